@@ -0,0 +1,37 @@
+"""Create quantized (int8 and binary) Atlas Vector Search indexes on pages collection."""
+from lightodm import get_database
+from pymongo.operations import SearchIndexModel
+
+QUANTIZED_INDEXES = {
+    "vec_pages_large_dot_int8": "scalar",
+    "vec_pages_large_dot_bin": "binary",
+}
+
+
+def run():
+    db = get_database()
+    collection = db["pages"]
+
+    for index_name, quantization in QUANTIZED_INDEXES.items():
+        definition = {
+            "fields": [
+                {
+                    "type": "vector",
+                    "path": "emb_content_markdown_text_embedding_3_large",
+                    "similarity": "dotProduct",
+                    "numDimensions": 3072,
+                    "quantization": quantization,
+                },
+                {"type": "filter", "path": "document_id"},
+            ]
+        }
+
+        index_model = SearchIndexModel(
+            definition=definition, name=index_name, type="vectorSearch"
+        )
+        collection.create_search_index(model=index_model)
+        print(f"Created vector search index '{index_name}' on pages collection.")
+
+
+if __name__ == "__main__":
+    run()
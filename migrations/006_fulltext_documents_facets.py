@@ -0,0 +1,37 @@
+"""Add stringFacet mappings to the ft_documents index for search facets."""
+from lightodm import get_database
+
+
+def run():
+    db = get_database()
+    collection = db["documents"]
+
+    definition = {
+        "mappings": {
+            "dynamic": False,
+            "fields": {
+                "content": {"type": "string", "analyzer": "lucene.standard"},
+                "tags": [
+                    {"type": "string", "analyzer": "lucene.keyword"},
+                    {"type": "stringFacet"},
+                ],
+                "file_name": {"type": "string", "analyzer": "lucene.standard"},
+                "file_type": {"type": "stringFacet"},
+                "status": [
+                    {"type": "string", "analyzer": "lucene.keyword"},
+                    {"type": "stringFacet"},
+                ],
+                "document_type": [
+                    {"type": "string", "analyzer": "lucene.keyword"},
+                    {"type": "stringFacet"},
+                ],
+            },
+        }
+    }
+
+    collection.update_search_index("ft_documents", definition)
+    print("Updated search index 'ft_documents' with facet fields.")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,11 +1,28 @@
 import api from './client'
-import type { ExtractionRequest, ExtractionResponse, FieldResultRecord, SplitClassifyResult } from '@/types'
+import type {
+  CaseExtractionJob,
+  CaseExtractionRequest,
+  ExtractionRequest,
+  ExtractionResponse,
+  FieldResultRecord,
+  SplitClassifyResult,
+} from '@/types'
 
 export async function extractFields(request: ExtractionRequest): Promise<ExtractionResponse> {
   const { data } = await api.post('/extract', request)
   return data
 }
 
+export async function startCaseExtraction(request: CaseExtractionRequest): Promise<CaseExtractionJob> {
+  const { data } = await api.post('/extract/case-jobs', request)
+  return data
+}
+
+export async function getCaseExtraction(jobId: string): Promise<CaseExtractionJob> {
+  const { data } = await api.get(`/extract/case-jobs/${jobId}`)
+  return data
+}
+
 export async function getFieldResults(documentId: string): Promise<FieldResultRecord[]> {
   const { data } = await api.get('/field-results', { params: { document_id: documentId } })
   return data
@@ -50,7 +50,10 @@ export function useElementDisplay(
   function extractRegions(el: DocumentElement): Array<{ polygon: number[]; pageNumber: number }> {
     const regions: Array<{ polygon: number[]; pageNumber: number }> = []
 
-    if (el.type === 'key_value_pair') {
+    // Precomputed at parse time; older documents fall back to element_data
+    if (el.geometry?.bbox && el.geometry.bbox.length >= 8) {
+      regions.push({ polygon: el.geometry.bbox, pageNumber: el.page_number })
+    } else if (el.type === 'key_value_pair') {
       // Union key and value bounding regions
       const keyRegions = el.element_data?.key?.boundingRegions || []
       const valueRegions = el.element_data?.value?.boundingRegions || []
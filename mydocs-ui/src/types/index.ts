@@ -24,6 +24,15 @@ export interface FileMetadata {
   image_height?: number
 }
 
+export interface ElementGeometry {
+  bbox: number[]
+  bbox_norm: number[]
+  rows: number[][]
+  row_pages: number[]
+  key_bbox: number[]
+  value_bbox: number[]
+}
+
 export interface DocumentElement {
   id: string
   page_id: string
@@ -32,6 +41,7 @@ export interface DocumentElement {
   short_id?: string
   type: DocumentElementType
   element_data: Record<string, any>
+  geometry?: ElementGeometry | null
 }
 
 export interface Document {
@@ -136,12 +146,25 @@ export interface VectorSearchConfig {
   embedding_model?: string
   num_candidates: number
   score_boost: number
+  quantization?: 'int8' | 'binary' | null
+  rescore_multiplier?: number
+  dimensions?: number | null
 }
 
 export interface HybridSearchConfig {
   combination_method: string
   rrf_k: number
   weights: { fulltext: number; vector: number }
+  candidate_multiplier?: number
+}
+
+export interface SnippetConfig {
+  enabled: boolean
+  field?: string
+  max_fragments?: number
+  fragment_chars?: number
+  pre_tag?: string
+  post_tag?: string
 }
 
 export interface SearchFilters {
@@ -163,6 +186,27 @@ export interface SearchRequest {
   top_k?: number
   min_score?: number
   include_content_fields?: string[]
+  snippet?: SnippetConfig
+  use_cache?: boolean
+  group_by?: 'document' | null
+  group_size?: number
+  facets?: Array<'tags' | 'file_type' | 'status' | 'document_type'>
+  facet_size?: number
+  paginate?: boolean
+  cursor?: string
+  debug?: boolean
+  explain?: boolean
+}
+
+export interface SimilarSearchRequest {
+  document_id?: string
+  page_ids?: string[]
+  vector?: VectorSearchConfig
+  filters?: SearchFilters
+  top_k?: number
+  min_score?: number
+  include_content_fields?: string[]
+  exclude_source?: boolean
 }
 
 export interface SearchResult {
@@ -173,10 +217,36 @@ export interface SearchResult {
   scores: Record<string, number>
   content?: string
   content_markdown?: string
+  snippets?: string[]
   file_name?: string
   tags: string[]
 }
 
+export interface SearchResultGroup {
+  document_id: string
+  score: number
+  hits: number
+  page_ids: string[]
+  file_name?: string
+  file_type?: string
+  status?: string
+  document_type?: string
+  tags: string[]
+  page_count?: number
+}
+
+export interface FacetBucket {
+  value: string
+  count: number
+}
+
+export interface SearchDebugInfo {
+  total_ms: number
+  timings_ms: Record<string, number>
+  counts: Record<string, number>
+  explain?: Record<string, unknown> | null
+}
+
 export interface SearchResponse {
   results: SearchResult[]
   total: number
@@ -184,6 +254,11 @@ export interface SearchResponse {
   search_mode: string
   vector_index_used?: string
   embedding_model_used?: string
+  cached?: boolean
+  next_cursor?: string | null
+  groups?: SearchResultGroup[] | null
+  facets?: Record<string, FacetBucket[]> | null
+  debug?: SearchDebugInfo | null
 }
 
 export interface VectorIndexInfo {
@@ -192,6 +267,7 @@ export interface VectorIndexInfo {
   field: string
   dimensions: number
   similarity: string
+  quantization?: 'int8' | 'binary' | null
 }
 
 // Cases
@@ -237,6 +313,9 @@ export interface ExtractionRequest {
   fields?: string[]
   content_mode?: string
   reference_granularity?: string
+  max_concurrency?: number
+  use_llm_cache?: boolean
+  map_reduce_chunk_tokens?: number
 }
 
 export interface ExtractionResponse {
@@ -247,6 +326,59 @@ export interface ExtractionResponse {
   results: Record<string, FieldResult>
   model_used: string
   reference_granularity: string
+  llm_calls?: number
+  llm_cache_hits?: number
+  context_pages_dropped?: number
+  context_tokens_dropped?: number
+  map_reduce_chunks?: number
+}
+
+export interface CaseExtractionRequest {
+  case_id: string
+  document_type?: string
+  document_ids?: string[]
+  subdocuments?: boolean
+  subdocument_ids?: string[]
+  fields?: string[]
+  content_mode?: string
+  reference_granularity?: string
+  map_reduce_chunk_tokens?: number
+  document_concurrency?: number
+  max_concurrency?: number
+  use_llm_cache?: boolean
+  restart?: boolean
+  resume?: boolean
+}
+
+export type ExtractionJobStatus = 'pending' | 'running' | 'completed' | 'failed'
+
+export interface ExtractionUnit {
+  document_id: string
+  subdocument_id: string
+  document_type: string
+  case_type: string
+  status: ExtractionJobStatus
+  error?: string | null
+  target_object_id?: string | null
+  llm_calls: number
+  completed_at?: string | null
+}
+
+export interface CaseExtractionJob {
+  id: string
+  case_id: string
+  config_hash: string
+  case_type: string
+  request: CaseExtractionRequest
+  status: ExtractionJobStatus
+  units: ExtractionUnit[]
+  total_units: number
+  completed_units: number
+  failed_units: number
+  target_objects: Record<string, string[]>
+  created_at?: string | null
+  started_at?: string | null
+  finished_at?: string | null
 }
 
 // Sub-documents (from split & classify)
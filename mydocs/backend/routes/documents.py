@@ -21,6 +21,8 @@ from mydocs.parsing.base_parser import DocumentLockedException
 from mydocs.models import Document, DocumentPage, StorageBackendEnum, StorageModeEnum
 from mydocs.parsing.pipeline import batch_parse, ingest_files, parse_document
 from mydocs.parsing.storage import get_storage
+from mydocs.retrieval.cache import bump_corpus_generation
+from mydocs.retrieval.local import delete_document_from_local_indexes
 import mydocs.config as C
 
 router = APIRouter(prefix="/api/v1/documents")
@@ -365,6 +367,7 @@ async def add_tags(document_id: str, request: TagsRequest):
         {"_id": document_id},
         {"$addToSet": {"tags": {"$each": request.tags}}},
     )
+    await bump_corpus_generation()
     updated = await Document.aget(document_id)
     return updated.model_dump(by_alias=False, exclude_none=True)
 
@@ -378,6 +381,7 @@ async def remove_tag(document_id: str, tag: str):
         {"_id": document_id},
         {"$pull": {"tags": tag}},
     )
+    await bump_corpus_generation()
     updated = await Document.aget(document_id)
     return updated.model_dump(by_alias=False, exclude_none=True)
 
@@ -391,6 +395,9 @@ async def delete_document(document_id: str):
     # Delete pages
     await DocumentPage.adelete_many({"document_id": document_id})
 
+    # Drop rows from the local indexes (no-op for the Atlas backends)
+    delete_document_from_local_indexes(document_id)
+
     # Delete managed file and sidecar via storage backend
     if doc.managed_path:
         storage = get_storage(doc.storage_backend)
@@ -421,5 +428,6 @@ async def delete_document(document_id: str):
 
     # Delete document
     await Document.adelete_one({"_id": document_id})
+    await bump_corpus_generation()
 
     return Response(status_code=204)
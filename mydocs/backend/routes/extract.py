@@ -3,8 +3,12 @@
 from fastapi import APIRouter, HTTPException, Query
 from tinystructlog import get_logger
 
+from mydocs.extracting.case_job import start_case_job
+from mydocs.extracting.exceptions import CaseNotFoundError, NoDocumentsFoundError
 from mydocs.extracting.extractor import BaseExtractor
 from mydocs.extracting.models import (
+    CaseExtractionJob,
+    CaseExtractionRequest,
     ContentMode,
     ExtractionRequest,
     ExtractionResponse,
@@ -34,6 +38,34 @@ async def extract_fields(request: ExtractionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/extract/case-jobs", status_code=202)
+async def start_case_extraction(request: CaseExtractionRequest):
+    """Extract all documents of a case in the background.
+
+    Resumes the checkpointed job of the same case and settings, if any.
+    Poll GET /extract/case-jobs/{job_id} for progress.
+    """
+    try:
+        job = await start_case_job(request)
+        return job.model_dump(by_alias=False)
+    except CaseNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except NoDocumentsFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log.error(f"Failed to start case extraction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/extract/case-jobs/{job_id}")
+async def get_case_extraction(job_id: str):
+    """Get the status and progress of a case extraction job."""
+    job = await CaseExtractionJob.aget(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Case extraction job {job_id} not found")
+    return job.model_dump(by_alias=False)
+
+
 @router.get("/field-results")
 async def get_field_results(document_id: str = Query(..., description="Document ID to fetch results for")):
     """Get stored extraction results for a document."""
@@ -76,6 +108,7 @@ async def split_classify(request: SplitClassifyRequest):
             content_mode=request.content_mode,
             case_type=case_type,
             force=request.force,
+            use_llm_cache=request.use_llm_cache,
         )
         return result
     except HTTPException:
@@ -4,9 +4,17 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 from mydocs.parsing.config import EmbeddingConfig, ParserConfig
-from mydocs.retrieval.models import SearchRequest, SearchResponse
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+    SimilarSearchRequest,
+)
 from mydocs.retrieval.search import VECTOR_INDEX_MAP
 from mydocs.retrieval.search import search as retrieval_search
+from mydocs.retrieval.search import search_many, search_similar
 
 router = APIRouter(prefix="/api/v1/search")
 
@@ -19,23 +27,25 @@ def _error(status_code: int, error_code: str, detail: str) -> JSONResponse:
 
 
 def _similarity_from_index_name(index_name: str) -> str:
-    if index_name.endswith("_cos"):
+    if index_name.endswith("_cos") or "_cos_" in index_name:
         return "cosine"
     return "dotProduct"
 
 
-def _build_index_info(emb: EmbeddingConfig, search_target: str) -> dict | None:
-    key = (search_target, emb.target_field)
-    index_name = VECTOR_INDEX_MAP.get(key)
-    if index_name is None:
-        return None
-    return {
-        "index_name": index_name,
-        "embedding_model": emb.model,
-        "field": emb.target_field,
-        "dimensions": emb.dimensions,
-        "similarity": _similarity_from_index_name(index_name),
-    }
+def _build_index_infos(emb: EmbeddingConfig, search_target: str) -> list[dict]:
+    infos = []
+    for (target, field, quantization), index_name in VECTOR_INDEX_MAP.items():
+        if target != search_target or field not in (emb.target_field, emb.short_field):
+            continue
+        infos.append({
+            "index_name": index_name,
+            "embedding_model": emb.model,
+            "field": field,
+            "dimensions": emb.dimensions if field == emb.target_field else emb.short_dimensions,
+            "similarity": _similarity_from_index_name(index_name),
+            "quantization": quantization,
+        })
+    return infos
 
 
 @router.post("/", response_model=SearchResponse)
@@ -46,20 +56,35 @@ async def search_documents(request: SearchRequest):
         return _error(400, "INVALID_REQUEST", str(exc))
 
 
+@router.post("/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest):
+    max_requests = RetrievalConfig().batch_search.max_requests
+    if len(request.requests) > max_requests:
+        return _error(
+            400, "INVALID_REQUEST",
+            f"Batch of {len(request.requests)} requests exceeds the limit of {max_requests}",
+        )
+    return await search_many(request.requests, max_concurrency=request.max_concurrency)
+
+
+@router.post("/similar", response_model=SearchResponse)
+async def search_similar_pages(request: SimilarSearchRequest):
+    try:
+        return await search_similar(request)
+    except ValueError as exc:
+        return _error(400, "INVALID_REQUEST", str(exc))
+
+
 @router.get("/indices")
 async def list_indices():
     config = ParserConfig()
 
     pages = []
     for emb in config.page_embeddings or []:
-        info = _build_index_info(emb, "pages")
-        if info:
-            pages.append(info)
+        pages.extend(_build_index_infos(emb, "pages"))
 
     documents = []
     for emb in config.document_embeddings or []:
-        info = _build_index_info(emb, "documents")
-        if info:
-            documents.append(info)
+        documents.extend(_build_index_infos(emb, "documents"))
 
     return {"pages": pages, "documents": documents}
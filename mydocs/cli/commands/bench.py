@@ -0,0 +1,81 @@
+"""mydocs bench command — offline search evaluation and latency benchmarks."""
+
+import json
+import sys
+
+from mydocs.cli.formatters import format_bench_reports
+from mydocs.retrieval.config import RetrievalConfig
+
+
+def register(subparsers):
+    parser = subparsers.add_parser("bench", help="Benchmark search quality and latency")
+    sub = parser.add_subparsers(dest="bench_action")
+
+    search_parser = sub.add_parser("search", help="Evaluate search against a judged query set (JSONL)")
+    search_parser.add_argument("queries", help="Path to the query set (JSONL with query and relevant IDs)")
+    search_parser.add_argument("--mode", choices=["fulltext", "vector", "hybrid"], default="hybrid", help="Search mode (default: hybrid)")
+    search_parser.add_argument("--target", choices=["pages", "documents"], default="pages", help="Search target (default: pages)")
+    search_parser.add_argument("--k", type=int, default=10, help="Cutoff for recall@k and nDCG@k (default: 10)")
+    search_parser.add_argument("--concurrency", type=int, default=1, help="Queries in flight at once (default: 1)")
+    search_parser.add_argument("--warmup", type=int, default=1, help="Unmeasured warm-up queries per variant (default: 1)")
+    search_parser.add_argument(
+        "--variant", action="append", default=[], metavar="NAME=JSON",
+        help='SearchRequest overrides to compare, e.g. rrf20=\'{"hybrid": {"rrf_k": 20}}\' (repeatable)',
+    )
+    search_parser.add_argument(
+        "--backend", choices=["local", "atlas"], default=None,
+        help="Override the vector and full-text backends (default: as configured)",
+    )
+    search_parser.add_argument("--output", choices=["json", "table"], default="table", help="Output format (default: table)")
+    parser.set_defaults(func=handle)
+
+
+def _parse_variants(values: list[str]) -> dict[str, dict]:
+    if not values:
+        return {"baseline": {}}
+    variants = {}
+    for value in values:
+        name, sep, overrides = value.partition("=")
+        if not sep or not name:
+            raise ValueError(f"Invalid --variant {value!r}; expected NAME=JSON")
+        try:
+            variants[name] = json.loads(overrides) if overrides else {}
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON for variant {name!r}: {exc}") from exc
+        if not isinstance(variants[name], dict):
+            raise ValueError(f"Variant {name!r} must be a JSON object")
+    return variants
+
+
+async def handle(args):
+    if getattr(args, "bench_action", None) == "search":
+        await _handle_search(args)
+    else:
+        print("Error: specify a subcommand: search", file=sys.stderr)
+        sys.exit(2)
+
+
+async def _handle_search(args):
+    from mydocs.retrieval.evaluation import load_query_set, run_benchmark
+
+    queries = load_query_set(args.queries)
+    if not queries:
+        print("No queries found.")
+        return
+
+    retrieval_config = RetrievalConfig()
+    if args.backend:
+        retrieval_config.vector_backend = args.backend
+        retrieval_config.fulltext_backend = args.backend
+
+    print(f"Running {len(queries)} queries...", file=sys.stderr)
+    reports = await run_benchmark(
+        queries,
+        _parse_variants(args.variant),
+        base_request={"search_mode": args.mode, "search_target": args.target},
+        k=args.k,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        retrieval_config=retrieval_config,
+    )
+    format_bench_reports(reports, args.output)
@@ -4,6 +4,8 @@ import sys
 
 from mydocs.cli.formatters import format_doc_pages, format_doc_show, format_docs_list
 from mydocs.models import Document, DocumentPage, DocumentStatusEnum
+from mydocs.retrieval.cache import bump_corpus_generation
+from mydocs.retrieval.local import delete_document_from_local_indexes
 
 
 def register(subparsers):
@@ -121,6 +123,7 @@ async def _handle_tag(args, output):
             {"_id": args.doc_id},
             {"$addToSet": {"tags": {"$each": tag_list}}},
         )
+    await bump_corpus_generation()
 
     updated = await Document.aget(args.doc_id)
     format_doc_show(updated, output)
@@ -139,4 +142,6 @@ async def _handle_delete(args):
 
     await DocumentPage.adelete_many({"document_id": args.doc_id})
     await doc.adelete()
+    delete_document_from_local_indexes(args.doc_id)
+    await bump_corpus_generation()
     print(f"Deleted document {args.doc_id} ({doc.original_file_name})")
@@ -3,12 +3,14 @@
 import sys
 
 from mydocs.cli.formatters import (
+    format_case_job,
     format_extraction_result,
     format_field_results,
     format_split_classify_result,
 )
-from mydocs.extracting.extractor import BaseExtractor
-from mydocs.extracting.models import ExtractionRequest, FieldResultRecord
+from mydocs.extracting.case_job import prepare_case_job, run_case_job
+from mydocs.extracting.exceptions import NoDocumentsFoundError
+from mydocs.extracting.models import CaseExtractionRequest, FieldResultRecord
 from mydocs.extracting.prompt_utils import get_split_classify_prompt
 from mydocs.extracting.splitter import split_and_classify
 from mydocs.models import Case, Document
@@ -26,6 +28,13 @@ def register(subparsers):
     run_parser.add_argument("--content-mode", choices=["markdown", "html"], default="markdown", help="Content mode (default: markdown)")
     run_parser.add_argument("--reference-granularity", choices=["full", "page", "none"], default="none", help="Reference granularity (default: none)")
     run_parser.add_argument("--subdocument-id", default=None, help="SubDocument ID to scope extraction to")
+    run_parser.add_argument("--subdocuments", action="store_true", default=False, help="Extract each subdocument of split documents separately")
+    run_parser.add_argument("--document-concurrency", type=int, default=None, help="Documents extracted concurrently (default: 4)")
+    run_parser.add_argument("--max-concurrency", type=int, default=None, help="Field groups extracted concurrently per document (default: 4)")
+    run_parser.add_argument("--restart", action="store_true", default=False, help="Re-extract all documents instead of resuming the previous run")
+    run_parser.add_argument("--resume", action="store_true", default=False, help="Resume a completed run too, extracting only documents added since")
+    run_parser.add_argument("--no-llm-cache", action="store_true", default=False, help="Bypass the LLM response cache")
+    run_parser.add_argument("--map-reduce-chunk-tokens", type=int, default=None, help="Extract contexts larger than this many tokens chunk by chunk (default: prompt config)")
 
     # extract results <case_id>
     results_parser = sub.add_parser("results", help="Show extraction results for a case")
@@ -37,6 +46,7 @@ def register(subparsers):
     sc_parser.add_argument("--case-type", default="generic", help="Case type (default: generic)")
     sc_parser.add_argument("--content-mode", choices=["markdown", "html"], default="markdown", help="Content mode (default: markdown)")
     sc_parser.add_argument("--force", action="store_true", default=False, help="Force re-classification even if hashes match")
+    sc_parser.add_argument("--no-llm-cache", action="store_true", default=False, help="Bypass the LLM response cache")
 
     parser.add_argument(
         "--output",
@@ -75,30 +85,45 @@ async def _handle_run(args, output):
     if args.fields:
         fields = [f.strip() for f in args.fields.split(",") if f.strip()]
 
-    print(f"Extracting fields for case: {case.name} ({len(case.document_ids)} documents)", file=sys.stderr)
+    subdocument_id = getattr(args, "subdocument_id", None)
+    request = CaseExtractionRequest(
+        case_id=args.case_id,
+        document_type=args.document_type,
+        subdocuments=getattr(args, "subdocuments", False),
+        subdocument_ids=[subdocument_id] if subdocument_id else None,
+        fields=fields,
+        content_mode=args.content_mode,
+        reference_granularity=args.reference_granularity,
+        map_reduce_chunk_tokens=getattr(args, "map_reduce_chunk_tokens", None),
+        document_concurrency=getattr(args, "document_concurrency", None),
+        max_concurrency=getattr(args, "max_concurrency", None),
+        use_llm_cache=not getattr(args, "no_llm_cache", False),
+        restart=getattr(args, "restart", False),
+        resume=getattr(args, "resume", False),
+    )
 
-    for i, doc_id in enumerate(case.document_ids):
-        doc = await Document.aget(doc_id)
-        doc_name = doc.original_file_name if doc else doc_id
-        print(f"\n[{i + 1}/{len(case.document_ids)}] {doc_name}", file=sys.stderr)
-
-        request = ExtractionRequest(
-            case_id=args.case_id,
-            case_type=case.type,
-            document_type=args.document_type,
-            document_ids=[doc_id],
-            fields=fields,
-            content_mode=args.content_mode,
-            reference_granularity=args.reference_granularity,
-            subdocument_id=getattr(args, "subdocument_id", None),
-        )
-
-        try:
-            extractor = BaseExtractor(request)
-            response = await extractor.run()
-            format_extraction_result(response, doc_name, output)
-        except Exception as e:
-            print(f"  Error: {e}", file=sys.stderr)
+    try:
+        job = await prepare_case_job(request)
+    except NoDocumentsFoundError as e:
+        print(str(e), file=sys.stderr)
+        return
+
+    print(
+        f"Extracting fields for case: {case.name} ({job.total_units} units, "
+        f"{job.completed_units} already completed)",
+        file=sys.stderr,
+    )
+
+    def progress(job, unit, response):
+        name = f"{unit.document_id}/{unit.subdocument_id}" if unit.subdocument_id else unit.document_id
+        print(f"\n[{job.completed_units + job.failed_units}/{job.total_units}] {name}", file=sys.stderr)
+        if response:
+            format_extraction_result(response, name, output)
+        else:
+            print(f"  Error: {unit.error}", file=sys.stderr)
+
+    job = await run_case_job(job, progress=progress)
+    format_case_job(job, output)
 
 
 async def _handle_results(args, output):
@@ -138,11 +163,16 @@ async def _handle_split_classify(args, output):
 
     force = getattr(args, "force", False)
 
+    def progress(completed, total):
+        print(f"  Classified batch {completed}/{total}", file=sys.stderr)
+
     result = await split_and_classify(
         document_id=document_id,
         prompt_config=prompt_config,
         content_mode=content_mode,
         case_type=case_type,
         force=force,
+        progress=progress,
+        use_llm_cache=not getattr(args, "no_llm_cache", False),
     )
     format_split_classify_result(result, output)
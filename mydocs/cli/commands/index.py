@@ -0,0 +1,133 @@
+"""mydocs index command — manage the embedded local search indexes."""
+
+import sys
+
+from mydocs.cli.formatters import print_table
+from mydocs.parsing.config import ParserConfig
+from mydocs.retrieval.config import RetrievalConfig
+
+
+def register(subparsers):
+    parser = subparsers.add_parser("index", help="Local search index management")
+    sub = parser.add_subparsers(dest="index_action")
+
+    rebuild_parser = sub.add_parser("rebuild", help="Rebuild local indexes from data stored in MongoDB")
+    rebuild_parser.add_argument("--target", choices=["pages", "documents", "all"], default="all", help="Search target (default: all)")
+    rebuild_parser.add_argument("--kind", choices=["vector", "fulltext", "all"], default="all", help="Index kind (default: all)")
+
+    backfill_parser = sub.add_parser(
+        "backfill-short", help="Populate Matryoshka short vectors from the stored full vectors",
+    )
+    backfill_parser.add_argument("--target", choices=["pages", "documents", "all"], default="all", help="Search target (default: all)")
+    backfill_parser.add_argument("--overwrite", action="store_true", help="Recompute short vectors that already exist")
+
+    sub.add_parser("stats", help="Show local index sizes")
+    parser.set_defaults(func=handle)
+
+
+def _configured_vector_fields(target: str) -> list[tuple[str, str]]:
+    parser_config = ParserConfig()
+    configs = []
+    if target in ("pages", "all"):
+        configs += [("pages", ec) for ec in parser_config.page_embeddings or []]
+    if target in ("documents", "all"):
+        configs += [("documents", ec) for ec in parser_config.document_embeddings or []]
+    fields = []
+    for search_target, ec in configs:
+        fields.append((search_target, ec.target_field))
+        if ec.short_field:
+            fields.append((search_target, ec.short_field))
+    return fields
+
+
+def _configured_fulltext_fields(target: str) -> list[tuple[str, str]]:
+    config = RetrievalConfig().local_fulltext
+    fields = []
+    if target in ("pages", "all"):
+        fields += [("pages", field) for field in config.page_fields]
+    if target in ("documents", "all"):
+        fields += [("documents", field) for field in config.document_fields]
+    return fields
+
+
+async def handle(args):
+    action = getattr(args, "index_action", None)
+    if action == "rebuild":
+        await _handle_rebuild(args)
+    elif action == "backfill-short":
+        await _handle_backfill_short(args)
+    elif action == "stats":
+        _handle_stats()
+    else:
+        print("Error: specify a subcommand: rebuild, backfill-short or stats", file=sys.stderr)
+        sys.exit(2)
+
+
+async def _handle_rebuild(args):
+    from mydocs.retrieval.local import rebuild_fulltext_index, rebuild_vector_index
+
+    retrieval_config = RetrievalConfig()
+    rows = []
+    if args.kind in ("vector", "all"):
+        for search_target, vector_field in _configured_vector_fields(args.target):
+            print(f"Rebuilding vector {search_target}.{vector_field}...", file=sys.stderr)
+            total = await rebuild_vector_index(search_target, vector_field, retrieval_config.local_vector)
+            rows.append(["vector", search_target, vector_field, str(total)])
+    if args.kind in ("fulltext", "all"):
+        for search_target, field in _configured_fulltext_fields(args.target):
+            print(f"Rebuilding fulltext {search_target}.{field}...", file=sys.stderr)
+            total = await rebuild_fulltext_index(search_target, field, retrieval_config.local_fulltext)
+            rows.append(["fulltext", search_target, field, str(total)])
+
+    if not rows:
+        print("No index fields configured.")
+        return
+    print_table(["Kind", "Target", "Field", "Rows"], rows)
+
+
+async def _handle_backfill_short(args):
+    from mydocs.retrieval.embeddings import backfill_short_embeddings
+
+    parser_config = ParserConfig()
+    retrieval_config = RetrievalConfig()
+    local_config = retrieval_config.local_vector if retrieval_config.vector_backend == "local" else None
+
+    configs = []
+    if args.target in ("pages", "all"):
+        configs += [("pages", ec) for ec in parser_config.page_embeddings or []]
+    if args.target in ("documents", "all"):
+        configs += [("documents", ec) for ec in parser_config.document_embeddings or []]
+
+    rows = []
+    for search_target, ec in configs:
+        if not ec.short_field:
+            continue
+        print(f"Backfilling {search_target}.{ec.short_field}...", file=sys.stderr)
+        total = await backfill_short_embeddings(
+            search_target, ec.target_field, ec.short_field, ec.short_dimensions,
+            overwrite=args.overwrite, local_config=local_config,
+        )
+        rows.append([search_target, ec.short_field, str(ec.short_dimensions), str(total)])
+
+    if not rows:
+        print("No embedding configs with short_dimensions found in parser configuration.")
+        return
+    print_table(["Target", "Field", "Dimensions", "Updated"], rows)
+
+
+def _handle_stats():
+    from mydocs.retrieval.local import get_fulltext_index, get_vector_index
+
+    retrieval_config = RetrievalConfig()
+    rows = []
+    for search_target, vector_field in _configured_vector_fields("all"):
+        index = get_vector_index(search_target, vector_field, retrieval_config.local_vector)
+        rows.append(["vector", search_target, vector_field, str(len(index)), index.path])
+    for search_target, field in _configured_fulltext_fields("all"):
+        index = get_fulltext_index(search_target, field, retrieval_config.local_fulltext)
+        rows.append(["fulltext", search_target, field, str(len(index)), index.path])
+
+    if not rows:
+        print("No index fields configured.")
+        return
+    print_table(["Kind", "Target", "Field", "Rows", "Path"], rows)
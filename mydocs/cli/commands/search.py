@@ -2,7 +2,7 @@
 
 from mydocs.cli.formatters import format_search_result
 from mydocs.retrieval import search
-from mydocs.retrieval.models import SearchFilters, SearchRequest
+from mydocs.retrieval.models import SearchFilters, SearchRequest, SnippetConfig
 
 
 def register(subparsers):
@@ -12,6 +12,7 @@ def register(subparsers):
     parser.add_argument("--target", choices=["pages", "documents"], default="pages", help="Search target (default: pages)")
     parser.add_argument("--top-k", type=int, default=10, help="Max results (default: 10)")
     parser.add_argument("--tags", default=None, help="Filter by tags (comma-separated)")
+    parser.add_argument("--snippets", action="store_true", help="Return highlighted fragments around the matches")
     parser.add_argument("--output", choices=["json", "table", "quiet", "full"], default="table", help="Output format (default: table)")
     parser.set_defaults(func=handle)
 
@@ -27,6 +28,10 @@ async def handle(args):
     )
     if args.output == "full":
         request.include_content_fields = ["content", "content_markdown"]
+    elif args.output in ("table", "quiet"):
+        request.include_content_fields = []  # not displayed
+    if args.snippets:
+        request.snippet = SnippetConfig(enabled=True, pre_tag="[", post_tag="]")
 
     response = await search(request)
     format_search_result(response, args.output)
@@ -125,6 +125,12 @@ def format_search_result(response, mode: str) -> None:
             print_table(headers, rows)
         print(f"\n{response.total} results ({response.search_mode} on {response.search_target})")
 
+        if mode == "table" and any(r.snippets for r in response.results):
+            print()
+            for i, r in enumerate(response.results):
+                for snippet in r.snippets or []:
+                    print(f"[{i + 1}] {snippet}")
+
         if mode == "full" and response.results:
             print()
             for i, r in enumerate(response.results):
@@ -292,6 +298,26 @@ def format_extraction_result(response, document_name: str, mode: str) -> None:
             rows.append([field_name, content, justification])
         print_table(headers, rows)
         print(f"\nModel: {response.model_used}")
+        if response.llm_cache_hits:
+            print(f"LLM calls: {response.llm_calls} (cache hits: {response.llm_cache_hits})")
+
+
+def format_case_job(job, mode: str) -> None:
+    """Format and print the outcome of a case extraction job."""
+    if mode == "json":
+        print(json.dumps(job.model_dump(by_alias=False, mode="json"), indent=2))
+    elif mode == "quiet":
+        print(f"{job.status}\t{job.completed_units}/{job.total_units} units, {job.failed_units} failed")
+    else:
+        print(f"\nJob {job.id}: {job.status}")
+        print(f"Units: {job.completed_units}/{job.total_units} completed, {job.failed_units} failed")
+        rows = [
+            [unit.document_id, unit.subdocument_id, unit.document_type, unit.error or ""]
+            for unit in job.units if unit.error
+        ]
+        print_table(["Document", "SubDocument", "DocType", "Error"], rows)
+        for document_type, ids in job.target_objects.items():
+            print(f"Target objects ({document_type}): {len(ids)}")
 
 
 def format_field_results(records, mode: str) -> None:
@@ -465,3 +491,29 @@ def format_config(serialized_config, mode: str) -> None:
             print(serialized_config.config_yaml, end="")
         else:
             print(json.dumps(serialized_config.config_dict, indent=2))
+
+
+def format_bench_reports(reports, mode: str) -> None:
+    """Format and print search benchmark reports."""
+    if mode == "json":
+        print(json.dumps([r.model_dump() for r in reports], indent=2))
+    else:
+        if not reports:
+            print("No variants run.")
+            return
+        k = reports[0].k
+        headers = [
+            "Variant", "Queries", "Errors", f"Recall@{k}", f"nDCG@{k}", "MRR",
+            "p50 ms", "p95 ms", "p99 ms", "QPS",
+        ]
+        rows = [
+            [
+                r.variant, str(r.queries), str(r.errors),
+                f"{r.recall:.4f}", f"{r.ndcg:.4f}", f"{r.mrr:.4f}",
+                f"{r.latency_p50_ms:.1f}", f"{r.latency_p95_ms:.1f}", f"{r.latency_p99_ms:.1f}",
+                f"{r.throughput_qps:.2f}",
+            ]
+            for r in reports
+        ]
+        print_table(headers, rows)
+        print(f"\nConcurrency: {reports[0].concurrency}")
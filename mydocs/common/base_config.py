@@ -1,16 +1,73 @@
+import copy
 import hashlib
 import json
 import os
+from collections import OrderedDict
 from typing import Any, Dict, Literal, Optional
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from tinystructlog import get_logger
 
 import mydocs.config as C
 
 log = get_logger(__name__)
 
+# Parsed YAML layers by path: (mtime_ns, size, data). data is None when the
+# file failed to parse, so a broken file is reported once per change.
+_yaml_cache: dict[str, tuple[int, int, Optional[dict]]] = {}
+
+# Loaded configs by layer key (class, YAML path, YAML mtime/size, scalar
+# constructor arguments): field values after applying the YAML layer, and
+# serialized dumps by (layer key, format, exclude). Most recent last.
+_instance_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_dump_cache: "OrderedDict[tuple, SerializedConfig]" = OrderedDict()
+_CACHE_SIZE = 64
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def clear_config_cache() -> None:
+    """Drop all cached YAML layers, loaded configs and serialized configs."""
+    _yaml_cache.clear()
+    _instance_cache.clear()
+    _dump_cache.clear()
+
+
+def _cache_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _load_yaml_layer(config_path: str) -> Optional[dict]:
+    """Parsed YAML for config_path, re-read only when its mtime or size changes.
+
+    Returns a copy callers may modify, or None when the file is missing or
+    cannot be parsed.
+    """
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        _yaml_cache.pop(config_path, None)
+        return None
+
+    cached = _yaml_cache.get(config_path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        data = cached[2]
+    else:
+        try:
+            with open(config_path, 'r') as f:
+                data = yaml.safe_load(f) or {}
+            log.info(f"Loaded configuration from: {config_path}")
+        except yaml.YAMLError as e:
+            log.error(f"Error parsing YAML file {config_path}: {e}")
+            log.warning("Using existing configuration values due to YAML parsing error.")
+            data = None
+        _yaml_cache[config_path] = (stat.st_mtime_ns, stat.st_size, data)
+
+    return copy.deepcopy(data) if data is not None else None
+
 
 class SerializedConfig(BaseModel):
     config_dict: Dict[str, Any]
@@ -23,13 +80,59 @@ class BaseConfig(BaseModel):
     config_name: str
     config_root: str = C.CONFIG_ROOT
 
+    # Identifies an unmodified config loaded from YAML (None once a field is
+    # assigned), and this instance's dump_config() results
+    _layer_key: Optional[tuple] = PrivateAttr(default=None)
+    _dumps: dict = PrivateAttr(default_factory=dict)
+
     def __init__(self, **kwargs):
         is_internal_load = kwargs.pop('_is_internal_load', False)
         super().__init__(**kwargs)
 
-        if not is_internal_load:
+        if is_internal_load:
+            return
+
+        layer_key = self._build_layer_key(kwargs)
+        cached = _instance_cache.get(layer_key) if layer_key else None
+        if cached is not None:
+            _instance_cache.move_to_end(layer_key)
+            self.__dict__.update(copy.deepcopy(cached))
+        else:
             updated_instance = self.apply_yaml_config(self.config_name, self.config_root)
             self.__dict__.update(updated_instance.__dict__)
+            if layer_key:
+                _cache_put(_instance_cache, layer_key, copy.deepcopy(self.__dict__))
+        self._layer_key = layer_key
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            # Assigned fields invalidate the memoized dumps; in-place changes
+            # to nested values are not tracked
+            self._layer_key = None
+            self._dumps = {}
+
+    def model_copy(self, *, update: Optional[dict] = None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            copied._layer_key = None
+            copied._dumps = {}
+        return copied
+
+    def _build_layer_key(self, kwargs: dict) -> Optional[tuple]:
+        """Cache key of a config loaded from YAML, or None if it cannot be cached.
+
+        Only configs built from scalar arguments are cached.
+        """
+        if not all(isinstance(value, _SCALARS) for value in kwargs.values()):
+            return None
+        config_path = os.path.join(self.config_root, f"{self.config_name}.yml")
+        try:
+            stat = os.stat(config_path)
+            layer = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            layer = None
+        return type(self), config_path, layer, tuple(sorted(kwargs.items()))
 
     def apply_config(self, other_config: 'BaseConfig') -> 'BaseConfig':
         """Apply configuration updates from another BaseConfig instance with recursive merging."""
@@ -62,27 +165,47 @@ class BaseConfig(BaseModel):
             return self
 
         try:
-            with open(config_path, 'r') as f:
-                yaml_data = yaml.safe_load(f) or {}
+            yaml_data = _load_yaml_layer(config_path)
+            if yaml_data is None:
+                return self
 
             temp_config = self.__class__(**yaml_data, _is_internal_load=True)
             updated_config = self.apply_config(temp_config)
-            log.info(f"Successfully loaded and applied configuration from: {config_path}")
+            log.debug(f"Applied configuration from: {config_path}")
             return updated_config
 
-        except yaml.YAMLError as e:
-            log.error(f"Error parsing YAML file {config_path}: {e}")
-            log.warning("Using existing configuration values due to YAML parsing error.")
-            return self
-
         except Exception as e:
             log.error(f"Error loading configuration from {config_path}: {e}")
             log.warning("Using existing configuration values due to loading error.")
             return self
 
-    def dump_config(self, format: Literal["yaml", "json"] = "yaml") -> SerializedConfig:
-        """Dump configuration to YAML or JSON with deterministic output and SHA256 hash."""
-        config_data = self.model_dump(exclude_none=True)
+    def dump_config(
+        self,
+        format: Literal["yaml", "json"] = "yaml",
+        exclude: Optional[dict] = None,
+    ) -> SerializedConfig:
+        """Dump configuration to YAML or JSON with deterministic output and SHA256 hash.
+
+        exclude is passed to model_dump to leave settings out of the dump and
+        its hash. Results are memoized per instance, and across instances
+        loaded from the same YAML layer and arguments, so dumping an
+        unchanged configuration does not serialize it again. Assigning a
+        field drops the memo; nested values must not be changed in place.
+        """
+        if format not in ("yaml", "json"):
+            raise ValueError(f"Unsupported format: {format}. Use 'yaml' or 'json'")
+
+        memo_key = (format, repr(exclude))
+        cached = self._dumps.get(memo_key)
+        if cached is None and self._layer_key is not None:
+            cached = _dump_cache.get((self._layer_key, *memo_key))
+            if cached is not None:
+                _dump_cache.move_to_end((self._layer_key, *memo_key))
+        if cached is not None:
+            self._dumps[memo_key] = cached
+            return cached.model_copy(deep=True)
+
+        config_data = self.model_dump(exclude_none=True, exclude=exclude)
 
         config_yaml = None
         config_json = None
@@ -93,20 +216,22 @@ class BaseConfig(BaseModel):
                 allow_unicode=True, sort_keys=True, indent=2
             )
             config_yaml = serialized_str
-        elif format == "json":
+        else:
             serialized_str = json.dumps(
                 config_data, indent=2, sort_keys=True,
                 ensure_ascii=False, separators=(',', ': ')
             )
             config_json = serialized_str
-        else:
-            raise ValueError(f"Unsupported format: {format}. Use 'yaml' or 'json'")
 
         config_hash = hashlib.sha256(serialized_str.encode('utf-8')).hexdigest()
 
-        return SerializedConfig(
+        serialized = SerializedConfig(
             config_dict=config_data,
             config_yaml=config_yaml,
             config_json=config_json,
             config_hash=config_hash,
         )
+        self._dumps[memo_key] = serialized
+        if self._layer_key is not None:
+            _cache_put(_dump_cache, (self._layer_key, *memo_key), serialized)
+        return serialized.model_copy(deep=True)
@@ -44,3 +44,9 @@ AZURE_STORAGE_CACHE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CACHE_CONTAIN
 
 # Storage backend selection
 STORAGE_BACKEND = os.environ.get("MYDOCS_STORAGE_BACKEND", "local")
+
+# LLM response cache (extraction and split-classify prompts)
+LLM_CACHE_ENABLED = os.environ.get("MYDOCS_LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_FOLDER = os.environ.get("MYDOCS_LLM_CACHE_FOLDER")  # default: <DATA_FOLDER>/llm_cache
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("MYDOCS_LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("MYDOCS_LLM_CACHE_MAX_ENTRIES", "10000"))
@@ -0,0 +1,326 @@
+"""Case-level extraction jobs: resumable, concurrent extraction of a whole case.
+
+A CaseExtractionJob fans out one BaseExtractor run per unit, i.e. per
+document of the case or, with `subdocuments`, per subdocument of split
+documents. At most document_concurrency units run at once, each with its
+own max_concurrency field groups. Every finished unit is checkpointed in
+the `extraction_jobs` collection, so a job interrupted by a crash or a
+cancel resumes from its completed units.
+
+The job ID is derived from the case, the request settings that affect
+results and the field definitions and prompt configs the units extract
+with (case_job_hash); concurrency and cache settings can change between a
+run and its resumption. A unit that fails is recorded with its error and
+does not stop the other units; re-running the job retries it. A completed
+job is only resumed on request, otherwise it is run again from scratch.
+When all units ran, the target object IDs of the completed units are
+collected per document type.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from lightodm import generate_composite_id
+from tinystructlog import get_logger
+
+from mydocs.extracting.exceptions import CaseNotFoundError, ConfigNotFoundError, NoDocumentsFoundError
+from mydocs.extracting.extractor import BaseExtractor
+from mydocs.extracting.models import (
+    CaseExtractionJob,
+    CaseExtractionRequest,
+    ExtractionJobStatus,
+    ExtractionRequest,
+    ExtractionResponse,
+    ExtractionUnit,
+)
+from mydocs.extracting.prompt_utils import calculate_content_hash, get_all_fields, get_prompt
+from mydocs.models import Case, Document
+
+log = get_logger(__name__)
+
+DEFAULT_DOCUMENT_CONCURRENCY = 4
+
+# Execution settings that do not affect extraction results
+_EXECUTION_FIELDS = {"document_concurrency", "max_concurrency", "use_llm_cache", "restart", "resume"}
+
+UnitProgress = Callable[[CaseExtractionJob, ExtractionUnit, Optional[ExtractionResponse]], None]
+
+# Jobs running in this process, and locks serializing their start, by _request_key
+_running_jobs: dict[str, tuple[CaseExtractionJob, asyncio.Task]] = {}
+_start_locks: dict[str, asyncio.Lock] = {}
+
+
+def _request_settings(request: CaseExtractionRequest) -> dict:
+    """The request settings that affect the extraction results."""
+    return request.model_dump(mode="json", exclude=_EXECUTION_FIELDS)
+
+
+def extraction_config_hash(case_type: str, document_type: str, fields: Optional[list[str]] = None) -> str:
+    """Hash of the field definitions and prompt configs of a case/document type.
+
+    Only the requested fields (all by default) and the prompts of their
+    groups are included. A missing prompt is hashed as such; the unit fails
+    when it runs.
+    """
+    field_definitions = get_all_fields(case_type, document_type)
+    if fields:
+        requested = set(fields)
+        field_definitions = [field for field in field_definitions if field.name in requested]
+
+    prompts = {}
+    for group in sorted({field.group for field in field_definitions}):
+        try:
+            prompts[str(group)] = get_prompt(case_type, document_type, group).model_dump(mode="json")
+        except ConfigNotFoundError:
+            prompts[str(group)] = None
+
+    return calculate_content_hash(json.dumps({
+        "fields": [field.model_dump(mode="json") for field in field_definitions],
+        "prompts": prompts,
+    }, sort_keys=True))
+
+
+def case_job_hash(request: CaseExtractionRequest, case_type: str, units: list[ExtractionUnit]) -> str:
+    """Hash of everything that affects the results of a job.
+
+    Combines the result-affecting request settings with the extraction
+    configs of every (case type, document type) of the units, so editing a
+    field definition or prompt starts a new job instead of resuming one
+    whose completed units used the old configs.
+    """
+    config_types = sorted({(unit.case_type or case_type, unit.document_type) for unit in units})
+    configs = {
+        f"{unit_case_type}/{document_type}": extraction_config_hash(unit_case_type, document_type, request.fields)
+        for unit_case_type, document_type in config_types
+    }
+    return calculate_content_hash(json.dumps({
+        "request": _request_settings(request),
+        "configs": configs,
+    }, sort_keys=True))
+
+
+def _request_key(request: CaseExtractionRequest) -> str:
+    """Identifies the jobs of a request without loading its case and configs."""
+    return generate_composite_id([
+        request.case_id, calculate_content_hash(json.dumps(_request_settings(request), sort_keys=True)),
+    ])
+
+
+def _unit_key(unit: ExtractionUnit) -> tuple[str, str]:
+    return unit.document_id, unit.subdocument_id
+
+
+async def build_units(case: Case, request: CaseExtractionRequest) -> list[ExtractionUnit]:
+    """List the extraction units of a case, in case document order.
+
+    Documents are loaded with one query, projected to their subdocuments.
+    Documents that no longer exist are skipped.
+    """
+    document_ids = case.document_ids
+    if request.document_ids is not None:
+        requested = set(request.document_ids)
+        document_ids = [doc_id for doc_id in document_ids if doc_id in requested]
+
+    raw = await Document.aaggregate([
+        {"$match": {"_id": {"$in": document_ids}}},
+        {"$project": {
+            "_id": 1, "subdocuments.id": 1, "subdocuments.document_type": 1, "subdocuments.case_type": 1,
+        }},
+    ]) if document_ids else []
+    subdocuments_by_doc = {str(doc["_id"]): doc.get("subdocuments") or [] for doc in raw}
+
+    split_units = request.subdocuments or request.subdocument_ids is not None
+    units = []
+    for doc_id in document_ids:
+        if doc_id not in subdocuments_by_doc:
+            log.warning(f"Document {doc_id} of case {case.id} not found, skipping")
+            continue
+        subdocuments = subdocuments_by_doc[doc_id]
+        if split_units and subdocuments:
+            for subdoc in subdocuments:
+                if request.subdocument_ids is None or subdoc["id"] in request.subdocument_ids:
+                    units.append(ExtractionUnit(
+                        document_id=doc_id, subdocument_id=subdoc["id"], document_type=subdoc["document_type"],
+                        case_type=subdoc.get("case_type", ""),
+                    ))
+        elif request.subdocument_ids is None:
+            units.append(ExtractionUnit(document_id=doc_id, document_type=request.document_type))
+    return units
+
+
+def _update_counts(job: CaseExtractionJob) -> None:
+    job.total_units = len(job.units)
+    job.completed_units = sum(unit.status == ExtractionJobStatus.COMPLETED for unit in job.units)
+    job.failed_units = sum(unit.status == ExtractionJobStatus.FAILED for unit in job.units)
+
+
+async def prepare_case_job(request: CaseExtractionRequest) -> CaseExtractionJob:
+    """Create the job for a request, or load its checkpoint to resume it.
+
+    A checkpoint that is not completed is resumed unless request.restart: its
+    completed units are kept, failed and interrupted units are reset to
+    pending, and documents added to the case since are added as new units.
+    A completed checkpoint is only resumed with request.resume; otherwise
+    all units are extracted again.
+
+    Raises:
+        CaseNotFoundError: If the case does not exist.
+        NoDocumentsFoundError: If the request selects no documents.
+    """
+    case = await Case.aget(request.case_id)
+    if not case:
+        raise CaseNotFoundError(f"Case {request.case_id} not found")
+
+    units = await build_units(case, request)
+    if not units:
+        raise NoDocumentsFoundError(f"No documents to extract in case {request.case_id}")
+
+    config_hash = case_job_hash(request, case.type, units)
+    job = None if request.restart else await CaseExtractionJob.aget(generate_composite_id([case.id, config_hash]))
+    if job and job.status == ExtractionJobStatus.COMPLETED and not request.resume:
+        log.info(f"Case extraction job {job.id} already completed, extracting all units again")
+        job = None
+    if job:
+        checkpoint = {_unit_key(unit): unit for unit in job.units}
+        units = [
+            checkpoint[_unit_key(unit)]
+            if _unit_key(unit) in checkpoint
+            and checkpoint[_unit_key(unit)].status == ExtractionJobStatus.COMPLETED
+            else unit
+            for unit in units
+        ]
+        job.request = request
+        job.units = units
+        log.info(
+            f"Resuming case extraction job {job.id}: "
+            f"{sum(u.status == ExtractionJobStatus.COMPLETED for u in units)}/{len(units)} units completed"
+        )
+    else:
+        job = CaseExtractionJob(
+            case_id=case.id,
+            config_hash=config_hash,
+            request=request,
+            units=units,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    job.case_type = case.type
+    job.status = ExtractionJobStatus.PENDING
+    job.target_objects = {}
+    job.finished_at = None
+    _update_counts(job)
+    await job.asave()
+    return job
+
+
+def _unit_request(job: CaseExtractionJob, unit: ExtractionUnit) -> ExtractionRequest:
+    request = job.request
+    return ExtractionRequest(
+        case_id=job.case_id,
+        case_type=job.case_type,
+        document_type=unit.document_type,
+        document_ids=[unit.document_id],
+        subdocument_id=unit.subdocument_id or None,
+        fields=request.fields,
+        reference_granularity=request.reference_granularity,
+        content_mode=request.content_mode,
+        max_concurrency=request.max_concurrency,
+        use_llm_cache=request.use_llm_cache,
+        map_reduce_chunk_tokens=request.map_reduce_chunk_tokens,
+    )
+
+
+async def run_case_job(job: CaseExtractionJob, progress: Optional[UnitProgress] = None) -> CaseExtractionJob:
+    """Extract all units of a job that are not completed yet.
+
+    Each finished unit is checkpointed before the next progress callback.
+    Returns the job with status COMPLETED, or FAILED if any unit failed.
+    """
+    request = job.request
+    semaphore = asyncio.Semaphore(max(request.document_concurrency or DEFAULT_DOCUMENT_CONCURRENCY, 1))
+    checkpoint_lock = asyncio.Lock()
+    pending = [unit for unit in job.units if unit.status != ExtractionJobStatus.COMPLETED]
+
+    job.status = ExtractionJobStatus.RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    await job.asave()
+    log.info(f"Case extraction job {job.id}: {len(pending)}/{len(job.units)} units to extract")
+
+    async def extract_unit(unit: ExtractionUnit) -> None:
+        response = None
+        async with semaphore:
+            unit.status = ExtractionJobStatus.RUNNING
+            unit.error = None
+            try:
+                response = await BaseExtractor(_unit_request(job, unit)).run()
+            except Exception as e:
+                log.error(f"Extraction of {unit.document_id} {unit.subdocument_id} failed: {e}")
+                unit.status = ExtractionJobStatus.FAILED
+                unit.error = str(e)
+            else:
+                unit.status = ExtractionJobStatus.COMPLETED
+                unit.target_object_id = response.target_object_id
+                unit.llm_calls = response.llm_calls
+                unit.completed_at = datetime.now(timezone.utc)
+
+        async with checkpoint_lock:
+            _update_counts(job)
+            await job.asave()
+        log.info(
+            f"Case extraction job {job.id} progress: "
+            f"{job.completed_units + job.failed_units}/{job.total_units} units ({job.failed_units} failed)"
+        )
+        if progress:
+            progress(job, unit, response)
+
+    tasks = [asyncio.create_task(extract_unit(unit)) for unit in pending]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    target_objects: dict[str, list[str]] = {}
+    for unit in job.units:
+        if unit.status == ExtractionJobStatus.COMPLETED and unit.target_object_id:
+            target_objects.setdefault(unit.document_type, []).append(unit.target_object_id)
+    job.target_objects = target_objects
+    job.status = ExtractionJobStatus.FAILED if job.failed_units else ExtractionJobStatus.COMPLETED
+    job.finished_at = datetime.now(timezone.utc)
+    await job.asave()
+    log.info(
+        f"Case extraction job {job.id} {job.status}: {job.completed_units}/{job.total_units} units completed, "
+        f"{sum(len(ids) for ids in target_objects.values())} target objects"
+    )
+    return job
+
+
+async def start_case_job(request: CaseExtractionRequest) -> CaseExtractionJob:
+    """Start (or resume) a job in the background and return it.
+
+    A job that is already running in this process is returned as is.
+    Concurrent starts of the same request are serialized, so the job is
+    prepared and run once.
+    """
+    key = _request_key(request)
+    async with _start_locks.setdefault(key, asyncio.Lock()):
+        running = _running_jobs.get(key)
+        if running and not running[1].done():
+            return running[0]
+
+        job = await prepare_case_job(request)
+        task = asyncio.create_task(run_case_job(job))
+        _running_jobs[key] = (job, task)
+
+    def finished(task: asyncio.Task) -> None:
+        if _running_jobs.get(key, (None, None))[1] is task:
+            del _running_jobs[key]
+        if not task.cancelled() and task.exception():
+            log.error(f"Case extraction job {job.id} failed: {task.exception()}")
+
+    task.add_done_callback(finished)
+    return job
@@ -1,18 +1,23 @@
 """Context building utilities for the extraction pipeline.
 
 Converts field definitions to search queries, builds LLM context strings
-from retrieved pages, and prepares prompt inputs.
+from retrieved pages (optionally packed into a token budget), and prepares
+prompt inputs.
 """
 
 from typing import Optional
 
+import litellm
+from lightodm import generate_composite_id
 from tinystructlog import get_logger
 
 from mydocs.extracting.models import (
     ContentMode,
+    ContextStats,
     FieldDefinition,
     FieldInput,
     FieldPrompt,
+    FieldResult,
     FieldResultRecord,
     PromptInput,
 )
@@ -37,9 +42,14 @@ def fields_to_query(fields: list[FieldDefinition]) -> str:
 def get_context(
     pages: list[DocumentPage],
     content_mode: ContentMode = ContentMode.MARKDOWN,
+    doc_long_to_short: Optional[dict[str, str]] = None,
 ) -> tuple[str, dict[str, str]]:
     """Build LLM context string from retrieved pages.
 
+    doc_long_to_short fixes the short document IDs, so that contexts built
+    from different subsets of the same pages (map-reduce chunks) use the
+    same IDs; by default documents are numbered in order of appearance.
+
     Returns:
         A tuple of (context_string, doc_short_to_long) where doc_short_to_long
         maps short document IDs ("1", "2") to actual document IDs.
@@ -53,8 +63,9 @@ def get_context(
         if page.document_id not in unique_doc_ids:
             unique_doc_ids.append(page.document_id)
 
-    doc_long_to_short = {doc_id: str(i + 1) for i, doc_id in enumerate(unique_doc_ids)}
-    doc_short_to_long = {v: k for k, v in doc_long_to_short.items()}
+    if doc_long_to_short is None:
+        doc_long_to_short = {doc_id: str(i + 1) for i, doc_id in enumerate(unique_doc_ids)}
+    doc_short_to_long = {doc_long_to_short[doc_id]: doc_id for doc_id in unique_doc_ids}
 
     # Group pages by document
     pages_by_doc: dict[str, list[DocumentPage]] = {}
@@ -70,18 +81,186 @@ def get_context(
         doc_pages = sorted(pages_by_doc[doc_id], key=lambda p: p.page_number)
         for page in doc_pages:
             context_parts.append(f"## Page {page.page_number}")
-
-            if content_mode == ContentMode.HTML:
-                content = page.content_html or page.content_markdown or page.content or ""
-            else:
-                content = page.content_markdown or page.content or ""
-
-            context_parts.append(content)
+            context_parts.append(page_content(page, content_mode))
             context_parts.append("")  # blank line between pages
 
     return "\n".join(context_parts), doc_short_to_long
 
 
+def page_content(page: DocumentPage, content_mode: ContentMode = ContentMode.MARKDOWN) -> str:
+    """The content of a page rendered into the context for content_mode."""
+    if content_mode == ContentMode.HTML:
+        return page.content_html or page.content_markdown or page.content or ""
+    return page.content_markdown or page.content or ""
+
+
+# ---------------------------------------------------------------------------
+# Token-budgeted context packing
+# ---------------------------------------------------------------------------
+
+TRUNCATION_MARKER = "[... page truncated: {omitted} of {total} tokens omitted ...]"
+OMITTED_PAGES_MARKER = "[{dropped} of {total} retrieved pages omitted to fit the context budget]"
+MARKER_RESERVE_TOKENS = 32  # kept free for the omitted-pages marker
+MIN_TRUNCATED_PAGE_TOKENS = 128  # a page is truncated only if this much budget is left
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Token count of text with the model's tokenizer."""
+    return litellm.token_counter(model=model, text=text)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    tokens = litellm.encode(model=model, text=text)
+    return litellm.decode(model=model, tokens=tokens[:max_tokens])
+
+
+async def expand_adjacent_pages(pages: list[DocumentPage], adjacent_pages: int) -> list[DocumentPage]:
+    """Insert up to adjacent_pages neighbours before/after each retrieved page.
+
+    Neighbours that were not retrieved are fetched with one query and placed
+    directly after the page they neighbour, so they inherit its priority.
+    """
+    if adjacent_pages <= 0 or not pages:
+        return pages
+
+    present = {(page.document_id, page.page_number) for page in pages}
+    wanted: list[tuple[str, int]] = []
+    for page in pages:
+        for offset in range(-adjacent_pages, adjacent_pages + 1):
+            key = (page.document_id, page.page_number + offset)
+            if key[1] >= 1 and key not in present and key not in wanted:
+                wanted.append(key)
+    if not wanted:
+        return pages
+
+    fetched = await DocumentPage.afind({"_id": {"$in": [generate_composite_id(list(key)) for key in wanted]}})
+    neighbours = {(page.document_id, page.page_number): page for page in fetched}
+
+    expanded: list[DocumentPage] = []
+    seen: set[tuple[str, int]] = set()
+    for page in pages:
+        for offset in [0] + [o for d in range(1, adjacent_pages + 1) for o in (-d, d)]:
+            key = (page.document_id, page.page_number + offset)
+            candidate = page if offset == 0 else neighbours.get(key)
+            if candidate is not None and key not in seen:
+                seen.add(key)
+                expanded.append(candidate)
+    return expanded
+
+
+def pack_pages(
+    pages: list[DocumentPage],
+    max_tokens: int,
+    model: str,
+    content_mode: ContentMode = ContentMode.MARKDOWN,
+) -> tuple[list[DocumentPage], ContextStats]:
+    """Select the pages that fit into a token budget.
+
+    Pages are taken in priority order (the retriever's ranking). A page that
+    does not fit is truncated with a TRUNCATION_MARKER when at least
+    MIN_TRUNCATED_PAGE_TOKENS are left, otherwise it is dropped and packing
+    continues with the next, possibly smaller, page. The result is
+    deterministic for a given page list, budget and tokenizer.
+    """
+    stats = ContextStats(max_tokens=max_tokens, pages_total=len(pages))
+    remaining = max_tokens - MARKER_RESERVE_TOKENS
+    documents: set[str] = set()
+    selected: list[DocumentPage] = []
+
+    for page in pages:
+        content = page_content(page, content_mode)
+        header_tokens = count_tokens(f"## Page {page.page_number}\n", model)
+        if page.document_id not in documents:
+            header_tokens += count_tokens(f"# Document d{len(documents) + 1}\n", model)
+        content_tokens = count_tokens(content, model)
+        stats.tokens_total += content_tokens
+
+        if header_tokens + content_tokens <= remaining:
+            selected.append(page)
+            documents.add(page.document_id)
+            remaining -= header_tokens + content_tokens
+            stats.tokens_included += content_tokens
+            continue
+
+        marker_tokens = count_tokens(TRUNCATION_MARKER.format(omitted=content_tokens, total=content_tokens), model)
+        keep = remaining - header_tokens - marker_tokens
+        if keep >= MIN_TRUNCATED_PAGE_TOKENS:
+            marker = TRUNCATION_MARKER.format(omitted=content_tokens - keep, total=content_tokens)
+            truncated = f"{_truncate_to_tokens(content, keep, model)}\n{marker}"
+            selected.append(page.model_copy(
+                update={"content": truncated, "content_markdown": truncated, "content_html": truncated},
+            ))
+            documents.add(page.document_id)
+            remaining -= header_tokens + keep + marker_tokens
+            stats.pages_truncated += 1
+            stats.tokens_included += keep
+            stats.tokens_dropped += content_tokens - keep
+        else:
+            stats.pages_dropped += 1
+            stats.tokens_dropped += content_tokens
+
+    stats.pages_included = len(selected)
+    return selected, stats
+
+
+def chunk_pages(
+    pages: list[DocumentPage],
+    max_tokens: int,
+    model: str,
+    content_mode: ContentMode = ContentMode.MARKDOWN,
+) -> list[list[DocumentPage]]:
+    """Split pages, in order, into consecutive chunks of at most max_tokens.
+
+    A page larger than max_tokens forms a chunk of its own.
+    """
+    chunks: list[list[DocumentPage]] = []
+    chunk: list[DocumentPage] = []
+    chunk_tokens = 0
+    for page in pages:
+        tokens = count_tokens(f"## Page {page.page_number}\n{page_content(page, content_mode)}", model)
+        if chunk and chunk_tokens + tokens > max_tokens:
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(page)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def build_context(
+    pages: list[DocumentPage],
+    content_mode: ContentMode = ContentMode.MARKDOWN,
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    adjacent_pages: int = 0,
+) -> tuple[str, dict[str, str], ContextStats]:
+    """Build the LLM context, expanded by adjacent pages and packed into max_tokens.
+
+    Without max_tokens (or model) all pages are rendered as by get_context().
+    Otherwise pages are packed by pack_pages() and an OMITTED_PAGES_MARKER
+    line is appended when pages were dropped.
+
+    Returns:
+        A tuple of (context_string, doc_short_to_long, stats).
+    """
+    pages = await expand_adjacent_pages(pages, adjacent_pages)
+    if not max_tokens or not model:
+        context, doc_short_to_long = get_context(pages, content_mode)
+        return context, doc_short_to_long, ContextStats(pages_total=len(pages), pages_included=len(pages))
+
+    selected, stats = pack_pages(pages, max_tokens, model, content_mode)
+    context, doc_short_to_long = get_context(selected, content_mode)
+    if stats.pages_dropped:
+        context += OMITTED_PAGES_MARKER.format(dropped=stats.pages_dropped, total=stats.pages_total) + "\n"
+    if stats.pages_dropped or stats.pages_truncated:
+        log.info(
+            f"Context packed into {max_tokens} tokens: {stats.pages_included}/{stats.pages_total} pages "
+            f"({stats.pages_truncated} truncated), {stats.tokens_dropped} tokens dropped"
+        )
+    return context, doc_short_to_long, stats
+
+
 def fields_to_prompts(fields: list[FieldDefinition]) -> list[FieldPrompt]:
     """Convert FieldDefinition objects to FieldPrompt objects for template insertion."""
     prompts = []
@@ -117,11 +296,13 @@ async def get_prompt_input(
     document_id: str,
     document_type: str,
     subdocument_id: str = "",
+    extracted: Optional[dict[str, FieldResult]] = None,
 ) -> PromptInput:
     """Build the complete prompt input for an extraction group.
 
-    Resolves field dependencies by looking up previously extracted
-    FieldResultRecords from the database.
+    Resolves field dependencies from `extracted` (results of the current
+    run's prerequisite groups) when available, otherwise by looking up
+    previously extracted FieldResultRecords from the database.
     """
     field_prompts = fields_to_prompts(fields)
 
@@ -133,16 +314,20 @@ async def get_prompt_input(
         field_inputs = []
         for field in fields_with_inputs:
             for req in field.inputs:
-                # Look up previously extracted result, scoped by subdocument_id
-                query = {
-                    "document_id": document_id,
-                    "field_name": req.field_name,
-                    "subdocument_id": subdocument_id,
-                }
-                records = await FieldResultRecord.afind(query)
-                content = None
-                if records:
-                    content = records[0].result.content
+                same_document_type = not req.document_type or req.document_type == document_type
+                if extracted and same_document_type and req.field_name in extracted:
+                    content = extracted[req.field_name].content
+                else:
+                    # Look up previously extracted result, scoped by subdocument_id
+                    query = {
+                        "document_id": document_id,
+                        "field_name": req.field_name,
+                        "subdocument_id": subdocument_id,
+                    }
+                    records = await FieldResultRecord.afind(query)
+                    content = None
+                    if records:
+                        content = records[0].result.content
 
                 field_inputs.append(FieldInput(
                     field_name=req.field_name,
@@ -9,6 +9,8 @@ import typing
 from datetime import datetime, timezone
 from typing import Any, Optional, get_args, get_origin
 
+from lightodm import generate_composite_id
+from pydantic import BaseModel
 from tinystructlog import get_logger
 
 from mydocs.extracting.models import (
@@ -18,7 +20,8 @@ from mydocs.extracting.models import (
     Reference,
     ReferenceGranularity,
 )
-from mydocs.models import Document, DocumentPage
+from mydocs.models import Document, DocumentElementTypeEnum, DocumentPage, ElementGeometry
+from mydocs.parsing.geometry import calculate_union_polygon, table_row_boxes
 
 log = get_logger(__name__)
 
@@ -35,61 +38,89 @@ def get_inner_type(annotation: Any) -> Any:
 
 
 # ---------------------------------------------------------------------------
-# Polygon Calculation
+# Document Element Fetching
 # ---------------------------------------------------------------------------
 
-def calculate_union_polygon(polygons: list[list[float]]) -> list[float]:
-    """Compute bounding box union of multiple polygons.
+class ElementProjection(BaseModel):
+    """The parts of a DocumentElement needed to resolve references to it."""
+    page_number: int
+    short_id: str
+    type: DocumentElementTypeEnum
+    geometry: Optional[ElementGeometry] = None
+    element_data: dict = {}  # only loaded for elements without geometry, and tables without row_pages
 
-    Each polygon is a flat list of [x1, y1, x2, y2, ...] coordinates.
-    Returns [min_x, min_y, max_x, min_y, max_x, max_y, min_x, max_y]
-    (a rectangular bounding box).
-    """
-    if not polygons:
-        return []
 
-    all_x = []
-    all_y = []
-    for poly in polygons:
-        for i in range(0, len(poly), 2):
-            if i + 1 < len(poly):
-                all_x.append(poly[i])
-                all_y.append(poly[i + 1])
+async def fetch_document_elements(
+    element_keys: set[tuple[str, int, str]],
+) -> dict[str, list[ElementProjection]]:
+    """Fetch the referenced elements of the referenced documents.
 
-    if not all_x:
-        return []
+    element_keys are (document_id, page_number, short_id) triples. A single
+    aggregation filters each document's elements down to the referenced ones
+    and projects them without document content, subdocuments or, when the
+    element has precomputed geometry, its raw element_data.
 
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
+    Returns a dict mapping document_id to its referenced elements; every
+    existing document is present, with an empty list if none matched.
+    """
+    if not element_keys:
+        return {}
+    keys = sorted(f"{doc_id}:{page_number}:{short_id}" for doc_id, page_number, short_id in element_keys)
+    raw = await Document.aaggregate([
+        {"$match": {"_id": {"$in": sorted({doc_id for doc_id, _, _ in element_keys})}}},
+        {"$project": {"_id": 1, "elements": {"$map": {
+            "input": {"$filter": {
+                "input": {"$ifNull": ["$elements", []]},
+                "as": "e",
+                "cond": {"$in": [
+                    {"$concat": [
+                        "$_id", ":", {"$toString": "$$e.page_number"}, ":", {"$ifNull": ["$$e.short_id", ""]},
+                    ]},
+                    keys,
+                ]},
+            }},
+            "as": "e",
+            "in": {
+                "page_number": "$$e.page_number",
+                "short_id": "$$e.short_id",
+                "type": "$$e.type",
+                "geometry": "$$e.geometry",
+                "element_data": {"$cond": [
+                    {"$and": [
+                        {"$ifNull": ["$$e.geometry", False]},
+                        {"$or": [
+                            {"$ne": ["$$e.type", DocumentElementTypeEnum.TABLE.value]},
+                            {"$ifNull": ["$$e.geometry.row_pages", False]},
+                        ]},
+                    ]},
+                    {},
+                    "$$e.element_data",
+                ]},
+            },
+        }}}},
+    ])
+    return {
+        str(doc["_id"]): [ElementProjection.model_validate(elem) for elem in doc.get("elements", [])]
+        for doc in raw
+    }
 
-    return [min_x, min_y, max_x, min_y, max_x, max_y, min_x, max_y]
 
+async def fetch_page_infos(
+    page_keys: set[tuple[str, int]],
+) -> dict[tuple[str, int], dict]:
+    """Fetch page metadata (ID and dimensions) for (document_id, page_number) keys.
 
-# ---------------------------------------------------------------------------
-# Document Element Fetching
-# ---------------------------------------------------------------------------
-
-async def fetch_document_elements(
-    document_ids: list[str],
-) -> dict[str, Document]:
-    """Fetch documents with their elements for reference resolution.
-
-    Returns a dict mapping document_id to Document.
+    Page IDs are composite keys of (document_id, page_number), so all pages
+    are loaded with a single $in query on _id, without their content.
     """
-    docs = await Document.afind({"_id": {"$in": document_ids}})
-    return {str(doc.id): doc for doc in docs}
-
-
-async def fetch_page_info(
-    document_id: str,
-    page_number: int,
-) -> Optional[DocumentPage]:
-    """Fetch a single page's metadata (dimensions)."""
-    pages = await DocumentPage.afind({
-        "document_id": document_id,
-        "page_number": page_number,
-    })
-    return pages[0] if pages else None
+    if not page_keys:
+        return {}
+    page_ids = [generate_composite_id([doc_id, page_number]) for doc_id, page_number in page_keys]
+    raw = await DocumentPage.aaggregate([
+        {"$match": {"_id": {"$in": page_ids}}},
+        {"$project": {"_id": 1, "document_id": 1, "page_number": 1, "width": 1, "height": 1, "unit": 1}},
+    ])
+    return {(str(page["document_id"]), page["page_number"]): page for page in raw}
 
 
 # ---------------------------------------------------------------------------
@@ -120,40 +151,44 @@ def parse_reference_string(ref_str: str) -> Optional[dict]:
     }
 
 
-def _find_element_by_short_id(doc: Document, short_id: str, page_number: int) -> Optional[dict]:
-    """Find a DocumentElement in a document by short_id and page_number."""
-    if not doc.elements:
+def _get_row_box(
+    element,
+    row_number: int,
+    row_boxes: Optional[dict[int, tuple[int, list[float]]]] = None,
+) -> Optional[tuple[int, list[float]]]:
+    """(page number, bounding box) of a table row, or None if it has no cells.
+
+    Rows of multi-page tables may be on a later page than the element. Uses
+    the precomputed geometry; tables parsed before row pages were stored
+    fall back to row_boxes (table_row_boxes of element_data).
+    """
+    geometry = getattr(element, "geometry", None)
+    if geometry and geometry.row_pages:
+        if row_number < len(geometry.rows) and geometry.rows[row_number]:
+            return geometry.row_pages[row_number], geometry.rows[row_number]
         return None
-    for elem in doc.elements:
-        if elem.short_id == short_id and elem.page_number == page_number:
-            return elem
-    return None
+
+    if row_boxes is None:
+        element_data = element.element_data if hasattr(element, "element_data") else element
+        row_boxes = table_row_boxes(element_data, getattr(element, "page_number", None))
+    return row_boxes.get(row_number)
 
 
-def _get_element_polygon(element, row_number: Optional[int] = None) -> list[float]:
-    """Extract polygon from element_data.
+def _get_element_polygon(element) -> list[float]:
+    """Extract polygon from the element's precomputed geometry or element_data.
 
-    For tables with row_number, computes union of that row's cell polygons.
     For key-value pairs, computes union of key and value bounding regions.
+    Elements parsed before geometry was stored fall back to walking
+    element_data.
     """
+    geometry = getattr(element, "geometry", None)
+    if geometry and geometry.bbox:
+        return geometry.bbox
+
     element_data = element.element_data if hasattr(element, "element_data") else element
 
     bounding_regions = element_data.get("boundingRegions", [])
 
-    if row_number is not None:
-        # Table row — compute union of cell polygons for the specified row
-        cells = element_data.get("cells", [])
-        row_polygons = []
-        for cell in cells:
-            if cell.get("rowIndex") == row_number:
-                cell_regions = cell.get("boundingRegions", [])
-                for region in cell_regions:
-                    poly = region.get("polygon", [])
-                    if poly:
-                        row_polygons.append(poly)
-        if row_polygons:
-            return calculate_union_polygon(row_polygons)
-
     # Standard element — use bounding regions directly
     if bounding_regions:
         polygons = [r.get("polygon", []) for r in bounding_regions if r.get("polygon")]
@@ -172,6 +207,171 @@ def _get_element_polygon(element, row_number: Optional[int] = None) -> list[floa
     return []
 
 
+class ReferenceResolver:
+    """Resolves the reference strings of one enrichment run.
+
+    Built once per run with create(): the referenced elements are fetched
+    with one projected aggregation (full granularity only) and indexed by
+    (document_id, page_number, short_id), and the dimensions of every
+    referenced page are loaded with a single query. Resolution itself does no I/O; rectangles come from the
+    elements' precomputed geometry, or for older documents are computed
+    from element_data (table row bounding boxes once per table). A reference
+    to a table row that continues on a later page resolves to that page.
+    """
+
+    def __init__(
+        self,
+        doc_short_to_long: dict[str, str],
+        elements: dict[str, list],
+        pages: dict[tuple[str, int], dict],
+    ):
+        self.doc_short_to_long = doc_short_to_long
+        self.document_ids = set(elements)
+        self.pages = pages
+        self._elements: dict[tuple[str, int, str], Any] = {}
+        for doc_id, doc_elements in elements.items():
+            for elem in doc_elements:
+                if elem.short_id:
+                    self._elements.setdefault((doc_id, elem.page_number, elem.short_id), elem)
+        self._row_boxes: dict[tuple[str, int, str], dict[int, tuple[int, list[float]]]] = {}
+
+    @classmethod
+    async def create(
+        cls,
+        doc_short_to_long: dict[str, str],
+        reference_strings: list[str],
+        reference_granularity: ReferenceGranularity = ReferenceGranularity.FULL,
+    ) -> "ReferenceResolver":
+        """Prefetch everything needed to resolve reference_strings."""
+        element_keys: set[tuple[str, int, str]] = set()
+        row_refs: set[tuple[str, int, str, int]] = set()
+        for ref_str in reference_strings:
+            parsed = parse_reference_string(ref_str)
+            doc_id = doc_short_to_long.get(parsed["doc_short_id"]) if parsed else None
+            if doc_id:
+                element_keys.add((doc_id, parsed["page_number"], parsed["element_short_id"]))
+                if parsed["row_number"] is not None:
+                    row_refs.add((doc_id, parsed["page_number"], parsed["element_short_id"], parsed["row_number"]))
+
+        elements: dict[str, list[ElementProjection]] = {}
+        if reference_granularity == ReferenceGranularity.FULL:
+            elements = await fetch_document_elements(element_keys)
+        resolver = cls(doc_short_to_long, elements, {})
+
+        page_keys = {(doc_id, page_number) for doc_id, page_number, _ in element_keys}
+        for doc_id, page_number, short_id, row_number in row_refs:
+            row_box = resolver._row_box(doc_id, page_number, short_id, row_number)
+            if row_box:
+                page_keys.add((doc_id, row_box[0]))
+        resolver.pages = await fetch_page_infos(page_keys)
+        return resolver
+
+    def _row_box(
+        self, doc_id: str, page_number: int, short_id: str, row_number: int,
+    ) -> Optional[tuple[int, list[float]]]:
+        element = self._elements.get((doc_id, page_number, short_id))
+        if not element:
+            return None
+        row_boxes = None
+        if not (element.geometry and element.geometry.row_pages):
+            key = (doc_id, page_number, short_id)
+            if key not in self._row_boxes:
+                self._row_boxes[key] = table_row_boxes(element.element_data, page_number)
+            row_boxes = self._row_boxes[key]
+        return _get_row_box(element, row_number, row_boxes)
+
+    def _parse(self, ref_str: str) -> tuple[Optional[dict], Optional[str]]:
+        parsed = parse_reference_string(ref_str)
+        if not parsed:
+            return None, None
+        doc_id = self.doc_short_to_long.get(parsed["doc_short_id"])
+        if not doc_id:
+            log.warning(f"Unknown document short ID: d{parsed['doc_short_id']}")
+            return None, None
+        return parsed, doc_id
+
+    def resolve(self, ref_str: str) -> Optional[Reference]:
+        """Resolve a reference string to a Reference with polygon data."""
+        parsed, doc_id = self._parse(ref_str)
+        if not parsed:
+            return None
+
+        if doc_id not in self.document_ids:
+            log.warning(f"Document not found: {doc_id}")
+            return None
+
+        page_number = parsed["page_number"]
+        short_id = parsed["element_short_id"]
+        element = self._elements.get((doc_id, page_number, short_id))
+        if not element:
+            log.warning(
+                f"Element {short_id} not found on page "
+                f"{page_number} of document {doc_id}"
+            )
+            return None
+
+        row_box = None
+        if parsed["row_number"] is not None:
+            row_box = self._row_box(doc_id, page_number, short_id, parsed["row_number"])
+        if row_box:
+            page_number, polygon = row_box
+        else:
+            # Whole element, or a row without cells: the element's box
+            polygon = _get_element_polygon(element)
+
+        page = self.pages.get((doc_id, page_number))
+        return Reference(
+            document_id=doc_id,
+            page_id=str(page["_id"]) if page else "",
+            page_number=page_number,
+            page_width=page.get("width") or 0.0 if page else 0.0,
+            page_height=page.get("height") or 0.0 if page else 0.0,
+            page_unit=page.get("unit") or "inch" if page else "inch",
+            element_type=element.type if hasattr(element, "type") else "unknown",
+            element_short_id=short_id,
+            polygon=polygon,
+            llm_reference=ref_str,
+        )
+
+    def resolve_page(self, ref_str: str) -> Optional[PageReference]:
+        """Resolve a reference string to a PageReference (no polygon)."""
+        parsed, doc_id = self._parse(ref_str)
+        if not parsed:
+            return None
+
+        page = self.pages.get((doc_id, parsed["page_number"]))
+        if not page:
+            return None
+
+        return PageReference(
+            document_id=doc_id,
+            page_id=str(page["_id"]),
+            page_number=parsed["page_number"],
+        )
+
+    def resolve_all(
+        self,
+        reference_strings: list[str],
+        reference_granularity: ReferenceGranularity,
+    ) -> tuple[Optional[list[Reference]], Optional[list[PageReference]]]:
+        """Resolve one field's references; page references are deduplicated."""
+        if reference_granularity == ReferenceGranularity.FULL:
+            return [ref for ref in map(self.resolve, reference_strings) if ref], None
+
+        if reference_granularity == ReferenceGranularity.PAGE:
+            page_refs = []
+            seen_pages: set[tuple[str, int]] = set()
+            for page_ref in map(self.resolve_page, reference_strings):
+                if page_ref:
+                    key = (page_ref.document_id, page_ref.page_number)
+                    if key not in seen_pages:
+                        seen_pages.add(key)
+                        page_refs.append(page_ref)
+            return None, page_refs
+
+        return None, None
+
+
 async def resolve_reference(
     ref_str: str,
     doc_short_to_long: dict[str, str],
@@ -179,54 +379,19 @@ async def resolve_reference(
 ) -> Optional[Reference]:
     """Resolve a single LLM reference string to a Reference with polygon data.
 
+    Prefer ReferenceResolver when resolving more than one reference.
+
     Args:
         ref_str: Reference string like "d1:3:p5" or "d1:3:t3:2"
         doc_short_to_long: Mapping of short doc IDs ("1") to actual document IDs
         documents: Pre-fetched Document objects keyed by document_id
     """
     parsed = parse_reference_string(ref_str)
-    if not parsed:
-        return None
-
-    doc_id = doc_short_to_long.get(parsed["doc_short_id"])
-    if not doc_id:
-        log.warning(f"Unknown document short ID: d{parsed['doc_short_id']}")
-        return None
-
-    doc = documents.get(doc_id)
-    if not doc:
-        log.warning(f"Document not found: {doc_id}")
-        return None
-
-    element = _find_element_by_short_id(doc, parsed["element_short_id"], parsed["page_number"])
-    if not element:
-        log.warning(
-            f"Element {parsed['element_short_id']} not found on page "
-            f"{parsed['page_number']} of document {doc_id}"
-        )
-        return None
-
-    polygon = _get_element_polygon(element, parsed.get("row_number"))
-
-    # Get page info for dimensions
-    page = await fetch_page_info(doc_id, parsed["page_number"])
-    page_id = str(page.id) if page else ""
-    page_width = page.width if page and page.width else 0.0
-    page_height = page.height if page and page.height else 0.0
-    page_unit = page.unit if page and page.unit else "inch"
-
-    return Reference(
-        document_id=doc_id,
-        page_id=page_id,
-        page_number=parsed["page_number"],
-        page_width=page_width,
-        page_height=page_height,
-        page_unit=page_unit,
-        element_type=element.type if hasattr(element, "type") else "unknown",
-        element_short_id=parsed["element_short_id"],
-        polygon=polygon,
-        llm_reference=ref_str,
-    )
+    doc_id = doc_short_to_long.get(parsed["doc_short_id"]) if parsed else None
+    page_keys = {(doc_id, parsed["page_number"])} if doc_id else set()
+    pages = await fetch_page_infos(page_keys)
+    elements = {doc_id: doc.elements or [] for doc_id, doc in documents.items()}
+    return ReferenceResolver(doc_short_to_long, elements, pages).resolve(ref_str)
 
 
 async def resolve_page_reference(
@@ -234,23 +399,8 @@ async def resolve_page_reference(
     doc_short_to_long: dict[str, str],
 ) -> Optional[PageReference]:
     """Resolve a reference string to a PageReference (page granularity only)."""
-    parsed = parse_reference_string(ref_str)
-    if not parsed:
-        return None
-
-    doc_id = doc_short_to_long.get(parsed["doc_short_id"])
-    if not doc_id:
-        return None
-
-    page = await fetch_page_info(doc_id, parsed["page_number"])
-    if not page:
-        return None
-
-    return PageReference(
-        document_id=doc_id,
-        page_id=str(page.id),
-        page_number=parsed["page_number"],
-    )
+    resolver = await ReferenceResolver.create(doc_short_to_long, [ref_str], ReferenceGranularity.PAGE)
+    return resolver.resolve_page(ref_str)
 
 
 # ---------------------------------------------------------------------------
@@ -333,9 +483,14 @@ async def enrich_composite_field_results(
             result_items.append(item_dict)
         return {parent_field_name: result_items}
 
-    # Pre-fetch documents for reference resolution
-    all_doc_ids = list(set(doc_short_to_long.values()))
-    documents = await fetch_document_elements(all_doc_ids) if all_doc_ids else {}
+    # Prefetch elements and pages for all references of the run
+    reference_strings = []
+    for item in items:
+        for field_name in item.model_fields:
+            value = getattr(item, field_name, None)
+            if isinstance(value, LLMFieldItem):
+                reference_strings.extend(value.references)
+    resolver = await ReferenceResolver.create(doc_short_to_long, reference_strings, reference_granularity)
 
     result_items = []
     for item in items:
@@ -345,28 +500,10 @@ async def enrich_composite_field_results(
             if not isinstance(value, LLMFieldItem):
                 continue
 
-            resolved_refs: Optional[list[Reference]] = None
-            resolved_page_refs: Optional[list[PageReference]] = None
-
-            if value.references:
-                if reference_granularity == ReferenceGranularity.FULL:
-                    resolved_refs = []
-                    for ref_str in value.references:
-                        ref = await resolve_reference(ref_str, doc_short_to_long, documents)
-                        if ref:
-                            resolved_refs.append(ref)
-
-                elif reference_granularity == ReferenceGranularity.PAGE:
-                    resolved_page_refs = []
-                    seen_pages: set[tuple[str, int]] = set()
-                    for ref_str in value.references:
-                        page_ref = await resolve_page_reference(ref_str, doc_short_to_long)
-                        if page_ref:
-                            key = (page_ref.document_id, page_ref.page_number)
-                            if key not in seen_pages:
-                                seen_pages.add(key)
-                                resolved_page_refs.append(page_ref)
-
+            resolved_refs, resolved_page_refs = (
+                resolver.resolve_all(value.references, reference_granularity)
+                if value.references else (None, None)
+            )
             item_dict[field_name] = llm_field_to_result(
                 value, model_name, resolved_refs, resolved_page_refs
             )
@@ -395,33 +532,18 @@ async def enrich_field_results(
             results[item.name] = llm_field_to_result(item, model_name)
         return results
 
-    # Pre-fetch documents for reference resolution (full and page modes)
-    all_doc_ids = list(set(doc_short_to_long.values()))
-    documents = await fetch_document_elements(all_doc_ids) if all_doc_ids else {}
+    # Prefetch elements and pages for all references of the run (full and page modes)
+    resolver = await ReferenceResolver.create(
+        doc_short_to_long,
+        [ref_str for item in llm_result for ref_str in item.references],
+        reference_granularity,
+    )
 
     for item in llm_result:
-        resolved_refs: Optional[list[Reference]] = None
-        resolved_page_refs: Optional[list[PageReference]] = None
-
-        if item.references:
-            if reference_granularity == ReferenceGranularity.FULL:
-                resolved_refs = []
-                for ref_str in item.references:
-                    ref = await resolve_reference(ref_str, doc_short_to_long, documents)
-                    if ref:
-                        resolved_refs.append(ref)
-
-            elif reference_granularity == ReferenceGranularity.PAGE:
-                resolved_page_refs = []
-                seen_pages: set[tuple[str, int]] = set()
-                for ref_str in item.references:
-                    page_ref = await resolve_page_reference(ref_str, doc_short_to_long)
-                    if page_ref:
-                        key = (page_ref.document_id, page_ref.page_number)
-                        if key not in seen_pages:
-                            seen_pages.add(key)
-                            resolved_page_refs.append(page_ref)
-
+        resolved_refs, resolved_page_refs = (
+            resolver.resolve_all(item.references, reference_granularity)
+            if item.references else (None, None)
+        )
         results[item.name] = llm_field_to_result(
             item, model_name, resolved_refs, resolved_page_refs
         )
@@ -9,6 +9,10 @@ class NoDocumentsFoundError(ExtractionError):
     """Raised when no documents are found for the extraction request."""
 
 
+class CaseNotFoundError(ExtractionError):
+    """Raised when the case of an extraction request does not exist."""
+
+
 class FieldConsistencyError(ExtractionError):
     """Raised when field definitions are inconsistent with prompt configuration."""
 
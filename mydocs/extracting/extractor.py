@@ -2,9 +2,16 @@
 
 Graph structure:
   Subgraph: START → get_prompt_input → retriever_step → get_context → llm_step → enrich_step → END
-  Main:     START --Send()--> [GROUP_SUBGRAPH...] → combine_results → END
+  Main:     START --DAG(inputs)--> [GROUP_SUBGRAPH...] → combine_results → END
+
+Groups are scheduled by scheduler.run_field_groups: independent groups run
+concurrently and dependent groups receive their inputs in memory. Retrieved
+pages and rendered contexts are shared across groups (run_cache.py). Groups
+whose context exceeds map_reduce_chunk_tokens extract chunk by chunk and
+merge the results (map_reduce.py).
 """
 
+import asyncio
 import json
 from typing import Any
 
@@ -14,6 +21,7 @@ from langgraph.graph import END, START, StateGraph
 from tinystructlog import get_logger
 
 from mydocs.extracting.context import (
+    chunk_pages,
     fields_to_query,
     format_fields_for_prompt,
     get_context,
@@ -25,6 +33,13 @@ from mydocs.extracting.enrichment import (
     enrich_composite_field_results,
     enrich_field_results,
 )
+from mydocs.extracting.llm_cache import cached_acompletion, get_llm_cache
+from mydocs.extracting.map_reduce import (
+    apply_reduced,
+    build_reduce_prompt,
+    concat_results,
+    merge_field_items,
+)
 from mydocs.extracting.models import (
     ContentMode,
     ExtractionMode,
@@ -36,6 +51,7 @@ from mydocs.extracting.models import (
     FieldResult,
     FieldResultRecord,
     LLMFieldsResult,
+    MapReduceMerge,
     ReferenceGranularity,
     RetrieverFilter,
     SubgraphOutput,
@@ -48,6 +64,12 @@ from mydocs.extracting.prompt_utils import (
     validate_prompt_consistency,
 )
 from mydocs.extracting.registry import get_retriever, get_schema, get_target_object_class
+from mydocs.extracting.run_cache import ExtractionRunCache
+from mydocs.extracting.scheduler import (
+    DEFAULT_MAX_CONCURRENCY,
+    build_group_dependencies,
+    run_field_groups,
+)
 from mydocs.extracting.target_objects import populate_target_object
 from mydocs.models import Case, Document
 
@@ -65,6 +87,9 @@ class BaseExtractor:
         self.request = request
         self.case_type = request.case_type
         self.document_type = request.document_type
+        self.llm_calls = 0
+        self.llm_cache_hits = 0
+        self.run_cache = ExtractionRunCache()
 
     async def _resolve_case_type(self) -> str:
         """Resolve case_type from Case.type if case_id is provided."""
@@ -175,16 +200,18 @@ class BaseExtractor:
         state = self._build_initial_state(case_type, field_definitions, field_groups)
         state.prompt_configs = prompt_configs
 
-        # Step 2: Execute groups in parallel via LangGraph
+        # Step 2: Execute groups as a DAG of input dependencies
+        dependencies = build_group_dependencies(field_groups, self.document_type)
         all_field_results: dict[str, FieldResult] = {}
         all_composite_results: dict[str, list[dict[str, FieldResult]]] = {}
         model_used = "unknown"
 
+        group_states: dict[int, ExtractGroupState] = {}
         for group_id, fields in field_groups.items():
             prompt_config = prompt_configs[group_id]
             model_used = prompt_config.model
 
-            group_state = ExtractGroupState(
+            group_states[group_id] = ExtractGroupState(
                 group_id=group_id,
                 fields=fields,
                 prompt_config=prompt_config,
@@ -195,7 +222,16 @@ class BaseExtractor:
                 output_schema_name=self.request.output_schema or prompt_config.output_schema,
             )
 
-            group_result = await self._run_group(group_state)
+        async def run_group(group_id: int, prerequisite_results: dict[str, FieldResult]) -> SubgraphOutput:
+            return await self._run_group(group_states[group_id], prerequisite_results)
+
+        group_outputs = await run_field_groups(
+            field_groups,
+            dependencies,
+            run_group,
+            max_concurrency=self.request.max_concurrency or DEFAULT_MAX_CONCURRENCY,
+        )
+        for group_result in group_outputs.values():
             all_field_results.update(group_result.field_results)
             for k, v in group_result.composite_results.items():
                 all_composite_results.setdefault(k, []).extend(v)
@@ -222,6 +258,16 @@ class BaseExtractor:
                 if tid:
                     target_object_id = tid
 
+        # Groups sharing a context share its dropped pages: count each context once
+        context_stats = self.run_cache.context_stats()
+        log.debug(f"Extraction run cache {self.run_cache.stats()}")
+        llm_cache = get_llm_cache()
+        if llm_cache and self.request.use_llm_cache:
+            log.info(
+                f"Extraction LLM calls={self.llm_calls} cache_hits={self.llm_cache_hits} "
+                f"cache={llm_cache.stats()}"
+            )
+
         # Return response
         return ExtractionResponse(
             document_id=self.request.document_ids[0] if self.request.document_ids else "",
@@ -233,10 +279,23 @@ class BaseExtractor:
             target_object_id=target_object_id,
             model_used=model_used,
             reference_granularity=self.request.reference_granularity,
+            llm_calls=self.llm_calls,
+            llm_cache_hits=self.llm_cache_hits,
+            context_pages_dropped=sum(stats.pages_dropped for stats in context_stats),
+            context_tokens_dropped=sum(stats.tokens_dropped for stats in context_stats),
+            map_reduce_chunks=sum(gs.map_reduce_chunks for gs in group_states.values()),
         )
 
-    async def _run_group(self, group_state: ExtractGroupState) -> SubgraphOutput:
-        """Execute a single extraction group: prompt → retrieve → context → llm → enrich."""
+    async def _run_group(
+        self,
+        group_state: ExtractGroupState,
+        prerequisite_results: dict[str, FieldResult] | None = None,
+    ) -> SubgraphOutput:
+        """Execute a single extraction group: prompt → retrieve → context → llm → enrich.
+
+        prerequisite_results holds the fields extracted earlier in this run
+        by the groups this one depends on.
+        """
         prompt_config = group_state.prompt_config
         if not prompt_config:
             log.error(f"No prompt config for group {group_state.group_id}")
@@ -252,6 +311,7 @@ class BaseExtractor:
             document_id,
             self.document_type,
             subdocument_id=self.request.subdocument_id or "",
+            extracted=prerequisite_results,
         )
         group_state.prompt_input = prompt_input
 
@@ -260,22 +320,14 @@ class BaseExtractor:
         if retriever_config:
             retriever_fn = get_retriever(retriever_config.name)
             query = fields_to_query(group_state.fields)
-            pages = await retriever_fn(
-                query, retriever_config, group_state.retriever_filter
+            pages = await self.run_cache.get_pages(
+                retriever_fn, query, retriever_config, group_state.retriever_filter
             )
             group_state.retrieved_pages = pages
         else:
             group_state.retrieved_pages = []
 
-        # 2c. Build context string
-        context, doc_short_to_long = get_context(
-            group_state.retrieved_pages,
-            group_state.content_mode,
-        )
-        group_state.context = context
-        group_state.doc_short_to_long = doc_short_to_long
-
-        # 2d. LLM call
+        # 2c. Prompt templates
         fields_str = format_fields_for_prompt(prompt_input.field_prompts)
 
         # Add field inputs if available
@@ -295,18 +347,41 @@ class BaseExtractor:
             schema_json = json.dumps(output_schema.model_json_schema(), indent=2)
             sys_prompt = sys_prompt.replace("{FIELD_SCHEMA}", schema_json)
 
-        user_prompt = prompt_config.user_prompt_template.format(
-            fields=fields_str,
-            context=context,
-        )
+        # 2d. Oversized contexts: map-reduce over page chunks
+        chunk_tokens = self.request.map_reduce_chunk_tokens or prompt_config.map_reduce_chunk_tokens
+        chunks = chunk_pages(
+            group_state.retrieved_pages, chunk_tokens, prompt_config.model, group_state.content_mode,
+        ) if chunk_tokens else []
+        if len(chunks) > 1:
+            llm_result, doc_short_to_long = await self._run_map_reduce(
+                group_state, chunks, sys_prompt, fields_str, output_schema
+            )
+            group_state.doc_short_to_long = doc_short_to_long
+        else:
+            # 2e. Build context string (shared by groups with the same pages)
+            context, doc_short_to_long, context_stats = await self.run_cache.get_context(
+                group_state.retrieved_pages,
+                group_state.content_mode,
+                model=prompt_config.model,
+                max_tokens=prompt_config.context_max_tokens,
+                adjacent_pages=prompt_config.context_adjacent_pages,
+            )
+            group_state.context = context
+            group_state.context_stats = context_stats
+            group_state.doc_short_to_long = doc_short_to_long
 
-        # Call LLM with structured output
-        llm_result = await self._call_llm(
-            sys_prompt, user_prompt, prompt_config, output_schema
-        )
+            user_prompt = prompt_config.user_prompt_template.format(
+                fields=fields_str,
+                context=context,
+            )
+
+            # 2f. Call LLM with structured output
+            llm_result = await self._call_llm(
+                sys_prompt, user_prompt, prompt_config, output_schema
+            )
         group_state.llm_result = llm_result
 
-        # 2e. Enrich results
+        # 2g. Enrich results
         if isinstance(llm_result, LLMFieldsResult):
             field_results = await enrich_field_results(
                 llm_result.result,
@@ -338,6 +413,62 @@ class BaseExtractor:
             group_state.field_results = field_results
             return SubgraphOutput(field_results=field_results)
 
+    async def _run_map_reduce(
+        self,
+        group_state: ExtractGroupState,
+        chunks: list[list],
+        sys_prompt: str,
+        fields_str: str,
+        output_schema: type,
+    ) -> tuple[Any, dict[str, str]]:
+        """Extract each page chunk concurrently and merge the chunk results.
+
+        All chunks share one short-ID mapping so references stay valid after
+        merging. Returns the merged LLM result and that mapping.
+        """
+        prompt_config = group_state.prompt_config
+        doc_ids = list(dict.fromkeys(page.document_id for chunk in chunks for page in chunk))
+        doc_long_to_short = {doc_id: str(i + 1) for i, doc_id in enumerate(doc_ids)}
+        semaphore = asyncio.Semaphore(max(prompt_config.map_reduce_max_concurrency, 1))
+        log.info(
+            f"Group {group_state.group_id}: map-reduce over {len(chunks)} chunks "
+            f"({sum(len(chunk) for chunk in chunks)} pages)"
+        )
+
+        async def extract_chunk(chunk: list) -> Any:
+            context, _ = get_context(chunk, group_state.content_mode, doc_long_to_short)
+            user_prompt = prompt_config.user_prompt_template.format(fields=fields_str, context=context)
+            async with semaphore:
+                return await self._call_llm(sys_prompt, user_prompt, prompt_config, output_schema)
+
+        tasks = [asyncio.create_task(extract_chunk(chunk)) for chunk in chunks]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if all(isinstance(result, LLMFieldsResult) for result in results):
+            merged, conflicts = merge_field_items([result.result for result in results])
+            if conflicts:
+                log.info(f"Group {group_state.group_id}: chunks disagree on {sorted(conflicts)}")
+            if conflicts and prompt_config.map_reduce_merge == MapReduceMerge.LLM:
+                reduce_fields = format_fields_for_prompt(
+                    [fp for fp in group_state.prompt_input.field_prompts if fp.name in conflicts]
+                )
+                reduced = await self._call_llm(
+                    sys_prompt, build_reduce_prompt(reduce_fields, conflicts), prompt_config, output_schema
+                )
+                merged = apply_reduced(merged, reduced, conflicts)
+            llm_result = output_schema(result=merged)
+        else:
+            llm_result = concat_results(results, output_schema)
+
+        group_state.map_reduce_chunks = len(chunks)
+        return llm_result, {short: long for long, short in doc_long_to_short.items()}
+
     async def _call_llm(
         self,
         sys_prompt: str,
@@ -352,6 +483,9 @@ class BaseExtractor:
           for HTTP 429, 500, 503, connection errors, and timeouts.
         - Validation retries (validation_retries): Outer loop retries when the
           LLM returns valid JSON that fails Pydantic model_validate_json().
+
+        Responses are served from the LLM response cache (llm_cache.py) when
+        it is enabled and the request does not bypass it.
         """
         messages = [
             {"role": "system", "content": sys_prompt},
@@ -361,16 +495,19 @@ class BaseExtractor:
         last_error = None
         for attempt in range(prompt_config.validation_retries):
             try:
-                response = await litellm.acompletion(
-                    model=prompt_config.model,
-                    messages=messages,
-                    response_format=output_schema,
+                result, cached = await cached_acompletion(
+                    prompt_config.model,
+                    messages,
+                    output_schema,
                     num_retries=prompt_config.transport_retries,
-                    **prompt_config.llm_kwargs,
+                    llm_kwargs=prompt_config.llm_kwargs,
+                    use_cache=self.request.use_llm_cache,
                 )
-
-                content = response.choices[0].message.content
-                return output_schema.model_validate_json(content)
+                if cached:
+                    self.llm_cache_hits += 1
+                else:
+                    self.llm_calls += 1
+                return result
 
             except litellm.exceptions.APIError:
                 raise  # Transport errors already retried by litellm; don't retry again
@@ -0,0 +1,208 @@
+"""Content-addressed cache of LLM responses.
+
+Extraction and split-classify prompts are deterministic functions of the
+document content and configuration, so re-running them (with `force`, or
+after a change that only affects enrichment or target objects) re-sends
+byte-identical requests. Responses are cached on a CacheStore keyed by a
+hash of (model, messages, response_format JSON schema, llm_kwargs), with a
+TTL and a bound on the number of entries.
+
+The cache is disabled unless MYDOCS_LLM_CACHE_ENABLED is set. Entries are
+stored under <DATA_FOLDER>/llm_cache (MYDOCS_LLM_CACHE_FOLDER), or in the
+AZURE_STORAGE_CACHE_CONTAINER_NAME container under `llm/` when
+MYDOCS_STORAGE_BACKEND is azure_blob. Only responses that validated against
+response_format are stored.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Optional
+
+import litellm
+from pydantic import BaseModel, ValidationError
+from tinystructlog import get_logger
+
+import mydocs.config as C
+from mydocs.parsing.cache import CacheStore
+
+log = get_logger(__name__)
+
+_BLOB_PREFIX = "llm"
+
+
+def _canonical_json(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def llm_cache_key(
+    model: str,
+    messages: list[dict],
+    response_format: type[BaseModel],
+    llm_kwargs: Optional[dict] = None,
+) -> str:
+    """Hash of everything that determines an LLM response."""
+    schema_hash = hashlib.sha256(
+        _canonical_json(response_format.model_json_schema()).encode("utf-8")
+    ).hexdigest()
+    payload = _canonical_json({
+        "model": model,
+        "messages": messages,
+        "response_format": schema_hash,
+        "llm_kwargs": llm_kwargs or {},
+    })
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """TTL- and size-bounded LLM response cache on a CacheStore."""
+
+    def __init__(
+        self,
+        store: CacheStore,
+        prefix: str,
+        ttl_seconds: float = 30 * 24 * 3600,
+        max_entries: int = 10000,
+    ):
+        self.store = store
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self._writes_since_prune = 0
+
+    def _path(self, key: str) -> str:
+        return f"{self.prefix}/{key[:2]}/{key}.json"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response content, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            if not await self.store.exists(path):
+                self.misses += 1
+                return None
+            entry = await self.store.read_json(path)
+        except Exception as e:
+            log.warning(f"LLM cache read failed for {key}: {e}")
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get("created_at", 0) >= self.ttl_seconds:
+            self.expired += 1
+            self.misses += 1
+            try:
+                await self.store.delete(path)
+            except Exception as e:
+                log.warning(f"LLM cache delete failed for {key}: {e}")
+            return None
+
+        self.hits += 1
+        return entry["content"]
+
+    async def put(self, key: str, content: str, model: str) -> None:
+        try:
+            await self.store.write_json(self._path(key), {
+                "content": content, "model": model, "created_at": time.time(),
+            })
+        except Exception as e:
+            log.warning(f"LLM cache write failed for {key}: {e}")
+            return
+        self.writes += 1
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= max(1, self.max_entries // 10):
+            try:
+                await self.prune()
+            except Exception as e:
+                log.warning(f"LLM cache prune failed: {e}")
+
+    async def prune(self) -> int:
+        """Delete expired entries and the oldest entries beyond max_entries."""
+        self._writes_since_prune = 0
+        entries = await self.store.list_entries(self.prefix)
+
+        cutoff = time.time() - self.ttl_seconds
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        stale = [key for i, (key, modified) in enumerate(entries) if i >= self.max_entries or modified < cutoff]
+        for key in stale:
+            await self.store.delete(key)
+        if stale:
+            log.info(f"LLM cache pruned {len(stale)} of {len(entries)} entries")
+        return len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "writes": self.writes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide LLM response cache, or None when disabled."""
+    global _llm_cache
+    if not C.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        if C.STORAGE_BACKEND == "azure_blob":
+            from mydocs.parsing.cache import BlobCacheStore
+            store, prefix = BlobCacheStore(C.AZURE_STORAGE_CACHE_CONTAINER_NAME), _BLOB_PREFIX
+        else:
+            from mydocs.parsing.cache import LocalCacheStore
+            store = LocalCacheStore()
+            prefix = C.LLM_CACHE_FOLDER or os.path.join(C.DATA_FOLDER, "llm_cache")
+        _llm_cache = LLMResponseCache(store, prefix, C.LLM_CACHE_TTL_SECONDS, C.LLM_CACHE_MAX_ENTRIES)
+    return _llm_cache
+
+
+async def cached_acompletion(
+    model: str,
+    messages: list[dict],
+    response_format: type[BaseModel],
+    num_retries: int,
+    llm_kwargs: Optional[dict] = None,
+    use_cache: bool = True,
+) -> tuple[BaseModel, bool]:
+    """Structured litellm completion, served from the cache when possible.
+
+    Returns the validated response_format instance and whether it came from
+    the cache. Validation errors of a fresh response propagate, so callers
+    keep their validation retry loops; invalid responses are never cached.
+    """
+    llm_kwargs = llm_kwargs or {}
+    cache = get_llm_cache() if use_cache else None
+    key = llm_cache_key(model, messages, response_format, llm_kwargs) if cache else None
+
+    if cache:
+        content = await cache.get(key)
+        if content is not None:
+            try:
+                result = response_format.model_validate_json(content)
+                log.debug(f"LLM cache hit model={model} key={key[:12]}")
+                return result, True
+            except ValidationError as e:
+                log.warning(f"Discarding invalid cached LLM response {key[:12]}: {e}")
+
+    response = await litellm.acompletion(
+        model=model,
+        messages=messages,
+        response_format=response_format,
+        num_retries=num_retries,
+        **llm_kwargs,
+    )
+    content = response.choices[0].message.content
+    result = response_format.model_validate_json(content)
+    if cache:
+        await cache.put(key, content, model)
+    return result, False
@@ -0,0 +1,136 @@
+"""Map-reduce extraction for contexts that do not fit one prompt.
+
+When a group's retrieved pages exceed PromptConfig.map_reduce_chunk_tokens,
+the extractor splits them into consecutive chunks (context.chunk_pages),
+extracts every chunk with the group's prompt (map) and merges the chunk
+results (reduce). All chunks are rendered with the same short document IDs,
+so reference strings like "d1:412:p3" stay valid across chunks.
+
+Merging LLMFieldItems per field:
+- vote: the value found by most chunks wins (ties: earliest chunk); the
+  references of all chunks that found it are combined
+- llm: fields whose chunks disagree are reconciled by one more LLM call
+  that sees only the candidate values; its references are restricted to
+  those of the candidates
+
+Other schemas with a `result` list (composite items, direct mode) are
+merged by concatenating the chunk results.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+from tinystructlog import get_logger
+
+from mydocs.extracting.exceptions import ExtractionError
+from mydocs.extracting.models import LLMFieldItem, LLMFieldsResult
+
+log = get_logger(__name__)
+
+EMPTY_VALUES = {"", "n/a", "na", "none", "null", "not found", "unknown"}
+
+
+def is_empty(item: LLMFieldItem) -> bool:
+    return item.content.strip().casefold() in EMPTY_VALUES
+
+
+def _normalize(content: str) -> str:
+    return " ".join(content.split()).casefold()
+
+
+def _merge_references(items: list[LLMFieldItem]) -> list[str]:
+    return list(dict.fromkeys(ref for item in items for ref in item.references))
+
+
+def merge_field_items(
+    chunk_items: list[list[LLMFieldItem]],
+) -> tuple[list[LLMFieldItem], dict[str, list[LLMFieldItem]]]:
+    """Merge the per-chunk LLMFieldItems of each field by vote.
+
+    Returns the merged items (in order of first appearance) and, for fields
+    whose chunks found different values, all non-empty candidates.
+    """
+    candidates: dict[str, list[LLMFieldItem]] = {}
+    for items in chunk_items:
+        for item in items:
+            candidates.setdefault(item.name, []).append(item)
+
+    merged: list[LLMFieldItem] = []
+    conflicts: dict[str, list[LLMFieldItem]] = {}
+    for name, items in candidates.items():
+        found = [item for item in items if not is_empty(item)]
+        if not found:
+            merged.append(items[0])
+            continue
+
+        by_value: dict[str, list[LLMFieldItem]] = {}
+        for item in found:
+            by_value.setdefault(_normalize(item.content), []).append(item)
+        # dicts keep insertion order, so max() picks the earliest value among equal votes
+        winners = max(by_value.values(), key=len)
+        merged.append(winners[0].model_copy(update={"references": _merge_references(winners)}))
+        if len(by_value) > 1:
+            conflicts[name] = found
+
+    return merged, conflicts
+
+
+def concat_results(results: list[BaseModel], output_schema: type[BaseModel]) -> BaseModel:
+    """Merge chunk results of a schema with a `result` list by concatenation."""
+    if not all(isinstance(getattr(result, "result", None), list) for result in results):
+        raise ExtractionError(
+            f"Map-reduce extraction requires an output schema with a `result` list, got {output_schema.__name__}"
+        )
+    return output_schema(result=[item for result in results for item in result.result])
+
+
+def build_reduce_prompt(fields_str: str, conflicts: dict[str, list[LLMFieldItem]]) -> str:
+    """User prompt asking the LLM to reconcile conflicting chunk values."""
+    parts = [
+        "The document was too long for one request and was processed in parts.",
+        "For the fields below, the parts returned different values. For each field,",
+        "return the single correct value, with its justification and citation,",
+        "and only references that appear among the candidates.",
+        "",
+        "Fields:",
+        fields_str,
+        "",
+        "Candidates:",
+    ]
+    for name, items in conflicts.items():
+        parts.append(f"### {name}")
+        for i, item in enumerate(items, start=1):
+            parts.append(
+                f"{i}. content: {item.content}\n"
+                f"   justification: {item.justification}\n"
+                f"   citation: {item.citation}\n"
+                f"   references: {', '.join(item.references) or 'none'}"
+            )
+    return "\n".join(parts)
+
+
+def apply_reduced(
+    merged: list[LLMFieldItem],
+    reduced: Optional[LLMFieldsResult],
+    conflicts: dict[str, list[LLMFieldItem]],
+) -> list[LLMFieldItem]:
+    """Replace voted values of conflicting fields with the LLM's choice.
+
+    References the reduce call invents are dropped; a field the reduce call
+    did not return keeps its voted value.
+    """
+    if not reduced:
+        return merged
+    choices = {item.name: item for item in reduced.result if item.name in conflicts}
+    result = []
+    for item in merged:
+        choice = choices.get(item.name)
+        if choice is None:
+            result.append(item)
+            continue
+        allowed = set(_merge_references(conflicts[item.name]))
+        dropped = [ref for ref in choice.references if ref not in allowed]
+        if dropped:
+            log.warning(f"Reduce step returned unknown references for {item.name}: {dropped}")
+        result.append(choice.model_copy(update={"references": [r for r in choice.references if r in allowed]}))
+    return result
@@ -32,6 +32,18 @@ class ExtractionMode(StrEnum):
     DIRECT = "direct"
 
 
+class MapReduceMerge(StrEnum):
+    VOTE = "vote"
+    LLM = "llm"
+
+
+class ExtractionJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class FieldDataType(StrEnum):
     STRING = "string"
     DATE = "date"
@@ -180,6 +192,10 @@ class ExtractionRequest(BaseModel):
 
     subdocument_id: Optional[str] = None
 
+    max_concurrency: Optional[int] = None  # concurrent field groups; defaults to scheduler.DEFAULT_MAX_CONCURRENCY
+    use_llm_cache: bool = True  # False bypasses the LLM response cache
+    map_reduce_chunk_tokens: Optional[int] = None  # overrides PromptConfig.map_reduce_chunk_tokens
+
 
 class ExtractionResponse(BaseModel):
     """Response from field extraction."""
@@ -193,6 +209,32 @@ class ExtractionResponse(BaseModel):
     target_object_id: Optional[str] = None
     model_used: str
     reference_granularity: str
+    llm_calls: int = 0  # LLM requests sent to the provider
+    llm_cache_hits: int = 0  # LLM responses served from the cache
+    context_pages_dropped: int = 0  # retrieved pages left out to fit context token budgets
+    context_tokens_dropped: int = 0  # tokens of dropped and truncated pages
+    map_reduce_chunks: int = 0  # chunks extracted by groups that ran map-reduce
+
+
+class CaseExtractionRequest(BaseModel):
+    """Request to extract fields from every document of a case."""
+    case_id: str
+    document_type: str = "generic"  # for whole-document units; subdocument units use their own type
+
+    document_ids: Optional[list[str]] = None  # subset of the case's documents (default: all)
+    subdocuments: bool = False  # extract each subdocument of split documents as its own unit
+    subdocument_ids: Optional[list[str]] = None  # only these subdocuments (implies subdocuments)
+
+    fields: Optional[list[str]] = None
+    reference_granularity: ReferenceGranularity = ReferenceGranularity.FULL
+    content_mode: ContentMode = ContentMode.MARKDOWN
+    map_reduce_chunk_tokens: Optional[int] = None
+
+    document_concurrency: Optional[int] = None  # units extracted concurrently; defaults to case_job.DEFAULT_DOCUMENT_CONCURRENCY
+    max_concurrency: Optional[int] = None  # concurrent field groups per unit
+    use_llm_cache: bool = True
+    restart: bool = False  # discard checkpointed units instead of resuming
+    resume: bool = False  # also resume a completed job (extract only units added since)
 
 
 # ---------------------------------------------------------------------------
@@ -212,6 +254,45 @@ class FieldResultRecord(MongoBaseModel):
         composite_key = ["document_id", "subdocument_id", "field_name"]
 
 
+class ExtractionUnit(BaseModel):
+    """One BaseExtractor run of a case extraction job: a document or a subdocument."""
+    document_id: str
+    subdocument_id: str = ""
+    document_type: str
+    case_type: str = ""  # subdocument units: the subdocument's case type (default: the case's)
+    status: ExtractionJobStatus = ExtractionJobStatus.PENDING
+    error: Optional[str] = None
+    target_object_id: Optional[str] = None
+    llm_calls: int = 0
+    completed_at: Optional[datetime] = None
+
+
+class CaseExtractionJob(MongoBaseModel):
+    """Checkpointed state of a case extraction job.
+
+    The ID is derived from the case, the result-affecting request settings
+    and the extraction configs (case_job.case_job_hash), so re-running the
+    same extraction finds and resumes the job.
+    """
+    case_id: str
+    config_hash: str
+    case_type: str = "generic"
+    request: CaseExtractionRequest
+    status: ExtractionJobStatus = ExtractionJobStatus.PENDING
+    units: list[ExtractionUnit] = Field(default_factory=list)
+    total_units: int = 0
+    completed_units: int = 0
+    failed_units: int = 0
+    target_objects: dict[str, list[str]] = Field(default_factory=dict)  # document_type -> target object IDs
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "extraction_jobs"
+        composite_key = ["case_id", "config_hash"]
+
+
 class UserFieldDefinition(MongoBaseModel):
     case_type: str = "generic"
     document_type: str
@@ -266,9 +347,20 @@ class PromptConfig(BaseModel):
     content_mode: ContentMode = ContentMode.MARKDOWN
     reference_granularity: ReferenceGranularity = ReferenceGranularity.FULL
 
+    # Context packing (extraction only)
+    context_max_tokens: Optional[int] = None  # token budget of the rendered context (None = unlimited)
+    context_adjacent_pages: int = 0  # neighbouring pages added after each retrieved page
+
+    # Map-reduce extraction (extraction only)
+    map_reduce_chunk_tokens: Optional[int] = None  # contexts above this are extracted chunk by chunk
+    map_reduce_merge: MapReduceMerge = MapReduceMerge.VOTE  # how conflicting chunk values are reconciled
+    map_reduce_max_concurrency: int = 4  # chunks extracted concurrently
+
     # Split/classify specific
     batch_size: Optional[int] = None
     overlap_factor: Optional[int] = None
+    max_concurrency: Optional[int] = None  # batches classified concurrently
+    batch_retries: Optional[int] = None  # extra attempts for a batch failing validation (>= 0)
 
     # Versioning
     hash: Optional[str] = None
@@ -306,6 +398,18 @@ class RetrieverFilter(BaseModel):
     page_ids: Optional[list[str]] = None
 
 
+class ContextStats(BaseModel):
+    """How a group's retrieved pages were packed into its context."""
+    max_tokens: Optional[int] = None
+    pages_total: int = 0
+    pages_included: int = 0
+    pages_truncated: int = 0
+    pages_dropped: int = 0
+    tokens_total: int = 0  # counted only when a token budget applies
+    tokens_included: int = 0
+    tokens_dropped: int = 0
+
+
 class SubgraphOutput(BaseModel):
     """Output from a single group subgraph execution."""
     field_results: dict[str, FieldResult] = Field(default_factory=dict)
@@ -321,6 +425,8 @@ class ExtractGroupState(BaseModel):
     retriever_filter: Optional[RetrieverFilter] = None
     retrieved_pages: list[Any] = Field(default_factory=list)
     context: Optional[str] = None
+    context_stats: Optional[ContextStats] = None
+    map_reduce_chunks: int = 0
     doc_short_to_long: dict[str, str] = Field(default_factory=dict)
     llm_result: Optional[Any] = None
     field_results: dict[str, FieldResult] = Field(default_factory=dict)
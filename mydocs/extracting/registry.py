@@ -20,6 +20,9 @@ SCHEMAS: dict[str, type[BaseModel]] = {
 # Populated by retrievers.py on import to avoid circular imports
 RETRIEVERS: dict[str, Callable] = {}
 
+# Retrievers whose result does not depend on the query (only on config and filter)
+QUERY_INDEPENDENT_RETRIEVERS: set[str] = set()
+
 # Target object registry: maps (case_type, document_type) to MongoBaseModel subclasses
 TARGET_OBJECTS: dict[tuple[str, str], type[MongoBaseModel]] = {}
 
@@ -10,8 +10,10 @@ import litellm
 from tinystructlog import get_logger
 
 from mydocs.extracting.models import RetrieverConfig, RetrieverFilter
-from mydocs.extracting.registry import RETRIEVERS
+from mydocs.extracting.registry import QUERY_INDEPENDENT_RETRIEVERS, RETRIEVERS
 from mydocs.models import DocumentPage
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import FuzzyConfig
 
 log = get_logger(__name__)
 
@@ -41,6 +43,12 @@ async def get_vector_retriever(
     )
     query_embedding = response.data[0]["embedding"]
 
+    retrieval_config = RetrievalConfig()
+    if retrieval_config.vector_backend == "local":
+        return await _local_vector_pages(
+            query_embedding, retriever_config, retriever_filter, retrieval_config,
+        )
+
     # Build $vectorSearch pipeline
     vector_stage: dict = {
         "$vectorSearch": {
@@ -99,6 +107,37 @@ async def get_vector_retriever(
     return pages
 
 
+async def _local_vector_pages(
+    query_embedding: list[float],
+    retriever_config: RetrieverConfig,
+    retriever_filter: Optional[RetrieverFilter],
+    retrieval_config: RetrievalConfig,
+) -> list[DocumentPage]:
+    """Retrieve pages from the embedded local vector index."""
+    from mydocs.retrieval.local import get_vector_index
+
+    index = get_vector_index("pages", retriever_config.embedding_field, retrieval_config.local_vector)
+    document_ids = retriever_filter.document_ids if retriever_filter else None
+    hits = index.search(query_embedding, retriever_config.top_k, document_ids=document_ids)
+    if not hits:
+        return []
+
+    pages_by_id = {
+        str(p.id): p
+        for p in await DocumentPage.afind({"_id": {"$in": [hit_id for hit_id, _, _ in hits]}})
+    }
+    pages = [pages_by_id[hit_id] for hit_id, _, _ in hits if hit_id in pages_by_id]
+
+    log.info(f"Local vector retriever returned {len(pages)} pages")
+    return pages
+
+
+def _fuzzy_config(retriever_config: RetrieverConfig) -> Optional[FuzzyConfig]:
+    """Fuzzy matching options from retriever_kwargs["fuzzy"], as used by /search."""
+    fuzzy = retriever_config.retriever_kwargs.get("fuzzy")
+    return FuzzyConfig.model_validate(fuzzy) if fuzzy else None
+
+
 async def get_fulltext_retriever(
     query: str,
     retriever_config: RetrieverConfig,
@@ -106,15 +145,22 @@ async def get_fulltext_retriever(
 ) -> list[DocumentPage]:
     """Retrieve pages via MongoDB Atlas Search $search.
 
-    Uses the Atlas Search index for keyword-based retrieval.
+    Uses the Atlas Search index for keyword-based retrieval, or the
+    embedded BM25 index when the local full-text backend is configured.
     """
+    retrieval_config = RetrievalConfig()
+    if retrieval_config.fulltext_backend == "local":
+        return await _local_fulltext_pages(query, retriever_config, retriever_filter, retrieval_config)
+
     search_index = retriever_config.search_index or "ft_pages"
     search_field = retriever_config.search_field or "content"
 
     # Build compound search query
-    compound: dict = {
-        "must": [{"text": {"query": query, "path": search_field}}]
-    }
+    text_op: dict = {"text": {"query": query, "path": search_field}}
+    fuzzy = _fuzzy_config(retriever_config)
+    if fuzzy and fuzzy.enabled:
+        text_op["text"]["fuzzy"] = {"maxEdits": fuzzy.max_edits, "prefixLength": fuzzy.prefix_length}
+    compound: dict = {"must": [text_op]}
 
     # Pre-filter by document_ids
     if retriever_filter and retriever_filter.document_ids:
@@ -164,6 +210,34 @@ async def get_fulltext_retriever(
     return pages
 
 
+async def _local_fulltext_pages(
+    query: str,
+    retriever_config: RetrieverConfig,
+    retriever_filter: Optional[RetrieverFilter],
+    retrieval_config: RetrievalConfig,
+) -> list[DocumentPage]:
+    """Retrieve pages from the embedded local full-text index."""
+    from mydocs.retrieval.local import get_fulltext_index
+
+    search_field = retriever_config.search_field or "content"
+    index = get_fulltext_index("pages", search_field, retrieval_config.local_fulltext)
+    document_ids = retriever_filter.document_ids if retriever_filter else None
+    hits = index.search(
+        query, retriever_config.top_k, document_ids=document_ids, fuzzy=_fuzzy_config(retriever_config),
+    )
+    if not hits:
+        return []
+
+    pages_by_id = {
+        str(p.id): p
+        for p in await DocumentPage.afind({"_id": {"$in": [hit_id for hit_id, _, _ in hits]}})
+    }
+    pages = [pages_by_id[hit_id] for hit_id, _, _ in hits if hit_id in pages_by_id]
+
+    log.info(f"Local fulltext retriever returned {len(pages)} pages")
+    return pages
+
+
 async def get_document_pages_retriever(
     query: str,
     retriever_config: RetrieverConfig,
@@ -210,3 +284,4 @@ RETRIEVERS["vector_retriever"] = get_vector_retriever
 RETRIEVERS["fulltext_retriever"] = get_fulltext_retriever
 RETRIEVERS["document_pages_retriever"] = get_document_pages_retriever
 RETRIEVERS["pages_retriever"] = get_pages_retriever
+QUERY_INDEPENDENT_RETRIEVERS.update({"document_pages_retriever", "pages_retriever"})
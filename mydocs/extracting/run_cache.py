@@ -0,0 +1,139 @@
+"""Pages and context strings shared by the groups of one extraction run.
+
+Every group of a run retrieves its own context. With retrievers that ignore
+the query (document_pages_retriever, pages_retriever) all groups of a run
+fetch the same pages and render the same context string. ExtractionRunCache
+lives for one BaseExtractor.run(): retrievals are keyed by retriever name,
+retriever config, filter and (for query-dependent retrievers) the query, and
+are single-flight, so concurrently running groups share one fetch. Rendered
+(and token-packed) contexts are keyed by the ordered page IDs, the content
+mode and the packing settings.
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+
+from tinystructlog import get_logger
+
+from mydocs.extracting.context import build_context
+from mydocs.extracting.models import ContentMode, ContextStats, RetrieverConfig, RetrieverFilter
+from mydocs.extracting.registry import QUERY_INDEPENDENT_RETRIEVERS
+from mydocs.models import DocumentPage
+
+log = get_logger(__name__)
+
+
+def retrieval_key(
+    query: str,
+    retriever_config: RetrieverConfig,
+    retriever_filter: Optional[RetrieverFilter],
+) -> str:
+    """Key of a retrieval; the query is left out for retrievers that ignore it."""
+    return json.dumps({
+        "config": retriever_config.model_dump(mode="json"),
+        "filter": retriever_filter.model_dump(mode="json") if retriever_filter else None,
+        "query": None if retriever_config.name in QUERY_INDEPENDENT_RETRIEVERS else query,
+    }, sort_keys=True, default=str)
+
+
+class ExtractionRunCache:
+    """Run-scoped, single-flight cache of retrieved pages and rendered contexts."""
+
+    def __init__(self):
+        self._pages: dict[str, asyncio.Future] = {}
+        self._contexts: dict[tuple, asyncio.Future] = {}
+        self.page_hits = 0
+        self.page_misses = 0
+        self.context_hits = 0
+        self.context_misses = 0
+
+    async def _single_flight(self, store: dict, key, compute: Callable[[], Awaitable]):
+        """Run compute() once per key; concurrent callers await the same result.
+
+        Failed computations are not cached.
+        """
+        future = store.get(key)
+        if future is not None:
+            return True, await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        store[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            del store[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; nothing else retrieves it
+            raise
+        future.set_result(value)
+        return False, value
+
+    async def get_pages(
+        self,
+        retriever_fn: Callable[..., Awaitable[list[DocumentPage]]],
+        query: str,
+        retriever_config: RetrieverConfig,
+        retriever_filter: Optional[RetrieverFilter],
+    ) -> list[DocumentPage]:
+        """Retrieve pages once per distinct retrieval of the run.
+
+        A group asking for a retrieval that is already in flight waits for
+        it. Failed retrievals are not cached.
+        """
+        hit, pages = await self._single_flight(
+            self._pages,
+            retrieval_key(query, retriever_config, retriever_filter),
+            lambda: retriever_fn(query, retriever_config, retriever_filter),
+        )
+        if hit:
+            self.page_hits += 1
+        else:
+            self.page_misses += 1
+        return list(pages)
+
+    async def get_context(
+        self,
+        pages: list[DocumentPage],
+        content_mode: ContentMode = ContentMode.MARKDOWN,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        adjacent_pages: int = 0,
+    ) -> tuple[str, dict[str, str], ContextStats]:
+        """build_context(), rendered once per distinct page list and packing settings."""
+        key = (
+            content_mode,
+            tuple(str(page.id) for page in pages),
+            model if max_tokens else None,
+            max_tokens,
+            adjacent_pages,
+        )
+        hit, (context, doc_short_to_long, stats) = await self._single_flight(
+            self._contexts,
+            key,
+            lambda: build_context(pages, content_mode, model, max_tokens, adjacent_pages),
+        )
+        if hit:
+            self.context_hits += 1
+        else:
+            self.context_misses += 1
+        return context, dict(doc_short_to_long), stats.model_copy()
+
+    def context_stats(self) -> list[ContextStats]:
+        """Packing stats of every distinct context rendered in the run, once each."""
+        return [
+            future.result()[2].model_copy()
+            for future in self._contexts.values()
+            if future.done() and not future.cancelled() and future.exception() is None
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "page_hits": self.page_hits,
+            "page_misses": self.page_misses,
+            "context_hits": self.context_hits,
+            "context_misses": self.context_misses,
+        }
@@ -0,0 +1,95 @@
+"""Dependency-aware scheduling of extraction field groups.
+
+A group depends on another group of the same run when one of its fields
+lists a field of that group in `inputs`. Groups run as a DAG: independent
+groups run concurrently (at most max_concurrency LLM pipelines at a time)
+and a dependent group starts as soon as all of its prerequisites finished,
+receiving their field results in memory. End-to-end latency is therefore
+bounded by the critical path rather than the number of groups.
+"""
+
+import asyncio
+from graphlib import CycleError, TopologicalSorter
+from typing import Awaitable, Callable
+
+from tinystructlog import get_logger
+
+from mydocs.extracting.exceptions import FieldConsistencyError
+from mydocs.extracting.models import FieldDefinition, FieldResult, SubgraphOutput
+
+log = get_logger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+GroupRunner = Callable[[int, dict[str, FieldResult]], Awaitable[SubgraphOutput]]
+
+
+def build_group_dependencies(
+    field_groups: dict[int, list[FieldDefinition]],
+    document_type: str,
+) -> dict[int, set[int]]:
+    """Map each group to the groups producing its input fields.
+
+    Inputs scoped to another document type, produced by the same group, or
+    not extracted in this run have no in-run producer; they are resolved
+    from stored FieldResultRecords instead.
+
+    Raises:
+        FieldConsistencyError: If the group dependencies form a cycle.
+    """
+    producers = {field.name: group_id for group_id, fields in field_groups.items() for field in fields}
+    dependencies: dict[int, set[int]] = {group_id: set() for group_id in field_groups}
+    for group_id, fields in field_groups.items():
+        for field in fields:
+            for requirement in field.inputs or []:
+                if requirement.document_type and requirement.document_type != document_type:
+                    continue
+                producer = producers.get(requirement.field_name)
+                if producer is not None and producer != group_id:
+                    dependencies[group_id].add(producer)
+
+    try:
+        tuple(TopologicalSorter(dependencies).static_order())
+    except CycleError as e:
+        raise FieldConsistencyError(f"Field groups have cyclic input dependencies: {e.args[1]}") from e
+    return dependencies
+
+
+async def run_field_groups(
+    field_groups: dict[int, list[FieldDefinition]],
+    dependencies: dict[int, set[int]],
+    run_group: GroupRunner,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> dict[int, SubgraphOutput]:
+    """Run every group once its prerequisites finished.
+
+    run_group(group_id, prerequisite_results) receives the field results of
+    the group's direct prerequisites. If any group fails, the remaining
+    groups are cancelled and the error is re-raised.
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+    tasks: dict[int, asyncio.Task] = {}
+
+    async def run(group_id: int) -> SubgraphOutput:
+        prerequisites = sorted(dependencies.get(group_id, ()))
+        outputs = await asyncio.gather(*(tasks[p] for p in prerequisites))
+        prerequisite_results: dict[str, FieldResult] = {}
+        for output in outputs:
+            prerequisite_results.update(output.field_results)
+        async with semaphore:
+            log.debug(f"Running extraction group {group_id} (after groups {prerequisites})")
+            return await run_group(group_id, prerequisite_results)
+
+    order = TopologicalSorter({group_id: dependencies.get(group_id, set()) for group_id in field_groups})
+    for group_id in order.static_order():
+        tasks[group_id] = asyncio.create_task(run(group_id))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {group_id: tasks[group_id].result() for group_id in field_groups}
@@ -5,15 +5,18 @@ by document type using batched LLM calls.  Persists classified segments
 as SubDocument objects on the parent Document.
 """
 
+import asyncio
 import json
 from datetime import datetime, timezone
-from typing import NamedTuple
+from typing import Callable, NamedTuple, Optional
 
 import litellm
 from lightodm import generate_composite_id
 from tinystructlog import get_logger
 
 from mydocs.extracting.context import get_context
+from mydocs.extracting.exceptions import ExtractionError
+from mydocs.extracting.llm_cache import cached_acompletion, get_llm_cache
 from mydocs.extracting.models import (
     ContentMode,
     LLMSplitClassifyBatchResult,
@@ -32,6 +35,19 @@ from mydocs.models import (
 
 log = get_logger(__name__)
 
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_BATCH_RETRIES = 2
+BATCH_RETRY_DELAY = 1.0  # seconds, doubled per retry
+
+# Execution settings that do not affect the classification result
+_EXECUTION_FIELDS = {
+    "max_concurrency", "batch_retries",
+    "context_max_tokens", "context_adjacent_pages",
+    "map_reduce_chunk_tokens", "map_reduce_merge", "map_reduce_max_concurrency",
+}
+
+SplitProgress = Callable[[int, int], None]  # (completed batches, total batches)
+
 
 # ---------------------------------------------------------------------------
 # Batching
@@ -88,6 +104,7 @@ async def run_llm_split_classify(
     prompt_config: PromptConfig,
     batch_num: int,
     total_batches: int,
+    use_cache: bool = True,
 ) -> LLMSplitClassifyBatchResult:
     """Run the LLM to classify pages in a single batch.
 
@@ -95,6 +112,9 @@ async def run_llm_split_classify(
     - Transport retries (transport_retries): Handled by litellm internally.
     - Validation retries (validation_retries): Outer loop retries on schema
       validation failures.
+
+    Responses are served from the LLM response cache when it is enabled and
+    use_cache is set.
     """
     sys_prompt = prompt_config.sys_prompt_template
     user_prompt = prompt_config.user_prompt_template.format(
@@ -111,16 +131,15 @@ async def run_llm_split_classify(
     last_error = None
     for attempt in range(prompt_config.validation_retries):
         try:
-            response = await litellm.acompletion(
-                model=prompt_config.model,
-                messages=messages,
-                response_format=LLMSplitClassifyBatchResult,
+            result, _ = await cached_acompletion(
+                prompt_config.model,
+                messages,
+                LLMSplitClassifyBatchResult,
                 num_retries=prompt_config.transport_retries,
-                **prompt_config.llm_kwargs,
+                llm_kwargs=prompt_config.llm_kwargs,
+                use_cache=use_cache,
             )
-
-            content = response.choices[0].message.content
-            return LLMSplitClassifyBatchResult.model_validate_json(content)
+            return result
 
         except litellm.exceptions.APIError:
             raise  # Transport errors already retried by litellm; don't retry again
@@ -135,6 +154,77 @@ async def run_llm_split_classify(
     raise last_error
 
 
+async def classify_batches(
+    batches: list[list[DocumentPage]],
+    prompt_config: PromptConfig,
+    content_mode: ContentMode = ContentMode.MARKDOWN,
+    max_concurrency: Optional[int] = None,
+    progress: Optional[SplitProgress] = None,
+    use_llm_cache: bool = True,
+) -> list[LLMSplitClassifyBatchResult]:
+    """Classify all batches concurrently, returning results in batch order.
+
+    At most max_concurrency batches are in flight. A batch whose LLM output
+    still fails validation after run_llm_split_classify's validation
+    retries is retried on its own (prompt_config.batch_retries extra
+    attempts, exponential backoff) while completed batches are kept, so a
+    batch makes at most (batch_retries + 1) * validation_retries LLM calls.
+    Transport errors (litellm APIError), already retried transport_retries
+    times by litellm, are not retried again. If a batch still fails, the
+    remaining batches are cancelled and ExtractionError is raised.
+    """
+    total_batches = len(batches)
+    max_concurrency = max_concurrency or prompt_config.max_concurrency or DEFAULT_MAX_CONCURRENCY
+    retries = prompt_config.batch_retries if prompt_config.batch_retries is not None else DEFAULT_BATCH_RETRIES
+    if retries < 0:
+        raise ExtractionError(f"batch_retries must be >= 0, got {retries}")
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+    results: list[Optional[LLMSplitClassifyBatchResult]] = [None] * total_batches
+    completed = 0
+
+    async def classify(batch_idx: int) -> None:
+        nonlocal completed
+        batch_num = batch_idx + 1
+        context = generate_split_context(batches[batch_idx], content_mode)
+        for attempt in range(retries + 1):
+            try:
+                async with semaphore:
+                    result = await run_llm_split_classify(
+                        context, prompt_config, batch_num, total_batches, use_cache=use_llm_cache,
+                    )
+                break
+            except litellm.exceptions.APIError as e:
+                raise ExtractionError(f"Split-classify batch {batch_num}/{total_batches} failed: {e}") from e
+            except Exception as e:
+                if attempt == retries:
+                    raise ExtractionError(
+                        f"Split-classify batch {batch_num}/{total_batches} failed "
+                        f"after {attempt + 1} attempts: {e}"
+                    ) from e
+                log.warning(
+                    f"Batch {batch_num}/{total_batches} attempt {attempt + 1}/{retries + 1} failed: {e}"
+                )
+                await asyncio.sleep(BATCH_RETRY_DELAY * 2 ** attempt)
+
+        results[batch_idx] = result
+        completed += 1
+        log.debug(f"Batch {batch_num}/{total_batches}: {len(result.result)} segments")
+        log.info(f"Split-classify progress: {completed}/{total_batches} batches")
+        if progress:
+            progress(completed, total_batches)
+
+    tasks = [asyncio.create_task(classify(i)) for i in range(total_batches)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Overlap Merging (4-phase algorithm)
 # ---------------------------------------------------------------------------
@@ -315,12 +405,27 @@ async def _build_subdocuments(
     return subdocuments
 
 
+def split_config_hash(prompt_config: PromptConfig) -> str:
+    """Hash of the prompt config settings that affect the classification.
+
+    Execution settings (concurrency, retries) and extraction-only context
+    packing and map-reduce settings are excluded so tuning them does not invalidate stored
+    results.
+    """
+    return calculate_content_hash(
+        json.dumps(prompt_config.model_dump(exclude=_EXECUTION_FIELDS), sort_keys=True)
+    )
+
+
 async def split_and_classify(
     document_id: str,
     prompt_config: PromptConfig,
     content_mode: ContentMode = ContentMode.MARKDOWN,
     case_type: str = "generic",
     force: bool = False,
+    max_concurrency: Optional[int] = None,
+    progress: Optional[SplitProgress] = None,
+    use_llm_cache: bool = True,
 ) -> SplitClassifyResult:
     """Split and classify a document into typed segments.
 
@@ -330,6 +435,10 @@ async def split_and_classify(
         content_mode: Which content representation to use.
         case_type: Case type for SubDocument creation.
         force: If True, skip idempotency check and always re-run LLM calls.
+        max_concurrency: Batches classified concurrently (default:
+            prompt_config.max_concurrency, then DEFAULT_MAX_CONCURRENCY).
+        progress: Called with (completed, total) after each classified batch.
+        use_llm_cache: If False, bypass the LLM response cache.
 
     Returns:
         SplitClassifyResult with classified segments and persisted subdocuments.
@@ -341,9 +450,7 @@ async def split_and_classify(
 
     # Compute current hashes for idempotency
     file_sha256 = doc.file_metadata.sha256 if doc.file_metadata else ""
-    config_hash = calculate_content_hash(
-        json.dumps(prompt_config.model_dump(), sort_keys=True)
-    )
+    config_hash = split_config_hash(prompt_config)
 
     # Idempotency check
     if not force and doc.subdocuments and doc.split_classify_meta:
@@ -388,15 +495,14 @@ async def split_and_classify(
 
     log.info(f"Created {total_batches} batches (batch_size={batch_size}, overlap={overlap_factor})")
 
-    # Classify each batch
-    batch_results: list[LLMSplitClassifyBatchResult] = []
-    for batch_num, batch in enumerate(batches, start=1):
-        context = generate_split_context(batch, content_mode)
-        result = await run_llm_split_classify(
-            context, prompt_config, batch_num, total_batches
-        )
-        batch_results.append(result)
-        log.debug(f"Batch {batch_num}/{total_batches}: {len(result.result)} segments")
+    # Classify batches concurrently; they are independent until merging
+    batch_results = await classify_batches(
+        batches, prompt_config, content_mode,
+        max_concurrency=max_concurrency, progress=progress, use_llm_cache=use_llm_cache,
+    )
+    llm_cache = get_llm_cache()
+    if llm_cache and use_llm_cache:
+        log.info(f"Split-classify LLM cache: {llm_cache.stats()}")
 
     # Merge overlapping results
     segments = combine_overlapping_results(batch_results, batches)
@@ -102,6 +102,20 @@ class SplitClassifyMeta(BaseModel):
     completed_at: datetime
 
 
+class ElementGeometry(BaseModel):
+    """Precomputed rectangles of an element on its page (table rows on row_pages).
+
+    Polygons are 8-point rectangles [x0, y0, x1, y0, x1, y1, x0, y1] in page
+    units; an empty list means no geometry is available.
+    """
+    bbox: list[float] = Field(default_factory=list, description="Element bounding box")
+    bbox_norm: list[float] = Field(default_factory=list, description="Bounding box scaled to [0, 1] page coordinates")
+    rows: list[list[float]] = Field(default_factory=list, description="Table row bounding boxes by row index")
+    row_pages: list[int] = Field(default_factory=list, description="Page of each table row bounding box (later pages for rows of multi-page tables)")
+    key_bbox: list[float] = Field(default_factory=list, description="Key bounding box of a key-value pair")
+    value_bbox: list[float] = Field(default_factory=list, description="Value bounding box of a key-value pair")
+
+
 class DocumentElement(BaseModel):
     id: str = Field(..., description="Globally unique element ID (deterministic hash)")
     page_id: str = Field(..., description="Reference to the page containing this element")
@@ -110,6 +124,7 @@ class DocumentElement(BaseModel):
     short_id: Optional[str] = Field(None, description="Short element reference ID (e.g., p0, t1, kv2)")
     type: DocumentElementTypeEnum
     element_data: dict
+    geometry: Optional[ElementGeometry] = Field(None, description="Precomputed rectangles (None for documents parsed before geometry was added)")
 
 
 # --- Sidecar Model ---
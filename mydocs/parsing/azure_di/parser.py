@@ -19,7 +19,11 @@ from mydocs.parsing.azure_di.html import get_element_html
 from mydocs.parsing.azure_di.markdown import get_element_markdown
 from mydocs.parsing.base_parser import DocumentParser
 from mydocs.parsing.config import ParserConfig
+from mydocs.parsing.geometry import build_element_geometry
 from mydocs.parsing.storage import get_storage
+from mydocs.retrieval.cache import bump_corpus_generation
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.embeddings import shorten_embedding
 
 log = get_logger(__name__)
 
@@ -68,6 +72,7 @@ class AzureDIDocumentParser(DocumentParser):
         log.info("Processing elements.")
         self.document.elements = await self._aprocess_elements()
         await self.document.asave()
+        self._update_local_fulltext_index("documents", [self.document])
 
         if self.parser_config.document_embeddings:
             await self._embed_document()
@@ -82,6 +87,8 @@ class AzureDIDocumentParser(DocumentParser):
         else:
             log.info("Page embeddings are disabled.")
 
+        # Document content and embeddings changed: invalidate cached search results
+        await bump_corpus_generation()
         return self.document
 
     async def _aprocess_file(self, fpath: str) -> AnalyzeResult:
@@ -110,6 +117,10 @@ class AzureDIDocumentParser(DocumentParser):
         if not self._analyze_result or not self.document:
             raise ValueError("Processor is not initialized")
 
+        page_dimensions = {
+            page.page_number: (page.width, page.height) for page in self._analyze_result.pages or []
+        }
+
         elements = []
         to_process = []
         if self._analyze_result.paragraphs:
@@ -136,13 +147,18 @@ class AzureDIDocumentParser(DocumentParser):
                 log.error(f"Error processing element {el}: {e}")
                 continue
 
+            element_data = el.as_dict()
             element = DocumentElement(
                 id=generate_composite_id([self.document.id, first_bbox.page_number, first_span.offset]),
                 page_id=generate_composite_id([self.document.id, first_bbox.page_number]),
                 page_number=first_bbox.page_number,
                 offset=first_span.offset,
                 type=typ,
-                element_data=el.as_dict(),
+                element_data=element_data,
+                geometry=build_element_geometry(
+                    element_data, typ, first_bbox.page_number,
+                    *page_dimensions.get(first_bbox.page_number, (None, None)),
+                ),
             )
             elements.append(element)
 
@@ -212,6 +228,8 @@ class AzureDIDocumentParser(DocumentParser):
                 log.info(f"Saving page {pages[page_num].id}, page_num: {page_num}")
                 await pages[page_num].asave()
 
+        self._update_local_fulltext_index("pages", [pages[n] for n in page_elements if n in pages])
+        await bump_corpus_generation()
         return list(pages.values())
 
     async def _embed_document(self):
@@ -232,12 +250,17 @@ class AzureDIDocumentParser(DocumentParser):
                 log.info("Saving embeddings to cache")
                 await self._cache_store.write_json(cache_key, embedded_doc)
 
+            update = {embedding.target_field: embedded_doc[0]}
+            if embedding.short_field:
+                update[embedding.short_field] = shorten_embedding(embedded_doc[0], embedding.short_dimensions)
             await Document.aupdate_one(
                 filter={"_id": self.document.id},
-                update={"$set": {embedding.target_field: embedded_doc[0]}},
+                update={"$set": update},
             )
             log.info(f"Document {self.document.id} updated with embedding {embedding.target_field}.")
             self.document = await Document.aget(self.document.id)
+            for field, vector in update.items():
+                self._update_local_vector_index("documents", field, {self.document.id: vector})
 
     async def _embed_pages(self):
         """Generate and store page-level embeddings using litellm."""
@@ -265,9 +288,48 @@ class AzureDIDocumentParser(DocumentParser):
                 log.info("Saving embeddings to cache")
                 await self._cache_store.write_json(cache_key, emb_dict)
 
+            short_dict = {}
+            if embedding.short_field:
+                short_dict = {
+                    page_id: shorten_embedding(vector, embedding.short_dimensions)
+                    for page_id, vector in emb_dict.items()
+                }
             for page_id, vector in emb_dict.items():
                 log.info(f"Updating page {page_id} with embedding vector, len: {len(vector)}")
+                update = {embedding.target_field: vector}
+                if page_id in short_dict:
+                    update[embedding.short_field] = short_dict[page_id]
                 await DocumentPage.aupdate_one(
                     filter={"_id": page_id},
-                    update={"$set": {embedding.target_field: vector}},
+                    update={"$set": update},
                 )
+            self._update_local_vector_index("pages", embedding.target_field, emb_dict)
+            if short_dict:
+                self._update_local_vector_index("pages", embedding.short_field, short_dict)
+
+    def _update_local_vector_index(self, search_target: str, vector_field: str, emb_dict: dict) -> None:
+        """Load freshly embedded vectors into the local vector index when it is the active backend."""
+        retrieval_config = RetrievalConfig()
+        if retrieval_config.vector_backend != "local" or not emb_dict:
+            return
+        from mydocs.retrieval.local import get_vector_index
+
+        index = get_vector_index(search_target, vector_field, retrieval_config.local_vector)
+        ids = list(emb_dict.keys())
+        index.upsert(ids, [self.document.id] * len(ids), list(emb_dict.values()))
+        log.info(f"Local vector index {search_target}.{vector_field} updated with {len(ids)} vectors.")
+
+    def _update_local_fulltext_index(self, search_target: str, items: list) -> None:
+        """Index freshly saved text in the local full-text index when it is the active backend."""
+        retrieval_config = RetrievalConfig()
+        if retrieval_config.fulltext_backend != "local" or not items:
+            return
+        from mydocs.retrieval.local import get_fulltext_index
+
+        config = retrieval_config.local_fulltext
+        fields = config.document_fields if search_target == "documents" else config.page_fields
+        ids = [item.id for item in items]
+        for field in fields:
+            index = get_fulltext_index(search_target, field, config)
+            index.add(ids, [self.document.id] * len(ids), [getattr(item, field, None) or "" for item in items])
+        log.info(f"Local fulltext indexes for {search_target} updated with {len(ids)} rows.")
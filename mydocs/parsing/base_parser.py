@@ -6,6 +6,7 @@ from tinystructlog import get_logger
 
 from mydocs.parsing.config import ParserConfig
 from mydocs.models import Document, DocumentPage, DocumentStatusEnum
+from mydocs.retrieval.cache import bump_corpus_generation
 
 log = get_logger(__name__)
 
@@ -24,7 +25,7 @@ class DocumentParser(ABC):
         self.document = document
         self.parser_config = parser_config
         self.pages: List[DocumentPage] = []
-        self.parser_config_hash = parser_config.dump_config().config_hash
+        self.parser_config_hash = parser_config.parser_config_hash()
 
     async def __aenter__(self) -> "DocumentParser":
         """Load existing document state and acquire processing lock."""
@@ -58,6 +59,8 @@ class DocumentParser(ABC):
         self.document.status = DocumentStatusEnum.PARSING
         log.info(f"Locking document: {self.document.id}, config hash: {self.parser_config_hash}")
         await self.document.asave()
+        # Status is a search filter: invalidate cached results
+        await bump_corpus_generation()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
@@ -80,6 +83,7 @@ class DocumentParser(ABC):
             self.document.modified_at = datetime.now()
             log.info(f"Releasing lock on document: {self.document.id}, status: {self.document.status}")
             await self.document.asave()
+            await bump_corpus_generation()
 
         return False
 
@@ -1,5 +1,6 @@
-"""Cache store abstraction for parsing artifacts (DI results, embeddings)."""
+"""Cache store abstraction for parsing artifacts (DI results, embeddings) and LLM responses."""
 
+import asyncio
 import json
 import os
 from abc import ABC, abstractmethod
@@ -27,6 +28,16 @@ class CacheStore(ABC):
         """Write data as a JSON cache entry."""
         ...
 
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete a cache entry if it exists."""
+        ...
+
+    @abstractmethod
+    async def list_entries(self, prefix: str) -> list[tuple[str, float]]:
+        """List (key, last modified timestamp) for all entries under prefix."""
+        ...
+
     async def close(self) -> None:
         """Release any resources held by the cache store."""
         pass
@@ -47,6 +58,27 @@ class LocalCacheStore(CacheStore):
         with open(key, "w") as f:
             json.dump(data, f)
 
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(key)
+        except FileNotFoundError:
+            pass
+
+    async def list_entries(self, prefix: str) -> list[tuple[str, float]]:
+        return await asyncio.to_thread(self._walk_entries, prefix)
+
+    @staticmethod
+    def _walk_entries(prefix: str) -> list[tuple[str, float]]:
+        entries = []
+        for dirpath, _, filenames in os.walk(prefix):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    entries.append((path, os.path.getmtime(path)))
+                except FileNotFoundError:
+                    continue
+        return entries
+
 
 class BlobCacheStore(CacheStore):
     """Cache store backed by an Azure Blob Storage container."""
@@ -76,6 +108,18 @@ class BlobCacheStore(CacheStore):
         except Exception as e:
             log.warning(f"Failed to write cache blob '{key}' in container '{self._container_name}': {e}")
 
+    async def delete(self, key: str) -> None:
+        try:
+            await self._container_client.delete_blob(key)
+        except Exception as e:
+            log.debug(f"Failed to delete cache blob '{key}' in container '{self._container_name}': {e}")
+
+    async def list_entries(self, prefix: str) -> list[tuple[str, float]]:
+        entries = []
+        async for blob in self._container_client.list_blobs(name_starts_with=prefix):
+            entries.append((blob.name, blob.last_modified.timestamp()))
+        return entries
+
     async def close(self) -> None:
         if self._client:
             await self._client.close()
@@ -10,6 +10,24 @@ class EmbeddingConfig(BaseModel):
     field_to_embed: str = "content_markdown"
     target_field: str = "emb_content_markdown_text_embedding_3_large"
     dimensions: int = 3072
+    # Matryoshka short vector: truncated to short_dimensions and renormalized
+    short_dimensions: Optional[int] = None
+    short_target_field: Optional[str] = None  # defaults to "<target_field>_<short_dimensions>"
+
+    @property
+    def short_field(self) -> Optional[str]:
+        if not self.short_dimensions:
+            return None
+        return self.short_target_field or f"{self.target_field}_{self.short_dimensions}"
+
+
+# Settings left out of the parser config hash. Short vectors are derived from
+# the (cached) full vectors, so enabling them must not invalidate the parse cache
+_SHORT_VECTOR_FIELDS = {"short_dimensions", "short_target_field"}
+PARSER_HASH_EXCLUDE = {
+    "page_embeddings": {"__all__": _SHORT_VECTOR_FIELDS},
+    "document_embeddings": {"__all__": _SHORT_VECTOR_FIELDS},
+}
 
 
 class ParserConfig(BaseConfig):
@@ -22,3 +40,7 @@ class ParserConfig(BaseConfig):
     page_embeddings: Optional[List[EmbeddingConfig]] = None
     document_embeddings: Optional[List[EmbeddingConfig]] = None
     use_cache: bool = False
+
+    def parser_config_hash(self) -> str:
+        """Hash identifying the parse output, stored as Document.parser_config_hash."""
+        return self.dump_config(exclude=PARSER_HASH_EXCLUDE).config_hash
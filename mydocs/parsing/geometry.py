@@ -0,0 +1,135 @@
+"""Element geometry computed at parse time.
+
+Azure DI returns polygons per bounding region (and per cell for tables).
+Reference enrichment and the document viewer need rectangles: the element's
+bounding box, the bounding box of a table row, or of a key-value pair's key
+and value. build_element_geometry() computes them once per element from the
+raw element_data, restricted to the element's page (table rows that continue
+on later pages are boxed on their own page), and the result is stored as
+DocumentElement.geometry.
+"""
+
+from typing import Optional
+
+from mydocs.models import DocumentElementTypeEnum, ElementGeometry
+
+
+def calculate_union_polygon(polygons: list[list[float]]) -> list[float]:
+    """Compute bounding box union of multiple polygons.
+
+    Each polygon is a flat list of [x1, y1, x2, y2, ...] coordinates.
+    Returns [min_x, min_y, max_x, min_y, max_x, max_y, min_x, max_y]
+    (a rectangular bounding box).
+    """
+    if not polygons:
+        return []
+
+    all_x = []
+    all_y = []
+    for poly in polygons:
+        for i in range(0, len(poly), 2):
+            if i + 1 < len(poly):
+                all_x.append(poly[i])
+                all_y.append(poly[i + 1])
+
+    if not all_x:
+        return []
+
+    min_x, max_x = min(all_x), max(all_x)
+    min_y, max_y = min(all_y), max(all_y)
+
+    return [min_x, min_y, max_x, min_y, max_x, max_y, min_x, max_y]
+
+
+def _region_polygons(regions: list[dict], page_number: Optional[int] = None) -> list[list[float]]:
+    """Polygons of bounding regions, optionally only those on page_number."""
+    return [
+        region["polygon"]
+        for region in regions
+        if region.get("polygon") and (page_number is None or region.get("pageNumber", page_number) == page_number)
+    ]
+
+
+def table_row_polygons(element_data: dict, page_number: Optional[int] = None) -> dict[int, list[float]]:
+    """Bounding box of every table row, computed in one pass over the cells."""
+    polygons_by_row: dict[int, list[list[float]]] = {}
+    for cell in element_data.get("cells", []):
+        row_index = cell.get("rowIndex")
+        if row_index is None:
+            continue
+        polygons = _region_polygons(cell.get("boundingRegions", []), page_number)
+        if polygons:
+            polygons_by_row.setdefault(row_index, []).extend(polygons)
+    return {row: calculate_union_polygon(polygons) for row, polygons in polygons_by_row.items()}
+
+
+def table_row_boxes(element_data: dict, page_number: int) -> dict[int, tuple[int, list[float]]]:
+    """Bounding box of every table row and the page it is on.
+
+    A row is boxed on page_number when it has cells there. Rows of a
+    multi-page table without cells on page_number are boxed on the first
+    page their cells are on.
+    """
+    polygons_by_row: dict[int, dict[int, list[list[float]]]] = {}
+    for cell in element_data.get("cells", []):
+        row_index = cell.get("rowIndex")
+        if row_index is None:
+            continue
+        for region in cell.get("boundingRegions", []):
+            if region.get("polygon"):
+                polygons_by_row.setdefault(row_index, {}).setdefault(
+                    region.get("pageNumber", page_number), []
+                ).append(region["polygon"])
+
+    boxes = {}
+    for row, polygons_by_page in polygons_by_row.items():
+        row_page = page_number if page_number in polygons_by_page else min(polygons_by_page)
+        boxes[row] = (row_page, calculate_union_polygon(polygons_by_page[row_page]))
+    return boxes
+
+
+def normalize_polygon(polygon: list[float], page_width: Optional[float], page_height: Optional[float]) -> list[float]:
+    """Scale a polygon from page units to [0, 1] page coordinates."""
+    if not polygon or not page_width or not page_height:
+        return []
+    return [value / (page_width if i % 2 == 0 else page_height) for i, value in enumerate(polygon)]
+
+
+def build_element_geometry(
+    element_data: dict,
+    element_type: DocumentElementTypeEnum,
+    page_number: int,
+    page_width: Optional[float] = None,
+    page_height: Optional[float] = None,
+) -> ElementGeometry:
+    """Precompute the rectangles of one element on its page.
+
+    bbox is the union of the element's bounding regions (of key and value
+    for key-value pairs). Tables get one rectangle per row index, key-value
+    pairs separate key and value rectangles; row_pages holds the page of
+    each row rectangle. bbox_norm is bbox scaled by the page dimensions when
+    they are known.
+    """
+    geometry = ElementGeometry()
+
+    if element_type == DocumentElementTypeEnum.KEY_VALUE_PAIR:
+        key_polygons = _region_polygons(element_data.get("key", {}).get("boundingRegions", []), page_number)
+        value_polygons = _region_polygons(
+            (element_data.get("value") or {}).get("boundingRegions", []), page_number
+        )
+        geometry.key_bbox = calculate_union_polygon(key_polygons)
+        geometry.value_bbox = calculate_union_polygon(value_polygons)
+        geometry.bbox = calculate_union_polygon(key_polygons + value_polygons)
+    else:
+        geometry.bbox = calculate_union_polygon(
+            _region_polygons(element_data.get("boundingRegions", []), page_number)
+        )
+
+    if element_type == DocumentElementTypeEnum.TABLE:
+        row_boxes = table_row_boxes(element_data, page_number)
+        row_count = max(element_data.get("rowCount") or 0, max(row_boxes, default=-1) + 1)
+        geometry.rows = [row_boxes[row][1] if row in row_boxes else [] for row in range(row_count)]
+        geometry.row_pages = [row_boxes[row][0] if row in row_boxes else page_number for row in range(row_count)]
+
+    geometry.bbox_norm = normalize_polygon(geometry.bbox, page_width, page_height)
+    return geometry
@@ -7,6 +7,7 @@ from mydocs.models import (
     DocumentPage,
     DocumentStatusEnum,
     DocumentTypeEnum,
+    ElementGeometry,
     FileMetadata,
     FileTypeEnum,
     StorageBackendEnum,
@@ -21,6 +22,7 @@ __all__ = [
     "DocumentElementTypeEnum",
     "DocumentTypeEnum",
     "FileMetadata",
+    "ElementGeometry",
     "DocumentElement",
     "Document",
     "DocumentPage",
@@ -19,6 +19,7 @@ from mydocs.models import (
     StorageModeEnum,
 )
 from mydocs.parsing.storage import get_storage
+from mydocs.retrieval.cache import bump_corpus_generation
 
 log = get_logger(__name__)
 
@@ -79,6 +80,7 @@ async def ingest_files(
     tags = tags or []
     documents = []
     skipped = []
+    saved = 0
 
     # Normalize to list of sources
     sources = [source] if isinstance(source, str) else source
@@ -117,6 +119,7 @@ async def ingest_files(
                 created_at=datetime.now(),
             )
             await doc.asave()
+            saved += 1
             skipped.append({"path": str(file_path), "reason": "unsupported_format"})
             continue
 
@@ -174,9 +177,13 @@ async def ingest_files(
             await storage.write_metadata_sidecar(str(file_path), doc.id, sidecar_data)
 
         await doc.asave()
+        saved += 1
         documents.append(doc)
         log.info(f"Ingested document {doc.id} for file {file_path.name} -> {doc.file_name}")
 
+    if saved:
+        # New documents and statuses change status-filtered search results
+        await bump_corpus_generation()
     log.info(f"Ingestion complete: {len(documents)} ingested, {len(skipped)} skipped")
     return documents, skipped
 
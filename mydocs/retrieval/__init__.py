@@ -1,5 +1,5 @@
 """Retrieval engine for mydocs — search over parsed documents and pages."""
 
-from mydocs.retrieval.search import search
+from mydocs.retrieval.search import search, search_many, search_similar
 
-__all__ = ["search"]
+__all__ = ["search", "search_many", "search_similar"]
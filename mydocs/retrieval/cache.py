@@ -0,0 +1,143 @@
+"""In-process search result cache with write-driven invalidation.
+
+Entries are keyed by a canonical hash of the SearchRequest and stamped with
+the corpus generation, a counter stored in MongoDB and bumped by every write
+that can change search results (page writes in the parser, tag edits and
+document deletes, document status changes). A cached response is only served
+while the generation is unchanged. The generation itself is cached in-process
+for ``generation_ttl_seconds``, so cache hits cost no database round trip;
+writes in this process are visible on the next search, writes in other
+processes within that interval.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from lightodm import get_async_database
+from pymongo import ReturnDocument
+from tinystructlog import get_logger
+
+from mydocs.retrieval.config import SearchCacheConfig
+from mydocs.retrieval.models import SearchRequest, SearchResponse
+
+log = get_logger(__name__)
+
+GENERATION_COLLECTION = "search_generation"
+_GENERATION_ID = "corpus"
+
+# Fields that do not change the results of a request
+_KEY_EXCLUDE = {"use_cache", "debug", "explain"}
+
+# Last generation read or written by this process: (generation, expires_at)
+_generation: Optional[tuple[int, float]] = None
+
+
+def request_cache_key(request: SearchRequest) -> str:
+    """Canonical hash of a search request (field order independent)."""
+    payload = json.dumps(
+        request.model_dump(mode="json", exclude=_KEY_EXCLUDE),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_corpus_generation(max_age_seconds: float = 0.0) -> int:
+    """Return the current corpus generation (0 if never bumped).
+
+    A value read or bumped by this process less than ``max_age_seconds`` ago
+    is returned without querying MongoDB.
+    """
+    global _generation
+    now = time.monotonic()
+    if _generation is not None and now < _generation[1]:
+        return _generation[0]
+    db = get_async_database()
+    doc = await db[GENERATION_COLLECTION].find_one({"_id": _GENERATION_ID})
+    generation = doc["generation"] if doc else 0
+    _generation = (generation, now + max_age_seconds)
+    return generation
+
+
+async def bump_corpus_generation() -> int:
+    """Increment the corpus generation, invalidating all cached search results."""
+    db = get_async_database()
+    doc = await db[GENERATION_COLLECTION].find_one_and_update(
+        {"_id": _GENERATION_ID},
+        {"$inc": {"generation": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    global _generation
+    # Keep the cached value's expiry: it only short-circuits reads, and a
+    # bump must be visible to this process at once.
+    expires_at = _generation[1] if _generation is not None else 0.0
+    _generation = (doc["generation"], expires_at)
+    log.debug(f"corpus generation bumped to {doc['generation']}")
+    return doc["generation"]
+
+
+class SearchResultCache:
+    """LRU cache of SearchResponses with a TTL and generation check."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[int, float, SearchResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, generation: int) -> Optional[SearchResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        entry_generation, expires_at, response = entry
+        if entry_generation != generation or time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response.model_copy(deep=True)
+
+    def put(self, key: str, generation: int, response: SearchResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, response.model_copy(deep=True))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_search_cache: Optional[SearchResultCache] = None
+
+
+def get_search_cache(config: Optional[SearchCacheConfig] = None) -> SearchResultCache:
+    """Return the process-wide search result cache."""
+    global _search_cache
+    config = config or SearchCacheConfig()
+    if _search_cache is None:
+        _search_cache = SearchResultCache(config.max_entries, config.ttl_seconds)
+    else:
+        _search_cache.max_entries = config.max_entries
+        _search_cache.ttl_seconds = config.ttl_seconds
+    return _search_cache
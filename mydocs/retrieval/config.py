@@ -0,0 +1,69 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from mydocs.common.base_config import BaseConfig
+
+
+class LocalVectorIndexConfig(BaseModel):
+    index_type: str = "flat"  # "flat" (exact) or "ivf"
+    similarity: str = "dotProduct"  # "dotProduct" or "cosine"
+    ivf_nlist: int = 256
+    ivf_nprobe: int = 16
+    ivf_min_train_size: int = 10000
+    quantization: Optional[str] = None  # None, "int8" or "binary"
+    rescore_multiplier: int = 4  # quantized scan keeps top_k * multiplier rows for exact rescoring
+
+
+class LocalFulltextIndexConfig(BaseModel):
+    k1: float = 1.2
+    b: float = 0.75
+    max_segments: int = 8  # merge all segments once exceeded
+    page_fields: list[str] = ["content"]
+    document_fields: list[str] = ["content"]
+
+
+class SearchCacheConfig(BaseModel):
+    enabled: bool = True
+    max_entries: int = 1024
+    ttl_seconds: float = 300.0
+    generation_ttl_seconds: float = 1.0  # how long a process reuses the corpus generation it read
+
+
+class BatchSearchConfig(BaseModel):
+    max_requests: int = 1000
+    max_concurrency: int = 8
+    embedding_batch_size: int = 256  # queries per provider embedding call
+
+
+class GroupingConfig(BaseModel):
+    candidate_multiplier: int = 4  # grouped searches rank top_k * group_size * multiplier pages
+    max_candidates: int = 1000
+
+
+class FacetingConfig(BaseModel):
+    candidate_limit: int = 200  # ranked candidates counted when $searchMeta cannot be used
+
+
+class PaginationConfig(BaseModel):
+    max_results: int = 200  # candidates ranked and kept per paginated search
+    ttl_seconds: float = 600.0  # cursor lifetime
+    max_cursors: int = 1000  # least recently used cursors are dropped first
+
+
+class SearchDiagnosticsConfig(BaseModel):
+    slow_query_ms: float = 1000.0  # log a slow-search record above this duration; 0 disables
+
+
+class RetrievalConfig(BaseConfig):
+    config_name: str = "retrieval"
+    vector_backend: str = "atlas"  # "atlas" or "local"
+    local_vector: LocalVectorIndexConfig = LocalVectorIndexConfig()
+    fulltext_backend: str = "atlas"  # "atlas" or "local"
+    local_fulltext: LocalFulltextIndexConfig = LocalFulltextIndexConfig()
+    search_cache: SearchCacheConfig = SearchCacheConfig()
+    batch_search: BatchSearchConfig = BatchSearchConfig()
+    grouping: GroupingConfig = GroupingConfig()
+    faceting: FacetingConfig = FacetingConfig()
+    pagination: PaginationConfig = PaginationConfig()
+    diagnostics: SearchDiagnosticsConfig = SearchDiagnosticsConfig()
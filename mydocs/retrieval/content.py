@@ -0,0 +1,121 @@
+"""Content projection and snippet generation for search results.
+
+Retrievers project only the content fields a request asks for. Snippets
+come from Atlas Search highlights when the full-text stage produced them,
+and otherwise from windows around query-term matches in the stored text.
+"""
+
+import re
+from typing import Optional
+
+from mydocs.retrieval.models import SnippetConfig
+
+CONTENT_FIELDS = ("content", "content_markdown")
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def content_projection(
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
+    highlight: bool = False,
+) -> dict:
+    """$project entries for the content fields of a search result.
+
+    content_fields=None projects every content field. The snippet source
+    field is added when snippets are built by windowing (highlight=False).
+    """
+    fields = CONTENT_FIELDS if content_fields is None else [f for f in CONTENT_FIELDS if f in content_fields]
+    projection = {field: 1 for field in fields}
+    if snippet and snippet.enabled:
+        if highlight:
+            projection["highlights"] = 1
+        elif snippet.field in CONTENT_FIELDS:
+            projection[snippet.field] = 1
+    return projection
+
+
+def use_highlight(snippet: Optional[SnippetConfig], searched_field: str) -> bool:
+    """Atlas can only highlight the field the text operator searched."""
+    return bool(snippet and snippet.enabled and snippet.field == searched_field)
+
+
+def highlight_stage(snippet: SnippetConfig) -> dict:
+    """The `highlight` option of a $search stage."""
+    return {"path": snippet.field, "maxNumPassages": snippet.max_fragments}
+
+
+def format_highlights(highlights: list[dict], snippet: SnippetConfig) -> list[str]:
+    """Render Atlas searchHighlights as marked-up fragments, best first."""
+    ranked = sorted(highlights or [], key=lambda h: h.get("score", 0.0), reverse=True)
+    fragments = []
+    for highlight in ranked[: snippet.max_fragments]:
+        parts = []
+        for text in highlight.get("texts", []):
+            value = text.get("value", "")
+            if text.get("type") == "hit":
+                parts.append(f"{snippet.pre_tag}{value}{snippet.post_tag}")
+            else:
+                parts.append(value)
+        fragments.append("".join(parts).strip())
+    return [fragment for fragment in fragments if fragment]
+
+
+def window_snippets(text: Optional[str], query: str, snippet: SnippetConfig) -> list[str]:
+    """Build up to max_fragments windows of ~fragment_chars around query-term matches.
+
+    Windows with the most matches come first. Without any match, the leading
+    fragment of the text is returned.
+    """
+    if not text:
+        return []
+    terms = {term.lower() for term in _WORD_PATTERN.findall(query)}
+    matches = [m for m in _WORD_PATTERN.finditer(text) if m.group().lower() in terms]
+    half = max(snippet.fragment_chars // 2, 1)
+
+    if not matches:
+        head = text[: snippet.fragment_chars].strip()
+        return [head + ("…" if len(text) > snippet.fragment_chars else "")]
+
+    # Candidate windows centered on each match, scored by the matches they contain
+    windows = []
+    for m in matches:
+        start = max(0, m.start() - half)
+        end = min(len(text), m.end() + half)
+        inside = [x for x in matches if x.start() >= start and x.end() <= end]
+        windows.append((len(inside), -start, start, end))
+    windows.sort(reverse=True)
+
+    chosen: list[tuple[int, int]] = []
+    for _, _, start, end in windows:
+        if any(start < c_end and end > c_start for c_start, c_end in chosen):
+            continue
+        chosen.append((start, end))
+        if len(chosen) >= snippet.max_fragments:
+            break
+
+    fragments = []
+    for start, end in chosen:
+        parts = []
+        cursor = start
+        for m in matches:
+            if m.start() < start or m.end() > end:
+                continue
+            parts.append(text[cursor:m.start()])
+            parts.append(f"{snippet.pre_tag}{m.group()}{snippet.post_tag}")
+            cursor = m.end()
+        parts.append(text[cursor:end])
+        fragment = "".join(parts).strip()
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        fragments.append(f"{prefix}{fragment}{suffix}")
+    return fragments
+
+
+def build_snippets(result: dict, query: str, snippet: SnippetConfig) -> list[str]:
+    """Snippets for a result dict: Atlas highlights if present, else windowing."""
+    if result.get("highlights"):
+        fragments = format_highlights(result["highlights"], snippet)
+        if fragments:
+            return fragments
+    return window_snippets(result.get(snippet.field), query, snippet)
@@ -0,0 +1,94 @@
+"""Server-side state for paginated searches.
+
+A paginated search ranks up to pagination.max_results candidates once and
+keeps the ranked (id, score, scores) list here under a random cursor ID.
+Continuation tokens are opaque encodings of (cursor ID, offset); serving a
+page only hydrates that slice from MongoDB, without re-embedding the query
+or re-running the retrievers. The state lives in process memory, so a token
+is only valid on the process that issued it and until its TTL expires.
+"""
+
+import base64
+import binascii
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from mydocs.retrieval.config import PaginationConfig
+from mydocs.retrieval.models import SearchRequest
+
+
+class SearchCursor(NamedTuple):
+    request: SearchRequest  # the request that started the search
+    hits: list[dict]  # ranked {"id", "score", "scores"} dicts
+    vector_index_used: Optional[str] = None
+    embedding_model_used: Optional[str] = None
+
+
+def encode_cursor(cursor_id: str, offset: int) -> str:
+    payload = json.dumps({"c": cursor_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[str, int]:
+    """Return (cursor_id, offset), raising ValueError for malformed tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        cursor_id, offset = str(payload["c"]), int(payload["o"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+    if offset < 0:
+        raise ValueError("Invalid search cursor")
+    return cursor_id, offset
+
+
+class SearchCursorStore:
+    """LRU store of SearchCursors with a TTL."""
+
+    def __init__(self, max_cursors: int = 1000, ttl_seconds: float = 600.0):
+        self.max_cursors = max_cursors
+        self.ttl_seconds = ttl_seconds
+        self._cursors: OrderedDict[str, tuple[float, SearchCursor]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def put(self, cursor: SearchCursor) -> str:
+        """Store a cursor and return its ID."""
+        cursor_id = secrets.token_urlsafe(12)
+        self._cursors[cursor_id] = (time.monotonic() + self.ttl_seconds, cursor)
+        while len(self._cursors) > self.max_cursors:
+            self._cursors.popitem(last=False)
+        return cursor_id
+
+    def get(self, cursor_id: str) -> Optional[SearchCursor]:
+        entry = self._cursors.get(cursor_id)
+        if entry is None:
+            return None
+        expires_at, cursor = entry
+        if time.monotonic() >= expires_at:
+            del self._cursors[cursor_id]
+            return None
+        self._cursors.move_to_end(cursor_id)
+        return cursor
+
+    def clear(self) -> None:
+        self._cursors.clear()
+
+
+_cursor_store: Optional[SearchCursorStore] = None
+
+
+def get_cursor_store(config: Optional[PaginationConfig] = None) -> SearchCursorStore:
+    """Return the process-wide search cursor store."""
+    global _cursor_store
+    config = config or PaginationConfig()
+    if _cursor_store is None:
+        _cursor_store = SearchCursorStore(config.max_cursors, config.ttl_seconds)
+    else:
+        _cursor_store.max_cursors = config.max_cursors
+        _cursor_store.ttl_seconds = config.ttl_seconds
+    return _cursor_store
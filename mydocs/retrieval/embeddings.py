@@ -1,8 +1,13 @@
-"""Query embedding generation via litellm."""
+"""Query embedding generation via litellm, and Matryoshka short vectors."""
+
+import math
+from typing import Optional
 
 import litellm
 from tinystructlog import get_logger
 
+from mydocs.retrieval.config import LocalVectorIndexConfig
+
 log = get_logger(__name__)
 
 
@@ -14,3 +19,107 @@ async def generate_query_embedding(query: str, model: str) -> list[float]:
         input=[query],
     )
     return response.data[0]["embedding"]
+
+
+async def generate_query_embeddings(
+    queries: list[str],
+    model: str,
+    batch_size: int = 256,
+) -> list[list[float]]:
+    """Generate embeddings for many queries, batch_size inputs per provider call."""
+    vectors: list[list[float]] = []
+    for start in range(0, len(queries), batch_size):
+        chunk = queries[start:start + batch_size]
+        log.debug(f"generating {len(chunk)} query embeddings model={model}")
+        response = await litellm.aembedding(
+            model=model,
+            input=chunk,
+        )
+        vectors.extend(item["embedding"] for item in response.data)
+    return vectors
+
+
+def shorten_embedding(vector: list[float], dimensions: int) -> list[float]:
+    """Truncate an embedding to its first `dimensions` values and L2-renormalize.
+
+    For Matryoshka-trained models (text-embedding-3-*) this matches what the
+    provider returns for the same `dimensions` parameter.
+    """
+    head = vector[:dimensions]
+    norm = math.sqrt(sum(v * v for v in head))
+    if norm == 0:
+        return list(head)
+    return [v / norm for v in head]
+
+
+def average_embeddings(vectors: list[list[float]]) -> list[float]:
+    """Mean of several embeddings, L2-renormalized (a centroid query vector)."""
+    import numpy as np
+
+    mean = np.asarray(vectors, dtype=np.float64).mean(axis=0)
+    norm = np.linalg.norm(mean)
+    if norm > 0:
+        mean /= norm
+    return mean.tolist()
+
+
+async def backfill_short_embeddings(
+    search_target: str,
+    full_field: str,
+    short_field: str,
+    short_dimensions: int,
+    batch_size: int = 500,
+    overwrite: bool = False,
+    local_config: Optional[LocalVectorIndexConfig] = None,
+) -> int:
+    """Populate short vectors from the stored full vectors, without calling the provider.
+
+    When `local_config` is given, the short
+    vectors are also upserted into the local vector index for short_field.
+
+    Returns the number of records updated.
+    """
+    from pymongo import UpdateOne
+
+    from mydocs.models import Document, DocumentPage
+
+    model = Document if search_target == "documents" else DocumentPage
+    collection = await model.get_async_collection()
+    query: dict = {full_field: {"$exists": True}}
+    if not overwrite:
+        query[short_field] = {"$exists": False}
+    cursor = collection.find(query, {"_id": 1, "document_id": 1, full_field: 1})
+
+    local_index = None
+    if local_config is not None:
+        from mydocs.retrieval.local import get_vector_index
+        local_index = get_vector_index(search_target, short_field, local_config)
+
+    total = 0
+    batch: list[tuple[str, str, list[float]]] = []
+
+    async def flush():
+        nonlocal total
+        if not batch:
+            return
+        await collection.bulk_write(
+            [UpdateOne({"_id": rid}, {"$set": {short_field: vec}}) for rid, _, vec in batch],
+            ordered=False,
+        )
+        if local_index is not None:
+            local_index.upsert(
+                [rid for rid, _, _ in batch], [doc_id for _, doc_id, _ in batch], [vec for _, _, vec in batch],
+            )
+        total += len(batch)
+        log.info(f"Backfilled {total} {search_target} with {short_field}")
+        batch.clear()
+
+    async for doc in cursor:
+        vector: Optional[list[float]] = doc.get(full_field)
+        if not vector:
+            continue
+        batch.append((doc["_id"], str(doc.get("document_id", doc["_id"])), shorten_embedding(vector, short_dimensions)))
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    return total
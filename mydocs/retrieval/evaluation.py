@@ -0,0 +1,201 @@
+"""Offline retrieval evaluation and latency benchmarking.
+
+A query set is a JSONL file with one judged query per line:
+
+    {"query": "termination notice period", "relevant": ["page_id_1", "page_id_2"]}
+    {"query": "late fees", "relevant": {"page_id_3": 2, "page_id_4": 1}}
+
+`relevant` lists the relevant result IDs (pages or documents, matching the
+search target), optionally with graded relevance. Each query may also carry
+a `request` object with SearchRequest overrides for that query alone.
+
+run_benchmark() runs the query set through search() once per variant (a set
+of SearchRequest overrides such as {"hybrid": {"rrf_k": 20}}) and reports
+quality (recall@k, nDCG@k, MRR) and latency (p50/p95/p99, throughput).
+"""
+
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from pydantic import BaseModel, field_validator
+from tinystructlog import get_logger
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import SearchRequest
+from mydocs.retrieval.search import search
+
+log = get_logger(__name__)
+
+
+class JudgedQuery(BaseModel):
+    query: str
+    relevant: dict[str, float]  # result id -> relevance grade (> 0)
+    request: dict = {}  # per-query SearchRequest overrides
+
+    @field_validator("relevant", mode="before")
+    @classmethod
+    def _ids_to_grades(cls, value):
+        if isinstance(value, (list, tuple)):
+            return {str(rid): 1.0 for rid in value}
+        return value
+
+
+class BenchmarkReport(BaseModel):
+    variant: str
+    queries: int
+    errors: int = 0
+    k: int
+    recall: float
+    ndcg: float
+    mrr: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    throughput_qps: float
+    concurrency: int
+
+
+def load_query_set(path: str | Path) -> list[JudgedQuery]:
+    """Load a JSONL query set, skipping blank lines."""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                queries.append(JudgedQuery.model_validate(json.loads(line)))
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_number}: invalid judged query: {exc}") from exc
+    return queries
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def recall_at_k(ranked: list[str], relevant: dict[str, float], k: int) -> float:
+    if not relevant:
+        return 0.0
+    hits = sum(1 for rid in ranked[:k] if relevant.get(rid, 0) > 0)
+    return hits / len([grade for grade in relevant.values() if grade > 0])
+
+
+def reciprocal_rank(ranked: list[str], relevant: dict[str, float]) -> float:
+    for position, rid in enumerate(ranked, start=1):
+        if relevant.get(rid, 0) > 0:
+            return 1.0 / position
+    return 0.0
+
+
+def ndcg_at_k(ranked: list[str], relevant: dict[str, float], k: int) -> float:
+    """nDCG@k with exponential gains, (2^grade - 1) / log2(position + 1)."""
+    dcg = sum((2 ** relevant.get(rid, 0) - 1) / math.log2(i + 2) for i, rid in enumerate(ranked[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def latency_percentiles(latencies_ms: list[float]) -> tuple[float, float, float]:
+    if not latencies_ms:
+        return 0.0, 0.0, 0.0
+    p50, p95, p99 = np.percentile(np.asarray(latencies_ms), [50, 95, 99])
+    return float(p50), float(p95), float(p99)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _deep_merge(base: dict, overrides: dict) -> dict:
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def build_request(query: JudgedQuery, base: dict, variant: dict, k: int) -> SearchRequest:
+    """SearchRequest for one query: base, then variant, then per-query overrides."""
+    data = _deep_merge(_deep_merge(base, variant), query.request)
+    data["query"] = query.query
+    data["top_k"] = max(data.get("top_k", k), k)
+    data["use_cache"] = False  # measure the search, not the result cache
+    data.setdefault("include_content_fields", [])
+    return SearchRequest.model_validate(data)
+
+
+async def run_benchmark(
+    queries: list[JudgedQuery],
+    variants: dict[str, dict],
+    base_request: Optional[dict] = None,
+    k: int = 10,
+    concurrency: int = 1,
+    warmup: int = 1,
+    retrieval_config: Optional[RetrievalConfig] = None,
+) -> list[BenchmarkReport]:
+    """Run the query set once per variant and report quality and latency.
+
+    The first `warmup` queries of each variant are run unmeasured (local
+    index loading, connection setup). Queries run at most `concurrency` at a
+    time; throughput is measured queries over wall-clock time. Failed queries
+    count as errors and score 0.
+    """
+    base_request = base_request or {}
+    retrieval_config = retrieval_config or RetrievalConfig()
+    reports = []
+
+    for name, overrides in variants.items():
+        requests = [build_request(q, base_request, overrides, k) for q in queries]
+        for request in requests[:warmup]:
+            try:
+                await search(request, retrieval_config=retrieval_config)
+            except Exception as exc:
+                log.warning(f"bench warmup failed variant={name}: {exc}")
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        latencies: list[Optional[float]] = [None] * len(requests)
+        rankings: list[list[str]] = [[] for _ in requests]
+
+        async def run(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await search(requests[i], retrieval_config=retrieval_config)
+                except Exception as exc:
+                    log.warning(f"bench query failed variant={name} query={requests[i].query!r}: {exc}")
+                    return
+                latencies[i] = (time.perf_counter() - started) * 1000
+                rankings[i] = [result.id for result in response.results]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(i) for i in range(len(requests))))
+        wall = time.perf_counter() - started
+
+        measured = [latency for latency in latencies if latency is not None]
+        p50, p95, p99 = latency_percentiles(measured)
+        n = max(len(queries), 1)
+        reports.append(BenchmarkReport(
+            variant=name,
+            queries=len(queries),
+            errors=len(queries) - len(measured),
+            k=k,
+            recall=sum(recall_at_k(r, q.relevant, k) for r, q in zip(rankings, queries)) / n,
+            ndcg=sum(ndcg_at_k(r, q.relevant, k) for r, q in zip(rankings, queries)) / n,
+            mrr=sum(reciprocal_rank(r[:k], q.relevant) for r, q in zip(rankings, queries)) / n,
+            latency_p50_ms=p50,
+            latency_p95_ms=p95,
+            latency_p99_ms=p99,
+            throughput_qps=len(measured) / wall if wall > 0 else 0.0,
+            concurrency=concurrency,
+        ))
+        log.info(f"bench variant={name} done queries={len(queries)} errors={reports[-1].errors}")
+
+    return reports
@@ -0,0 +1,74 @@
+"""Facet counts for search results.
+
+Full-text document searches on Atlas count facets with $searchMeta over all
+matching documents (see fulltext_retriever.fulltext_facets). Every other
+search counts the distinct documents of its ranked candidate window with a
+single $facet aggregation on the documents collection.
+"""
+
+from mydocs.models import Document
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import FacetBucket, SearchRequest
+from mydocs.retrieval.trace import traced_aggregate
+
+FACET_FIELDS = ("tags", "file_type", "status", "document_type")
+
+
+def validate_facets(facets: list[str]) -> None:
+    unknown = [facet for facet in facets if facet not in FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {unknown}. Available: {list(FACET_FIELDS)}")
+
+
+def use_search_meta(request: SearchRequest, retrieval_config: RetrievalConfig) -> bool:
+    """Whether the facets can be counted with Atlas $searchMeta.
+
+    file_type and document_ids filters are applied after $search, so
+    $searchMeta could not honor them.
+    """
+    return (
+        request.search_target == "documents"
+        and request.search_mode == "fulltext"
+        and retrieval_config.fulltext_backend == "atlas"
+        and not request.filters.file_type
+        and not request.filters.document_ids
+    )
+
+
+def _facet_pipeline(field: str, size: int) -> list[dict]:
+    stages: list[dict] = [{"$unwind": f"${field}"}] if field == "tags" else []
+    stages += [
+        {"$match": {field: {"$ne": None}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": size},
+    ]
+    return stages
+
+
+async def facet_candidates(document_ids: list[str], facets: list[str], size: int) -> dict[str, list[FacetBucket]]:
+    """Count distinct candidate documents per facet value."""
+    if not document_ids:
+        return {facet: [] for facet in facets}
+
+    raw = await traced_aggregate(Document, [
+        {"$match": {"_id": {"$in": list(dict.fromkeys(document_ids))}}},
+        {"$facet": {facet: _facet_pipeline(facet, size) for facet in facets}},
+    ], "facets")
+    counts = raw[0] if raw else {}
+    return {
+        facet: [FacetBucket(value=str(bucket["_id"]), count=bucket["count"]) for bucket in counts.get(facet, [])]
+        for facet in facets
+    }
+
+
+def parse_search_meta(raw: list[dict], facets: list[str]) -> dict[str, list[FacetBucket]]:
+    """Convert $searchMeta facet output to FacetBuckets."""
+    meta = raw[0].get("facet", {}) if raw else {}
+    return {
+        facet: [
+            FacetBucket(value=str(bucket["_id"]), count=bucket["count"])
+            for bucket in meta.get(facet, {}).get("buckets", [])
+        ]
+        for facet in facets
+    }
@@ -1,9 +1,15 @@
-"""Full-text search via MongoDB Atlas Search $search stage."""
+"""Full-text search via MongoDB Atlas Search $search stage or the local BM25 index."""
+
+from typing import Optional
 
 from tinystructlog import get_logger
 
 from mydocs.models import Document, DocumentPage
-from mydocs.retrieval.models import FullTextSearchConfig, SearchFilters
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.content import content_projection, highlight_stage, use_highlight
+from mydocs.retrieval.facets import parse_search_meta
+from mydocs.retrieval.models import FacetBucket, FullTextSearchConfig, SearchFilters, SnippetConfig
+from mydocs.retrieval.trace import traced_aggregate
 
 log = get_logger(__name__)
 
@@ -31,21 +37,44 @@ async def fulltext_search(
     fulltext_config: FullTextSearchConfig,
     filters: SearchFilters,
     top_k: int,
+    retrieval_config: Optional[RetrievalConfig] = None,
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
 ) -> list[dict]:
-    """Execute Atlas Search $search and return normalized result dicts."""
+    """Execute full-text search on the configured backend and return normalized result dicts.
+
+    Only content_fields are projected (all content fields when None). With
+    snippets enabled, Atlas highlights are requested for the searched field
+    and returned under "highlights"; otherwise the snippet source field is
+    projected for windowing.
+    """
+    retrieval_config = retrieval_config or RetrievalConfig()
+    if retrieval_config.fulltext_backend == "local":
+        return await _search_local(
+            query, search_target, fulltext_config, filters, top_k, retrieval_config, content_fields, snippet,
+        )
     if search_target == "documents":
-        return await _search_documents(query, fulltext_config, filters, top_k)
+        return await _search_documents(query, fulltext_config, filters, top_k, content_fields, snippet)
     else:
-        return await _search_pages(query, fulltext_config, filters, top_k)
+        return await _search_pages(query, fulltext_config, filters, top_k, content_fields, snippet)
 
 
-async def _search_documents(
-    query: str,
-    config: FullTextSearchConfig,
-    filters: SearchFilters,
-    top_k: int,
-) -> list[dict]:
-    """Full-text search on the documents collection using ft_documents index."""
+def _search_stage(index: str, compound: dict, config: FullTextSearchConfig, snippet: Optional[SnippetConfig]) -> dict:
+    stage = {"index": index, "compound": compound}
+    if use_highlight(snippet, config.content_field):
+        stage["highlight"] = highlight_stage(snippet)
+    return {"$search": stage}
+
+
+def _score_fields(config: FullTextSearchConfig, snippet: Optional[SnippetConfig]) -> dict:
+    fields = {"score": {"$meta": "searchScore"}}
+    if use_highlight(snippet, config.content_field):
+        fields["highlights"] = {"$meta": "searchHighlights"}
+    return {"$addFields": fields}
+
+
+def _documents_compound(query: str, config: FullTextSearchConfig, filters: SearchFilters) -> dict:
+    """Compound operator for ft_documents: the text query plus keyword-indexed filters."""
     fuzzy_opts = _build_fuzzy_opts(config)
     text_op = _build_text_operator(query, config.content_field, fuzzy_opts)
 
@@ -60,10 +89,52 @@ async def _search_documents(
         filter_clauses.append({"text": {"query": filters.document_type, "path": "document_type"}})
     if filter_clauses:
         compound["filter"] = filter_clauses
+    return compound
+
+
+async def fulltext_facets(
+    query: str,
+    fulltext_config: FullTextSearchConfig,
+    filters: SearchFilters,
+    facets: list[str],
+    facet_size: int,
+) -> dict[str, list[FacetBucket]]:
+    """Count facets over all documents matching the query with $searchMeta.
+
+    Requires the stringFacet mappings of ft_documents (migration 006).
+    """
+    pipeline = [{
+        "$searchMeta": {
+            "index": "ft_documents",
+            "facet": {
+                "operator": {"compound": _documents_compound(query, fulltext_config, filters)},
+                "facets": {
+                    facet: {"type": "string", "path": facet, "numBuckets": facet_size}
+                    for facet in facets
+                },
+            },
+        }
+    }]
+
+    log.debug(f"fulltext facets pipeline: {pipeline}")
+    raw = await traced_aggregate(Document, pipeline, "fulltext.facets")
+    return parse_search_meta(raw, facets)
+
+
+async def _search_documents(
+    query: str,
+    config: FullTextSearchConfig,
+    filters: SearchFilters,
+    top_k: int,
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
+) -> list[dict]:
+    """Full-text search on the documents collection using ft_documents index."""
+    compound = _documents_compound(query, config, filters)
 
     pipeline: list[dict] = [
-        {"$search": {"index": "ft_documents", "compound": compound}},
-        {"$addFields": {"score": {"$meta": "searchScore"}}},
+        _search_stage("ft_documents", compound, config, snippet),
+        _score_fields(config, snippet),
     ]
 
     # Post-search $match for fields not in the search index
@@ -78,13 +149,13 @@ async def _search_documents(
     pipeline.append({"$limit": top_k})
     pipeline.append({
         "$project": {
-            "_id": 1, "score": 1, "content": 1, "content_markdown": 1,
-            "file_name": 1, "tags": 1,
+            "_id": 1, "score": 1, "file_name": 1, "tags": 1,
+            **content_projection(content_fields, snippet, use_highlight(snippet, config.content_field)),
         }
     })
 
     log.debug(f"fulltext documents pipeline: {pipeline}")
-    raw = await Document.aaggregate(pipeline)
+    raw = await traced_aggregate(Document, pipeline, "fulltext.documents")
 
     results = []
     for doc in raw:
@@ -97,6 +168,7 @@ async def _search_documents(
             "content_markdown": doc.get("content_markdown"),
             "file_name": doc.get("file_name"),
             "tags": doc.get("tags", []),
+            "highlights": doc.get("highlights"),
         })
     return results
 
@@ -106,6 +178,8 @@ async def _search_pages(
     config: FullTextSearchConfig,
     filters: SearchFilters,
     top_k: int,
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
 ) -> list[dict]:
     """Full-text search on the pages collection using ft_pages index."""
     fuzzy_opts = _build_fuzzy_opts(config)
@@ -120,8 +194,8 @@ async def _search_pages(
         compound["filter"] = filter_clauses
 
     pipeline: list[dict] = [
-        {"$search": {"index": "ft_pages", "compound": compound}},
-        {"$addFields": {"score": {"$meta": "searchScore"}}},
+        _search_stage("ft_pages", compound, config, snippet),
+        _score_fields(config, snippet),
         {"$limit": top_k},
         # Lookup to documents for enrichment and doc-level filtering
         {
@@ -151,13 +225,13 @@ async def _search_pages(
     pipeline.append({
         "$project": {
             "_id": 1, "document_id": 1, "page_number": 1, "score": 1,
-            "content": 1, "content_markdown": 1,
             "file_name": "$_doc.file_name", "tags": "$_doc.tags",
+            **content_projection(content_fields, snippet, use_highlight(snippet, config.content_field)),
         }
     })
 
     log.debug(f"fulltext pages pipeline: {pipeline}")
-    raw = await DocumentPage.aaggregate(pipeline)
+    raw = await traced_aggregate(DocumentPage, pipeline, "fulltext.pages")
 
     results = []
     for doc in raw:
@@ -170,5 +244,33 @@ async def _search_pages(
             "content_markdown": doc.get("content_markdown"),
             "file_name": doc.get("file_name"),
             "tags": doc.get("tags", []),
+            "highlights": doc.get("highlights"),
         })
     return results
+
+
+async def _search_local(
+    query: str,
+    search_target: str,
+    config: FullTextSearchConfig,
+    filters: SearchFilters,
+    top_k: int,
+    retrieval_config: RetrievalConfig,
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
+) -> list[dict]:
+    """BM25 search on the embedded local full-text index, hydrated from MongoDB."""
+    from mydocs.retrieval.local import get_fulltext_index
+    from mydocs.retrieval.local.documents import hydrate_results, resolve_document_filter
+
+    allowed_document_ids = await resolve_document_filter(filters)
+    if allowed_document_ids is not None and not allowed_document_ids:
+        return []
+
+    index = get_fulltext_index(search_target, config.content_field, retrieval_config.local_fulltext)
+    hits = index.search(query, top_k, document_ids=allowed_document_ids, fuzzy=config.fuzzy)
+    log.debug(f"local fulltext search returned {len(hits)} hits from {index.path}")
+
+    return await hydrate_results(
+        search_target, [(hit_id, score) for hit_id, _, score in hits], content_projection(content_fields, snippet),
+    )
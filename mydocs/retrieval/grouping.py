@@ -0,0 +1,74 @@
+"""Document-level collapsing of page search results.
+
+Page hits are ranked first (after hybrid fusion), then collapsed so that
+each document contributes at most group_size pages. The metadata of all
+returned documents is loaded with a single query.
+"""
+
+from mydocs.models import Document
+from mydocs.retrieval.models import SearchResultGroup
+from mydocs.retrieval.trace import traced_aggregate
+
+
+def collapse_by_document(results: list[dict], max_groups: int, group_size: int) -> tuple[list[dict], list[dict]]:
+    """Collapse ranked page results per document.
+
+    Returns the kept pages in group order (groups by best page score, pages
+    best first) and one {"document_id", "score", "hits", "page_ids"} dict
+    per group.
+    """
+    groups: dict[str, dict] = {}
+    for result in results:
+        document_id = result["document_id"]
+        group = groups.get(document_id)
+        if group is None:
+            if len(groups) >= max_groups:
+                # Later pages of already-open groups still count as hits
+                continue
+            group = groups[document_id] = {
+                "document_id": document_id, "score": result["score"], "hits": 0, "pages": [],
+            }
+        group["hits"] += 1
+        if len(group["pages"]) < group_size:
+            group["pages"].append(result)
+
+    kept = []
+    summaries = []
+    for group in groups.values():
+        kept.extend(group["pages"])
+        summaries.append({
+            "document_id": group["document_id"],
+            "score": group["score"],
+            "hits": group["hits"],
+            "page_ids": [page["id"] for page in group["pages"]],
+        })
+    return kept, summaries
+
+
+async def load_groups(summaries: list[dict]) -> list[SearchResultGroup]:
+    """Attach document metadata to group summaries with one query."""
+    if not summaries:
+        return []
+
+    raw = await traced_aggregate(Document, [
+        {"$match": {"_id": {"$in": [group["document_id"] for group in summaries]}}},
+        {"$project": {
+            "_id": 1, "original_file_name": 1, "file_type": 1, "status": 1,
+            "document_type": 1, "tags": 1, "page_count": "$file_metadata.page_count",
+        }},
+    ], "groups")
+    by_id = {str(doc["_id"]): doc for doc in raw}
+
+    groups = []
+    for summary in summaries:
+        doc = by_id.get(summary["document_id"], {})
+        groups.append(SearchResultGroup(
+            **summary,
+            file_name=doc.get("original_file_name"),
+            file_type=doc.get("file_type"),
+            status=doc.get("status"),
+            document_type=doc.get("document_type"),
+            tags=doc.get("tags", []),
+            page_count=doc.get("page_count"),
+        ))
+    return groups
@@ -1,5 +1,15 @@
-"""Hybrid result combination: RRF and weighted sum."""
+"""Hybrid result combination: RRF, weighted sum, z-score and convex fusion.
 
+Both result lists are laid out once as dense NumPy arrays over the union of
+their ids; every fusion method is then a handful of array operations, so the
+cost stays flat as the candidate windows grow. Ties on the fused score are
+broken by the best rank in either list, then by first appearance (full-text
+results before vector results).
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
 from tinystructlog import get_logger
 
 from mydocs.retrieval.models import HybridSearchConfig
@@ -7,37 +17,117 @@ from mydocs.retrieval.models import HybridSearchConfig
 log = get_logger(__name__)
 
 
+class _Branch(NamedTuple):
+    rows: np.ndarray  # row of each result in the candidate union
+    ranks: np.ndarray  # 0-based rank within the branch
+    scores: np.ndarray  # raw retriever score
+
+
+class _Candidates(NamedTuple):
+    results: list[dict]  # first-seen result dict per id
+    fulltext: _Branch
+    vector: _Branch
+
+
+def _collect(ft_results: list[dict], vec_results: list[dict]) -> _Candidates:
+    """Map both lists onto the union of their ids (first occurrence wins)."""
+    rows_by_id: dict[str, int] = {}
+    results: list[dict] = []
+
+    def _branch(branch_results: list[dict]) -> _Branch:
+        rows, ranks, scores = [], [], []
+        seen = set()
+        for rank, result in enumerate(branch_results):
+            rid = result["id"]
+            if rid in seen:
+                continue
+            seen.add(rid)
+            row = rows_by_id.get(rid)
+            if row is None:
+                row = rows_by_id[rid] = len(results)
+                results.append(result)
+            rows.append(row)
+            ranks.append(rank)
+            scores.append(result.get("score", 0.0))
+        return _Branch(
+            np.asarray(rows, dtype=np.intp),
+            np.asarray(ranks, dtype=np.float64),
+            np.asarray(scores, dtype=np.float64),
+        )
+
+    fulltext = _branch(ft_results)
+    vector = _branch(vec_results)
+    return _Candidates(results, fulltext, vector)
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    if scores.size == 0:
+        return scores
+    spread = scores.max() - scores.min()
+    if spread == 0:
+        return np.ones_like(scores)
+    return (scores - scores.min()) / spread
+
+
+def _z_score(scores: np.ndarray) -> np.ndarray:
+    if scores.size == 0:
+        return scores
+    std = scores.std()
+    if std == 0:
+        return np.zeros_like(scores)
+    return (scores - scores.mean()) / std
+
+
+def _scatter(n: int, branch: _Branch, values: np.ndarray, fill: float = 0.0) -> np.ndarray:
+    dense = np.full(n, fill, dtype=np.float64)
+    dense[branch.rows] = values
+    return dense
+
+
+def _rank_results(
+    candidates: _Candidates,
+    fused: np.ndarray,
+    ft_scores: np.ndarray,
+    vec_scores: np.ndarray,
+    top_k: Optional[int],
+) -> list[dict]:
+    """Order by fused score with stable tie-breaking and build the result dicts."""
+    n = len(candidates.results)
+    best_rank = np.full(n, np.inf)
+    for branch in (candidates.fulltext, candidates.vector):
+        best_rank[branch.rows] = np.minimum(best_rank[branch.rows], branch.ranks)
+    # lexsort sorts by the last key first
+    order = np.lexsort((np.arange(n), best_rank, -fused))
+    if top_k is not None:
+        order = order[:top_k]
+
+    combined = []
+    for row in order.tolist():
+        result = dict(candidates.results[row])
+        result["score"] = float(fused[row])
+        result["scores"] = {"fulltext": float(ft_scores[row]), "vector": float(vec_scores[row])}
+        combined.append(result)
+    return combined
+
+
 def combine_results_rrf(
     ft_results: list[dict],
     vec_results: list[dict],
     rrf_k: int = 60,
     ft_boost: float = 1.0,
     vec_boost: float = 1.0,
+    top_k: Optional[int] = None,
 ) -> list[dict]:
     """Combine results using Reciprocal Rank Fusion.
 
     score = sum(boost / (rrf_k + rank + 1)) across methods.
     """
-    merged: dict[str, dict] = {}
-
-    for rank, result in enumerate(ft_results):
-        rid = result["id"]
-        if rid not in merged:
-            merged[rid] = {**result, "score": 0.0, "scores": {"fulltext": result.get("score", 0.0), "vector": 0.0}}
-        rrf_score = ft_boost / (rrf_k + rank + 1)
-        merged[rid]["score"] += rrf_score
-
-    for rank, result in enumerate(vec_results):
-        rid = result["id"]
-        if rid not in merged:
-            merged[rid] = {**result, "score": 0.0, "scores": {"fulltext": 0.0, "vector": result.get("score", 0.0)}}
-        else:
-            merged[rid]["scores"]["vector"] = result.get("score", 0.0)
-        rrf_score = vec_boost / (rrf_k + rank + 1)
-        merged[rid]["score"] += rrf_score
+    candidates = _collect(ft_results, vec_results)
+    n = len(candidates.results)
+    ft, vec = candidates.fulltext, candidates.vector
 
-    results = sorted(merged.values(), key=lambda r: r["score"], reverse=True)
-    return results
+    fused = _scatter(n, ft, ft_boost / (rrf_k + ft.ranks + 1)) + _scatter(n, vec, vec_boost / (rrf_k + vec.ranks + 1))
+    return _rank_results(candidates, fused, _scatter(n, ft, ft.scores), _scatter(n, vec, vec.scores), top_k)
 
 
 def combine_results_weighted_sum(
@@ -46,52 +136,76 @@ def combine_results_weighted_sum(
     weights: dict,
     ft_boost: float = 1.0,
     vec_boost: float = 1.0,
+    top_k: Optional[int] = None,
 ) -> list[dict]:
     """Combine results using weighted sum with min-max normalization."""
     w_ft = weights.get("fulltext", 0.5)
     w_vec = weights.get("vector", 0.5)
+    candidates = _collect(ft_results, vec_results)
+    n = len(candidates.results)
+    ft, vec = candidates.fulltext, candidates.vector
 
-    def _normalize(results: list[dict]) -> list[dict]:
-        if not results:
-            return results
-        scores = [r["score"] for r in results]
-        min_s, max_s = min(scores), max(scores)
-        spread = max_s - min_s
-        if spread == 0:
-            for r in results:
-                r["score"] = 1.0
-        else:
-            for r in results:
-                r["score"] = (r["score"] - min_s) / spread
-        return results
-
-    ft_normed = _normalize([{**r} for r in ft_results])
-    vec_normed = _normalize([{**r} for r in vec_results])
-
-    merged: dict[str, dict] = {}
-
-    for result in ft_normed:
-        rid = result["id"]
-        merged[rid] = {
-            **result,
-            "score": w_ft * ft_boost * result["score"],
-            "scores": {"fulltext": result["score"], "vector": 0.0},
-        }
-
-    for result in vec_normed:
-        rid = result["id"]
-        if rid in merged:
-            merged[rid]["score"] += w_vec * vec_boost * result["score"]
-            merged[rid]["scores"]["vector"] = result["score"]
-        else:
-            merged[rid] = {
-                **result,
-                "score": w_vec * vec_boost * result["score"],
-                "scores": {"fulltext": 0.0, "vector": result["score"]},
-            }
-
-    results = sorted(merged.values(), key=lambda r: r["score"], reverse=True)
-    return results
+    ft_norm = _scatter(n, ft, _min_max(ft.scores))
+    vec_norm = _scatter(n, vec, _min_max(vec.scores))
+    fused = w_ft * ft_boost * ft_norm + w_vec * vec_boost * vec_norm
+    return _rank_results(candidates, fused, ft_norm, vec_norm, top_k)
+
+
+def combine_results_zscore(
+    ft_results: list[dict],
+    vec_results: list[dict],
+    weights: dict,
+    ft_boost: float = 1.0,
+    vec_boost: float = 1.0,
+    top_k: Optional[int] = None,
+) -> list[dict]:
+    """Combine results using a weighted sum of per-list z-scores.
+
+    A result missing from one list gets that list's lowest z-score, i.e. it
+    counts as ranking below every candidate the list returned.
+    """
+    w_ft = weights.get("fulltext", 0.5)
+    w_vec = weights.get("vector", 0.5)
+    candidates = _collect(ft_results, vec_results)
+    n = len(candidates.results)
+    ft, vec = candidates.fulltext, candidates.vector
+
+    ft_z = _z_score(ft.scores)
+    vec_z = _z_score(vec.scores)
+    ft_dense = _scatter(n, ft, ft_z, fill=ft_z.min() if ft_z.size else 0.0)
+    vec_dense = _scatter(n, vec, vec_z, fill=vec_z.min() if vec_z.size else 0.0)
+    fused = w_ft * ft_boost * ft_dense + w_vec * vec_boost * vec_dense
+    return _rank_results(candidates, fused, _scatter(n, ft, ft_z), _scatter(n, vec, vec_z), top_k)
+
+
+def combine_results_convex(
+    ft_results: list[dict],
+    vec_results: list[dict],
+    weights: dict,
+    ft_boost: float = 1.0,
+    vec_boost: float = 1.0,
+    top_k: Optional[int] = None,
+) -> list[dict]:
+    """Combine results using a convex combination of theoretically normalized scores.
+
+    score = alpha * ft / max(ft) + (1 - alpha) * vec, where
+    alpha = w_ft / (w_ft + w_vec). Full-text (BM25) scores are bounded below by
+    0 and vector scores are already in [0, 1], so unlike min-max the
+    normalization does not depend on the weakest candidate in the window.
+    Weights tuned offline on labelled queries can be passed as-is.
+    """
+    w_ft = max(weights.get("fulltext", 0.5), 0.0)
+    w_vec = max(weights.get("vector", 0.5), 0.0)
+    alpha = w_ft / (w_ft + w_vec) if (w_ft + w_vec) > 0 else 0.5
+    candidates = _collect(ft_results, vec_results)
+    n = len(candidates.results)
+    ft, vec = candidates.fulltext, candidates.vector
+
+    ft_max = ft.scores.max() if ft.scores.size else 0.0
+    ft_norm = _scatter(n, ft, ft.scores / ft_max if ft_max > 0 else np.zeros_like(ft.scores))
+    vec_norm = _scatter(n, vec, np.clip(vec.scores, 0.0, 1.0))
+    fused = alpha * ft_boost * ft_norm + (1 - alpha) * vec_boost * vec_norm
+    return _rank_results(candidates, fused, ft_norm, vec_norm, top_k)
 
 
 def combine_results(
@@ -100,6 +214,7 @@ def combine_results(
     hybrid_config: HybridSearchConfig,
     ft_boost: float = 1.0,
     vec_boost: float = 1.0,
+    top_k: Optional[int] = None,
 ) -> list[dict]:
     """Route to the appropriate combination method."""
     if hybrid_config.combination_method == "rrf":
@@ -108,6 +223,7 @@ def combine_results(
             rrf_k=hybrid_config.rrf_k,
             ft_boost=ft_boost,
             vec_boost=vec_boost,
+            top_k=top_k,
         )
     elif hybrid_config.combination_method == "weighted_sum":
         return combine_results_weighted_sum(
@@ -115,6 +231,23 @@ def combine_results(
             weights=hybrid_config.weights,
             ft_boost=ft_boost,
             vec_boost=vec_boost,
+            top_k=top_k,
+        )
+    elif hybrid_config.combination_method == "zscore":
+        return combine_results_zscore(
+            ft_results, vec_results,
+            weights=hybrid_config.weights,
+            ft_boost=ft_boost,
+            vec_boost=vec_boost,
+            top_k=top_k,
+        )
+    elif hybrid_config.combination_method == "convex":
+        return combine_results_convex(
+            ft_results, vec_results,
+            weights=hybrid_config.weights,
+            ft_boost=ft_boost,
+            vec_boost=vec_boost,
+            top_k=top_k,
         )
     else:
         raise ValueError(f"Unknown combination method: {hybrid_config.combination_method}")
@@ -0,0 +1,165 @@
+"""Embedded (in-process) search backends persisted under DATA_FOLDER.
+
+Index instances are cached per process so the memory-mapped data is
+shared across concurrent requests.
+
+Uses lazy imports so numpy and the index modules are only loaded when a
+local backend is selected.
+"""
+
+import os
+
+import mydocs.config as C
+from mydocs.retrieval.config import LocalFulltextIndexConfig, LocalVectorIndexConfig, RetrievalConfig
+
+_vector_indexes: dict[tuple[str, str], "LocalVectorIndex"] = {}
+_fulltext_indexes: dict[tuple[str, str], "LocalFulltextIndex"] = {}
+
+
+def get_vector_index_root() -> str:
+    return os.path.join(C.DATA_FOLDER, "indexes", "vector")
+
+
+def get_vector_index(
+    search_target: str,
+    vector_field: str,
+    config: LocalVectorIndexConfig | None = None,
+) -> "LocalVectorIndex":
+    """Return the process-wide local vector index for (search_target, vector_field)."""
+    from mydocs.retrieval.local.vector_index import LocalVectorIndex
+
+    key = (search_target, vector_field)
+    if key not in _vector_indexes:
+        path = os.path.join(get_vector_index_root(), f"{search_target}.{vector_field}")
+        _vector_indexes[key] = LocalVectorIndex(path, config)
+    return _vector_indexes[key]
+
+
+def get_fulltext_index_root() -> str:
+    return os.path.join(C.DATA_FOLDER, "indexes", "fulltext")
+
+
+def get_fulltext_index(
+    search_target: str,
+    field: str,
+    config: LocalFulltextIndexConfig | None = None,
+) -> "LocalFulltextIndex":
+    """Return the process-wide local full-text index for (search_target, field)."""
+    from mydocs.retrieval.local.fulltext_index import LocalFulltextIndex
+
+    key = (search_target, field)
+    if key not in _fulltext_indexes:
+        path = os.path.join(get_fulltext_index_root(), f"{search_target}.{field}")
+        _fulltext_indexes[key] = LocalFulltextIndex(path, config)
+    return _fulltext_indexes[key]
+
+
+def _index_names(root: str) -> list[tuple[str, str]]:
+    if not os.path.isdir(root):
+        return []
+    names = []
+    for name in sorted(os.listdir(root)):
+        search_target, _, field = name.partition(".")
+        if field:
+            names.append((search_target, field))
+    return names
+
+
+def delete_document_from_local_indexes(
+    document_id: str,
+    retrieval_config: RetrievalConfig | None = None,
+) -> None:
+    """Remove a document's rows from every local vector and full-text index on disk.
+
+    No-op unless a local vector or full-text backend is selected.
+    """
+    retrieval_config = retrieval_config or RetrievalConfig()
+    if "local" not in (retrieval_config.vector_backend, retrieval_config.fulltext_backend):
+        return
+    for search_target, vector_field in _index_names(get_vector_index_root()):
+        get_vector_index(
+            search_target, vector_field, retrieval_config.local_vector,
+        ).delete_documents([document_id])
+    for search_target, field in _index_names(get_fulltext_index_root()):
+        get_fulltext_index(
+            search_target, field, retrieval_config.local_fulltext,
+        ).delete_documents([document_id])
+
+
+async def rebuild_vector_index(
+    search_target: str,
+    vector_field: str,
+    config: LocalVectorIndexConfig | None = None,
+    batch_size: int = 5000,
+) -> int:
+    """Rebuild a local vector index from the embeddings stored in MongoDB.
+
+    Returns the number of vectors loaded.
+    """
+    from mydocs.models import Document, DocumentPage
+
+    index = get_vector_index(search_target, vector_field, config)
+    index.clear()
+
+    model = Document if search_target == "documents" else DocumentPage
+    collection = await model.get_async_collection()
+    cursor = collection.find(
+        {vector_field: {"$exists": True}},
+        {"_id": 1, "document_id": 1, vector_field: 1},
+    )
+
+    total = 0
+    ids, document_ids, vectors = [], [], []
+    async for doc in cursor:
+        ids.append(str(doc["_id"]))
+        document_ids.append(str(doc.get("document_id", doc["_id"])))
+        vectors.append(doc[vector_field])
+        if len(ids) >= batch_size:
+            index.upsert(ids, document_ids, vectors)
+            total += len(ids)
+            ids, document_ids, vectors = [], [], []
+    if ids:
+        index.upsert(ids, document_ids, vectors)
+        total += len(ids)
+
+    if index.config.index_type == "ivf" and total:
+        index.train_ivf()
+    return total
+
+
+async def rebuild_fulltext_index(
+    search_target: str,
+    field: str,
+    config: LocalFulltextIndexConfig | None = None,
+    batch_size: int = 5000,
+) -> int:
+    """Rebuild a local full-text index from the text stored in MongoDB.
+
+    Returns the number of rows indexed.
+    """
+    from mydocs.models import Document, DocumentPage
+
+    index = get_fulltext_index(search_target, field, config)
+    index.clear()
+
+    model = Document if search_target == "documents" else DocumentPage
+    collection = await model.get_async_collection()
+    cursor = collection.find(
+        {field: {"$exists": True}},
+        {"_id": 1, "document_id": 1, field: 1},
+    )
+
+    total = 0
+    ids, document_ids, texts = [], [], []
+    async for doc in cursor:
+        ids.append(str(doc["_id"]))
+        document_ids.append(str(doc.get("document_id", doc["_id"])))
+        texts.append(doc.get(field) or "")
+        if len(ids) >= batch_size:
+            index.add(ids, document_ids, texts)
+            total += len(ids)
+            ids, document_ids, texts = [], [], []
+    if ids:
+        index.add(ids, document_ids, texts)
+        total += len(ids)
+    return total
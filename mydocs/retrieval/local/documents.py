@@ -0,0 +1,120 @@
+"""Filter resolution and result hydration for the local search backends.
+
+Local indexes only know (id, document_id). Document-level filters are
+resolved to a document ID allowlist before searching, and hits are
+hydrated from MongoDB afterwards into the same result dicts the Atlas
+retrievers return.
+"""
+
+from typing import Optional
+
+from tinystructlog import get_logger
+
+from mydocs.models import Document, DocumentPage
+from mydocs.retrieval.models import SearchFilters
+from mydocs.retrieval.trace import traced_aggregate
+
+log = get_logger(__name__)
+
+
+async def resolve_document_filter(filters: SearchFilters) -> Optional[list[str]]:
+    """Resolve filters to the list of allowed document IDs.
+
+    Returns None when no filter restricts the document set.
+    """
+    doc_match: dict = {}
+    if filters.tags:
+        doc_match["tags"] = {"$all": filters.tags}
+    if filters.file_type:
+        doc_match["file_type"] = filters.file_type
+    if filters.status:
+        doc_match["status"] = filters.status
+    if filters.document_type:
+        doc_match["document_type"] = filters.document_type
+
+    if not doc_match:
+        return list(filters.document_ids) if filters.document_ids else None
+
+    if filters.document_ids:
+        doc_match["_id"] = {"$in": filters.document_ids}
+
+    raw = await traced_aggregate(Document, [{"$match": doc_match}, {"$project": {"_id": 1}}], "filter.documents")
+    return [str(doc["_id"]) for doc in raw]
+
+
+async def hydrate_results(
+    search_target: str,
+    hits: list[tuple[str, float]],
+    content_projection: Optional[dict] = None,
+) -> list[dict]:
+    """Load result dicts for (id, score) hits, preserving hit order.
+
+    content_projection limits the content fields loaded (all when None).
+    """
+    if not hits:
+        return []
+
+    ids = [hit_id for hit_id, _ in hits]
+    scores = dict(hits)
+    if content_projection is None:
+        content_projection = {"content": 1, "content_markdown": 1}
+
+    if search_target == "documents":
+        raw = await traced_aggregate(Document, [
+            {"$match": {"_id": {"$in": ids}}},
+            {"$project": {
+                "_id": 1, "file_name": 1, "tags": 1, **content_projection,
+            }},
+        ], "hydrate.documents")
+        by_id = {
+            str(doc["_id"]): {
+                "id": str(doc["_id"]),
+                "document_id": str(doc["_id"]),
+                "page_number": None,
+                "content": doc.get("content"),
+                "content_markdown": doc.get("content_markdown"),
+                "file_name": doc.get("file_name"),
+                "tags": doc.get("tags", []),
+            }
+            for doc in raw
+        }
+    else:
+        raw = await traced_aggregate(DocumentPage, [
+            {"$match": {"_id": {"$in": ids}}},
+            {
+                "$lookup": {
+                    "from": "documents",
+                    "localField": "document_id",
+                    "foreignField": "_id",
+                    "as": "_doc",
+                }
+            },
+            {"$unwind": {"path": "$_doc", "preserveNullAndEmptyArrays": True}},
+            {"$project": {
+                "_id": 1, "document_id": 1, "page_number": 1,
+                "file_name": "$_doc.file_name", "tags": "$_doc.tags",
+                **content_projection,
+            }},
+        ], "hydrate.pages")
+        by_id = {
+            str(doc["_id"]): {
+                "id": str(doc["_id"]),
+                "document_id": str(doc.get("document_id", "")),
+                "page_number": doc.get("page_number"),
+                "content": doc.get("content"),
+                "content_markdown": doc.get("content_markdown"),
+                "file_name": doc.get("file_name"),
+                "tags": doc.get("tags", []),
+            }
+            for doc in raw
+        }
+
+    results = []
+    for hit_id in ids:
+        result = by_id.get(hit_id)
+        if result is None:
+            log.debug(f"local index hit {hit_id} not found in {search_target}; index is stale")
+            continue
+        result["score"] = scores[hit_id]
+        results.append(result)
+    return results
@@ -0,0 +1,422 @@
+"""In-process BM25 full-text index with compressed on-disk postings.
+
+The index is a list of immutable segments (one per add() call), merged
+once there are more than `max_segments` of them. On-disk layout per
+(search_target, field) directory:
+  meta.json         segment sequence numbers and delete tombstones
+  seg_NNNNNN.json   segment header: row ids, document ids, lengths, term dictionary
+  seg_NNNNNN.bin    postings: per term, varint-encoded (docnum delta, tf) pairs
+
+A row added again in a newer segment shadows its older postings; deletes
+are tombstones applied to all segments up to the delete's sequence number.
+Writes save the new segment (if any) and then meta.json; the writer updates
+its in-memory state directly and only readers reload.
+"""
+
+import bisect
+import json
+import math
+import os
+import re
+import shutil
+from collections import Counter
+from typing import Optional
+
+from tinystructlog import get_logger
+
+from mydocs.retrieval.config import LocalFulltextIndexConfig
+from mydocs.retrieval.models import FuzzyConfig
+
+log = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokenization, close to Lucene's standard analyzer."""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def encode_varints(values: list[int]) -> bytes:
+    """Encode non-negative integers as LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data: bytes) -> list[int]:
+    """Decode a byte string of LEB128 varints."""
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = 0
+            shift = 0
+    return values
+
+
+def levenshtein_within(a: str, b: str, max_edits: int) -> bool:
+    """Return True if the edit distance between a and b is at most max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+        if min(current) > max_edits:
+            return False
+        previous = current
+    return previous[-1] <= max_edits
+
+
+def _write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class _Segment:
+    """An immutable batch of indexed rows."""
+
+    def __init__(self, seq: int, ids: list[str], document_ids: list[str],
+                 lengths: list[int], terms: dict[str, list[int]], postings: bytes):
+        self.seq = seq
+        self.ids = ids
+        self.document_ids = document_ids
+        self.lengths = lengths
+        self.terms = terms  # term -> [offset, nbytes, df]
+        self.postings = postings
+
+    @classmethod
+    def build(cls, seq: int, ids: list[str], document_ids: list[str], texts: list[str]) -> "_Segment":
+        term_postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        for docnum, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_postings.setdefault(term, []).append((docnum, tf))
+        return cls._from_postings(seq, ids, document_ids, lengths, term_postings)
+
+    @classmethod
+    def _from_postings(cls, seq, ids, document_ids, lengths, term_postings) -> "_Segment":
+        terms: dict[str, list[int]] = {}
+        blob = bytearray()
+        for term in sorted(term_postings):
+            entries = term_postings[term]
+            flat = []
+            last = 0
+            for docnum, tf in entries:
+                flat.append(docnum - last)
+                flat.append(tf)
+                last = docnum
+            encoded = encode_varints(flat)
+            terms[term] = [len(blob), len(encoded), len(entries)]
+            blob.extend(encoded)
+        return cls(seq, ids, document_ids, lengths, terms, bytes(blob))
+
+    def iter_postings(self, term: str):
+        """Yield (docnum, tf) pairs for a term."""
+        entry = self.terms.get(term)
+        if not entry:
+            return
+        offset, nbytes, _ = entry
+        values = decode_varints(self.postings[offset:offset + nbytes])
+        docnum = 0
+        for i in range(0, len(values), 2):
+            docnum += values[i]
+            yield docnum, values[i + 1]
+
+    def save(self, directory: str) -> None:
+        name = f"seg_{self.seq:06d}"
+        tmp_bin = os.path.join(directory, f"{name}.bin.tmp")
+        with open(tmp_bin, "wb") as f:
+            f.write(self.postings)
+        os.replace(tmp_bin, os.path.join(directory, f"{name}.bin"))
+        _write_json_atomic(os.path.join(directory, f"{name}.json"), {
+            "ids": self.ids,
+            "document_ids": self.document_ids,
+            "lengths": self.lengths,
+            "terms": self.terms,
+        })
+
+    @classmethod
+    def load(cls, directory: str, seq: int) -> "_Segment":
+        name = f"seg_{seq:06d}"
+        with open(os.path.join(directory, f"{name}.json"), "r") as f:
+            header = json.load(f)
+        with open(os.path.join(directory, f"{name}.bin"), "rb") as f:
+            postings = f.read()
+        return cls(seq, header["ids"], header["document_ids"], header["lengths"], header["terms"], postings)
+
+
+class LocalFulltextIndex:
+    """BM25 inverted index persisted as segments under a directory.
+
+    Like the local vector index, a single writer is assumed and readers
+    reload when meta.json changes.
+    """
+
+    def __init__(self, path: str, config: Optional[LocalFulltextIndexConfig] = None):
+        self.path = path
+        self.config = config or LocalFulltextIndexConfig()
+        self._reset()
+        self._load()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _reset(self) -> None:
+        self._segments: list[_Segment] = []
+        self._tombstones: dict[str, int] = {}
+        self._next_seq = 1
+        self._live: dict[str, tuple[int, int]] = {}  # id -> (segment index, docnum)
+        self._total_length = 0
+        self._vocabulary: Optional[dict[int, list[str]]] = None  # term length -> sorted terms
+        self._loaded_mtime: Optional[int] = None
+
+    def _load(self) -> None:
+        self._reset()
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+        self._segments = [_Segment.load(self.path, seq) for seq in meta["segments"]]
+        self._tombstones = meta.get("tombstones", {})
+        self._next_seq = meta.get("next_seq", 1)
+        self._rebuild_live()
+        self._loaded_mtime = os.stat(self._meta_path).st_mtime_ns
+        log.debug(f"Loaded local fulltext index {self.path}: {len(self)} live rows")
+
+    def _rebuild_live(self) -> None:
+        self._live = {}
+        for seg_idx, segment in enumerate(self._segments):
+            for docnum, rid in enumerate(segment.ids):
+                if self._tombstones.get(rid, 0) >= segment.seq:
+                    self._live.pop(rid, None)
+                    continue
+                self._live[rid] = (seg_idx, docnum)
+        self._total_length = sum(
+            self._segments[seg_idx].lengths[docnum] for seg_idx, docnum in self._live.values()
+        )
+
+    def _save_meta(self) -> None:
+        """Write meta.json last: readers reload when its mtime changes."""
+        _write_json_atomic(self._meta_path, {
+            "segments": [segment.seq for segment in self._segments],
+            "tombstones": self._tombstones,
+            "next_seq": self._next_seq,
+        })
+        self._loaded_mtime = os.stat(self._meta_path).st_mtime_ns
+
+    def refresh(self) -> None:
+        """Reload the index if it was modified on disk since it was loaded."""
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._loaded_mtime:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, ids: list[str], document_ids: list[str], texts: list[str]) -> None:
+        """Index rows as a new segment. Rows with existing IDs are replaced."""
+        if not ids:
+            return
+        self.refresh()
+        os.makedirs(self.path, exist_ok=True)
+
+        segment = _Segment.build(self._next_seq, list(ids), list(document_ids), [t or "" for t in texts])
+        segment.save(self.path)
+        seg_idx = len(self._segments)
+        self._segments.append(segment)
+        self._next_seq += 1
+        self._vocabulary = None
+        for docnum, rid in enumerate(segment.ids):
+            previous = self._live.get(rid)
+            if previous is not None:
+                self._total_length -= self._segments[previous[0]].lengths[previous[1]]
+            self._live[rid] = (seg_idx, docnum)
+            self._total_length += segment.lengths[docnum]
+
+        if len(self._segments) > self.config.max_segments:
+            self._merge_segments()
+        else:
+            self._save_meta()
+
+    def delete_documents(self, document_ids: list[str]) -> int:
+        """Tombstone all rows of the given documents. Returns rows removed."""
+        self.refresh()
+        targets = set(document_ids)
+        removed = 0
+        for rid, (seg_idx, docnum) in list(self._live.items()):
+            if self._segments[seg_idx].document_ids[docnum] in targets:
+                self._tombstones[rid] = self._next_seq - 1
+                del self._live[rid]
+                self._total_length -= self._segments[seg_idx].lengths[docnum]
+                removed += 1
+        if removed:
+            self._save_meta()
+            log.info(f"Removed {removed} rows from local fulltext index {self.path}")
+        return removed
+
+    def clear(self) -> None:
+        """Delete all index files and reset to an empty index."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._reset()
+
+    def _merge_segments(self) -> None:
+        """Merge all segments into one, dropping shadowed and deleted rows."""
+        ids, document_ids, lengths = [], [], []
+        term_postings: dict[str, list[tuple[int, int]]] = {}
+        new_docnum: dict[tuple[int, int], int] = {}
+        for rid, (seg_idx, docnum) in self._live.items():
+            segment = self._segments[seg_idx]
+            new_docnum[(seg_idx, docnum)] = len(ids)
+            ids.append(rid)
+            document_ids.append(segment.document_ids[docnum])
+            lengths.append(segment.lengths[docnum])
+
+        for seg_idx, segment in enumerate(self._segments):
+            for term in segment.terms:
+                for docnum, tf in segment.iter_postings(term):
+                    merged = new_docnum.get((seg_idx, docnum))
+                    if merged is not None:
+                        term_postings.setdefault(term, []).append((merged, tf))
+        for entries in term_postings.values():
+            entries.sort()
+
+        old_seqs = [segment.seq for segment in self._segments]
+        merged_segment = _Segment._from_postings(
+            self._next_seq, ids, document_ids, lengths, term_postings,
+        )
+        merged_segment.save(self.path)
+        self._next_seq += 1
+        self._segments = [merged_segment]
+        self._tombstones = {}
+        self._vocabulary = None
+        self._rebuild_live()
+        self._save_meta()
+
+        for seq in old_seqs:
+            for ext in ("json", "bin"):
+                try:
+                    os.remove(os.path.join(self.path, f"seg_{seq:06d}.{ext}"))
+                except FileNotFoundError:
+                    pass
+        log.info(f"Merged {len(old_seqs)} segments in {self.path}: {len(self)} rows")
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _vocabulary_by_length(self) -> dict[int, list[str]]:
+        """Sorted vocabulary of all segments, bucketed by term length (built on first use)."""
+        if self._vocabulary is None:
+            terms = set()
+            for segment in self._segments:
+                terms.update(segment.terms)
+            vocabulary: dict[int, list[str]] = {}
+            for term in sorted(terms):
+                vocabulary.setdefault(len(term), []).append(term)
+            self._vocabulary = vocabulary
+        return self._vocabulary
+
+    def _expand_term(self, term: str, fuzzy: Optional[FuzzyConfig]) -> list[str]:
+        """Return the vocabulary terms matching a query term (exact or fuzzy).
+
+        Only terms within max_edits of the query term's length are compared,
+        and within each length the shared prefix is located by bisection.
+        """
+        if not fuzzy or not fuzzy.enabled:
+            return [term]
+        prefix = term[:fuzzy.prefix_length]
+        vocabulary = self._vocabulary_by_length()
+        matches = []
+        for length in range(max(len(term) - fuzzy.max_edits, 1), len(term) + fuzzy.max_edits + 1):
+            bucket = vocabulary.get(length, [])
+            for i in range(bisect.bisect_left(bucket, prefix), len(bucket)):
+                candidate = bucket[i]
+                if not candidate.startswith(prefix):
+                    break
+                if levenshtein_within(term, candidate, fuzzy.max_edits):
+                    matches.append(candidate)
+        return matches
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        document_ids: Optional[list[str]] = None,
+        fuzzy: Optional[FuzzyConfig] = None,
+    ) -> list[tuple[str, str, float]]:
+        """Return (id, document_id, score) tuples ranked by BM25.
+
+        Any query term may match (OR semantics, like an Atlas text operator).
+        With fuzzy matching, each query term contributes its best-scoring
+        vocabulary variant per row.
+        """
+        self.refresh()
+        if not self._live or top_k <= 0:
+            return []
+
+        allowed = set(document_ids) if document_ids is not None else None
+        n_docs = len(self._live)
+        avg_length = self._total_length / n_docs if n_docs else 0.0
+        k1, b = self.config.k1, self.config.b
+
+        scores: dict[str, float] = {}
+        row_documents: dict[str, str] = {}
+        for query_term in dict.fromkeys(tokenize(query)):
+            term_scores: dict[str, float] = {}
+            for term in self._expand_term(query_term, fuzzy):
+                # Only postings of live rows count: shadowed and deleted rows
+                # must not inflate df
+                postings = [
+                    (segment, docnum, tf)
+                    for seg_idx, segment in enumerate(self._segments)
+                    for docnum, tf in segment.iter_postings(term)
+                    if self._live.get(segment.ids[docnum]) == (seg_idx, docnum)
+                ]
+                df = len(postings)
+                if not df:
+                    continue
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for segment, docnum, tf in postings:
+                    document_id = segment.document_ids[docnum]
+                    if allowed is not None and document_id not in allowed:
+                        continue
+                    rid = segment.ids[docnum]
+                    length = segment.lengths[docnum]
+                    norm = k1 * (1.0 - b + b * length / avg_length) if avg_length else k1
+                    score = idf * tf * (k1 + 1.0) / (tf + norm)
+                    if score > term_scores.get(rid, 0.0):
+                        term_scores[rid] = score
+                    row_documents[rid] = document_id
+            for rid, score in term_scores.items():
+                scores[rid] = scores.get(rid, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(rid, row_documents[rid], score) for rid, score in ranked]
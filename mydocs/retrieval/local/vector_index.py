@@ -0,0 +1,594 @@
+"""In-process vector index over a memory-mapped float32 matrix.
+
+On-disk layout (one directory per (search_target, vector_field)):
+  meta.json        dimensions, row count, similarity, quantization, rows.log size
+  vectors.f32      row-major float32 matrix (count x dimensions)
+  rows.json        [id, document_id] per matrix row as of the last compaction
+  rows.log         [row, id, document_id] JSON lines written since; deleted
+                   rows are logged as [row, null, null]
+  ivf.npz          IVF centroids (index_type == "ivf")
+  assignments.i32  IVF list of each row
+  codes.bin        quantized codes per row when quantization is set
+  scales.f32       int8 per-row scales
+
+Writes patch or append only the rows they touch and write meta.json last:
+its row count and rows.log size bound what readers read, and its mtime
+tells them to reload. Only compaction and IVF training rewrite whole files.
+
+Search is exact (brute-force dot product) by default. With index_type "ivf"
+the matrix is partitioned by a spherical k-means coarse quantizer and only
+the `ivf_nprobe` closest lists are scanned.
+
+With quantization "int8" (per-row symmetric scale) or "binary" (sign bits),
+the scan runs over codes that are 4x / 32x smaller than the float32 matrix,
+and only the best `top_k * rescore_multiplier` rows are read from the
+memory-mapped matrix and rescored exactly.
+"""
+
+import json
+import os
+import shutil
+from typing import Optional
+
+import numpy as np
+from tinystructlog import get_logger
+
+from mydocs.retrieval.config import LocalVectorIndexConfig
+
+log = get_logger(__name__)
+
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 64
+_ASSIGN_CHUNK_ROWS = 65536
+
+
+def _write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _write_array_atomic(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def _write_rows(path: str, count: int, rows: list[int], updated: np.ndarray, appended: np.ndarray) -> None:
+    """Overwrite `rows` of a fixed-width row file in place and append after its first `count` rows.
+
+    Anything past `count` rows, left by an interrupted write, is replaced.
+    """
+    if rows:
+        writable = np.memmap(path, dtype=updated.dtype, mode="r+", shape=(count,) + updated.shape[1:])
+        writable[rows] = updated
+        writable.flush()
+        del writable
+    if len(appended):
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(count * appended[0].nbytes)
+            f.write(np.ascontiguousarray(appended).tobytes())
+            f.truncate()
+
+
+def _map_rows(path: str, dtype, shape: tuple) -> Optional[np.memmap]:
+    """Read-only map of the first shape[0] rows of a file; None if empty, missing or short."""
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if not nbytes or not os.path.exists(path) or os.path.getsize(path) < nbytes:
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorIndex:
+    """Vector index persisted under a directory and memory-mapped for search.
+
+    Writers (the parser) append rows via upsert() and keep their in-memory
+    state current; readers (the search API) pick up new rows on the next
+    search because refresh() compares the meta.json mtime. A single writer
+    process is assumed.
+    """
+
+    def __init__(self, path: str, config: Optional[LocalVectorIndexConfig] = None):
+        self.path = path
+        self.config = config or LocalVectorIndexConfig()
+        self._reset()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _rows_path(self) -> str:
+        return os.path.join(self.path, "rows.json")
+
+    @property
+    def _rows_log_path(self) -> str:
+        return os.path.join(self.path, "rows.log")
+
+    @property
+    def _ivf_path(self) -> str:
+        return os.path.join(self.path, "ivf.npz")
+
+    @property
+    def _assignments_path(self) -> str:
+        return os.path.join(self.path, "assignments.i32")
+
+    @property
+    def _codes_path(self) -> str:
+        return os.path.join(self.path, "codes.bin")
+
+    @property
+    def _scales_path(self) -> str:
+        return os.path.join(self.path, "scales.f32")
+
+    def _reset(self) -> None:
+        self.dimensions = 0
+        self._count = 0
+        self._ids: list[Optional[str]] = []
+        self._document_ids: list[Optional[str]] = []
+        self._row_by_id: dict[str, int] = {}
+        self._doc_code_by_id: dict[str, int] = {}
+        self._doc_codes = np.empty(0, dtype=np.int32)
+        self._rows_log_size = 0
+        self._vectors: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        # Per-row state rebuilt in memory by _load(), persisted by the next write
+        self._unsaved: set[str] = set()
+        self._loaded_mtime: Optional[int] = None
+
+    def _load(self) -> None:
+        self._reset()
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+
+        self.dimensions = meta["dimensions"]
+        self._count = meta["count"]
+        self._rows_log_size = meta.get("rows_log_size", 0)
+        self._read_rows()
+
+        if os.path.exists(self._ivf_path):
+            with np.load(self._ivf_path) as ivf:
+                self._centroids = ivf["centroids"]
+        self._map_files(meta.get("quantization"))
+
+        if self._centroids is not None and self._assignments is None and self._count:
+            self._assignments = self._assign_all()
+            self._unsaved.add("assignments")
+        if self.config.quantization and self._codes is None and self._count:
+            self._encode_codes()
+            self._unsaved.add("codes")
+
+        self._rebuild_lookups()
+        self._loaded_mtime = os.stat(self._meta_path).st_mtime_ns
+        log.debug(f"Loaded local vector index {self.path}: {len(self)} live rows")
+
+    def _read_rows(self) -> None:
+        """Rebuild the row table from the rows.json snapshot and the rows.log tail."""
+        rows = []
+        if os.path.exists(self._rows_path):
+            with open(self._rows_path, "r") as f:
+                rows = json.load(f)
+        ids = [r[0] if r else None for r in rows]
+        document_ids = [r[1] if r else None for r in rows]
+
+        if self._rows_log_size and os.path.exists(self._rows_log_path):
+            with open(self._rows_log_path, "rb") as f:
+                entries = f.read(self._rows_log_size).splitlines()
+            for entry in entries:
+                row, rid, doc_id = json.loads(entry)
+                if row >= len(ids):
+                    ids.extend([None] * (row + 1 - len(ids)))
+                    document_ids.extend([None] * (row + 1 - len(document_ids)))
+                ids[row] = rid
+                document_ids[row] = doc_id
+
+        missing = max(self._count - len(ids), 0)
+        self._ids = ids[: self._count] + [None] * missing
+        self._document_ids = document_ids[: self._count] + [None] * missing
+
+    def _map_files(self, quantization: Optional[str]) -> None:
+        """Map the first `count` rows of the per-row files.
+
+        Codes are only mapped if they were written for the configured quantization.
+        """
+        self._vectors = _map_rows(self._vectors_path, np.float32, (self._count, self.dimensions))
+        if self._centroids is not None:
+            self._assignments = _map_rows(self._assignments_path, np.int32, (self._count,))
+        self._codes = self._scales = None
+        if self.config.quantization and quantization == self.config.quantization:
+            if quantization == "binary":
+                self._codes = _map_rows(self._codes_path, np.uint8, (self._count, (self.dimensions + 7) // 8))
+            else:
+                self._codes = _map_rows(self._codes_path, np.int8, (self._count, self.dimensions))
+                self._scales = _map_rows(self._scales_path, np.float32, (self._count,))
+                if self._scales is None:
+                    self._codes = None
+
+    def _rebuild_lookups(self) -> None:
+        self._row_by_id = {}
+        self._doc_code_by_id = {}
+        self._doc_codes = np.empty(0, dtype=np.int32)
+        self._add_lookups(0)
+
+    def _add_lookups(self, first_row: int) -> None:
+        """Index rows first_row..count-1 by ID and document."""
+        codes = np.full(self._count - first_row, -1, dtype=np.int32)
+        for row in range(first_row, self._count):
+            rid, doc_id = self._ids[row], self._document_ids[row]
+            if rid is None:
+                continue
+            self._row_by_id[rid] = row
+            codes[row - first_row] = self._doc_code_by_id.setdefault(doc_id, len(self._doc_code_by_id))
+        self._doc_codes = np.concatenate([self._doc_codes, codes])
+
+    def _append_rows_log(self, entries: list[list]) -> None:
+        data = b"".join(json.dumps(entry).encode("utf-8") + b"\n" for entry in entries)
+        with open(self._rows_log_path, "r+b" if os.path.exists(self._rows_log_path) else "wb") as f:
+            # Drop any tail past the published size, left by an interrupted write
+            f.seek(self._rows_log_size)
+            f.write(data)
+            f.truncate()
+            self._rows_log_size = f.tell()
+
+    def _write_rows_snapshot(self) -> None:
+        rows = [
+            [rid, doc_id] if rid is not None else None
+            for rid, doc_id in zip(self._ids, self._document_ids)
+        ]
+        _write_json_atomic(self._rows_path, rows)
+        open(self._rows_log_path, "wb").close()
+        self._rows_log_size = 0
+
+    def _save_unsaved(self) -> None:
+        """Persist per-row state that _load() had to rebuild."""
+        if "assignments" in self._unsaved:
+            _write_array_atomic(self._assignments_path, self._assignments)
+        if "codes" in self._unsaved:
+            _write_array_atomic(self._codes_path, self._codes)
+            if self._scales is not None:
+                _write_array_atomic(self._scales_path, self._scales)
+        self._unsaved.clear()
+
+    def _commit(self) -> None:
+        """Publish a write: meta.json is written last, then the files are remapped."""
+        self._save_unsaved()
+        _write_json_atomic(self._meta_path, {
+            "dimensions": self.dimensions,
+            "count": self._count,
+            "similarity": self.config.similarity,
+            "quantization": self.config.quantization,
+            "rows_log_size": self._rows_log_size,
+        })
+        self._loaded_mtime = os.stat(self._meta_path).st_mtime_ns
+        self._map_files(self.config.quantization)
+
+    def refresh(self) -> None:
+        """Reload the index if another process modified it since it was loaded."""
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._loaded_mtime:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _prepare_vectors(self, vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if self.config.similarity == "cosine":
+            matrix = _normalize(matrix)
+        return matrix
+
+    def upsert(
+        self,
+        ids: list[str],
+        document_ids: list[str],
+        vectors: list[list[float]],
+    ) -> None:
+        """Insert or replace vectors. Existing IDs are overwritten in place."""
+        if not ids:
+            return
+        self.refresh()
+
+        matrix = self._prepare_vectors(vectors)
+        if not self.dimensions:
+            self.dimensions = matrix.shape[1]
+        elif matrix.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Vector dimension mismatch for index {self.path}: "
+                f"expected {self.dimensions}, got {matrix.shape[1]}"
+            )
+
+        update_rows, update_idx, append_idx = [], [], []
+        for i, rid in enumerate(ids):
+            row = self._row_by_id.get(rid)
+            if row is None:
+                append_idx.append(i)
+            else:
+                update_rows.append(row)
+                update_idx.append(i)
+
+        os.makedirs(self.path, exist_ok=True)
+        self._save_unsaved()
+        count = self._count
+        updated, appended = matrix[update_idx], matrix[append_idx]
+        _write_rows(self._vectors_path, count, update_rows, updated, appended)
+        if self._centroids is not None:
+            _write_rows(self._assignments_path, count, update_rows, self._assign(updated), self._assign(appended))
+        if self.config.quantization:
+            self._write_codes(count, update_rows, updated, appended)
+
+        if append_idx:
+            entries = [[count + n, ids[i], document_ids[i]] for n, i in enumerate(append_idx)]
+            self._append_rows_log(entries)
+            for _, rid, doc_id in entries:
+                self._ids.append(rid)
+                self._document_ids.append(doc_id)
+            self._count += len(entries)
+            self._add_lookups(count)
+
+        self._commit()
+
+        if (self.config.index_type == "ivf" and self._centroids is None
+                and len(self) >= self.config.ivf_min_train_size):
+            self.train_ivf()
+
+    def clear(self) -> None:
+        """Delete all index files and reset to an empty index."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._reset()
+
+    def delete_documents(self, document_ids: list[str]) -> int:
+        """Remove all rows belonging to the given documents. Returns rows removed."""
+        self.refresh()
+        targets = set(document_ids)
+        removed = [row for row, doc_id in enumerate(self._document_ids) if doc_id in targets]
+        for row in removed:
+            self._row_by_id.pop(self._ids[row], None)
+            self._ids[row] = None
+            self._document_ids[row] = None
+        if removed:
+            self._doc_codes[removed] = -1
+            if len(self) < self._count // 2:
+                self.compact()
+            else:
+                self._append_rows_log([[row, None, None] for row in removed])
+                self._commit()
+            log.info(f"Removed {len(removed)} rows from local vector index {self.path}")
+        return len(removed)
+
+    def compact(self) -> None:
+        """Rewrite the per-row files without deleted rows."""
+        live_rows = [row for row, rid in enumerate(self._ids) if rid is not None]
+        live = np.array(self._vectors[live_rows]) if live_rows else np.empty((0, self.dimensions), np.float32)
+        assignments = np.array(self._assignments[live_rows]) if self._assignments is not None else None
+        codes = np.array(self._codes[live_rows]) if self._codes is not None else None
+        scales = np.array(self._scales[live_rows]) if self._scales is not None else None
+
+        self._vectors = self._assignments = self._codes = self._scales = None
+        _write_array_atomic(self._vectors_path, live)
+        if assignments is not None:
+            _write_array_atomic(self._assignments_path, assignments)
+        if codes is not None:
+            _write_array_atomic(self._codes_path, codes)
+        if scales is not None:
+            _write_array_atomic(self._scales_path, scales)
+        self._unsaved.clear()
+
+        self._ids = [self._ids[row] for row in live_rows]
+        self._document_ids = [self._document_ids[row] for row in live_rows]
+        self._count = len(live_rows)
+        self._write_rows_snapshot()
+        self._commit()
+        self._rebuild_lookups()
+
+    # ------------------------------------------------------------------
+    # Quantization
+    # ------------------------------------------------------------------
+
+    def _quantize(self, matrix: np.ndarray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """Return (codes, scales) for a float32 matrix; scales is None for binary."""
+        if self.config.quantization == "binary":
+            return np.packbits(matrix > 0, axis=1), None
+        if self.config.quantization == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.rint(matrix / scales[:, np.newaxis]).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        raise ValueError(f"Unknown quantization: {self.config.quantization}")
+
+    def _encode_codes(self) -> None:
+        """Encode the whole matrix, for codes that are missing or of another quantization."""
+        log.info(f"Encoding {self.config.quantization} codes for {self.path}")
+        parts, scale_parts = [], []
+        for start in range(0, self._count, _ASSIGN_CHUNK_ROWS):
+            codes, scales = self._quantize(np.asarray(self._vectors[start:start + _ASSIGN_CHUNK_ROWS]))
+            parts.append(codes)
+            if scales is not None:
+                scale_parts.append(scales)
+        self._codes = np.concatenate(parts)
+        self._scales = np.concatenate(scale_parts) if scale_parts else None
+
+    def _write_codes(self, count: int, update_rows: list[int], updated: np.ndarray, appended: np.ndarray) -> None:
+        codes, scales = self._quantize(updated)
+        new_codes, new_scales = self._quantize(appended)
+        _write_rows(self._codes_path, count, update_rows, codes, new_codes)
+        if scales is not None:
+            _write_rows(self._scales_path, count, update_rows, scales, new_scales)
+
+    def _shortlist(self, rows: np.ndarray, query: np.ndarray, keep: int) -> np.ndarray:
+        """Keep the `keep` rows with the best approximate scores for exact rescoring."""
+        if rows.size <= keep:
+            return rows
+
+        approx = np.empty(rows.size, dtype=np.float32)
+        query_bits = np.packbits(query > 0) if self.config.quantization == "binary" else None
+        for start in range(0, rows.size, _ASSIGN_CHUNK_ROWS):
+            chunk = rows[start:start + _ASSIGN_CHUNK_ROWS]
+            if query_bits is not None:
+                hamming = np.bitwise_count(self._codes[chunk] ^ query_bits).sum(axis=1, dtype=np.int32)
+                approx[start:start + chunk.size] = -hamming
+            else:
+                approx[start:start + chunk.size] = (
+                    (self._codes[chunk].astype(np.float32) @ query) * self._scales[chunk]
+                )
+
+        best = np.argpartition(-approx, keep - 1)[:keep]
+        return np.sort(rows[best])
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _assign(self, matrix: np.ndarray) -> np.ndarray:
+        return np.argmax(matrix @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _assign_all(self) -> np.ndarray:
+        assignments = np.zeros(self._count, dtype=np.int32)
+        for start in range(0, self._count, _ASSIGN_CHUNK_ROWS):
+            chunk = np.asarray(self._vectors[start:start + _ASSIGN_CHUNK_ROWS])
+            assignments[start:start + len(chunk)] = self._assign(chunk)
+        return assignments
+
+    def train_ivf(self, seed: int = 0) -> None:
+        """Train the IVF coarse quantizer (spherical k-means) and assign all rows."""
+        live_rows = np.array(sorted(self._row_by_id.values()), dtype=np.int64)
+        if live_rows.size == 0:
+            return
+        nlist = min(self.config.ivf_nlist, live_rows.size)
+        rng = np.random.default_rng(seed)
+        sample_size = min(live_rows.size, nlist * _KMEANS_SAMPLE_PER_LIST)
+        sample = _normalize(np.array(self._vectors[rng.choice(live_rows, sample_size, replace=False)]))
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)]
+        for _ in range(_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        self._centroids = centroids.astype(np.float32)
+        tmp_path = f"{self._ivf_path}.tmp.npz"
+        np.savez(tmp_path, centroids=self._centroids)
+        os.replace(tmp_path, self._ivf_path)
+        _write_array_atomic(self._assignments_path, self._assign_all())
+        self._unsaved.discard("assignments")
+
+        self._commit()
+        log.info(f"Trained IVF for {self.path}: nlist={nlist}, rows={len(self)}")
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """Rows to scan for IVF search, or None for an exact full scan."""
+        if self.config.index_type != "ivf" or self._centroids is None:
+            return None
+        nprobe = min(self.config.ivf_nprobe, len(self._centroids))
+        centroid_scores = self._centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self._assignments, probe))
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query_embedding: list[float],
+        top_k: int,
+        document_ids: Optional[list[str]] = None,
+        exact: bool = False,
+        rescore_limit: int = 0,
+    ) -> list[tuple[str, str, float]]:
+        """Return (id, document_id, score) tuples for the top_k nearest rows.
+
+        With quantized codes, the best rescore_limit rows (default
+        top_k * rescore_multiplier) are rescored exactly; exact=True skips
+        the codes and scores every candidate row at full precision.
+
+        Scores follow Atlas semantics for dotProduct/cosine: (1 + sim) / 2.
+        """
+        self.refresh()
+        if not len(self) or top_k <= 0:
+            return []
+
+        query = self._prepare_vectors(query_embedding)[0]
+        if query.shape[0] != self.dimensions:
+            raise ValueError(
+                f"Query dimension {query.shape[0]} does not match index dimension {self.dimensions}"
+            )
+
+        mask = self._doc_codes >= 0
+        if document_ids is not None:
+            codes = [self._doc_code_by_id[d] for d in document_ids if d in self._doc_code_by_id]
+            mask &= np.isin(self._doc_codes, codes)
+
+        candidates = self._candidate_rows(query)
+        rows = np.flatnonzero(mask) if candidates is None else candidates[mask[candidates]]
+        if rows.size == 0:
+            return []
+
+        if self._codes is not None and not exact:
+            keep = max(rescore_limit or top_k * max(self.config.rescore_multiplier, 1), top_k)
+            rows = self._shortlist(rows, query, keep)
+            scores = self._vectors[rows] @ query
+        elif rows.size == self._count:
+            scores = (self._vectors @ query)[rows]
+        else:
+            scores = self._vectors[rows] @ query
+
+        k = min(top_k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            (self._ids[rows[t]], self._document_ids[rows[t]], float((1.0 + scores[t]) / 2.0))
+            for t in top
+        ]
+
+    def score_ids(self, query_embedding: list[float], ids: list[str]) -> dict[str, float]:
+        """Exact scores of the query against the stored vectors of the given IDs.
+
+        Used to rerank candidates from another index; unknown IDs are omitted.
+        """
+        self.refresh()
+        rows = [(rid, self._row_by_id[rid]) for rid in ids if rid in self._row_by_id]
+        if not rows:
+            return {}
+        query = self._prepare_vectors(query_embedding)[0]
+        if query.shape[0] != self.dimensions:
+            raise ValueError(
+                f"Query dimension {query.shape[0]} does not match index dimension {self.dimensions}"
+            )
+        scores = self._vectors[[row for _, row in rows]] @ query
+        return {rid: float((1.0 + score) / 2.0) for (rid, _), score in zip(rows, scores)}
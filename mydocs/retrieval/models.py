@@ -1,6 +1,6 @@
 """Search request and response models for the retrieval engine."""
 
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel
 
@@ -24,12 +24,25 @@ class VectorSearchConfig(BaseModel):
     embedding_model: Optional[str] = None
     num_candidates: int = 100
     score_boost: float = 1.0
+    quantization: Optional[str] = None  # None (full precision), "int8" or "binary"
+    rescore_multiplier: int = 4  # quantized/short-vector search over-fetches top_k * multiplier candidates
+    dimensions: Optional[int] = None  # search the Matryoshka short vector, reranked with the full vector
 
 
 class HybridSearchConfig(BaseModel):
-    combination_method: str = "rrf"  # "rrf" or "weighted_sum"
+    combination_method: str = "rrf"  # "rrf", "weighted_sum", "zscore" or "convex"
     rrf_k: int = 60
     weights: dict = {"fulltext": 0.5, "vector": 0.5}
+    candidate_multiplier: int = 4  # each branch fetches top_k * multiplier candidates for fusion
+
+
+class SnippetConfig(BaseModel):
+    enabled: bool = False
+    field: str = "content"  # "content" or "content_markdown"
+    max_fragments: int = 3
+    fragment_chars: int = 200
+    pre_tag: str = "<em>"
+    post_tag: str = "</em>"
 
 
 class SearchFilters(BaseModel):
@@ -51,6 +64,27 @@ class SearchRequest(BaseModel):
     top_k: int = 10
     min_score: float = 0.0
     include_content_fields: list[str] = ["content"]
+    use_cache: bool = True  # False bypasses the search result cache
+    snippet: SnippetConfig = SnippetConfig()
+    group_by: Optional[str] = None  # "document" collapses page hits per document
+    group_size: int = 3  # pages kept per document when grouping
+    facets: list[str] = []  # "tags", "file_type", "status", "document_type"
+    facet_size: int = 10  # buckets per facet
+    paginate: bool = False  # keep the ranked candidates server-side and return next_cursor
+    cursor: Optional[str] = None  # next_cursor of a previous response; fetches the following page
+    debug: bool = False  # return stage timings and counts in SearchResponse.debug
+    explain: bool = False  # also run Atlas explain (executionStats) for each aggregation
+
+
+class SimilarSearchRequest(BaseModel):
+    document_id: Optional[str] = None  # query with the mean vector of this document's pages
+    page_ids: list[str] = []  # or with the mean vector of these pages
+    vector: VectorSearchConfig = VectorSearchConfig()
+    filters: SearchFilters = SearchFilters()
+    top_k: int = 10
+    min_score: float = 0.0
+    include_content_fields: list[str] = ["content"]
+    exclude_source: bool = True  # drop the source pages (all pages of document_id)
 
 
 class SearchResult(BaseModel):
@@ -63,6 +97,32 @@ class SearchResult(BaseModel):
     content_markdown: Optional[str] = None
     file_name: Optional[str] = None
     tags: list[str] = []
+    snippets: Optional[list[str]] = None
+
+
+class SearchResultGroup(BaseModel):
+    document_id: str
+    score: float  # best page score
+    hits: int  # matching pages among the ranked candidates
+    page_ids: list[str]  # pages returned in results, best first
+    file_name: Optional[str] = None
+    file_type: Optional[str] = None
+    status: Optional[str] = None
+    document_type: Optional[str] = None
+    tags: list[str] = []
+    page_count: Optional[int] = None
+
+
+class FacetBucket(BaseModel):
+    value: str
+    count: int
+
+
+class SearchDebugInfo(BaseModel):
+    total_ms: float
+    timings_ms: dict[str, float]  # per stage; concurrent and nested stages overlap
+    counts: dict[str, int]  # candidates per stage and after each filter
+    explain: Optional[dict[str, Any]] = None  # per aggregation, when explain is set
 
 
 class SearchResponse(BaseModel):
@@ -72,3 +132,25 @@ class SearchResponse(BaseModel):
     search_mode: str
     vector_index_used: Optional[str] = None
     embedding_model_used: Optional[str] = None
+    cached: bool = False
+    next_cursor: Optional[str] = None  # set when a paginated search has more results
+    groups: Optional[list[SearchResultGroup]] = None  # set when group_by is used
+    facets: Optional[dict[str, list[FacetBucket]]] = None  # set when facets are requested
+    debug: Optional[SearchDebugInfo] = None  # set when debug or explain is requested
+
+
+class BatchSearchRequest(BaseModel):
+    requests: list[SearchRequest]
+    max_concurrency: Optional[int] = None  # defaults to, and is capped at, batch_search.max_concurrency
+
+
+class BatchSearchItem(BaseModel):
+    index: int  # position in the request list
+    response: Optional[SearchResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSearchResponse(BaseModel):
+    results: list[BatchSearchItem]
+    total: int
+    failed: int = 0
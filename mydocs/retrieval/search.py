@@ -4,28 +4,84 @@ import asyncio
 
 from tinystructlog import get_logger
 
-from mydocs.parsing.config import ParserConfig
+from mydocs.models import DocumentPage
+from mydocs.parsing.config import EmbeddingConfig, ParserConfig
 from mydocs.retrieval import embeddings
 from mydocs.retrieval import fulltext_retriever
 from mydocs.retrieval import hybrid
 from mydocs.retrieval import vector_retriever
-from mydocs.retrieval.models import SearchRequest, SearchResponse, SearchResult
+from mydocs.retrieval.cache import get_corpus_generation, get_search_cache, request_cache_key
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.content import build_snippets, content_projection
+from mydocs.retrieval.cursor import SearchCursor, decode_cursor, encode_cursor, get_cursor_store
+from mydocs.retrieval.facets import facet_candidates, use_search_meta, validate_facets
+from mydocs.retrieval.grouping import collapse_by_document, load_groups
+from mydocs.retrieval.local.documents import hydrate_results
+from mydocs.retrieval.models import (
+    BatchSearchItem,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    SimilarSearchRequest,
+)
+from mydocs.retrieval.trace import count, stage, start_trace, traced_aggregate
 
 log = get_logger(__name__)
 
-# Maps (search_target, vector_field) -> index name
+# Maps (search_target, vector_field, quantization) -> index name
 VECTOR_INDEX_MAP = {
-    ("pages", "emb_content_markdown_text_embedding_3_large"): "vec_pages_large_dot",
+    ("pages", "emb_content_markdown_text_embedding_3_large", None): "vec_pages_large_dot",
+    ("pages", "emb_content_markdown_text_embedding_3_large", "int8"): "vec_pages_large_dot_int8",
+    ("pages", "emb_content_markdown_text_embedding_3_large", "binary"): "vec_pages_large_dot_bin",
+    ("pages", "emb_content_markdown_text_embedding_3_large_256", None): "vec_pages_large_256_dot",
 }
 
 
-def _resolve_vector_index(request: SearchRequest) -> tuple[str, str, str]:
-    """Resolve the vector index name, vector field, and embedding model.
+def _select_vector_field(request: SearchRequest, ec: EmbeddingConfig) -> tuple[str, str | None]:
+    """Return (vector_field, rerank_field) for an embedding config.
 
-    Returns (index_name, vector_field, embedding_model).
+    When request.vector.dimensions selects the config's short vector, the
+    first stage searches the short field and rerank_field is the full field.
+    """
+    dimensions = request.vector.dimensions
+    if not dimensions or dimensions == ec.dimensions:
+        return ec.target_field, None
+    if dimensions != ec.short_dimensions:
+        raise ValueError(
+            f"No {dimensions}-dimension vectors configured for {ec.target_field} "
+            f"(available: {ec.dimensions}, short: {ec.short_dimensions})"
+        )
+    return ec.short_field, ec.target_field
+
+
+def _resolve_vector_index(
+    request: SearchRequest,
+    retrieval_config: RetrievalConfig | None = None,
+) -> tuple[str, str, str, str | None]:
+    """Resolve the vector index name, vector field, embedding model and rerank field.
+
+    The index is looked up by request.vector.quantization, so quantized
+    requests resolve to the int8/binary variant of the index, and by
+    request.vector.dimensions, so short-vector requests resolve to the index
+    on the Matryoshka short field with the full field returned for reranking.
+
+    With the local vector backend, unmapped fields resolve to a
+    "local:<search_target>.<vector_field>" index name instead of failing,
+    and a quantization other than the local index's own is rejected.
+
+    Returns (index_name, vector_field, embedding_model, rerank_field).
     """
     parser_config = ParserConfig()
 
+    if retrieval_config and retrieval_config.vector_backend == "local":
+        local_quantization = retrieval_config.local_vector.quantization
+        if request.vector.quantization and request.vector.quantization != local_quantization:
+            raise ValueError(
+                f"vector.quantization={request.vector.quantization} is not available on the local "
+                f"vector backend (local_vector.quantization={local_quantization})"
+            )
+
     if request.search_target == "pages":
         emb_configs = parser_config.page_embeddings or []
     else:
@@ -36,18 +92,21 @@ def _resolve_vector_index(request: SearchRequest) -> tuple[str, str, str]:
         index_name = request.vector.index_name
         # Try to find the embedding config that matches this index
         for ec in emb_configs:
-            key = (request.search_target, ec.target_field)
-            if VECTOR_INDEX_MAP.get(key) == index_name:
-                vector_field = ec.target_field
-                model = request.vector.embedding_model or ec.model
-                return index_name, vector_field, model
+            for vector_field, rerank_field in ((ec.target_field, None), (ec.short_field, ec.target_field)):
+                if not vector_field:
+                    continue
+                key = (request.search_target, vector_field, request.vector.quantization)
+                if VECTOR_INDEX_MAP.get(key) == index_name:
+                    model = request.vector.embedding_model or ec.model
+                    return index_name, vector_field, model, rerank_field
         # Fallback: use first config or defaults
         if emb_configs:
             ec = emb_configs[0]
             model = request.vector.embedding_model or ec.model
-            return index_name, ec.target_field, model
+            vector_field, rerank_field = _select_vector_field(request, ec)
+            return index_name, vector_field, model, rerank_field
         model = request.vector.embedding_model or "text-embedding-3-large"
-        return index_name, "emb_content_markdown_text_embedding_3_large", model
+        return index_name, "emb_content_markdown_text_embedding_3_large", model, None
 
     # Auto-resolve: use first embedding config
     if not emb_configs:
@@ -57,116 +116,321 @@ def _resolve_vector_index(request: SearchRequest) -> tuple[str, str, str]:
         )
 
     ec = emb_configs[0]
-    key = (request.search_target, ec.target_field)
+    vector_field, rerank_field = _select_vector_field(request, ec)
+    key = (request.search_target, vector_field, request.vector.quantization)
     index_name = VECTOR_INDEX_MAP.get(key)
+    if not index_name and retrieval_config and retrieval_config.vector_backend == "local":
+        index_name = f"local:{request.search_target}.{vector_field}"
     if not index_name:
         raise ValueError(
-            f"No vector index found for ({request.search_target}, {ec.target_field}). "
+            f"No vector index found for ({request.search_target}, {vector_field}, "
+            f"quantization={request.vector.quantization}). "
             f"Known indexes: {list(VECTOR_INDEX_MAP.keys())}"
         )
 
     model = request.vector.embedding_model or ec.model
-    return index_name, ec.target_field, model
+    return index_name, vector_field, model, rerank_field
+
+
+async def search(
+    request: SearchRequest,
+    query_embedding: list[float] | None = None,
+    retrieval_config: RetrievalConfig | None = None,
+) -> SearchResponse:
+    """Execute a search request and return results.
 
+    query_embedding may be passed when the caller has already embedded
+    request.query with the resolved model (see search_many).
 
-async def search(request: SearchRequest) -> SearchResponse:
-    """Execute a search request and return results."""
+    With request.paginate the ranked candidates are kept server-side and the
+    response carries a next_cursor; a request with cursor set is served from
+    that state without searching again.
+
+    Every search is traced (see trace.py). request.debug returns the stage
+    timings and counts in response.debug, request.explain adds the Atlas
+    explain output of each aggregation, and searches slower than
+    diagnostics.slow_query_ms are logged with their breakdown.
+    """
+    retrieval_config = retrieval_config or RetrievalConfig()
+
+    with start_trace(explain=request.explain) as trace:
+        response = await _search(request, query_embedding, retrieval_config)
+
+    elapsed_ms = trace.elapsed_ms()
+    slow_query_ms = retrieval_config.diagnostics.slow_query_ms
+    if slow_query_ms and elapsed_ms >= slow_query_ms:
+        timings = {name: round(ms, 1) for name, ms in trace.timings_ms.items()}
+        log.warning(
+            f"slow search duration_ms={elapsed_ms:.1f} query={request.query!r} target={request.search_target} "
+            f"mode={request.search_mode} cached={response.cached} timings_ms={timings} counts={trace.counts}"
+        )
+    if request.debug or request.explain:
+        response.debug = trace.to_debug()
+    return response
+
+
+async def _search(
+    request: SearchRequest,
+    query_embedding: list[float] | None,
+    retrieval_config: RetrievalConfig,
+) -> SearchResponse:
     log.info(f"search started query={request.query} target={request.search_target} mode={request.search_mode}")
 
+    if request.cursor:
+        return await _search_page(request, retrieval_config)
+
+    if request.group_by is not None:
+        if request.group_by != "document":
+            raise ValueError(f"Unknown group_by: {request.group_by}")
+        if request.search_target != "pages":
+            raise ValueError("group_by='document' requires search_target='pages'")
+        if request.paginate:
+            raise ValueError("group_by cannot be combined with paginate")
+    validate_facets(request.facets)
+
+    cache = None
+    if request.use_cache and not request.paginate and retrieval_config.search_cache.enabled:
+        cache = get_search_cache(retrieval_config.search_cache)
+        cache_key = request_cache_key(request)
+        with stage("cache"):
+            generation = await get_corpus_generation(retrieval_config.search_cache.generation_ttl_seconds)
+            cached = cache.get(cache_key, generation)
+        if cached is not None:
+            cached.cached = True
+            log.info(f"search served from cache total={cached.total}")
+            return cached
+
     needs_fulltext = request.search_mode in ("fulltext", "hybrid")
     needs_vector = request.search_mode in ("vector", "hybrid")
 
     index_name = None
     embedding_model = None
-    query_embedding = None
     vector_field = None
+    rerank_field = None
+    rerank_embedding = None
 
     # Resolve vector index and generate embedding if needed
     if needs_vector:
-        index_name, vector_field, embedding_model = _resolve_vector_index(request)
+        index_name, vector_field, embedding_model, rerank_field = _resolve_vector_index(request, retrieval_config)
         log.debug(f"vector index resolved index_name={index_name} vector_field={vector_field} embedding_model={embedding_model}")
-        query_embedding = await embeddings.generate_query_embedding(
-            request.query, embedding_model
-        )
+        if query_embedding is None:
+            with stage("embedding"):
+                query_embedding = await embeddings.generate_query_embedding(
+                    request.query, embedding_model
+                )
+        if rerank_field:
+            # Two-stage: ANN on the short vector, rerank with the full query vector
+            rerank_embedding = query_embedding
+            query_embedding = embeddings.shorten_embedding(query_embedding, request.vector.dimensions)
 
-    # Execute searches
+    # Hybrid search fuses wider candidate windows than the final top_k
+    branch_limit = request.top_k
     if request.search_mode == "hybrid":
-        ft_task = fulltext_retriever.fulltext_search(
-            query=request.query,
-            search_target=request.search_target,
-            fulltext_config=request.fulltext,
-            filters=request.filters,
-            top_k=request.top_k,
-        )
-        vec_task = vector_retriever.vector_search(
-            query_embedding=query_embedding,
-            search_target=request.search_target,
-            index_name=index_name,
-            vector_field=vector_field,
-            filters=request.filters,
-            num_candidates=request.vector.num_candidates,
-            top_k=request.top_k,
-        )
-        ft_results, vec_results = await asyncio.gather(ft_task, vec_task)
-
-        combined = hybrid.combine_results(
-            ft_results=ft_results,
-            vec_results=vec_results,
-            hybrid_config=request.hybrid,
-            ft_boost=request.fulltext.score_boost,
-            vec_boost=request.vector.score_boost,
-        )
+        branch_limit = request.top_k * max(request.hybrid.candidate_multiplier, 1)
+    result_limit = request.top_k
 
-    elif request.search_mode == "fulltext":
-        ft_results = await fulltext_retriever.fulltext_search(
-            query=request.query,
-            search_target=request.search_target,
-            fulltext_config=request.fulltext,
-            filters=request.filters,
-            top_k=request.top_k,
-        )
-        combined = []
-        for r in ft_results:
-            r["scores"] = {"fulltext": r.get("score", 0.0), "vector": 0.0}
-            combined.append(r)
-
-    elif request.search_mode == "vector":
-        vec_results = await vector_retriever.vector_search(
-            query_embedding=query_embedding,
-            search_target=request.search_target,
-            index_name=index_name,
-            vector_field=vector_field,
-            filters=request.filters,
-            num_candidates=request.vector.num_candidates,
-            top_k=request.top_k,
+    # Paginated searches rank a deeper window once and hydrate content per page
+    defer_content = False
+    if request.paginate:
+        result_limit = max(request.top_k, retrieval_config.pagination.max_results)
+        branch_limit = max(branch_limit, result_limit)
+        defer_content = True
+
+    # Grouped searches rank enough pages to fill top_k documents, then hydrate the kept pages
+    if request.group_by:
+        grouping = retrieval_config.grouping
+        result_limit = min(
+            request.top_k * max(request.group_size, 1) * max(grouping.candidate_multiplier, 1),
+            grouping.max_candidates,
         )
-        combined = []
-        for r in vec_results:
-            r["scores"] = {"fulltext": 0.0, "vector": r.get("score", 0.0)}
-            combined.append(r)
+        branch_limit = max(branch_limit, result_limit)
+        defer_content = True
+
+    # Facets come from $searchMeta when possible, otherwise from a ranked candidate window
+    facet_task = None
+    facet_limit = 0
+    if request.facets:
+        if use_search_meta(request, retrieval_config):
+            facet_task = asyncio.create_task(fulltext_retriever.fulltext_facets(
+                query=request.query,
+                fulltext_config=request.fulltext,
+                filters=request.filters,
+                facets=request.facets,
+                facet_size=request.facet_size,
+            ))
+        else:
+            facet_limit = max(result_limit, retrieval_config.faceting.candidate_limit)
+            branch_limit = max(branch_limit, facet_limit)
+            defer_content = True
+
+    content_fields = [] if defer_content else request.include_content_fields
+    snippet = None if defer_content else request.snippet
+
+    # Quantized and short-vector indexes over-fetch candidates that are rescored at full precision
+    rescore_limit = 0
+    if request.vector.quantization or rerank_field:
+        rescore_limit = branch_limit * max(request.vector.rescore_multiplier, 1)
+
+    # The $searchMeta facet query runs alongside; it must not outlive a failed search
+    try:
+        # Execute searches
+        if request.search_mode == "hybrid":
+            ft_task = fulltext_retriever.fulltext_search(
+                query=request.query,
+                search_target=request.search_target,
+                fulltext_config=request.fulltext,
+                filters=request.filters,
+                top_k=branch_limit,
+                retrieval_config=retrieval_config,
+                content_fields=content_fields,
+                snippet=snippet,
+            )
+            vec_task = vector_retriever.vector_search(
+                query_embedding=query_embedding,
+                search_target=request.search_target,
+                index_name=index_name,
+                vector_field=vector_field,
+                filters=request.filters,
+                num_candidates=request.vector.num_candidates,
+                top_k=branch_limit,
+                retrieval_config=retrieval_config,
+                quantization=request.vector.quantization,
+                rescore_limit=rescore_limit,
+                rerank_field=rerank_field,
+                rerank_embedding=rerank_embedding,
+                content_fields=content_fields,
+                snippet=snippet,
+            )
+            ft_results, vec_results = await asyncio.gather(_timed("fulltext", ft_task), _timed("vector", vec_task))
+            count("fulltext.results", len(ft_results))
+            count("vector.results", len(vec_results))
 
+            with stage("fusion"):
+                combined = hybrid.combine_results(
+                    ft_results=ft_results,
+                    vec_results=vec_results,
+                    hybrid_config=request.hybrid,
+                    ft_boost=request.fulltext.score_boost,
+                    vec_boost=request.vector.score_boost,
+                    top_k=max(result_limit, facet_limit),
+                )
+            count("fused", len(combined))
+
+        elif request.search_mode == "fulltext":
+            ft_results = await _timed("fulltext", fulltext_retriever.fulltext_search(
+                query=request.query,
+                search_target=request.search_target,
+                fulltext_config=request.fulltext,
+                filters=request.filters,
+                top_k=branch_limit,
+                retrieval_config=retrieval_config,
+                content_fields=content_fields,
+                snippet=snippet,
+            ))
+            count("fulltext.results", len(ft_results))
+            combined = []
+            for r in ft_results:
+                r["scores"] = {"fulltext": r.get("score", 0.0), "vector": 0.0}
+                combined.append(r)
+
+        elif request.search_mode == "vector":
+            vec_results = await _timed("vector", vector_retriever.vector_search(
+                query_embedding=query_embedding,
+                search_target=request.search_target,
+                index_name=index_name,
+                vector_field=vector_field,
+                filters=request.filters,
+                num_candidates=request.vector.num_candidates,
+                top_k=branch_limit,
+                retrieval_config=retrieval_config,
+                quantization=request.vector.quantization,
+                rescore_limit=rescore_limit,
+                rerank_field=rerank_field,
+                rerank_embedding=rerank_embedding,
+                content_fields=content_fields,
+                snippet=snippet,
+            ))
+            count("vector.results", len(vec_results))
+            combined = []
+            for r in vec_results:
+                r["scores"] = {"fulltext": 0.0, "vector": r.get("score", 0.0)}
+                combined.append(r)
+
+        else:
+            raise ValueError(f"Unknown search_mode: {request.search_mode}")
+
+        # Post-processing: min_score filter
+        if request.min_score > 0:
+            combined = [r for r in combined if r["score"] >= request.min_score]
+            count("after_min_score", len(combined))
+
+        facets = None
+        if facet_task is not None:
+            with stage("facets"):
+                facets = await facet_task
+        elif request.facets:
+            with stage("facets"):
+                facets = await facet_candidates(
+                    [r["document_id"] for r in combined[:facet_limit]], request.facets, request.facet_size,
+                )
+    except BaseException:
+        if facet_task is not None:
+            facet_task.cancel()
+            await asyncio.gather(facet_task, return_exceptions=True)
+        raise
+
+    next_cursor = None
+    groups = None
+    if request.paginate:
+        combined, next_cursor = await _start_pagination(
+            request, combined[:result_limit], index_name, embedding_model, retrieval_config,
+        )
+    elif request.group_by:
+        combined, summaries = collapse_by_document(combined[:result_limit], request.top_k, request.group_size)
+        combined, groups = await asyncio.gather(_hydrate_page(request, combined), load_groups(summaries))
     else:
-        raise ValueError(f"Unknown search_mode: {request.search_mode}")
+        combined = combined[: request.top_k]
+        if defer_content:
+            combined = await _hydrate_page(request, combined)
+
+    with stage("build_response"):
+        response = _build_response(request, combined, index_name, embedding_model)
+    count("returned", response.total)
+    response.next_cursor = next_cursor
+    response.groups = groups
+    response.facets = facets
 
-    # Post-processing: min_score filter
-    if request.min_score > 0:
-        combined = [r for r in combined if r["score"] >= request.min_score]
+    if cache is not None:
+        cache.put(cache_key, generation, response)
 
-    # Truncate to top_k
-    combined = combined[: request.top_k]
+    log.info(f"search completed total={response.total}")
+    return response
 
-    # Filter content fields
+
+async def _timed(name: str, coro):
+    with stage(name):
+        return await coro
+
+
+def _build_response(
+    request: SearchRequest,
+    combined: list[dict],
+    index_name: str | None,
+    embedding_model: str | None,
+) -> SearchResponse:
+    """Build snippets, drop unrequested content and wrap the result dicts."""
     allowed_fields = set(request.include_content_fields)
     for r in combined:
+        if request.snippet.enabled:
+            r["snippets"] = build_snippets(r, request.query, request.snippet)
+        r.pop("highlights", None)
         if "content" not in allowed_fields:
             r["content"] = None
         if "content_markdown" not in allowed_fields:
             r["content_markdown"] = None
 
-    # Build response
     results = [SearchResult(**r) for r in combined]
-
-    response = SearchResponse(
+    return SearchResponse(
         results=results,
         total=len(results),
         search_target=request.search_target,
@@ -175,5 +439,201 @@ async def search(request: SearchRequest) -> SearchResponse:
         embedding_model_used=embedding_model,
     )
 
-    log.info(f"search completed total={response.total}")
+
+async def _hydrate_page(request: SearchRequest, hits: list[dict]) -> list[dict]:
+    """Load the content of one page of ranked hits."""
+    projection = content_projection(request.include_content_fields, request.snippet)
+    hydrated = await hydrate_results(request.search_target, [(h["id"], h["score"]) for h in hits], projection)
+    scores = {h["id"]: h["scores"] for h in hits}
+    for r in hydrated:
+        r["scores"] = scores[r["id"]]
+    return hydrated
+
+
+async def _start_pagination(
+    request: SearchRequest,
+    combined: list[dict],
+    index_name: str | None,
+    embedding_model: str | None,
+    retrieval_config: RetrievalConfig,
+) -> tuple[list[dict], str | None]:
+    """Keep the ranked hits server-side; return the hydrated first page and next cursor."""
+    hits = [{"id": r["id"], "score": r["score"], "scores": r["scores"]} for r in combined]
+    page = await _hydrate_page(request, hits[: request.top_k])
+    if len(hits) <= request.top_k:
+        return page, None
+
+    cursor_id = get_cursor_store(retrieval_config.pagination).put(
+        SearchCursor(request, hits, index_name, embedding_model),
+    )
+    return page, encode_cursor(cursor_id, request.top_k)
+
+
+async def _search_page(request: SearchRequest, retrieval_config: RetrievalConfig) -> SearchResponse:
+    """Serve the page after request.cursor from the stored ranking.
+
+    Everything except top_k (the page size) comes from the request that
+    started the search.
+    """
+    cursor_id, offset = decode_cursor(request.cursor)
+    state = get_cursor_store(retrieval_config.pagination).get(cursor_id)
+    if state is None:
+        raise ValueError("Search cursor expired or unknown; run the search again")
+
+    page_request = state.request.model_copy(update={"top_k": request.top_k})
+    end = offset + request.top_k
+    combined = await _hydrate_page(page_request, state.hits[offset:end])
+
+    response = _build_response(page_request, combined, state.vector_index_used, state.embedding_model_used)
+    if end < len(state.hits):
+        response.next_cursor = encode_cursor(cursor_id, end)
+    log.info(f"search page served offset={offset} total={response.total}")
     return response
+
+
+async def search_similar(
+    request: SimilarSearchRequest,
+    retrieval_config: RetrievalConfig | None = None,
+) -> SearchResponse:
+    """Find pages similar to stored pages, without an embedding call.
+
+    The stored vectors of request.page_ids, or of all pages of
+    request.document_id, are averaged into the query vector for the page
+    vector index resolved from request.vector. The source pages are excluded
+    from the results unless exclude_source is False.
+    """
+    if bool(request.document_id) == bool(request.page_ids):
+        raise ValueError("Set exactly one of document_id or page_ids")
+    log.info(f"similar search started document_id={request.document_id} page_ids={request.page_ids}")
+
+    retrieval_config = retrieval_config or RetrievalConfig()
+    search_request = SearchRequest(
+        query="",
+        search_target="pages",
+        search_mode="vector",
+        vector=request.vector,
+        filters=request.filters,
+        top_k=request.top_k,
+        min_score=request.min_score,
+        include_content_fields=request.include_content_fields,
+    )
+    index_name, vector_field, _, rerank_field = _resolve_vector_index(search_request, retrieval_config)
+
+    # Short-vector indexes are queried with the shortened mean of the full vectors
+    source_field = rerank_field or vector_field
+    source_match = {"document_id": request.document_id} if request.document_id else {"_id": {"$in": request.page_ids}}
+    raw = await traced_aggregate(DocumentPage, [
+        {"$match": {**source_match, source_field: {"$exists": True}}},
+        {"$project": {"_id": 1, source_field: 1}},
+    ], "similar.sources")
+    vectors = [doc[source_field] for doc in raw if doc.get(source_field)]
+    if not vectors:
+        raise ValueError(f"No stored {source_field} vectors found for the source pages")
+
+    query_embedding = embeddings.average_embeddings(vectors)
+    rerank_embedding = None
+    if rerank_field:
+        rerank_embedding = query_embedding
+        query_embedding = embeddings.shorten_embedding(query_embedding, request.vector.dimensions)
+
+    # Over-fetch by the number of source pages, which are dropped afterwards
+    source_ids = {str(doc["_id"]) for doc in raw} if request.exclude_source else set()
+    branch_limit = request.top_k + len(source_ids)
+    rescore_limit = 0
+    if request.vector.quantization or rerank_field:
+        rescore_limit = branch_limit * max(request.vector.rescore_multiplier, 1)
+
+    vec_results = await vector_retriever.vector_search(
+        query_embedding=query_embedding,
+        search_target="pages",
+        index_name=index_name,
+        vector_field=vector_field,
+        filters=request.filters,
+        num_candidates=request.vector.num_candidates,
+        top_k=branch_limit,
+        retrieval_config=retrieval_config,
+        quantization=request.vector.quantization,
+        rescore_limit=rescore_limit,
+        rerank_field=rerank_field,
+        rerank_embedding=rerank_embedding,
+        content_fields=request.include_content_fields,
+    )
+
+    combined = []
+    for r in vec_results:
+        if request.exclude_source and (r["id"] in source_ids or r["document_id"] == request.document_id):
+            continue
+        if r["score"] < request.min_score:
+            continue
+        r["scores"] = {"fulltext": 0.0, "vector": r.get("score", 0.0)}
+        combined.append(r)
+
+    response = _build_response(search_request, combined[: request.top_k], index_name, None)
+    response.search_mode = "similar"
+    log.info(f"similar search completed total={response.total} source_vectors={len(vectors)}")
+    return response
+
+
+async def search_many(
+    requests: list[SearchRequest],
+    max_concurrency: int | None = None,
+) -> BatchSearchResponse:
+    """Execute many search requests, returning results in request order.
+
+    Queries that need vectors are embedded up front with one provider call
+    per embedding model; the searches then run concurrently, at most
+    max_concurrency at a time, clamped to 1..batch_search.max_concurrency. A
+    failing request yields an item with `error` set instead of failing the
+    batch.
+    """
+    retrieval_config = RetrievalConfig()
+    batch_config = retrieval_config.batch_search
+    max_concurrency = min(max(max_concurrency or batch_config.max_concurrency, 1), batch_config.max_concurrency)
+    log.info(f"search_many started requests={len(requests)} max_concurrency={max_concurrency}")
+
+    items: list[BatchSearchItem | None] = [None] * len(requests)
+    query_embeddings: dict[int, list[float]] = {}
+
+    # Group the queries that need an embedding by model
+    by_model: dict[str, list[int]] = {}
+    for i, request in enumerate(requests):
+        if request.search_mode not in ("vector", "hybrid") or request.cursor:
+            continue
+        try:
+            _, _, embedding_model, _ = _resolve_vector_index(request, retrieval_config)
+        except ValueError as exc:
+            items[i] = BatchSearchItem(index=i, error=str(exc))
+            continue
+        by_model.setdefault(embedding_model, []).append(i)
+
+    for embedding_model, positions in by_model.items():
+        queries = list(dict.fromkeys(requests[i].query for i in positions))
+        try:
+            vectors = await embeddings.generate_query_embeddings(
+                queries, embedding_model, batch_size=batch_config.embedding_batch_size,
+            )
+        except Exception as exc:
+            log.warning(f"search_many embedding failed model={embedding_model}: {exc}")
+            for i in positions:
+                items[i] = BatchSearchItem(index=i, error=f"Embedding failed: {exc}")
+            continue
+        by_query = dict(zip(queries, vectors))
+        for i in positions:
+            query_embeddings[i] = by_query[requests[i].query]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(i: int) -> None:
+        async with semaphore:
+            try:
+                response = await search(requests[i], query_embeddings.get(i), retrieval_config)
+                items[i] = BatchSearchItem(index=i, response=response)
+            except Exception as exc:
+                log.warning(f"search_many request {i} failed: {exc}")
+                items[i] = BatchSearchItem(index=i, error=str(exc))
+
+    await asyncio.gather(*(run(i) for i, item in enumerate(items) if item is None))
+
+    failed = sum(1 for item in items if item.error is not None)
+    log.info(f"search_many completed requests={len(items)} failed={failed}")
+    return BatchSearchResponse(results=items, total=len(items), failed=failed)
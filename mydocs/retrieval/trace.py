@@ -0,0 +1,117 @@
+"""Per-request search instrumentation: stage timings, counts and explain output.
+
+search() opens a SearchTrace in a ContextVar, so retrievers and helpers can
+record into it without threading it through every call; with no active
+trace, stage() and count() are no-ops. Stage timings are wall-clock
+milliseconds from time.monotonic(), accumulated per stage name. Stages run
+concurrently in hybrid search and nest (a retriever stage contains its
+aggregation), so they do not sum to the total.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from bson import json_util
+from tinystructlog import get_logger
+
+from mydocs.retrieval.models import SearchDebugInfo
+
+log = get_logger(__name__)
+
+_current_trace: ContextVar[Optional["SearchTrace"]] = ContextVar("search_trace", default=None)
+
+
+class SearchTrace:
+    def __init__(self, explain: bool = False):
+        self.started = time.monotonic()
+        self.explain_enabled = explain
+        self.timings_ms: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.explain: dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            self.timings_ms[name] = self.timings_ms.get(name, 0.0) + elapsed
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = value
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def to_debug(self) -> SearchDebugInfo:
+        return SearchDebugInfo(
+            total_ms=round(self.elapsed_ms(), 3),
+            timings_ms={name: round(ms, 3) for name, ms in self.timings_ms.items()},
+            counts=dict(self.counts),
+            explain=self.explain or None,
+        )
+
+
+@contextmanager
+def start_trace(explain: bool = False) -> Iterator[SearchTrace]:
+    trace = SearchTrace(explain)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[SearchTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the current search (no-op outside a trace)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+def count(name: str, value: int) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, value)
+
+
+async def traced_aggregate(model, pipeline: list[dict], label: str) -> list[dict]:
+    """Run model.aaggregate(pipeline) as a timed, counted stage.
+
+    When the trace has explain enabled, the pipeline is also explained
+    (executionStats) after it ran; the explain call is not timed.
+    """
+    with stage(label):
+        raw = await model.aaggregate(pipeline)
+    count(label, len(raw))
+
+    trace = _current_trace.get()
+    if trace is not None and trace.explain_enabled:
+        trace.explain[label] = await _explain(model, pipeline)
+    return raw
+
+
+async def _explain(model, pipeline: list[dict]) -> Any:
+    try:
+        collection = await model.get_async_collection()
+        result = await collection.database.command({
+            "explain": {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}},
+            "verbosity": "executionStats",
+        })
+    except Exception as exc:
+        log.warning(f"explain failed: {exc}")
+        return {"error": str(exc)}
+    # BSON types (Int64, Timestamp, ...) to plain JSON values
+    return json.loads(json_util.dumps(result))
@@ -1,9 +1,14 @@
-"""Vector search via MongoDB Atlas $vectorSearch stage."""
+"""Vector search via MongoDB Atlas $vectorSearch stage or the local vector index."""
+
+from typing import NamedTuple, Optional
 
 from tinystructlog import get_logger
 
 from mydocs.models import Document, DocumentPage
-from mydocs.retrieval.models import SearchFilters
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.content import content_projection
+from mydocs.retrieval.models import SearchFilters, SnippetConfig
+from mydocs.retrieval.trace import traced_aggregate
 
 log = get_logger(__name__)
 
@@ -16,18 +21,82 @@ async def vector_search(
     filters: SearchFilters,
     num_candidates: int,
     top_k: int,
+    retrieval_config: Optional[RetrievalConfig] = None,
+    quantization: Optional[str] = None,
+    rescore_limit: int = 0,
+    rerank_field: Optional[str] = None,
+    rerank_embedding: Optional[list[float]] = None,
+    content_fields: Optional[list[str]] = None,
+    snippet: Optional[SnippetConfig] = None,
 ) -> list[dict]:
-    """Execute Atlas $vectorSearch and return normalized result dicts."""
+    """Execute vector search on the configured backend and return normalized result dicts.
+
+    With rescore_limit > 0 (quantized or short-vector indexes), that many
+    candidates are fetched together with their stored vectors and rescored at
+    full precision before truncating to top_k. For two-stage short-vector
+    search, rerank_field/rerank_embedding are the full stored field and full
+    query vector; otherwise the candidates are rescored on vector_field.
+
+    On Atlas the quantized variant is selected by index_name. The local
+    backend scans its quantized codes only when quantization is set (and
+    rescores the best rescore_limit rows internally), otherwise it searches
+    the full-precision matrix exactly.
+
+    Only content_fields are projected (all content fields when None), plus
+    the snippet source field when snippets are enabled.
+    """
+    fields_projection = content_projection(content_fields, snippet)
+    retrieval_config = retrieval_config or RetrievalConfig()
+    rescore = (
+        _Rescore(rescore_limit, rerank_field or vector_field, rerank_embedding or query_embedding)
+        if rescore_limit else None
+    )
+    if retrieval_config.vector_backend == "local":
+        return await _search_local(
+            query_embedding, search_target, vector_field, filters, top_k, retrieval_config,
+            rescore if rerank_field else None, fields_projection,
+            quantization=quantization, rescore_limit=rescore_limit,
+        )
     if search_target == "documents":
         return await _search_documents(
-            query_embedding, index_name, vector_field, filters, num_candidates, top_k,
+            query_embedding, index_name, vector_field, filters, num_candidates, top_k, rescore, fields_projection,
         )
     else:
         return await _search_pages(
-            query_embedding, index_name, vector_field, filters, num_candidates, top_k,
+            query_embedding, index_name, vector_field, filters, num_candidates, top_k, rescore, fields_projection,
         )
 
 
+class _Rescore(NamedTuple):
+    limit: int
+    field: str
+    embedding: list[float]
+
+
+def _rescore(rescore: _Rescore, raw: list[dict], top_k: int) -> list[dict]:
+    """Rescore candidates by full-precision dot product and keep the top_k.
+
+    Scores use the Atlas dotProduct/cosine normalization, (1 + sim) / 2.
+    """
+    import numpy as np
+
+    vector_field = rescore.field
+    candidates = [doc for doc in raw if doc.get(vector_field)]
+    if not candidates:
+        return []
+    query = np.asarray(rescore.embedding, dtype=np.float32)
+    matrix = np.asarray([doc[vector_field] for doc in candidates], dtype=np.float32)
+    scores = (1.0 + matrix @ query) / 2.0
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    rescored = []
+    for i in order:
+        doc = candidates[i]
+        doc["score"] = float(scores[i])
+        doc.pop(vector_field, None)
+        rescored.append(doc)
+    return rescored
+
+
 async def _search_documents(
     query_embedding: list[float],
     index_name: str,
@@ -35,15 +104,18 @@ async def _search_documents(
     filters: SearchFilters,
     num_candidates: int,
     top_k: int,
+    rescore: Optional[_Rescore] = None,
+    fields_projection: Optional[dict] = None,
 ) -> list[dict]:
     """Vector search on the documents collection."""
+    limit = max(rescore.limit, top_k) if rescore else top_k
     vector_stage: dict = {
         "$vectorSearch": {
             "index": index_name,
             "path": vector_field,
             "queryVector": query_embedding,
-            "numCandidates": num_candidates,
-            "limit": top_k,
+            "numCandidates": max(num_candidates, limit),
+            "limit": limit,
         }
     }
 
@@ -67,15 +139,18 @@ async def _search_documents(
     if post_match:
         pipeline.append({"$match": post_match})
 
-    pipeline.append({
-        "$project": {
-            "_id": 1, "score": 1, "content": 1, "content_markdown": 1,
-            "file_name": 1, "tags": 1,
-        }
-    })
+    projection = {
+        "_id": 1, "score": 1, "file_name": 1, "tags": 1,
+        **(fields_projection if fields_projection is not None else content_projection()),
+    }
+    if rescore:
+        projection[rescore.field] = 1
+    pipeline.append({"$project": projection})
 
     log.debug(f"vector documents pipeline: {pipeline}")
-    raw = await Document.aaggregate(pipeline)
+    raw = await traced_aggregate(Document, pipeline, "vector.documents")
+    if rescore:
+        raw = _rescore(rescore, raw, top_k)
 
     results = []
     for doc in raw:
@@ -99,15 +174,18 @@ async def _search_pages(
     filters: SearchFilters,
     num_candidates: int,
     top_k: int,
+    rescore: Optional[_Rescore] = None,
+    fields_projection: Optional[dict] = None,
 ) -> list[dict]:
     """Vector search on the pages collection with pre-filter on document_id."""
+    limit = max(rescore.limit, top_k) if rescore else top_k
     vector_stage: dict = {
         "$vectorSearch": {
             "index": index_name,
             "path": vector_field,
             "queryVector": query_embedding,
-            "numCandidates": num_candidates,
-            "limit": top_k,
+            "numCandidates": max(num_candidates, limit),
+            "limit": limit,
         }
     }
 
@@ -145,16 +223,19 @@ async def _search_pages(
     if doc_match:
         pipeline.append({"$match": doc_match})
 
-    pipeline.append({
-        "$project": {
-            "_id": 1, "document_id": 1, "page_number": 1, "score": 1,
-            "content": 1, "content_markdown": 1,
-            "file_name": "$_doc.file_name", "tags": "$_doc.tags",
-        }
-    })
+    projection = {
+        "_id": 1, "document_id": 1, "page_number": 1, "score": 1,
+        "file_name": "$_doc.file_name", "tags": "$_doc.tags",
+        **(fields_projection if fields_projection is not None else content_projection()),
+    }
+    if rescore:
+        projection[rescore.field] = 1
+    pipeline.append({"$project": projection})
 
     log.debug(f"vector pages pipeline: {pipeline}")
-    raw = await DocumentPage.aaggregate(pipeline)
+    raw = await traced_aggregate(DocumentPage, pipeline, "vector.pages")
+    if rescore:
+        raw = _rescore(rescore, raw, top_k)
 
     results = []
     for doc in raw:
@@ -169,3 +250,48 @@ async def _search_pages(
             "tags": doc.get("tags", []),
         })
     return results
+
+
+async def _search_local(
+    query_embedding: list[float],
+    search_target: str,
+    vector_field: str,
+    filters: SearchFilters,
+    top_k: int,
+    retrieval_config: RetrievalConfig,
+    rescore: Optional[_Rescore] = None,
+    fields_projection: Optional[dict] = None,
+    quantization: Optional[str] = None,
+    rescore_limit: int = 0,
+) -> list[dict]:
+    """Vector search on the embedded local index, hydrated from MongoDB.
+
+    Without quantization the index is searched exactly even if it keeps
+    quantized codes. For two-stage search, candidates from the short-vector
+    index are reranked with the vectors of the full-field local index.
+    """
+    from mydocs.retrieval.local import get_vector_index
+    from mydocs.retrieval.local.documents import hydrate_results, resolve_document_filter
+
+    allowed_document_ids = await resolve_document_filter(filters)
+    if allowed_document_ids is not None and not allowed_document_ids:
+        return []
+
+    index = get_vector_index(search_target, vector_field, retrieval_config.local_vector)
+    search_k = max(rescore.limit, top_k) if rescore else top_k
+    hits = index.search(
+        query_embedding, search_k, document_ids=allowed_document_ids,
+        exact=not quantization, rescore_limit=rescore_limit if quantization else 0,
+    )
+    log.debug(f"local vector search returned {len(hits)} hits from {index.path}")
+    scored = [(hit_id, score) for hit_id, _, score in hits]
+
+    if rescore:
+        full_index = get_vector_index(search_target, rescore.field, retrieval_config.local_vector)
+        full_scores = full_index.score_ids(rescore.embedding, [hit_id for hit_id, _ in scored])
+        scored = sorted(
+            ((hit_id, full_scores[hit_id]) for hit_id, _ in scored if hit_id in full_scores),
+            key=lambda item: -item[1],
+        )[:top_k]
+
+    return await hydrate_results(search_target, scored, fields_projection)
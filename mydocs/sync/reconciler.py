@@ -10,6 +10,7 @@ from mydocs.models import Document, DocumentStatusEnum, MetadataSidecar, Storage
 from mydocs.parsing.pipeline import parse_document
 from mydocs.parsing.storage import get_storage
 from mydocs.parsing.storage.base import FileStorage
+from mydocs.retrieval.cache import bump_corpus_generation
 from mydocs.sync.models import SyncAction, SyncItemResult, SyncPlan, SyncReport
 from mydocs.sync.sidecar import build_sidecar_from_document, read_sidecar, write_sidecar
 
@@ -74,6 +75,7 @@ async def _flag_orphaned(doc_id: str) -> None:
         {"_id": doc_id},
         {"$addToSet": {"tags": "_orphaned"}},
     )
+    await bump_corpus_generation()
     log.info(f"Flagged document {doc_id} as orphaned")
 
 
@@ -0,0 +1,70 @@
+"""Tests for the search endpoints in mydocs.backend.routes.search."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mydocs.backend.routes.search import router
+from mydocs.retrieval.config import BatchSearchConfig, RetrievalConfig
+from mydocs.retrieval.models import SearchResponse
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def concurrency():
+    """Runs batch searches against a fake search, recording peak concurrency."""
+    config = RetrievalConfig.model_construct(batch_search=BatchSearchConfig(max_concurrency=2))
+    state = {"running": 0, "peak": 0}
+
+    async def fake_search(request, query_embedding=None, retrieval_config=None):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return SearchResponse(results=[], total=0, search_target=request.search_target, search_mode="fulltext")
+
+    with patch("mydocs.backend.routes.search.RetrievalConfig", return_value=config), \
+            patch("mydocs.retrieval.search.RetrievalConfig", return_value=config), \
+            patch("mydocs.retrieval.search.search", side_effect=fake_search):
+        yield state
+
+
+def _batch(max_concurrency: int) -> dict:
+    return {
+        "requests": [{"query": f"q{i}", "search_mode": "fulltext"} for i in range(6)],
+        "max_concurrency": max_concurrency,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests: POST /api/v1/search/batch
+# ---------------------------------------------------------------------------
+
+class TestSearchBatchRoute:
+
+    def test_concurrency_capped_by_config(self, client, concurrency):
+        response = client.post("/api/v1/search/batch", json=_batch(100))
+
+        assert response.status_code == 200
+        assert [item["index"] for item in response.json()["results"]] == list(range(6))
+        assert concurrency["peak"] == 2
+
+    def test_non_positive_concurrency_runs_sequentially(self, client, concurrency):
+        response = client.post("/api/v1/search/batch", json=_batch(-3))
+
+        assert response.status_code == 200
+        assert response.json()["failed"] == 0
+        assert concurrency["peak"] == 1
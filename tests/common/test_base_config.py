@@ -0,0 +1,138 @@
+"""Tests for mydocs.common.base_config YAML and dump caching."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from mydocs.common import base_config
+from mydocs.common.base_config import BaseConfig, clear_config_cache
+
+
+class SampleConfig(BaseConfig):
+    config_name: str = "sample"
+    model: str = "default"
+    options: dict = {"a": 1, "b": 2}
+
+
+def _write(path, data: dict, mtime_ns: int) -> None:
+    path.write_text(yaml.safe_dump(data))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_config_cache()
+    yield
+    clear_config_cache()
+
+
+# ---------------------------------------------------------------------------
+# Tests: YAML layer cache
+# ---------------------------------------------------------------------------
+
+class TestYamlCache:
+
+    def test_parsed_once_until_file_changes(self, tmp_path):
+        path = tmp_path / "sample.yml"
+        _write(path, {"model": "first", "options": {"b": 3}}, 1_000_000_000)
+
+        with patch.object(base_config.yaml, "safe_load", wraps=yaml.safe_load) as safe_load:
+            first = SampleConfig(config_root=str(tmp_path))
+            second = SampleConfig(config_root=str(tmp_path))
+            assert safe_load.call_count == 1
+
+            _write(path, {"model": "second"}, 2_000_000_000)
+            reloaded = SampleConfig(config_root=str(tmp_path))
+            assert safe_load.call_count == 2
+
+        assert first.model == second.model == "first"
+        assert first.options == {"a": 1, "b": 3}
+        assert reloaded.model == "second"
+        assert reloaded.options == {"a": 1, "b": 2}
+
+    def test_instances_do_not_share_yaml_data(self, tmp_path):
+        _write(tmp_path / "sample.yml", {"options": {"b": 3}}, 1_000_000_000)
+
+        first = SampleConfig(config_root=str(tmp_path))
+        first.options["b"] = 99
+
+        assert SampleConfig(config_root=str(tmp_path)).options == {"a": 1, "b": 3}
+
+    def test_invalid_yaml_keeps_defaults_and_is_not_reparsed(self, tmp_path):
+        path = tmp_path / "sample.yml"
+        path.write_text("model: [unclosed\n")
+
+        with patch.object(base_config.yaml, "safe_load", wraps=yaml.safe_load) as safe_load:
+            assert SampleConfig(config_root=str(tmp_path)).model == "default"
+            assert SampleConfig(config_root=str(tmp_path)).model == "default"
+            assert safe_load.call_count == 1
+
+    def test_removed_file_falls_back_to_defaults(self, tmp_path):
+        path = tmp_path / "sample.yml"
+        _write(path, {"model": "first"}, 1_000_000_000)
+        assert SampleConfig(config_root=str(tmp_path)).model == "first"
+
+        path.unlink()
+        assert SampleConfig(config_root=str(tmp_path)).model == "default"
+
+
+# ---------------------------------------------------------------------------
+# Tests: dump_config memoization
+# ---------------------------------------------------------------------------
+
+class TestDumpConfig:
+
+    def test_hash_memoized_for_equal_values(self, tmp_path):
+        config = SampleConfig(config_root=str(tmp_path))
+
+        with patch.object(base_config.yaml, "dump", wraps=yaml.dump) as dump:
+            first = config.dump_config()
+            second = SampleConfig(config_root=str(tmp_path)).dump_config()
+            assert dump.call_count == 1
+
+        assert first.config_hash == second.config_hash
+        assert first.config_yaml == second.config_yaml
+
+    def test_unchanged_config_not_reserialized(self, tmp_path):
+        _write(tmp_path / "sample.yml", {"model": "first"}, 1_000_000_000)
+        SampleConfig(config_root=str(tmp_path)).dump_config()
+
+        with patch.object(SampleConfig, "apply_config", wraps=SampleConfig.apply_config) as apply_config, \
+                patch.object(SampleConfig, "model_dump_json") as model_dump_json:
+            config = SampleConfig(config_root=str(tmp_path))
+            config.dump_config()
+            config.dump_config()
+            apply_config.assert_not_called()
+            model_dump_json.assert_not_called()
+
+        assert config.model == "first"
+
+    def test_assignment_changes_hash(self, tmp_path):
+        config = SampleConfig(config_root=str(tmp_path))
+        before = config.dump_config().config_hash
+
+        config.options = {"a": 5, "b": 2}
+        assert config.dump_config().config_hash != before
+        assert SampleConfig(config_root=str(tmp_path)).dump_config().config_hash == before
+
+    def test_copy_with_update_changes_hash(self, tmp_path):
+        config = SampleConfig(config_root=str(tmp_path))
+        before = config.dump_config().config_hash
+
+        assert config.model_copy(update={"model": "other"}).dump_config().config_hash != before
+
+    def test_json_format_and_returned_copy(self, tmp_path):
+        config = SampleConfig(config_root=str(tmp_path))
+        serialized = config.dump_config(format="json")
+        serialized.config_dict["model"] = "changed"
+
+        again = config.dump_config(format="json")
+        assert again.config_dict["model"] == "default"
+        assert again.config_json is not None and again.config_yaml is None
+        assert again.config_hash != config.dump_config().config_hash
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Unsupported format"):
+            SampleConfig(config_root=str(tmp_path)).dump_config(format="toml")
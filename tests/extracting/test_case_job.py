@@ -0,0 +1,383 @@
+"""Tests for mydocs.extracting.case_job."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from lightodm import generate_composite_id
+
+from mydocs.extracting.case_job import (
+    build_units,
+    case_job_hash,
+    extraction_config_hash,
+    prepare_case_job,
+    run_case_job,
+    start_case_job,
+)
+from mydocs.extracting.exceptions import CaseNotFoundError, ConfigNotFoundError, NoDocumentsFoundError
+from mydocs.extracting.models import (
+    CaseExtractionJob,
+    CaseExtractionRequest,
+    ExtractionJobStatus,
+    ExtractionResponse,
+    ExtractionUnit,
+    FieldDefinition,
+    PromptConfig,
+)
+from mydocs.models import Case
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _case(*document_ids: str) -> Case:
+    case = Case(name="case", type="insurance", document_ids=list(document_ids))
+    case.id = "case_1"
+    return case
+
+
+RAW_DOCUMENTS = [
+    {"_id": "doc_a"},
+    {"_id": "doc_b", "subdocuments": [
+        {"id": "sub_1", "document_type": "invoice", "case_type": "insurance"},
+        {"id": "sub_2", "document_type": "receipt", "case_type": "generic"},
+    ]},
+]
+
+
+def _response(request, target_object_id=None) -> ExtractionResponse:
+    return ExtractionResponse(
+        document_id=request.document_ids[0],
+        document_type=request.document_type,
+        case_type=request.case_type,
+        extraction_mode="referenced",
+        results={},
+        model_used="m",
+        reference_granularity="full",
+        target_object_id=target_object_id,
+        llm_calls=2,
+    )
+
+
+def _job(*units: ExtractionUnit, **request) -> CaseExtractionJob:
+    request = CaseExtractionRequest(case_id="case_1", **request)
+    return CaseExtractionJob(
+        case_id="case_1", config_hash=case_job_hash(request, "insurance", list(units)), request=request,
+        units=list(units), total_units=len(units),
+    )
+
+
+def _unit(document_id: str, status=ExtractionJobStatus.PENDING, **kwargs) -> ExtractionUnit:
+    return ExtractionUnit(document_id=document_id, document_type="generic", status=status, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def configs():
+    """Extraction configs hashed by their case/document type and fields."""
+    with patch("mydocs.extracting.case_job.extraction_config_hash",
+               side_effect=lambda case_type, document_type, fields: f"{case_type}/{document_type}/{fields}") as hashed:
+        yield hashed
+
+
+@pytest.fixture
+def loaded_case():
+    """A case of three documents; patch CaseExtractionJob.aget to provide a checkpoint."""
+    with patch("mydocs.extracting.case_job.Case.aget", AsyncMock(return_value=_case("doc_a", "doc_b", "doc_c"))), \
+            patch("mydocs.extracting.case_job.Document.aaggregate",
+                  AsyncMock(return_value=[{"_id": "doc_a"}, {"_id": "doc_b"}, {"_id": "doc_c"}])):
+        yield
+
+
+@pytest.fixture
+def saves():
+    with patch.object(CaseExtractionJob, "asave", AsyncMock(return_value="job")) as asave:
+        yield asave
+
+
+# ---------------------------------------------------------------------------
+# Tests: job identity and units
+# ---------------------------------------------------------------------------
+
+class TestCaseJobHash:
+
+    UNITS = [_unit("doc_a")]
+
+    def test_execution_settings_do_not_change_the_job(self):
+        base = CaseExtractionRequest(case_id="case_1")
+        tuned = CaseExtractionRequest(
+            case_id="case_1", document_concurrency=16, use_llm_cache=False, restart=True, resume=True,
+        )
+        assert case_job_hash(base, "insurance", self.UNITS) == case_job_hash(tuned, "insurance", self.UNITS)
+
+    def test_result_settings_change_the_job(self):
+        base = case_job_hash(CaseExtractionRequest(case_id="case_1"), "insurance", self.UNITS)
+        assert base != case_job_hash(CaseExtractionRequest(case_id="case_1", fields=["total"]), "insurance", self.UNITS)
+        assert base != case_job_hash(CaseExtractionRequest(case_id="case_1", subdocuments=True), "insurance", self.UNITS)
+
+    def test_configs_of_every_unit_type(self, configs):
+        request = CaseExtractionRequest(case_id="case_1", fields=["total"])
+        units = [
+            _unit("doc_a"),
+            ExtractionUnit(document_id="doc_b", subdocument_id="s1", document_type="invoice", case_type="generic"),
+            _unit("doc_c"),
+        ]
+        base = case_job_hash(request, "insurance", units)
+
+        assert sorted(call.args for call in configs.call_args_list) == [
+            ("generic", "invoice", ["total"]), ("insurance", "generic", ["total"]),
+        ]
+        configs.side_effect = lambda case_type, document_type, fields: "edited"
+        assert case_job_hash(request, "insurance", units) != base
+
+
+class TestExtractionConfigHash:
+
+    FIELDS = [
+        FieldDefinition(name="total", description="Total", group=1),
+        FieldDefinition(name="date", description="Date", group=2),
+    ]
+
+    def _hash(self, fields=None, prompt=None, **field_changes):
+        definitions = [field.model_copy(update=field_changes) if field.name == "total" else field for field in self.FIELDS]
+        prompt = prompt or (lambda case_type, document_type, group: PromptConfig(
+            name=f"g{group}", sys_prompt_template="sys", user_prompt_template="{fields}\n{context}", model="m",
+        ))
+        with patch("mydocs.extracting.case_job.get_all_fields", return_value=definitions), \
+                patch("mydocs.extracting.case_job.get_prompt", side_effect=prompt) as get_prompt:
+            return extraction_config_hash("insurance", "invoice", fields), get_prompt
+
+    def test_fields_and_prompts(self):
+        base, get_prompt = self._hash()
+        assert [call.args[2] for call in get_prompt.call_args_list] == [1, 2]
+
+        assert self._hash(description="Grand total")[0] != base
+        assert self._hash(prompt=lambda case_type, document_type, group: PromptConfig(
+            name="other", sys_prompt_template="sys", user_prompt_template="{fields}\n{context}", model="m",
+        ))[0] != base
+
+        only_date, get_prompt = self._hash(fields=["date"])
+        assert only_date == self._hash(fields=["date"], description="Grand total")[0]
+        assert [call.args[2] for call in get_prompt.call_args_list] == [2]
+
+    def test_missing_prompt(self):
+        def missing(case_type, document_type, group):
+            raise ConfigNotFoundError("no prompts")
+
+        assert self._hash(prompt=missing)[0] != self._hash()[0]
+
+
+class TestBuildUnits:
+
+    @pytest.mark.asyncio
+    async def test_documents_and_subdocuments(self):
+        case = _case("doc_a", "doc_missing", "doc_b")
+        with patch("mydocs.extracting.case_job.Document.aaggregate", AsyncMock(return_value=RAW_DOCUMENTS)) as agg:
+            whole = await build_units(case, CaseExtractionRequest(case_id="case_1"))
+            split = await build_units(case, CaseExtractionRequest(case_id="case_1", subdocuments=True))
+
+        assert agg.await_args.args[0][0]["$match"]["_id"]["$in"] == ["doc_a", "doc_missing", "doc_b"]
+        assert [(u.document_id, u.subdocument_id, u.document_type) for u in whole] == [
+            ("doc_a", "", "generic"), ("doc_b", "", "generic"),
+        ]
+        assert [(u.document_id, u.subdocument_id, u.document_type, u.case_type) for u in split] == [
+            ("doc_a", "", "generic", ""), ("doc_b", "sub_1", "invoice", "insurance"),
+            ("doc_b", "sub_2", "receipt", "generic"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_selected_subdocuments(self):
+        case = _case("doc_a", "doc_b")
+        request = CaseExtractionRequest(case_id="case_1", subdocument_ids=["sub_2"])
+        with patch("mydocs.extracting.case_job.Document.aaggregate", AsyncMock(return_value=RAW_DOCUMENTS)):
+            units = await build_units(case, request)
+
+        assert [(u.document_id, u.subdocument_id) for u in units] == [("doc_b", "sub_2")]
+
+
+# ---------------------------------------------------------------------------
+# Tests: prepare_case_job
+# ---------------------------------------------------------------------------
+
+class TestPrepareCaseJob:
+
+    @pytest.mark.asyncio
+    async def test_resumes_completed_units(self, saves, loaded_case):
+        checkpoint = _job(
+            _unit("doc_a", ExtractionJobStatus.COMPLETED, target_object_id="t1"),
+            _unit("doc_b", ExtractionJobStatus.FAILED, error="boom"),
+        )
+        checkpoint.status = ExtractionJobStatus.FAILED
+        with patch.object(CaseExtractionJob, "aget", AsyncMock(return_value=checkpoint)) as aget:
+            job = await prepare_case_job(CaseExtractionRequest(case_id="case_1", document_concurrency=8))
+
+        assert aget.await_args.args[0] == checkpoint.id
+        assert [(u.document_id, u.status) for u in job.units] == [
+            ("doc_a", ExtractionJobStatus.COMPLETED),
+            ("doc_b", ExtractionJobStatus.PENDING),
+            ("doc_c", ExtractionJobStatus.PENDING),
+        ]
+        assert job.units[1].error is None
+        assert (job.status, job.total_units, job.completed_units, job.failed_units) == (
+            ExtractionJobStatus.PENDING, 3, 1, 0,
+        )
+        assert job.request.document_concurrency == 8
+        saves.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_restart_ignores_checkpoint(self, saves):
+        with patch("mydocs.extracting.case_job.Case.aget", AsyncMock(return_value=_case("doc_a"))), \
+                patch("mydocs.extracting.case_job.Document.aaggregate", AsyncMock(return_value=[{"_id": "doc_a"}])), \
+                patch.object(CaseExtractionJob, "aget", AsyncMock()) as aget:
+            job = await prepare_case_job(CaseExtractionRequest(case_id="case_1", restart=True))
+
+        aget.assert_not_awaited()
+        assert job.id == _job(_unit("doc_a")).id
+        assert job.id == generate_composite_id(["case_1", job.config_hash])
+        assert job.case_type == "insurance"
+
+    @pytest.mark.asyncio
+    async def test_completed_job_runs_again(self, saves, loaded_case):
+        checkpoint = _job(*(_unit(doc_id, ExtractionJobStatus.COMPLETED) for doc_id in ("doc_a", "doc_b", "doc_c")))
+        checkpoint.status = ExtractionJobStatus.COMPLETED
+        with patch.object(CaseExtractionJob, "aget", AsyncMock(return_value=checkpoint)):
+            job = await prepare_case_job(CaseExtractionRequest(case_id="case_1"))
+
+        assert job.id == checkpoint.id
+        assert [u.status for u in job.units] == [ExtractionJobStatus.PENDING] * 3
+        assert job.completed_units == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_completed_job(self, saves, loaded_case):
+        checkpoint = _job(_unit("doc_a", ExtractionJobStatus.COMPLETED), _unit("doc_b", ExtractionJobStatus.COMPLETED))
+        checkpoint.status = ExtractionJobStatus.COMPLETED
+        with patch.object(CaseExtractionJob, "aget", AsyncMock(return_value=checkpoint)):
+            job = await prepare_case_job(CaseExtractionRequest(case_id="case_1", resume=True))
+
+        assert [u.status for u in job.units] == [
+            ExtractionJobStatus.COMPLETED, ExtractionJobStatus.COMPLETED, ExtractionJobStatus.PENDING,
+        ]
+        assert job.status == ExtractionJobStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_case_not_found(self, saves):
+        with patch("mydocs.extracting.case_job.Case.aget", AsyncMock(return_value=None)):
+            with pytest.raises(CaseNotFoundError, match="case_1"):
+                await prepare_case_job(CaseExtractionRequest(case_id="case_1"))
+
+    @pytest.mark.asyncio
+    async def test_no_documents(self, saves):
+        with patch("mydocs.extracting.case_job.Case.aget", AsyncMock(return_value=_case())):
+            with pytest.raises(NoDocumentsFoundError):
+                await prepare_case_job(CaseExtractionRequest(case_id="case_1"))
+
+
+# ---------------------------------------------------------------------------
+# Tests: run_case_job
+# ---------------------------------------------------------------------------
+
+class TestRunCaseJob:
+
+    @pytest.mark.asyncio
+    async def test_runs_pending_units_and_collects_target_objects(self, saves):
+        job = _job(
+            ExtractionUnit(document_id="doc_a", document_type="generic",
+                           status=ExtractionJobStatus.COMPLETED, target_object_id="t_a"),
+            ExtractionUnit(document_id="doc_b", subdocument_id="sub_1", document_type="invoice"),
+            ExtractionUnit(document_id="doc_c", document_type="generic"),
+        )
+        requests = []
+
+        def extractor(request):
+            requests.append(request)
+            return MagicMock(run=AsyncMock(return_value=_response(request, f"t_{request.document_ids[0][-1]}")))
+
+        progress = MagicMock()
+        with patch("mydocs.extracting.case_job.BaseExtractor", side_effect=extractor):
+            job = await run_case_job(job, progress=progress)
+
+        assert [(r.document_ids, r.subdocument_id, r.document_type) for r in requests] == [
+            (["doc_b"], "sub_1", "invoice"), (["doc_c"], None, "generic"),
+        ]
+        assert job.status == ExtractionJobStatus.COMPLETED
+        assert job.completed_units == 3
+        assert job.target_objects == {"generic": ["t_a", "t_c"], "invoice": ["t_b"]}
+        assert progress.call_count == 2
+        assert saves.await_count == 4  # start, one checkpoint per unit, finish
+
+    @pytest.mark.asyncio
+    async def test_failed_unit_does_not_stop_the_others(self, saves):
+        job = _job(
+            ExtractionUnit(document_id="doc_a", document_type="generic"),
+            ExtractionUnit(document_id="doc_b", document_type="generic"),
+        )
+
+        def extractor(request):
+            if request.document_ids == ["doc_a"]:
+                return MagicMock(run=AsyncMock(side_effect=RuntimeError("llm down")))
+            return MagicMock(run=AsyncMock(return_value=_response(request)))
+
+        with patch("mydocs.extracting.case_job.BaseExtractor", side_effect=extractor):
+            job = await run_case_job(job)
+
+        assert job.status == ExtractionJobStatus.FAILED
+        assert [(u.status, u.error) for u in job.units] == [
+            (ExtractionJobStatus.FAILED, "llm down"), (ExtractionJobStatus.COMPLETED, None),
+        ]
+        assert (job.completed_units, job.failed_units) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, saves):
+        job = _job(
+            *(ExtractionUnit(document_id=f"doc_{i}", document_type="generic") for i in range(6)),
+            document_concurrency=2,
+        )
+        running = peak = 0
+
+        async def run(request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return _response(request)
+
+        def extractor(request):
+            return MagicMock(run=lambda: run(request))
+
+        with patch("mydocs.extracting.case_job.BaseExtractor", side_effect=extractor):
+            job = await run_case_job(job)
+
+        assert peak == 2
+        assert job.completed_units == 6
+
+
+# ---------------------------------------------------------------------------
+# Tests: start_case_job
+# ---------------------------------------------------------------------------
+
+class TestStartCaseJob:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_starts_run_once(self):
+        release = asyncio.Event()
+
+        async def prepare(request):
+            await asyncio.sleep(0)
+            return _job(_unit("doc_a"))
+
+        async def run(job):
+            await release.wait()
+            return job
+
+        request = CaseExtractionRequest(case_id="case_1")
+        with patch("mydocs.extracting.case_job.prepare_case_job", AsyncMock(side_effect=prepare)) as prepare_job, \
+                patch("mydocs.extracting.case_job.run_case_job", side_effect=run) as run_job:
+            first, second = await asyncio.gather(start_case_job(request), start_case_job(request))
+            assert first is second
+            assert prepare_job.await_count == 1
+            assert run_job.call_count == 1
+
+            release.set()
+            await asyncio.sleep(0)
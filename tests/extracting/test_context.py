@@ -0,0 +1,138 @@
+"""Tests for mydocs.extracting.context token-budgeted context packing."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from lightodm import generate_composite_id
+
+from mydocs.extracting.context import (
+    MARKER_RESERVE_TOKENS,
+    build_context,
+    expand_adjacent_pages,
+    get_context,
+    pack_pages,
+)
+from mydocs.models import DocumentPage
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _page(document_id: str, page_number: int, words: int) -> DocumentPage:
+    page = DocumentPage(
+        document_id=document_id,
+        page_number=page_number,
+        content_markdown=" ".join(f"w{i}" for i in range(words)),
+    )
+    page.id = generate_composite_id([document_id, page_number])
+    return page
+
+
+def _word_count(text: str, model: str) -> int:
+    return len(text.split())
+
+
+def _truncate_words(text: str, max_tokens: int, model: str) -> str:
+    return " ".join(text.split()[:max_tokens])
+
+
+@pytest.fixture
+def word_tokens():
+    with patch("mydocs.extracting.context.count_tokens", side_effect=_word_count), \
+            patch("mydocs.extracting.context._truncate_to_tokens", side_effect=_truncate_words):
+        yield
+
+
+# ---------------------------------------------------------------------------
+# Tests: pack_pages
+# ---------------------------------------------------------------------------
+
+class TestPackPages:
+
+    def test_everything_fits(self, word_tokens):
+        pages = [_page("doc_a", 1, 50), _page("doc_a", 2, 50)]
+        selected, stats = pack_pages(pages, 1000, "m")
+
+        assert selected == pages
+        assert (stats.pages_included, stats.pages_dropped, stats.tokens_dropped) == (2, 0, 0)
+        assert stats.tokens_total == stats.tokens_included == 100
+
+    def test_priority_order_and_skip_to_smaller_page(self, word_tokens):
+        # "# Document d1" and "## Page N" headers cost 3 words each
+        pages = [_page("doc_a", 3, 100), _page("doc_a", 1, 60), _page("doc_a", 2, 20)]
+        budget = MARKER_RESERVE_TOKENS + 6 + 100 + 3 + 20 + 6
+        selected, stats = pack_pages(pages, budget, "m")
+
+        assert [p.page_number for p in selected] == [3, 2]
+        assert (stats.pages_dropped, stats.pages_truncated, stats.tokens_dropped) == (1, 0, 60)
+
+    def test_truncates_page_that_does_not_fit(self, word_tokens):
+        pages = [_page("doc_a", 1, 1000)]
+        selected, stats = pack_pages(pages, MARKER_RESERVE_TOKENS + 500, "m")
+
+        assert stats.pages_truncated == 1 and stats.pages_dropped == 0
+        content = selected[0].content_markdown
+        assert content.endswith("tokens omitted ...]")
+        assert "of 1000 tokens omitted" in content
+        assert stats.tokens_included + stats.tokens_dropped == 1000
+        assert pages[0].content_markdown.count(" ") == 999  # original page untouched
+
+    def test_drops_when_too_little_budget_left(self, word_tokens):
+        pages = [_page("doc_a", 1, 100), _page("doc_a", 2, 1000)]
+        selected, stats = pack_pages(pages, MARKER_RESERVE_TOKENS + 150, "m")
+
+        assert [p.page_number for p in selected] == [1]
+        assert (stats.pages_dropped, stats.pages_truncated) == (1, 0)
+
+    def test_deterministic(self, word_tokens):
+        pages = [_page("doc_a", n, 300) for n in range(1, 6)]
+        assert pack_pages(pages, 1000, "m")[0] == pack_pages(list(pages), 1000, "m")[0]
+
+
+# ---------------------------------------------------------------------------
+# Tests: expand_adjacent_pages
+# ---------------------------------------------------------------------------
+
+class TestExpandAdjacentPages:
+
+    @pytest.mark.asyncio
+    async def test_neighbours_follow_their_anchor(self):
+        anchor_a, anchor_b = _page("doc_a", 5, 10), _page("doc_a", 1, 10)
+        fetched = [_page("doc_a", 4, 10), _page("doc_a", 6, 10), _page("doc_a", 2, 10)]
+        with patch("mydocs.extracting.context.DocumentPage.afind", AsyncMock(return_value=fetched)) as afind:
+            expanded = await expand_adjacent_pages([anchor_a, anchor_b], 1)
+
+        assert afind.await_count == 1
+        query_ids = afind.await_args.args[0]["_id"]["$in"]
+        assert generate_composite_id(["doc_a", 0]) not in query_ids
+        assert [p.page_number for p in expanded] == [5, 4, 6, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        pages = [_page("doc_a", 1, 10)]
+        assert await expand_adjacent_pages(pages, 0) is pages
+
+
+# ---------------------------------------------------------------------------
+# Tests: build_context
+# ---------------------------------------------------------------------------
+
+class TestBuildContext:
+
+    @pytest.mark.asyncio
+    async def test_unbounded_matches_get_context(self):
+        pages = [_page("doc_b", 2, 10), _page("doc_a", 1, 10)]
+        context, doc_map, stats = await build_context(pages)
+
+        assert (context, doc_map) == get_context(pages)
+        assert (stats.pages_included, stats.tokens_total) == (2, 0)
+
+    @pytest.mark.asyncio
+    async def test_marker_for_omitted_pages(self, word_tokens):
+        pages = [_page("doc_a", 1, 100), _page("doc_b", 1, 1000)]
+        context, doc_map, stats = await build_context(pages, model="m", max_tokens=MARKER_RESERVE_TOKENS + 150)
+
+        assert doc_map == {"1": "doc_a"}
+        assert context.endswith("[1 of 2 retrieved pages omitted to fit the context budget]\n")
+        assert stats.pages_dropped == 1
@@ -0,0 +1,207 @@
+"""Tests for mydocs.extracting.enrichment reference resolution."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from lightodm import generate_composite_id
+
+from mydocs.extracting.enrichment import ReferenceResolver, enrich_field_results, fetch_document_elements
+from mydocs.extracting.models import LLMFieldItem, ReferenceGranularity
+from mydocs.models import DocumentElementTypeEnum
+from mydocs.parsing.geometry import build_element_geometry
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _poly(x0: float, y0: float, x1: float, y1: float) -> list[float]:
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+def _element(page_number: int, short_id: str, element_data: dict, type_: str = "paragraph", geometry=None) -> dict:
+    return {
+        "page_number": page_number, "short_id": short_id, "type": type_,
+        "geometry": geometry.model_dump() if geometry else None, "element_data": element_data,
+    }
+
+
+def _table() -> dict:
+    return {"boundingRegions": [{"pageNumber": 2, "polygon": _poly(0, 0, 6, 6)}], "cells": [
+        {"rowIndex": 0, "boundingRegions": [{"polygon": _poly(0, 0, 1, 1)}]},
+        {"rowIndex": 0, "boundingRegions": [{"polygon": _poly(1, 0, 2, 1)}]},
+        {"rowIndex": 1, "boundingRegions": [{"polygon": _poly(0, 1, 2, 2)}]},
+        {"boundingRegions": [{"polygon": _poly(5, 5, 6, 6)}]},
+    ]}
+
+
+def _page(doc_id: str, page_number: int) -> dict:
+    return {
+        "_id": generate_composite_id([doc_id, page_number]), "document_id": doc_id,
+        "page_number": page_number, "width": 8.5, "height": 11.0, "unit": "inch",
+    }
+
+
+@pytest.fixture
+def patched_db():
+    document = {"_id": "doc_a", "elements": [
+        _element(1, "p1", {"boundingRegions": [{"polygon": _poly(1, 1, 2, 2)}]}),
+        _element(2, "p1", {"boundingRegions": [{"polygon": _poly(3, 3, 4, 4)}]}),
+        _element(2, "t1", _table(), "table"),
+    ]}
+    with patch("mydocs.extracting.enrichment.Document.aaggregate", AsyncMock(return_value=[document])) as doc_aggregate, \
+            patch("mydocs.extracting.enrichment.DocumentPage.aaggregate",
+                  AsyncMock(return_value=[_page("doc_a", 1), _page("doc_a", 2)])) as aggregate:
+        yield doc_aggregate, aggregate
+
+
+# ---------------------------------------------------------------------------
+# Tests: fetch_document_elements
+# ---------------------------------------------------------------------------
+
+class TestFetchDocumentElements:
+
+    @pytest.mark.asyncio
+    async def test_projects_referenced_elements(self, patched_db):
+        doc_aggregate, _ = patched_db
+        elements = await fetch_document_elements({("doc_a", 2, "t1"), ("doc_a", 1, "p1"), ("doc_b", 1, "p0")})
+
+        pipeline = doc_aggregate.await_args.args[0]
+        assert pipeline[0] == {"$match": {"_id": {"$in": ["doc_a", "doc_b"]}}}
+        projection = pipeline[1]["$project"]
+        assert set(projection) == {"_id", "elements"}
+        cond = projection["elements"]["$map"]["input"]["$filter"]["cond"]
+        assert cond["$in"][1] == ["doc_a:1:p1", "doc_a:2:t1", "doc_b:1:p0"]
+        assert set(projection["elements"]["$map"]["in"]) == {
+            "page_number", "short_id", "type", "geometry", "element_data",
+        }
+
+        assert list(elements) == ["doc_a"]
+        assert [(e.page_number, e.short_id) for e in elements["doc_a"]] == [(1, "p1"), (2, "p1"), (2, "t1")]
+        assert elements["doc_a"][2].type == DocumentElementTypeEnum.TABLE
+
+    @pytest.mark.asyncio
+    async def test_no_references(self, patched_db):
+        doc_aggregate, _ = patched_db
+        assert await fetch_document_elements(set()) == {}
+        doc_aggregate.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Tests: ReferenceResolver
+# ---------------------------------------------------------------------------
+
+class TestReferenceResolver:
+
+    @pytest.mark.asyncio
+    async def test_prefetches_once(self, patched_db):
+        doc_aggregate, aggregate = patched_db
+        refs = ["d1:1:p1", "d1:2:p1", "d1:2:t1:1", "d1:2:t1:0"]
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, refs, ReferenceGranularity.FULL)
+        resolved = [resolver.resolve(ref) for ref in refs]
+
+        assert doc_aggregate.await_count == 1
+        assert aggregate.await_count == 1
+        match = aggregate.await_args.args[0][0]["$match"]["_id"]["$in"]
+        assert sorted(match) == sorted(generate_composite_id(["doc_a", n]) for n in (1, 2))
+
+        assert resolved[0].polygon == _poly(1, 1, 2, 2)
+        assert resolved[1].polygon == _poly(3, 3, 4, 4)  # short_id is per page
+        assert resolved[2].polygon == _poly(0, 1, 2, 2)
+        assert resolved[3].polygon == _poly(0, 0, 2, 1)
+        assert resolved[1].page_id == generate_composite_id(["doc_a", 2])
+        assert resolved[1].page_width == 8.5
+
+    @pytest.mark.asyncio
+    async def test_uses_precomputed_geometry(self, patched_db):
+        doc_aggregate, _ = patched_db
+        geometry = build_element_geometry(_table(), DocumentElementTypeEnum.TABLE, 2)
+        geometry.rows[1] = _poly(7, 7, 8, 8)
+        document = {"_id": "doc_a", "elements": [_element(2, "t1", {}, "table", geometry)]}
+        doc_aggregate.return_value = [document]
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, ["d1:2:t1:1", "d1:2:t1"], ReferenceGranularity.FULL)
+
+        assert resolver.resolve("d1:2:t1:1").polygon == _poly(7, 7, 8, 8)
+        assert resolver.resolve("d1:2:t1").polygon == _poly(0, 0, 6, 6)
+
+    @staticmethod
+    def _multi_page_table() -> dict:
+        table = _table()
+        table["rowCount"] = 3
+        table["boundingRegions"].append({"pageNumber": 3, "polygon": _poly(0, 0, 6, 2)})
+        table["cells"].append({"rowIndex": 2, "boundingRegions": [{"pageNumber": 3, "polygon": _poly(1, 0, 5, 1)}]})
+        return table
+
+    @pytest.mark.asyncio
+    async def test_multi_page_table_row_on_its_page(self, patched_db):
+        doc_aggregate, aggregate = patched_db
+        geometry = build_element_geometry(self._multi_page_table(), DocumentElementTypeEnum.TABLE, 2)
+        doc_aggregate.return_value = [{"_id": "doc_a", "elements": [_element(2, "t1", {}, "table", geometry)]}]
+        aggregate.return_value = [_page("doc_a", 2), _page("doc_a", 3)]
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, ["d1:2:t1:2", "d1:2:t1:9"], ReferenceGranularity.FULL)
+
+        match = aggregate.await_args.args[0][0]["$match"]["_id"]["$in"]
+        assert sorted(match) == sorted(generate_composite_id(["doc_a", n]) for n in (2, 3))
+        row = resolver.resolve("d1:2:t1:2")
+        assert (row.page_number, row.page_id, row.polygon) == (3, generate_composite_id(["doc_a", 3]), _poly(1, 0, 5, 1))
+        missing = resolver.resolve("d1:2:t1:9")
+        assert (missing.page_number, missing.polygon) == (2, _poly(0, 0, 6, 6))
+
+    @pytest.mark.asyncio
+    async def test_multi_page_table_row_without_stored_row_pages(self, patched_db):
+        doc_aggregate, _ = patched_db
+        table = self._multi_page_table()
+        geometry = build_element_geometry(table, DocumentElementTypeEnum.TABLE, 2)
+        geometry.rows[2] = []
+        geometry.row_pages = []  # parsed before row pages were stored: element_data is loaded
+        doc_aggregate.return_value = [{"_id": "doc_a", "elements": [_element(2, "t1", table, "table", geometry)]}]
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, ["d1:2:t1:2", "d1:2:t1:1"], ReferenceGranularity.FULL)
+
+        row = resolver.resolve("d1:2:t1:2")
+        assert (row.page_number, row.polygon) == (3, _poly(1, 0, 5, 1))
+        assert resolver.resolve("d1:2:t1:1").polygon == _poly(0, 1, 2, 2)
+
+    @pytest.mark.asyncio
+    async def test_unresolvable_references(self, patched_db):
+        refs = ["d1:1:p9", "d2:1:p1", "garbage"]
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, refs, ReferenceGranularity.FULL)
+        assert [resolver.resolve(ref) for ref in refs] == [None, None, None]
+
+    @pytest.mark.asyncio
+    async def test_missing_page_defaults(self, patched_db):
+        _, aggregate = patched_db
+        aggregate.return_value = []
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, ["d1:1:p1"], ReferenceGranularity.FULL)
+
+        ref = resolver.resolve("d1:1:p1")
+        assert (ref.page_id, ref.page_width, ref.page_unit) == ("", 0.0, "inch")
+        assert resolver.resolve_page("d1:1:p1") is None
+
+    @pytest.mark.asyncio
+    async def test_page_granularity_skips_documents(self, patched_db):
+        doc_aggregate, _ = patched_db
+        resolver = await ReferenceResolver.create({"1": "doc_a"}, ["d1:2:p1"], ReferenceGranularity.PAGE)
+
+        doc_aggregate.assert_not_awaited()
+        page_ref = resolver.resolve_page("d1:2:p1")
+        assert (page_ref.document_id, page_ref.page_number) == ("doc_a", 2)
+
+
+# ---------------------------------------------------------------------------
+# Tests: enrich_field_results
+# ---------------------------------------------------------------------------
+
+class TestEnrichFieldResults:
+
+    @pytest.mark.asyncio
+    async def test_page_references_deduplicated(self, patched_db):
+        _, aggregate = patched_db
+        items = [
+            LLMFieldItem(name="a", content="x", justification="", citation="", references=["d1:1:p1", "d1:1:p2"]),
+            LLMFieldItem(name="b", content="y", justification="", citation="", references=["d1:2:p1"]),
+        ]
+        results = await enrich_field_results(items, {"1": "doc_a"}, ReferenceGranularity.PAGE, "m")
+
+        assert aggregate.await_count == 1
+        assert [r.page_number for r in results["a"].page_references] == [1]
+        assert [r.page_number for r in results["b"].page_references] == [2]
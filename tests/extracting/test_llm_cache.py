@@ -0,0 +1,144 @@
+"""Tests for mydocs.extracting.llm_cache."""
+
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mydocs.extracting import llm_cache as llm_cache_module
+from mydocs.extracting.llm_cache import LLMResponseCache, cached_acompletion, llm_cache_key
+from mydocs.extracting.models import LLMFieldsResult, LLMSplitClassifyBatchResult
+from mydocs.parsing.cache import LocalCacheStore
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "pages"}]
+CONTENT = '{"result": [{"document_type": "invoice", "page_numbers": [1, 2]}]}'
+
+
+def _llm_response(content: str) -> MagicMock:
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(LocalCacheStore(), str(tmp_path / "llm"), ttl_seconds=60, max_entries=100)
+    with patch.object(llm_cache_module, "get_llm_cache", return_value=cache):
+        yield cache
+
+
+# ---------------------------------------------------------------------------
+# Tests: llm_cache_key
+# ---------------------------------------------------------------------------
+
+class TestCacheKey:
+
+    def test_stable_and_order_independent(self):
+        first = llm_cache_key("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, {"temperature": 0, "seed": 1})
+        second = llm_cache_key("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, {"seed": 1, "temperature": 0})
+        assert first == second
+
+    def test_every_input_changes_key(self):
+        base = llm_cache_key("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, {})
+        assert llm_cache_key("gpt-4.1-mini", MESSAGES, LLMSplitClassifyBatchResult, {}) != base
+        assert llm_cache_key("gpt-4.1", MESSAGES[:1], LLMSplitClassifyBatchResult, {}) != base
+        assert llm_cache_key("gpt-4.1", MESSAGES, LLMFieldsResult, {}) != base
+        assert llm_cache_key("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, {"temperature": 0.2}) != base
+
+
+# ---------------------------------------------------------------------------
+# Tests: cached_acompletion
+# ---------------------------------------------------------------------------
+
+class TestCachedCompletion:
+
+    @pytest.mark.asyncio
+    async def test_second_call_served_from_cache(self, cache):
+        acompletion = AsyncMock(return_value=_llm_response(CONTENT))
+        with patch.object(llm_cache_module.litellm, "acompletion", acompletion):
+            first, first_cached = await cached_acompletion("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3)
+            second, second_cached = await cached_acompletion("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3)
+
+        assert acompletion.await_count == 1
+        assert (first_cached, second_cached) == (False, True)
+        assert second == first
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1 and cache.stats()["writes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bypass_skips_cache(self, cache):
+        acompletion = AsyncMock(return_value=_llm_response(CONTENT))
+        with patch.object(llm_cache_module.litellm, "acompletion", acompletion):
+            await cached_acompletion("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3)
+            _, cached = await cached_acompletion(
+                "gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3, use_cache=False,
+            )
+
+        assert cached is False
+        assert acompletion.await_count == 2
+        assert cache.stats()["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_response_not_cached(self, cache):
+        acompletion = AsyncMock(return_value=_llm_response('{"result": "nope"}'))
+        with patch.object(llm_cache_module.litellm, "acompletion", acompletion):
+            with pytest.raises(ValueError):
+                await cached_acompletion("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3)
+
+        assert cache.writes == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_calls_llm(self):
+        acompletion = AsyncMock(return_value=_llm_response(CONTENT))
+        with patch.object(llm_cache_module, "get_llm_cache", return_value=None), \
+                patch.object(llm_cache_module.litellm, "acompletion", acompletion):
+            _, cached = await cached_acompletion("gpt-4.1", MESSAGES, LLMSplitClassifyBatchResult, 3)
+
+        assert cached is False
+        assert acompletion.await_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Tests: TTL and size bounds
+# ---------------------------------------------------------------------------
+
+class TestBounds:
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_a_miss(self, cache):
+        await cache.put("ab12", CONTENT, "gpt-4.1")
+        with patch.object(llm_cache_module.time, "time", return_value=time.time() + 120):
+            assert await cache.get("ab12") is None
+
+        assert cache.expired == 1
+        assert not os.path.exists(cache._path("ab12"))
+
+    @pytest.mark.asyncio
+    async def test_prune_keeps_newest_entries(self, tmp_path):
+        cache = LLMResponseCache(LocalCacheStore(), str(tmp_path / "llm"), ttl_seconds=3600, max_entries=2)
+        for i, key in enumerate(["aa01", "bb02", "cc03"]):
+            await cache.store.write_json(cache._path(key), {"content": CONTENT, "created_at": time.time()})
+            os.utime(cache._path(key), (1_000_000 + i, 1_000_000 + i))
+
+        with patch.object(llm_cache_module.time, "time", return_value=1_000_100):
+            removed = await cache.prune()
+
+        assert removed == 1
+        assert not os.path.exists(cache._path("aa01"))
+        assert os.path.exists(cache._path("cc03"))
+
+    @pytest.mark.asyncio
+    async def test_failed_prune_does_not_fail_put(self, tmp_path):
+        cache = LLMResponseCache(LocalCacheStore(), str(tmp_path / "llm"), ttl_seconds=3600, max_entries=1)
+        with patch.object(cache.store, "list_entries", AsyncMock(side_effect=OSError("network down"))) as list_entries:
+            await cache.put("ab12", CONTENT, "gpt-4.1")
+
+        list_entries.assert_awaited_once()
+        assert cache.writes == 1
+        assert await cache.get("ab12") == CONTENT
@@ -0,0 +1,177 @@
+"""Tests for mydocs.extracting.map_reduce and map-reduce extraction."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from mydocs.extracting.context import chunk_pages
+from mydocs.extracting.exceptions import ExtractionError
+from mydocs.extracting.extractor import BaseExtractor
+from mydocs.extracting.map_reduce import (
+    apply_reduced,
+    build_reduce_prompt,
+    concat_results,
+    merge_field_items,
+)
+from mydocs.extracting.models import (
+    ExtractGroupState,
+    ExtractionRequest,
+    FieldPrompt,
+    LLMFieldItem,
+    LLMFieldsResult,
+    MapReduceMerge,
+    PromptConfig,
+    PromptInput,
+)
+from mydocs.models import DocumentPage
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _item(name: str, content: str, *references: str) -> LLMFieldItem:
+    return LLMFieldItem(
+        name=name, content=content, justification=f"j:{content}", citation=f"c:{content}", references=list(references),
+    )
+
+
+def _page(document_id: str, page_number: int, words: int = 10) -> DocumentPage:
+    page = DocumentPage(document_id=document_id, page_number=page_number, content_markdown="w " * words)
+    page.id = f"{document_id}-{page_number}"
+    return page
+
+
+def _prompt_config(**kwargs) -> PromptConfig:
+    return PromptConfig(
+        name="test", sys_prompt_template="sys", user_prompt_template="{fields}\n---\n{context}", model="m", **kwargs,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tests: merging
+# ---------------------------------------------------------------------------
+
+class TestMergeFieldItems:
+
+    def test_majority_wins_and_references_combine(self):
+        merged, conflicts = merge_field_items([
+            [_item("total", "100", "d1:1:p1"), _item("date", "")],
+            [_item("total", "250", "d1:5:p2"), _item("date", "2024-01-01", "d1:5:p3")],
+            [_item("total", " 250 ", "d1:9:p1"), _item("date", "N/A")],
+        ])
+
+        by_name = {item.name: item for item in merged}
+        assert by_name["total"].content == "250"
+        assert by_name["total"].references == ["d1:5:p2", "d1:9:p1"]
+        assert by_name["date"].content == "2024-01-01"
+        assert list(conflicts) == ["total"]
+        assert [c.content for c in conflicts["total"]] == ["100", "250", " 250 "]
+
+    def test_tie_goes_to_earliest_chunk(self):
+        merged, _ = merge_field_items([[_item("a", "x", "d1:1:p1")], [_item("a", "y", "d1:2:p1")]])
+        assert merged[0].content == "x"
+
+    def test_not_found_anywhere(self):
+        merged, conflicts = merge_field_items([[_item("a", "")], [_item("a", "none")]])
+        assert merged[0].content == "" and conflicts == {}
+
+    def test_apply_reduced_restricts_references(self):
+        merged, conflicts = merge_field_items([[_item("a", "x", "d1:1:p1")], [_item("a", "y", "d1:2:p1")]])
+        reduced = LLMFieldsResult(result=[_item("a", "y", "d1:2:p1", "d1:7:p7"), _item("b", "z")])
+
+        result = apply_reduced(merged, reduced, conflicts)
+        assert [(i.name, i.content, i.references) for i in result] == [("a", "y", ["d1:2:p1"])]
+
+    def test_reduce_prompt_lists_candidates(self):
+        _, conflicts = merge_field_items([[_item("a", "x", "d1:1:p1")], [_item("a", "y")]])
+        prompt = build_reduce_prompt("- **a**: field a", conflicts)
+        assert "### a" in prompt
+        assert "1. content: x" in prompt and "references: d1:1:p1" in prompt
+        assert "2. content: y" in prompt and "references: none" in prompt
+
+    def test_concat_results(self):
+        class Items(BaseModel):
+            result: list[int]
+
+        assert concat_results([Items(result=[1]), Items(result=[2, 3])], Items).result == [1, 2, 3]
+        with pytest.raises(ExtractionError):
+            concat_results([object()], Items)
+
+
+# ---------------------------------------------------------------------------
+# Tests: chunk_pages
+# ---------------------------------------------------------------------------
+
+class TestChunkPages:
+
+    def test_consecutive_chunks(self):
+        pages = [_page("doc_a", n, words) for n, words in enumerate([40, 40, 40, 200, 10], start=1)]
+        with patch("mydocs.extracting.context.count_tokens", side_effect=lambda text, model: len(text.split())):
+            chunks = chunk_pages(pages, 100, "m")
+
+        assert [[p.page_number for p in chunk] for chunk in chunks] == [[1, 2], [3], [4], [5]]
+
+
+# ---------------------------------------------------------------------------
+# Tests: BaseExtractor._run_map_reduce
+# ---------------------------------------------------------------------------
+
+class TestRunMapReduce:
+
+    def _group_state(self, **config) -> ExtractGroupState:
+        return ExtractGroupState(
+            group_id=0,
+            prompt_config=_prompt_config(**config),
+            prompt_input=PromptInput(field_prompts=[FieldPrompt(name="a", description="field a")]),
+        )
+
+    @pytest.mark.asyncio
+    async def test_chunks_share_document_ids(self):
+        extractor = BaseExtractor(ExtractionRequest(document_type="generic"))
+        chunks = [[_page("doc_a", 1), _page("doc_b", 1)], [_page("doc_b", 2)]]
+        prompts = []
+
+        async def call_llm(sys_prompt, user_prompt, prompt_config, output_schema):
+            prompts.append(user_prompt)
+            ref = "d1:1:p0" if "Page 1" in user_prompt else "d2:2:p0"
+            return LLMFieldsResult(result=[_item("a", "x", ref)])
+
+        with patch.object(extractor, "_call_llm", AsyncMock(side_effect=call_llm)):
+            result, doc_short_to_long = await extractor._run_map_reduce(
+                self._group_state(), chunks, "sys", "fields", LLMFieldsResult,
+            )
+
+        assert "# Document d2\n## Page 2" in prompts[1]
+        assert doc_short_to_long == {"1": "doc_a", "2": "doc_b"}
+        assert result.result[0].references == ["d1:1:p0", "d2:2:p0"]
+
+    @pytest.mark.asyncio
+    async def test_llm_reduce_for_conflicts(self):
+        extractor = BaseExtractor(ExtractionRequest(document_type="generic"))
+        chunks = [[_page("doc_a", 1)], [_page("doc_a", 2)]]
+        responses = [
+            LLMFieldsResult(result=[_item("a", "x", "d1:1:p0")]),
+            LLMFieldsResult(result=[_item("a", "y", "d1:2:p0")]),
+            LLMFieldsResult(result=[_item("a", "y", "d1:2:p0")]),
+        ]
+        call_llm = AsyncMock(side_effect=responses)
+        group_state = self._group_state(map_reduce_merge=MapReduceMerge.LLM)
+
+        with patch.object(extractor, "_call_llm", call_llm):
+            result, _ = await extractor._run_map_reduce(group_state, chunks, "sys", "fields", LLMFieldsResult)
+
+        assert call_llm.await_count == 3
+        assert "The document was too long" in call_llm.await_args.args[1]
+        assert result.result[0].content == "y"
+        assert group_state.map_reduce_chunks == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_propagates(self):
+        extractor = BaseExtractor(ExtractionRequest(document_type="generic"))
+        chunks = [[_page("doc_a", 1)], [_page("doc_a", 2)]]
+
+        with patch.object(extractor, "_call_llm", AsyncMock(side_effect=RuntimeError("boom"))):
+            with pytest.raises(RuntimeError, match="boom"):
+                await extractor._run_map_reduce(self._group_state(), chunks, "sys", "fields", LLMFieldsResult)
@@ -0,0 +1,45 @@
+"""Tests for mydocs.extracting.retrievers."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mydocs.extracting.models import RetrieverConfig, RetrieverFilter
+from mydocs.extracting.retrievers import get_fulltext_retriever
+from mydocs.retrieval.models import FuzzyConfig
+
+
+# ---------------------------------------------------------------------------
+# Tests: get_fulltext_retriever
+# ---------------------------------------------------------------------------
+
+class TestFulltextRetriever:
+
+    @pytest.mark.asyncio
+    async def test_local_backend_uses_fuzzy_options(self):
+        config = RetrieverConfig(
+            name="fulltext_retriever",
+            retriever_kwargs={"fuzzy": {"enabled": True, "max_edits": 1}},
+        )
+        index = MagicMock(search=MagicMock(return_value=[]))
+        retrieval_config = MagicMock(fulltext_backend="local")
+
+        with patch("mydocs.extracting.retrievers.RetrievalConfig", return_value=retrieval_config), \
+                patch("mydocs.retrieval.local.get_fulltext_index", return_value=index):
+            pages = await get_fulltext_retriever("invoice total", config, RetrieverFilter(document_ids=["doc_a"]))
+
+        assert pages == []
+        assert index.search.call_args.kwargs["fuzzy"] == FuzzyConfig(enabled=True, max_edits=1)
+        assert index.search.call_args.kwargs["document_ids"] == ["doc_a"]
+
+    @pytest.mark.asyncio
+    async def test_atlas_backend_uses_fuzzy_options(self):
+        config = RetrieverConfig(name="fulltext_retriever", retriever_kwargs={"fuzzy": {"enabled": True}})
+        retrieval_config = MagicMock(fulltext_backend="atlas")
+
+        with patch("mydocs.extracting.retrievers.RetrievalConfig", return_value=retrieval_config), \
+                patch("mydocs.extracting.retrievers.DocumentPage.aaggregate", AsyncMock(return_value=[])) as agg:
+            await get_fulltext_retriever("invoice total", config)
+
+        text_op = agg.await_args.args[0][0]["$search"]["compound"]["must"][0]["text"]
+        assert text_op["fuzzy"] == {"maxEdits": 2, "prefixLength": 3}
@@ -0,0 +1,156 @@
+"""Tests for mydocs.extracting.run_cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.extracting.context import build_context
+from mydocs.extracting.models import ContentMode, RetrieverConfig, RetrieverFilter
+from mydocs.extracting.run_cache import ExtractionRunCache, retrieval_key
+from mydocs.models import DocumentPage
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _page(document_id: str, page_number: int) -> DocumentPage:
+    page = DocumentPage(document_id=document_id, page_number=page_number, content_markdown=f"page {page_number}")
+    page.id = f"{document_id}-{page_number}"
+    return page
+
+
+def _slow_retriever(pages: list[DocumentPage]) -> AsyncMock:
+    async def retrieve(query, retriever_config, retriever_filter):
+        await asyncio.sleep(0.01)
+        return pages
+    return AsyncMock(side_effect=retrieve)
+
+
+DOC_FILTER = RetrieverFilter(document_ids=["doc_a"])
+
+
+# ---------------------------------------------------------------------------
+# Tests: retrieval_key
+# ---------------------------------------------------------------------------
+
+class TestRetrievalKey:
+
+    def test_query_ignored_for_query_independent_retrievers(self):
+        config = RetrieverConfig(name="document_pages_retriever")
+        assert retrieval_key("a", config, DOC_FILTER) == retrieval_key("b", config, DOC_FILTER)
+
+    def test_query_dependent(self):
+        config = RetrieverConfig(name="fulltext_retriever")
+        assert retrieval_key("a", config, DOC_FILTER) != retrieval_key("b", config, DOC_FILTER)
+
+    def test_config_and_filter(self):
+        config = RetrieverConfig(name="document_pages_retriever")
+        assert retrieval_key("a", config, DOC_FILTER) != retrieval_key("a", config, None)
+        assert retrieval_key("a", config, DOC_FILTER) != retrieval_key(
+            "a", RetrieverConfig(name="document_pages_retriever", top_k=3), DOC_FILTER,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Tests: ExtractionRunCache
+# ---------------------------------------------------------------------------
+
+class TestExtractionRunCache:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_groups_share_one_fetch(self):
+        cache = ExtractionRunCache()
+        pages = [_page("doc_a", 1), _page("doc_a", 2)]
+        retriever = _slow_retriever(pages)
+        config = RetrieverConfig(name="document_pages_retriever")
+
+        results = await asyncio.gather(*(
+            cache.get_pages(retriever, f"query {i}", config, DOC_FILTER) for i in range(3)
+        ))
+
+        assert retriever.await_count == 1
+        assert all(result == pages for result in results)
+        assert (cache.page_hits, cache.page_misses) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_distinct_retrievals_not_shared(self):
+        cache = ExtractionRunCache()
+        retriever = _slow_retriever([_page("doc_a", 1)])
+        config = RetrieverConfig(name="fulltext_retriever")
+
+        await cache.get_pages(retriever, "a", config, DOC_FILTER)
+        await cache.get_pages(retriever, "b", config, DOC_FILTER)
+
+        assert retriever.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_and_is_not_cached(self):
+        cache = ExtractionRunCache()
+        config = RetrieverConfig(name="pages_retriever")
+        pages = [_page("doc_a", 1)]
+        calls = 0
+
+        async def flaky(query, retriever_config, retriever_filter):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            if calls == 1:
+                raise RuntimeError("mongo down")
+            return pages
+
+        results = await asyncio.gather(
+            cache.get_pages(flaky, "q", config, DOC_FILTER),
+            cache.get_pages(flaky, "q", config, DOC_FILTER),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        assert await cache.get_pages(flaky, "q", config, DOC_FILTER) == pages
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_context_rendered_once(self):
+        cache = ExtractionRunCache()
+        pages = [_page("doc_a", 1), _page("doc_b", 1)]
+
+        with patch("mydocs.extracting.run_cache.build_context", wraps=build_context) as render:
+            first = await cache.get_context(pages, ContentMode.MARKDOWN)
+            second = await cache.get_context(list(pages), ContentMode.MARKDOWN)
+            await cache.get_context(pages, ContentMode.HTML)
+            await cache.get_context(pages[::-1], ContentMode.MARKDOWN)
+
+        assert render.call_count == 3
+        assert first == second
+        assert first[1] == {"1": "doc_a", "2": "doc_b"}
+        assert first[1] is not second[1]
+        assert cache.stats()["context_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_context_stats_counted_once_per_context(self):
+        cache = ExtractionRunCache()
+        pages = [_page("doc_a", n) for n in range(1, 4)]
+
+        with patch("mydocs.extracting.context.count_tokens", side_effect=lambda text, model: len(text.split())):
+            for _ in range(3):  # three groups sharing one packed context
+                _, _, stats = await cache.get_context(pages, ContentMode.MARKDOWN, model="m", max_tokens=10)
+            await cache.get_context(pages[:1], ContentMode.MARKDOWN)
+
+        assert stats.pages_dropped > 0
+        assert [s.pages_dropped for s in cache.context_stats()] == [stats.pages_dropped, 0]
+
+    @pytest.mark.asyncio
+    async def test_context_keyed_by_budget(self):
+        cache = ExtractionRunCache()
+        pages = [_page("doc_a", 1)]
+
+        with patch("mydocs.extracting.run_cache.build_context", wraps=build_context) as render, \
+                patch("mydocs.extracting.context.count_tokens", side_effect=lambda text, model: len(text.split())):
+            await cache.get_context(pages, ContentMode.MARKDOWN, model="m", max_tokens=1000)
+            await cache.get_context(pages, ContentMode.MARKDOWN, model="m", max_tokens=1000)
+            await cache.get_context(pages, ContentMode.MARKDOWN, model="m", max_tokens=2000)
+            await cache.get_context(pages, ContentMode.MARKDOWN, model="other")  # no budget: model irrelevant
+            await cache.get_context(pages, ContentMode.MARKDOWN)
+
+        assert render.call_count == 3
@@ -0,0 +1,146 @@
+"""Tests for mydocs.extracting.scheduler and in-memory field inputs."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.extracting.context import get_prompt_input
+from mydocs.extracting.exceptions import FieldConsistencyError
+from mydocs.extracting.models import (
+    FieldDefinition,
+    FieldRequirement,
+    FieldResult,
+    SubgraphOutput,
+)
+from mydocs.extracting.scheduler import build_group_dependencies, run_field_groups
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _field(name: str, group: int, inputs: list[str] | None = None, document_type: str | None = None) -> FieldDefinition:
+    return FieldDefinition(
+        name=name,
+        description=name,
+        group=group,
+        inputs=[FieldRequirement(field_name=i, document_type=document_type) for i in inputs] if inputs else None,
+    )
+
+
+def _groups(*fields: FieldDefinition) -> dict[int, list[FieldDefinition]]:
+    groups: dict[int, list[FieldDefinition]] = {}
+    for field in fields:
+        groups.setdefault(field.group, []).append(field)
+    return groups
+
+
+# ---------------------------------------------------------------------------
+# Tests: build_group_dependencies
+# ---------------------------------------------------------------------------
+
+class TestBuildGroupDependencies:
+
+    def test_inputs_become_group_edges(self):
+        groups = _groups(
+            _field("a", 0),
+            _field("b", 1),
+            _field("c", 2, inputs=["a", "b"]),
+            _field("d", 2, inputs=["c"]),  # same group: no edge
+        )
+        assert build_group_dependencies(groups, "invoice") == {0: set(), 1: set(), 2: {0, 1}}
+
+    def test_other_document_type_and_unknown_inputs_ignored(self):
+        groups = _groups(
+            _field("a", 0),
+            _field("b", 1, inputs=["a"], document_type="contract"),
+            _field("c", 1, inputs=["missing"]),
+        )
+        assert build_group_dependencies(groups, "invoice") == {0: set(), 1: set()}
+
+    def test_cycle_raises(self):
+        groups = _groups(_field("a", 0, inputs=["b"]), _field("b", 1, inputs=["a"]))
+        with pytest.raises(FieldConsistencyError, match="cyclic"):
+            build_group_dependencies(groups, "invoice")
+
+
+# ---------------------------------------------------------------------------
+# Tests: run_field_groups
+# ---------------------------------------------------------------------------
+
+class TestRunFieldGroups:
+
+    @pytest.mark.asyncio
+    async def test_independent_groups_run_concurrently_up_to_limit(self):
+        groups = _groups(*(_field(f"f{i}", i) for i in range(5)))
+        running = 0
+        peak = 0
+
+        async def run_group(group_id, prerequisite_results):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return SubgraphOutput(field_results={f"f{group_id}": FieldResult(content=str(group_id))})
+
+        outputs = await run_field_groups(groups, {g: set() for g in groups}, run_group, max_concurrency=3)
+
+        assert peak == 3
+        assert list(outputs) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_dependent_group_receives_prerequisite_results(self):
+        groups = _groups(_field("a", 0), _field("b", 1), _field("c", 2, inputs=["a", "b"]))
+        order = []
+        received = {}
+
+        async def run_group(group_id, prerequisite_results):
+            order.append(group_id)
+            received[group_id] = prerequisite_results
+            name = groups[group_id][0].name
+            return SubgraphOutput(field_results={name: FieldResult(content=name.upper())})
+
+        await run_field_groups(groups, build_group_dependencies(groups, "invoice"), run_group)
+
+        assert order[-1] == 2
+        assert received[0] == {} and received[1] == {}
+        assert {k: v.content for k, v in received[2].items()} == {"a": "A", "b": "B"}
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_remaining_groups(self):
+        groups = _groups(_field("a", 0), _field("b", 1), _field("c", 2, inputs=["a"]))
+        started = []
+
+        async def run_group(group_id, prerequisite_results):
+            started.append(group_id)
+            if group_id == 0:
+                raise RuntimeError("llm failed")
+            await asyncio.sleep(1)
+            return SubgraphOutput()
+
+        with pytest.raises(RuntimeError, match="llm failed"):
+            await run_field_groups(groups, build_group_dependencies(groups, "invoice"), run_group)
+
+        assert 2 not in started
+
+
+# ---------------------------------------------------------------------------
+# Tests: get_prompt_input
+# ---------------------------------------------------------------------------
+
+class TestPromptInputFromMemory:
+
+    @pytest.mark.asyncio
+    async def test_uses_extracted_results_before_database(self):
+        fields = [_field("c", 2, inputs=["a", "b"])]
+        stored = AsyncMock(return_value=[])
+        with patch("mydocs.extracting.context.FieldResultRecord.afind", stored):
+            prompt_input = await get_prompt_input(
+                fields, "doc_1", "invoice", extracted={"a": FieldResult(content="42")},
+            )
+
+        assert [(fi.field_name, fi.content) for fi in prompt_input.field_inputs] == [("a", "42"), ("b", None)]
+        stored.assert_awaited_once()
+        assert stored.await_args.args[0]["field_name"] == "b"
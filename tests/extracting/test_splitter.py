@@ -14,6 +14,7 @@ from mydocs.extracting.splitter import (
     _PageTag,
     _centrality_score,
     combine_overlapping_results,
+    split_config_hash,
 )
 
 
@@ -289,10 +290,7 @@ class TestSplitAndClassifyIdempotency:
             overlap_factor=3,
         )
 
-        import json as _json
-        config_hash_value = __import__("mydocs.extracting.prompt_utils", fromlist=["calculate_content_hash"]).calculate_content_hash(
-            _json.dumps(prompt_config.model_dump(), sort_keys=True)
-        )
+        config_hash_value = split_config_hash(prompt_config)
 
         mock_meta = SplitClassifyMeta(
             file_sha256="abc123",
@@ -576,3 +574,125 @@ class TestSplitAndClassifyIdempotency:
 
             # Verify document was saved
             mock_doc.asave.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Tests: classify_batches
+# ---------------------------------------------------------------------------
+
+class TestClassifyBatches:
+    """Tests for concurrent batch classification with per-batch retries."""
+
+    @staticmethod
+    def _prompt_config(**kwargs):
+        from mydocs.extracting.models import PromptConfig
+
+        return PromptConfig(
+            name="test",
+            sys_prompt_template="test",
+            user_prompt_template="test {context} {batch_num} {total_batches}",
+            **kwargs,
+        )
+
+    @pytest.mark.asyncio
+    async def test_batches_run_concurrently_in_order(self):
+        """Batches overlap up to max_concurrency; results keep batch order."""
+        import asyncio
+
+        from mydocs.extracting.splitter import classify_batches
+
+        batches = [[_make_page(i)] for i in range(1, 6)]
+        running = 0
+        peak = 0
+
+        async def fake_llm(context, prompt_config, batch_num, total_batches, use_cache=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (6 - batch_num))  # later batches finish first
+            running -= 1
+            return _make_batch_result([(f"type{batch_num}", [batch_num])])
+
+        progress = []
+        with patch("mydocs.extracting.splitter.generate_split_context", return_value="ctx"), \
+             patch("mydocs.extracting.splitter.run_llm_split_classify", side_effect=fake_llm):
+            results = await classify_batches(
+                batches, self._prompt_config(max_concurrency=3),
+                progress=lambda done, total: progress.append((done, total)),
+            )
+
+        assert peak == 3
+        assert [r.result[0].document_type for r in results] == [f"type{i}" for i in range(1, 6)]
+        assert progress == [(i, 5) for i in range(1, 6)]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried_alone(self):
+        """A failing batch is retried without re-running completed batches."""
+        from mydocs.extracting.splitter import classify_batches
+
+        batches = [[_make_page(1)], [_make_page(2)]]
+        calls = []
+
+        async def fake_llm(context, prompt_config, batch_num, total_batches, use_cache=True):
+            calls.append(batch_num)
+            if batch_num == 2 and calls.count(2) == 1:
+                raise RuntimeError("rate limited")
+            return _make_batch_result([("invoice", [batch_num])])
+
+        with patch("mydocs.extracting.splitter.generate_split_context", return_value="ctx"), \
+             patch("mydocs.extracting.splitter.run_llm_split_classify", side_effect=fake_llm), \
+             patch("mydocs.extracting.splitter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            results = await classify_batches(batches, self._prompt_config(batch_retries=1))
+
+        assert sorted(calls) == [1, 2, 2]
+        assert len(results) == 2
+        mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_raise(self):
+        """A batch failing on every attempt raises ExtractionError."""
+        from mydocs.extracting.exceptions import ExtractionError
+        from mydocs.extracting.splitter import classify_batches
+
+        with patch("mydocs.extracting.splitter.generate_split_context", return_value="ctx"), \
+             patch("mydocs.extracting.splitter.run_llm_split_classify", side_effect=RuntimeError("down")), \
+             patch("mydocs.extracting.splitter.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(ExtractionError, match="batch 1/1 failed after 3 attempts"):
+                await classify_batches([[_make_page(1)]], self._prompt_config())
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_not_retried(self):
+        """litellm API errors were already retried by litellm and fail the batch at once."""
+        import litellm
+
+        from mydocs.extracting.exceptions import ExtractionError
+        from mydocs.extracting.splitter import classify_batches
+
+        error = litellm.exceptions.APIError(status_code=500, message="down", llm_provider="azure", model="m")
+        with patch("mydocs.extracting.splitter.generate_split_context", return_value="ctx"), \
+             patch("mydocs.extracting.splitter.run_llm_split_classify", side_effect=error) as mock_llm, \
+             patch("mydocs.extracting.splitter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(ExtractionError, match="batch 1/1 failed"):
+                await classify_batches([[_make_page(1)]], self._prompt_config(batch_retries=2))
+
+        assert mock_llm.await_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_negative_batch_retries_rejected(self):
+        from mydocs.extracting.exceptions import ExtractionError
+        from mydocs.extracting.splitter import classify_batches
+
+        with patch("mydocs.extracting.splitter.run_llm_split_classify") as mock_llm:
+            with pytest.raises(ExtractionError, match="batch_retries must be >= 0"):
+                await classify_batches([[_make_page(1)]], self._prompt_config(batch_retries=-1))
+        mock_llm.assert_not_called()
+
+    def test_execution_settings_do_not_change_config_hash(self):
+        """Concurrency and retry settings are excluded from the idempotency hash."""
+        assert split_config_hash(self._prompt_config()) == split_config_hash(
+            self._prompt_config(max_concurrency=8, batch_retries=5)
+        )
+        assert split_config_hash(self._prompt_config()) != split_config_hash(
+            self._prompt_config(batch_size=6)
+        )
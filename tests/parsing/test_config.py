@@ -0,0 +1,43 @@
+"""Tests for mydocs.parsing.config."""
+
+import pytest
+
+from mydocs.common.base_config import clear_config_cache
+from mydocs.parsing.config import EmbeddingConfig, ParserConfig
+
+
+def _config(**embedding) -> ParserConfig:
+    return ParserConfig(
+        page_embeddings=[EmbeddingConfig(**embedding)],
+        document_embeddings=[EmbeddingConfig(**embedding)],
+        _is_internal_load=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_config_cache()
+    yield
+    clear_config_cache()
+
+
+# ---------------------------------------------------------------------------
+# Tests: parser_config_hash
+# ---------------------------------------------------------------------------
+
+class TestParserConfigHash:
+
+    def test_short_vectors_do_not_change_the_hash(self):
+        plain = _config()
+        short = _config(short_dimensions=256, short_target_field="emb_256")
+
+        assert short.parser_config_hash() == plain.parser_config_hash()
+        # documents parsed before short vectors existed keep matching
+        assert plain.parser_config_hash() == plain.dump_config().config_hash
+
+    def test_embedding_settings_change_the_hash(self):
+        assert _config(dimensions=1024).parser_config_hash() != _config().parser_config_hash()
+
+    def test_without_embeddings(self):
+        config = ParserConfig(_is_internal_load=True)
+        assert config.parser_config_hash() == config.dump_config().config_hash
@@ -0,0 +1,104 @@
+"""Tests for mydocs.parsing.geometry."""
+
+from mydocs.models import DocumentElementTypeEnum
+from mydocs.parsing.geometry import (
+    build_element_geometry,
+    calculate_union_polygon,
+    normalize_polygon,
+    table_row_boxes,
+    table_row_polygons,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _poly(x0: float, y0: float, x1: float, y1: float) -> list[float]:
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+def _region(page_number: int, polygon: list[float]) -> dict:
+    return {"pageNumber": page_number, "polygon": polygon}
+
+
+def _table() -> dict:
+    return {
+        "rowCount": 3,
+        "boundingRegions": [_region(1, _poly(0, 0, 2, 2)), _region(2, _poly(0, 0, 2, 1))],
+        "cells": [
+            {"rowIndex": 0, "boundingRegions": [_region(1, _poly(0, 0, 1, 1))]},
+            {"rowIndex": 0, "boundingRegions": [_region(1, _poly(1, 0, 2, 1))]},
+            {"rowIndex": 1, "boundingRegions": [_region(1, _poly(0, 1, 2, 2))]},
+            {"rowIndex": 2, "boundingRegions": [_region(2, _poly(0, 0, 2, 1))]},
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests: polygon helpers
+# ---------------------------------------------------------------------------
+
+class TestPolygonHelpers:
+
+    def test_union(self):
+        assert calculate_union_polygon([_poly(0, 0, 1, 1), _poly(2, 3, 4, 5)]) == _poly(0, 0, 4, 5)
+        assert calculate_union_polygon([]) == []
+
+    def test_table_rows(self):
+        assert table_row_polygons(_table()) == {0: _poly(0, 0, 2, 1), 1: _poly(0, 1, 2, 2), 2: _poly(0, 0, 2, 1)}
+        assert table_row_polygons(_table(), page_number=1) == {0: _poly(0, 0, 2, 1), 1: _poly(0, 1, 2, 2)}
+        assert table_row_polygons({}) == {}
+
+    def test_table_row_boxes_on_their_page(self):
+        assert table_row_boxes(_table(), 1) == {
+            0: (1, _poly(0, 0, 2, 1)), 1: (1, _poly(0, 1, 2, 2)), 2: (2, _poly(0, 0, 2, 1)),
+        }
+        assert table_row_boxes(_table(), 2) == {
+            0: (1, _poly(0, 0, 2, 1)), 1: (1, _poly(0, 1, 2, 2)), 2: (2, _poly(0, 0, 2, 1)),
+        }
+
+    def test_normalize(self):
+        assert normalize_polygon(_poly(1, 2, 4, 8), 4, 8) == _poly(0.25, 0.25, 1.0, 1.0)
+        assert normalize_polygon(_poly(1, 2, 4, 8), None, 8) == []
+
+
+# ---------------------------------------------------------------------------
+# Tests: build_element_geometry
+# ---------------------------------------------------------------------------
+
+class TestBuildElementGeometry:
+
+    def test_paragraph(self):
+        data = {"boundingRegions": [_region(1, _poly(1, 1, 2, 2)), _region(1, _poly(1, 2, 3, 3))]}
+        geometry = build_element_geometry(data, DocumentElementTypeEnum.PARAGRAPH, 1, 4.0, 6.0)
+
+        assert geometry.bbox == _poly(1, 1, 3, 3)
+        assert geometry.bbox_norm == _poly(0.25, 1 / 6, 0.75, 0.5)
+        assert geometry.rows == []
+
+    def test_table_restricted_to_element_page(self):
+        geometry = build_element_geometry(_table(), DocumentElementTypeEnum.TABLE, 1)
+
+        assert geometry.bbox == _poly(0, 0, 2, 2)
+        assert geometry.rows == [_poly(0, 0, 2, 1), _poly(0, 1, 2, 2), _poly(0, 0, 2, 1)]
+        assert geometry.row_pages == [1, 1, 2]  # row 2 continues on page 2
+        assert geometry.bbox_norm == []
+
+    def test_key_value_pair(self):
+        data = {
+            "key": {"boundingRegions": [_region(1, _poly(0, 0, 1, 1))]},
+            "value": {"boundingRegions": [_region(1, _poly(2, 0, 3, 1))]},
+        }
+        geometry = build_element_geometry(data, DocumentElementTypeEnum.KEY_VALUE_PAIR, 1)
+
+        assert geometry.key_bbox == _poly(0, 0, 1, 1)
+        assert geometry.value_bbox == _poly(2, 0, 3, 1)
+        assert geometry.bbox == _poly(0, 0, 3, 1)
+
+    def test_key_without_value(self):
+        data = {"key": {"boundingRegions": [_region(1, _poly(0, 0, 1, 1))]}, "value": None}
+        geometry = build_element_geometry(data, DocumentElementTypeEnum.KEY_VALUE_PAIR, 1)
+
+        assert geometry.value_bbox == []
+        assert geometry.bbox == _poly(0, 0, 1, 1)
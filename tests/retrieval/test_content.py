@@ -0,0 +1,131 @@
+"""Tests for mydocs.retrieval.content — content projection and snippets."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.content import (
+    build_snippets,
+    content_projection,
+    format_highlights,
+    use_highlight,
+    window_snippets,
+)
+from mydocs.retrieval.models import SearchRequest, SnippetConfig
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Tests: content_projection
+# ---------------------------------------------------------------------------
+
+class TestContentProjection:
+
+    def test_only_requested_fields(self):
+        assert content_projection(["content"]) == {"content": 1}
+        assert content_projection([]) == {}
+        assert content_projection(None) == {"content": 1, "content_markdown": 1}
+
+    def test_unknown_fields_ignored(self):
+        assert content_projection(["content_html"]) == {}
+
+    def test_snippet_source_field_added(self):
+        snippet = SnippetConfig(enabled=True, field="content_markdown")
+        assert content_projection([], snippet) == {"content_markdown": 1}
+
+    def test_highlight_replaces_source_field(self):
+        snippet = SnippetConfig(enabled=True)
+        assert content_projection([], snippet, highlight=True) == {"highlights": 1}
+
+    def test_use_highlight_only_for_searched_field(self):
+        snippet = SnippetConfig(enabled=True, field="content")
+        assert use_highlight(snippet, "content")
+        assert not use_highlight(snippet, "content_markdown")
+        assert not use_highlight(SnippetConfig(), "content")
+
+
+# ---------------------------------------------------------------------------
+# Tests: snippets
+# ---------------------------------------------------------------------------
+
+class TestSnippets:
+
+    def test_window_marks_matches(self):
+        text = "The lease may be terminated by either party with notice."
+        snippets = window_snippets(text, "Terminated lease", SnippetConfig(enabled=True, fragment_chars=400))
+
+        assert snippets == ["The <em>lease</em> may be <em>terminated</em> by either party with notice."]
+
+    def test_window_prefers_dense_fragments(self):
+        text = "invoice " + "filler " * 40 + "invoice total invoice"
+        snippets = window_snippets(
+            text, "invoice total", SnippetConfig(enabled=True, fragment_chars=40, max_fragments=1),
+        )
+
+        assert len(snippets) == 1
+        assert snippets[0].startswith("…")
+        assert snippets[0].count("<em>") == 3
+
+    def test_window_without_match_returns_head(self):
+        snippets = window_snippets("a" * 50, "zzz", SnippetConfig(enabled=True, fragment_chars=10))
+        assert snippets == ["a" * 10 + "…"]
+
+    def test_window_empty_text(self):
+        assert window_snippets(None, "q", SnippetConfig(enabled=True)) == []
+
+    def test_format_highlights_best_first(self):
+        highlights = [
+            {"score": 0.5, "texts": [{"value": "low ", "type": "text"}, {"value": "hit", "type": "hit"}]},
+            {"score": 0.9, "texts": [{"value": "high ", "type": "text"}, {"value": "hit", "type": "hit"}]},
+        ]
+        snippet = SnippetConfig(enabled=True, max_fragments=1, pre_tag="[", post_tag="]")
+
+        assert format_highlights(highlights, snippet) == ["high [hit]"]
+
+    def test_build_snippets_falls_back_to_windows(self):
+        snippet = SnippetConfig(enabled=True)
+        result = {"highlights": [], "content": "net revenue grew"}
+        assert build_snippets(result, "revenue", snippet) == ["net <em>revenue</em> grew"]
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() post-processing
+# ---------------------------------------------------------------------------
+
+class TestSearchContent:
+
+    @pytest.fixture
+    def fulltext(self):
+        result = {
+            "id": "p1", "document_id": "doc_1", "page_number": 1, "score": 2.0,
+            "content": "net revenue grew", "content_markdown": None, "file_name": "a.pdf", "tags": [],
+            "highlights": None,
+        }
+        mock = AsyncMock(side_effect=lambda **kwargs: [dict(result)])
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", mock):
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_passes_projection_and_snippet(self, fulltext):
+        request = SearchRequest(query="revenue", search_mode="fulltext", use_cache=False, include_content_fields=[])
+
+        await search(request)
+
+        kwargs = fulltext.await_args.kwargs
+        assert kwargs["content_fields"] == []
+        assert kwargs["snippet"] is request.snippet
+
+    @pytest.mark.asyncio
+    async def test_snippet_source_not_returned_unless_requested(self, fulltext):
+        request = SearchRequest(
+            query="revenue", search_mode="fulltext", use_cache=False,
+            include_content_fields=[], snippet=SnippetConfig(enabled=True),
+        )
+
+        response = await search(request)
+
+        result = response.results[0]
+        assert result.snippets == ["net <em>revenue</em> grew"]
+        assert result.content is None
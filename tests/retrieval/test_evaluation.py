@@ -0,0 +1,149 @@
+"""Tests for mydocs.retrieval.evaluation."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.evaluation import (
+    JudgedQuery,
+    build_request,
+    latency_percentiles,
+    load_query_set,
+    ndcg_at_k,
+    recall_at_k,
+    reciprocal_rank,
+    run_benchmark,
+)
+from mydocs.retrieval.models import SearchResponse, SearchResult
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _response(query: str, ids: list[str]) -> SearchResponse:
+    return SearchResponse(
+        search_target="pages",
+        search_mode="fulltext",
+        results=[SearchResult(id=rid, document_id="doc_1", score=1.0, scores={}) for rid in ids],
+        total=len(ids),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tests: metrics
+# ---------------------------------------------------------------------------
+
+class TestMetrics:
+
+    def test_recall_at_k(self):
+        relevant = {"a": 1, "b": 1, "c": 1, "d": 1}
+        assert recall_at_k(["a", "x", "b", "c"], relevant, 3) == 0.5
+        assert recall_at_k(["a"], {}, 3) == 0.0
+
+    def test_reciprocal_rank(self):
+        assert reciprocal_rank(["x", "y", "a"], {"a": 1}) == pytest.approx(1 / 3)
+        assert reciprocal_rank(["x"], {"a": 1}) == 0.0
+
+    def test_ndcg_perfect_and_graded(self):
+        relevant = {"a": 2, "b": 1}
+        assert ndcg_at_k(["a", "b", "x"], relevant, 3) == pytest.approx(1.0)
+        swapped = ndcg_at_k(["b", "a"], relevant, 2)
+        expected = (1 + 3 / 1.5849625) / (3 + 1 / 1.5849625)
+        assert swapped == pytest.approx(expected, rel=1e-6)
+        assert ndcg_at_k(["x"], relevant, 1) == 0.0
+
+    def test_latency_percentiles(self):
+        p50, p95, p99 = latency_percentiles([float(v) for v in range(1, 101)])
+        assert p50 == pytest.approx(50.5)
+        assert p95 == pytest.approx(95.05)
+        assert p99 == pytest.approx(99.01)
+        assert latency_percentiles([]) == (0.0, 0.0, 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Tests: query sets and requests
+# ---------------------------------------------------------------------------
+
+class TestQuerySet:
+
+    def test_load_list_and_graded(self, tmp_path):
+        path = tmp_path / "queries.jsonl"
+        path.write_text(
+            json.dumps({"query": "q1", "relevant": ["a", "b"]}) + "\n\n"
+            + json.dumps({"query": "q2", "relevant": {"c": 2}, "request": {"top_k": 5}}) + "\n"
+        )
+        queries = load_query_set(path)
+
+        assert [q.query for q in queries] == ["q1", "q2"]
+        assert queries[0].relevant == {"a": 1.0, "b": 1.0}
+        assert queries[1].relevant == {"c": 2.0}
+
+    def test_invalid_line_reports_position(self, tmp_path):
+        path = tmp_path / "queries.jsonl"
+        path.write_text(json.dumps({"relevant": ["a"]}) + "\n")
+        with pytest.raises(ValueError, match="queries.jsonl:1"):
+            load_query_set(path)
+
+    def test_build_request_merges_overrides(self):
+        query = JudgedQuery(query="q", relevant=["a"], request={"hybrid": {"candidate_multiplier": 8}})
+        request = build_request(
+            query, {"search_mode": "hybrid"}, {"hybrid": {"rrf_k": 20}, "use_cache": True}, k=20,
+        )
+
+        assert request.hybrid.rrf_k == 20
+        assert request.hybrid.candidate_multiplier == 8
+        assert request.top_k == 20
+        assert request.use_cache is False
+        assert request.include_content_fields == []
+
+
+# ---------------------------------------------------------------------------
+# Tests: run_benchmark
+# ---------------------------------------------------------------------------
+
+class TestRunBenchmark:
+
+    @pytest.mark.asyncio
+    async def test_reports_per_variant(self):
+        queries = [
+            JudgedQuery(query="q1", relevant=["a"]),
+            JudgedQuery(query="q2", relevant=["b"]),
+        ]
+
+        async def fake_search(request, retrieval_config=None):
+            if request.hybrid.rrf_k == 1:
+                return _response(request.query, ["x", "a", "b"])
+            return _response(request.query, ["a", "b"])
+
+        mock = AsyncMock(side_effect=fake_search)
+        with patch("mydocs.retrieval.evaluation.search", mock):
+            reports = await run_benchmark(
+                queries, {"base": {}, "rrf1": {"hybrid": {"rrf_k": 1}}},
+                k=2, concurrency=2, warmup=1,
+            )
+
+        assert [r.variant for r in reports] == ["base", "rrf1"]
+        assert reports[0].recall == 1.0
+        assert reports[0].mrr == pytest.approx(0.75)
+        assert reports[1].mrr == pytest.approx(0.25)  # b falls outside k=2
+        assert reports[1].recall == 0.5
+        assert reports[0].latency_p99_ms >= reports[0].latency_p50_ms >= 0
+        assert reports[0].throughput_qps > 0
+        assert mock.await_count == 6  # 2 queries + 1 warm-up per variant
+
+    @pytest.mark.asyncio
+    async def test_failed_queries_count_as_errors(self):
+        queries = [JudgedQuery(query="ok", relevant=["a"]), JudgedQuery(query="boom", relevant=["a"])]
+
+        async def fake_search(request, retrieval_config=None):
+            if request.query == "boom":
+                raise RuntimeError("backend down")
+            return _response(request.query, ["a"])
+
+        with patch("mydocs.retrieval.evaluation.search", AsyncMock(side_effect=fake_search)):
+            reports = await run_benchmark(queries, {"base": {}}, k=5, warmup=0)
+
+        assert reports[0].errors == 1
+        assert reports[0].recall == 0.5
@@ -0,0 +1,144 @@
+"""Tests for search facets ($searchMeta and candidate-window counting)."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.facets import facet_candidates, parse_search_meta, use_search_meta, validate_facets
+from mydocs.retrieval.fulltext_retriever import fulltext_facets
+from mydocs.retrieval.models import FullTextSearchConfig, SearchFilters, SearchRequest
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _result(rid: str, document_id: str, score: float) -> dict:
+    return {
+        "id": rid, "document_id": document_id, "page_number": 1, "score": score,
+        "content": None, "content_markdown": None, "file_name": None, "tags": [],
+    }
+
+
+async def _hydrate(search_target, hits, content_projection=None):
+    return [_result(hit_id, "doc", score) for hit_id, score in hits]
+
+
+# ---------------------------------------------------------------------------
+# Tests: helpers
+# ---------------------------------------------------------------------------
+
+class TestFacetHelpers:
+
+    def test_validate(self):
+        validate_facets(["tags", "status"])
+        with pytest.raises(ValueError, match="Unknown facets"):
+            validate_facets(["owner"])
+
+    def test_use_search_meta(self):
+        config = RetrievalConfig.model_construct()
+        request = SearchRequest(query="q", search_target="documents", search_mode="fulltext", facets=["tags"])
+        assert use_search_meta(request, config)
+        assert not use_search_meta(request.model_copy(update={"search_mode": "hybrid"}), config)
+        assert not use_search_meta(request.model_copy(update={"search_target": "pages"}), config)
+        assert not use_search_meta(request.model_copy(update={"filters": SearchFilters(file_type="pdf")}), config)
+
+    def test_parse_search_meta(self):
+        raw = [{"count": {"lowerBound": 3}, "facet": {"tags": {"buckets": [{"_id": "legal", "count": 3}]}}}]
+
+        facets = parse_search_meta(raw, ["tags", "status"])
+
+        assert facets["tags"][0].value == "legal"
+        assert facets["tags"][0].count == 3
+        assert facets["status"] == []
+
+    @pytest.mark.asyncio
+    async def test_facet_candidates_single_aggregation(self):
+        raw = [{"tags": [{"_id": "a", "count": 2}], "file_type": [{"_id": "pdf", "count": 2}]}]
+        with patch("mydocs.retrieval.facets.Document.aaggregate", AsyncMock(return_value=raw)) as aggregate:
+            facets = await facet_candidates(["d1", "d2", "d1"], ["tags", "file_type"], 5)
+
+        pipeline = aggregate.await_args.args[0]
+        assert pipeline[0] == {"$match": {"_id": {"$in": ["d1", "d2"]}}}
+        assert pipeline[1]["$facet"]["tags"][0] == {"$unwind": "$tags"}
+        assert pipeline[1]["$facet"]["file_type"][-1] == {"$limit": 5}
+        assert facets["file_type"][0].value == "pdf"
+
+    @pytest.mark.asyncio
+    async def test_fulltext_facets_pipeline(self):
+        with patch("mydocs.retrieval.fulltext_retriever.Document.aaggregate", AsyncMock(return_value=[])) as aggregate:
+            await fulltext_facets("q", FullTextSearchConfig(), SearchFilters(tags=["x"]), ["status"], 7)
+
+        stage = aggregate.await_args.args[0][0]["$searchMeta"]
+        assert stage["index"] == "ft_documents"
+        assert stage["facet"]["facets"] == {"status": {"type": "string", "path": "status", "numBuckets": 7}}
+        assert stage["facet"]["operator"]["compound"]["filter"] == [{"text": {"query": ["x"], "path": "tags"}}]
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() with facets
+# ---------------------------------------------------------------------------
+
+class TestSearchFacets:
+
+    @pytest.mark.asyncio
+    async def test_candidate_window_facets(self):
+        fulltext = AsyncMock(return_value=[_result(f"p{i}", f"d{i % 3}", 10.0 - i) for i in range(8)])
+        counted = AsyncMock(return_value={"tags": []})
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext), \
+                patch("mydocs.retrieval.search.hydrate_results", AsyncMock(side_effect=_hydrate)), \
+                patch("mydocs.retrieval.search.facet_candidates", counted):
+            response = await search(SearchRequest(
+                query="q", search_mode="fulltext", top_k=2, facets=["tags"], use_cache=False,
+            ))
+
+        assert fulltext.await_args.kwargs["top_k"] == 200
+        assert counted.await_args.args[0] == [f"d{i % 3}" for i in range(8)]
+        assert [r.id for r in response.results] == ["p0", "p1"]
+        assert response.facets == {"tags": []}
+
+    @pytest.mark.asyncio
+    async def test_search_meta_facets(self):
+        fulltext = AsyncMock(return_value=[_result("d1", "d1", 1.0)])
+        meta = AsyncMock(return_value={"status": []})
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_facets", meta):
+            response = await search(SearchRequest(
+                query="q", search_target="documents", search_mode="fulltext", facets=["status"], use_cache=False,
+            ))
+
+        meta.assert_awaited_once()
+        assert fulltext.await_args.kwargs["top_k"] == 10
+        assert response.facets == {"status": []}
+
+    @pytest.mark.asyncio
+    async def test_search_meta_task_cancelled_when_search_fails(self):
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_facets(**kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def failing_search(**kwargs):
+            await started.wait()
+            raise RuntimeError("atlas down")
+
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", side_effect=failing_search), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_facets", side_effect=slow_facets):
+            with pytest.raises(RuntimeError, match="atlas down"):
+                await search(SearchRequest(
+                    query="q", search_target="documents", search_mode="fulltext", facets=["status"], use_cache=False,
+                ))
+
+        assert cancelled.is_set()
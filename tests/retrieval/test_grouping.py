@@ -0,0 +1,107 @@
+"""Tests for mydocs.retrieval.grouping — document-level collapsing of page results."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.grouping import collapse_by_document, load_groups
+from mydocs.retrieval.models import SearchRequest
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _page(page_id: str, document_id: str, score: float) -> dict:
+    return {
+        "id": page_id, "document_id": document_id, "page_number": 1, "score": score,
+        "content": None, "content_markdown": None, "file_name": None, "tags": [],
+    }
+
+
+RANKED = [
+    _page("a1", "A", 0.9), _page("a2", "A", 0.8), _page("b1", "B", 0.7),
+    _page("a3", "A", 0.6), _page("c1", "C", 0.5), _page("b2", "B", 0.4),
+]
+
+
+async def _hydrate(search_target, hits, content_projection=None):
+    return [{**_page(hit_id, hit_id[0].upper(), score), "content": f"text {hit_id}"} for hit_id, score in hits]
+
+
+# ---------------------------------------------------------------------------
+# Tests: collapse_by_document
+# ---------------------------------------------------------------------------
+
+class TestCollapseByDocument:
+
+    def test_keeps_best_pages_per_document(self):
+        kept, groups = collapse_by_document(RANKED, max_groups=10, group_size=2)
+
+        assert [p["id"] for p in kept] == ["a1", "a2", "b1", "b2", "c1"]
+        assert [g["document_id"] for g in groups] == ["A", "B", "C"]
+        assert groups[0] == {"document_id": "A", "score": 0.9, "hits": 3, "page_ids": ["a1", "a2"]}
+
+    def test_limits_number_of_groups(self):
+        kept, groups = collapse_by_document(RANKED, max_groups=2, group_size=1)
+
+        assert [p["id"] for p in kept] == ["a1", "b1"]
+        assert [g["hits"] for g in groups] == [3, 2]
+
+    @pytest.mark.asyncio
+    async def test_load_groups_single_query(self):
+        _, summaries = collapse_by_document(RANKED, max_groups=2, group_size=1)
+        raw = [
+            {"_id": "B", "original_file_name": "b.pdf", "file_type": "pdf", "status": "parsed", "tags": ["x"]},
+            {"_id": "A", "original_file_name": "a.pdf", "file_type": "pdf", "status": "parsed", "page_count": 7},
+        ]
+        with patch("mydocs.retrieval.grouping.Document.aaggregate", AsyncMock(return_value=raw)) as aggregate:
+            groups = await load_groups(summaries)
+
+        aggregate.assert_awaited_once()
+        assert [g.document_id for g in groups] == ["A", "B"]
+        assert groups[0].file_name == "a.pdf"
+        assert groups[0].page_count == 7
+        assert groups[1].tags == ["x"]
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() with group_by
+# ---------------------------------------------------------------------------
+
+class TestGroupedSearch:
+
+    @pytest.fixture
+    def patched(self):
+        fulltext = AsyncMock(return_value=[dict(r) for r in RANKED])
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext), \
+                patch("mydocs.retrieval.search.hydrate_results", AsyncMock(side_effect=_hydrate)), \
+                patch("mydocs.retrieval.grouping.Document.aaggregate", AsyncMock(return_value=[])):
+            yield fulltext
+
+    @pytest.mark.asyncio
+    async def test_grouped_response(self, patched):
+        request = SearchRequest(
+            query="q", search_mode="fulltext", top_k=2, group_by="document", group_size=2, use_cache=False,
+        )
+
+        response = await search(request)
+
+        assert patched.await_args.kwargs["top_k"] == 2 * 2 * 4
+        assert patched.await_args.kwargs["content_fields"] == []
+        assert [r.id for r in response.results] == ["a1", "a2", "b1", "b2"]
+        assert response.results[0].content == "text a1"
+        assert [g.document_id for g in response.groups] == ["A", "B"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("overrides, message", [
+        ({"group_by": "tag"}, "Unknown group_by"),
+        ({"group_by": "document", "search_target": "documents"}, "requires search_target"),
+        ({"group_by": "document", "paginate": True}, "cannot be combined"),
+    ])
+    async def test_invalid_requests(self, patched, overrides, message):
+        with pytest.raises(ValueError, match=message):
+            await search(SearchRequest(query="q", use_cache=False, **overrides))
@@ -0,0 +1,129 @@
+"""Tests for mydocs.retrieval.hybrid — fusion methods, tie-breaking and candidate windows."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.hybrid import (
+    combine_results,
+    combine_results_convex,
+    combine_results_rrf,
+    combine_results_weighted_sum,
+    combine_results_zscore,
+)
+from mydocs.retrieval.models import HybridSearchConfig, SearchRequest
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _results(*pairs) -> list[dict]:
+    return [{"id": rid, "document_id": "doc_1", "score": score, "content": rid} for rid, score in pairs]
+
+
+FT = _results(("a", 12.0), ("b", 8.0), ("c", 2.0))
+VEC = _results(("b", 0.9), ("d", 0.8), ("a", 0.6))
+
+
+# ---------------------------------------------------------------------------
+# Tests: fusion methods
+# ---------------------------------------------------------------------------
+
+class TestFusion:
+
+    def test_rrf(self):
+        combined = combine_results_rrf(FT, VEC, rrf_k=60)
+
+        assert [r["id"] for r in combined] == ["b", "a", "d", "c"]
+        assert combined[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+        assert combined[0]["scores"] == {"fulltext": 8.0, "vector": 0.9}
+        assert combined[2]["scores"]["fulltext"] == 0.0
+
+    def test_weighted_sum_min_max(self):
+        combined = combine_results_weighted_sum(FT, VEC, weights={"fulltext": 0.5, "vector": 0.5})
+
+        by_id = {r["id"]: r for r in combined}
+        assert by_id["a"]["scores"] == {"fulltext": 1.0, "vector": 0.0}
+        assert by_id["b"]["scores"]["fulltext"] == pytest.approx(0.6)
+        assert by_id["b"]["score"] == pytest.approx(0.5 * 0.6 + 0.5 * 1.0)
+        assert combined[0]["id"] == "b"
+
+    def test_zscore_missing_gets_list_minimum(self):
+        combined = combine_results_zscore(FT, VEC, weights={"fulltext": 1.0, "vector": 0.0})
+
+        by_id = {r["id"]: r for r in combined}
+        # "d" is absent from full-text, so it ties with the weakest full-text hit
+        assert by_id["d"]["score"] == pytest.approx(by_id["c"]["score"])
+        assert [r["id"] for r in combined][:2] == ["a", "b"]
+
+    def test_convex_uses_theoretical_bounds(self):
+        combined = combine_results_convex(FT, VEC, weights={"fulltext": 3.0, "vector": 1.0})
+
+        by_id = {r["id"]: r for r in combined}
+        assert by_id["c"]["scores"]["fulltext"] == pytest.approx(2.0 / 12.0)
+        assert by_id["d"]["scores"]["vector"] == pytest.approx(0.8)
+        assert by_id["a"]["score"] == pytest.approx(0.75 * 1.0 + 0.25 * 0.6)
+
+    def test_ties_break_on_best_rank_then_first_seen(self):
+        ft = _results(("x", 1.0), ("y", 1.0))
+        vec = _results(("y", 0.5), ("x", 0.5))
+
+        combined = combine_results_rrf(ft, vec)
+
+        # Equal RRF scores and equal best ranks: full-text order wins
+        assert [r["id"] for r in combined] == ["x", "y"]
+
+    def test_top_k_and_inputs_untouched(self):
+        ft = _results(("a", 1.0), ("b", 0.5))
+
+        combined = combine_results_rrf(ft, [], top_k=1)
+
+        assert [r["id"] for r in combined] == ["a"]
+        assert "scores" not in ft[0]
+        assert ft[0]["score"] == 1.0
+
+    def test_duplicate_ids_count_once(self):
+        combined = combine_results_rrf(_results(("a", 2.0), ("a", 1.0)), [])
+
+        assert len(combined) == 1
+        assert combined[0]["score"] == pytest.approx(1 / 61)
+
+    def test_empty_inputs(self):
+        for method in ("rrf", "weighted_sum", "zscore", "convex"):
+            assert combine_results([], [], HybridSearchConfig(combination_method=method)) == []
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="Unknown combination method"):
+            combine_results(FT, VEC, HybridSearchConfig(combination_method="borda"))
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() candidate windows
+# ---------------------------------------------------------------------------
+
+class TestHybridCandidates:
+
+    @pytest.mark.asyncio
+    async def test_branches_over_fetch_and_fusion_truncates(self):
+        ft_results = _results(*[(f"f{i}", 10.0 - i) for i in range(12)])
+        vec_results = _results(*[(f"v{i}", 0.9 - i / 100) for i in range(12)])
+        fulltext = AsyncMock(return_value=ft_results)
+        vector = AsyncMock(return_value=vec_results)
+
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search._resolve_vector_index",
+                      return_value=("vec_pages_large_dot", "emb", "text-embedding-3-large", None)), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext), \
+                patch("mydocs.retrieval.search.vector_retriever.vector_search", vector):
+            request = SearchRequest(
+                query="q", top_k=3, use_cache=False,
+                hybrid=HybridSearchConfig(candidate_multiplier=4),
+            )
+            response = await search(request, query_embedding=[0.1])
+
+        assert fulltext.await_args.kwargs["top_k"] == 12
+        assert vector.await_args.kwargs["top_k"] == 12
+        assert [r.id for r in response.results] == ["f0", "v0", "f1"]
@@ -0,0 +1,193 @@
+"""Tests for mydocs.retrieval.local.fulltext_index — BM25 scoring, fuzzy matching, segments."""
+
+from unittest.mock import patch
+
+import pytest
+
+from mydocs.retrieval.config import LocalFulltextIndexConfig
+from mydocs.retrieval.local.fulltext_index import (
+    LocalFulltextIndex,
+    decode_varints,
+    encode_varints,
+    levenshtein_within,
+    tokenize,
+)
+from mydocs.retrieval.models import FuzzyConfig
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+TEXTS = {
+    "page_1": "Invoice number 1001 for consulting services",
+    "page_2": "Purchase order for office supplies",
+    "page_3": "Invoice invoice invoice reminder",
+    "page_4": "Employment contract between the parties",
+}
+DOCUMENTS = {"page_1": "doc_a", "page_2": "doc_a", "page_3": "doc_b", "page_4": "doc_c"}
+
+
+def _make_index(tmp_path, **config) -> LocalFulltextIndex:
+    index = LocalFulltextIndex(str(tmp_path / "ft"), LocalFulltextIndexConfig(**config))
+    ids = list(TEXTS)
+    index.add(ids, [DOCUMENTS[i] for i in ids], [TEXTS[i] for i in ids])
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Tests: helpers
+# ---------------------------------------------------------------------------
+
+class TestHelpers:
+    """Tests for tokenization, varint coding and edit distance."""
+
+    def test_tokenize_lowercases_words(self):
+        assert tokenize("Invoice #1001, Total: $5") == ["invoice", "1001", "total", "5"]
+
+    def test_varint_roundtrip(self):
+        values = [0, 1, 127, 128, 300, 2 ** 31]
+        assert decode_varints(encode_varints(values)) == values
+
+    def test_small_values_use_one_byte(self):
+        assert len(encode_varints([1, 2, 3])) == 3
+
+    @pytest.mark.parametrize("a,b,max_edits,expected", [
+        ("invoice", "invoice", 0, True),
+        ("invoice", "invoyce", 1, True),
+        ("invoice", "invioce", 1, False),
+        ("invoice", "invioce", 2, True),
+        ("contract", "contact", 1, True),
+    ])
+    def test_levenshtein_within(self, a, b, max_edits, expected):
+        assert levenshtein_within(a, b, max_edits) is expected
+
+
+# ---------------------------------------------------------------------------
+# Tests: LocalFulltextIndex
+# ---------------------------------------------------------------------------
+
+class TestLocalFulltextIndex:
+    """Tests for the segmented BM25 index."""
+
+    def test_bm25_ranks_higher_term_frequency_first(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        hits = index.search("invoice", top_k=10)
+
+        assert [hit_id for hit_id, _, _ in hits] == ["page_3", "page_1"]
+        assert hits[0][1] == "doc_b"
+        assert hits[0][2] > hits[1][2] > 0
+
+    def test_any_term_matches(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        hits = index.search("contract supplies", top_k=10)
+
+        assert {hit_id for hit_id, _, _ in hits} == {"page_2", "page_4"}
+
+    def test_document_id_filter(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        hits = index.search("invoice", top_k=10, document_ids=["doc_a"])
+
+        assert [hit_id for hit_id, _, _ in hits] == ["page_1"]
+
+    def test_fuzzy_matching(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        assert index.search("invoyce", top_k=10) == []
+        fuzzy = FuzzyConfig(enabled=True, max_edits=1, prefix_length=3)
+        hits = index.search("invoyce", top_k=10, fuzzy=fuzzy)
+        assert {hit_id for hit_id, _, _ in hits} == {"page_1", "page_3"}
+
+    def test_fuzzy_respects_prefix_length(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        fuzzy = FuzzyConfig(enabled=True, max_edits=1, prefix_length=3)
+        assert index.search("unvoice", top_k=10, fuzzy=fuzzy) == []
+
+    def test_reindexing_replaces_old_text(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        index.add(["page_1"], ["doc_a"], ["Delivery note"])
+
+        assert len(index) == 4
+        assert [hit_id for hit_id, _, _ in index.search("invoice", top_k=10)] == ["page_3"]
+        assert [hit_id for hit_id, _, _ in index.search("delivery", top_k=10)] == ["page_1"]
+
+    def test_delete_documents(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        removed = index.delete_documents(["doc_a"])
+
+        assert removed == 2
+        assert len(index) == 2
+        assert [hit_id for hit_id, _, _ in index.search("invoice", top_k=10)] == ["page_3"]
+
+    def test_readd_after_delete(self, tmp_path):
+        index = _make_index(tmp_path)
+        index.delete_documents(["doc_b"])
+
+        index.add(["page_3"], ["doc_b"], ["Invoice reminder"])
+
+        assert [hit_id for hit_id, _, _ in index.search("reminder", top_k=10)] == ["page_3"]
+
+    def test_persistence_and_refresh(self, tmp_path):
+        writer = _make_index(tmp_path)
+        reader = LocalFulltextIndex(writer.path)
+        assert len(reader) == 4
+
+        writer.add(["page_5"], ["doc_d"], ["Insurance policy"])
+
+        assert [hit_id for hit_id, _, _ in reader.search("insurance", top_k=10)] == ["page_5"]
+
+    def test_segments_merge_keeps_results(self, tmp_path):
+        index = _make_index(tmp_path, max_segments=2)
+        before = index.search("invoice order", top_k=10)
+        index.delete_documents(["doc_c"])
+
+        index.add(["page_5"], ["doc_d"], ["Second invoice"])
+        index.add(["page_6"], ["doc_d"], ["Third note"])
+
+        assert len(index._segments) <= 2
+        assert index._tombstones == {}
+        assert len(index) == 5
+        hits = {hit_id for hit_id, _, _ in index.search("invoice order", top_k=10)}
+        assert hits == {hit_id for hit_id, _, _ in before} | {"page_5"}
+
+    def test_writes_do_not_reload(self, tmp_path):
+        """The writer updates its state in memory; only meta.json and the new segment are written."""
+        index = _make_index(tmp_path)
+
+        with patch.object(index, "_load", wraps=index._load) as load:
+            index.add(["page_5"], ["doc_d"], ["Insurance policy"])
+            index.add(["page_1"], ["doc_a"], ["Delivery note"])
+            index.delete_documents(["doc_c"])
+
+        load.assert_not_called()
+        reader = LocalFulltextIndex(index.path)
+        assert reader._live == index._live
+        assert reader._total_length == index._total_length
+        assert reader.search("invoice delivery", top_k=10) == index.search("invoice delivery", top_k=10)
+
+    def test_df_counts_only_live_rows(self, tmp_path):
+        """Replaced and deleted rows do not inflate document frequency."""
+        index = _make_index(tmp_path)
+        for _ in range(3):
+            index.add(["page_1"], ["doc_a"], [TEXTS["page_1"]])
+        index.add(["page_9"], ["doc_z"], ["invoice"])
+        index.delete_documents(["doc_z"])
+
+        fresh = _make_index(tmp_path / "fresh")
+
+        assert index.search("invoice", top_k=10) == pytest.approx(fresh.search("invoice", top_k=10))
+
+    def test_fuzzy_expansion_by_length_and_prefix(self, tmp_path):
+        index = _make_index(tmp_path)
+        index.add(["page_5"], ["doc_d"], ["invoices invoicing inv"])
+
+        fuzzy = FuzzyConfig(enabled=True, max_edits=1, prefix_length=3)
+        assert sorted(index._expand_term("invoyce", fuzzy)) == ["invoice"]
+        fuzzy = FuzzyConfig(enabled=True, max_edits=2, prefix_length=0)
+        assert sorted(index._expand_term("invoice", fuzzy)) == ["invoice", "invoices"]
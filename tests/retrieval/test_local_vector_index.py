@@ -0,0 +1,280 @@
+"""Tests for mydocs.retrieval.local.vector_index — exact and IVF search, persistence."""
+
+import json
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from mydocs.retrieval import local
+from mydocs.retrieval.config import LocalVectorIndexConfig, RetrievalConfig
+from mydocs.retrieval.local.vector_index import LocalVectorIndex
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _unit_vectors(n: int, dims: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dims)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _make_index(tmp_path, n: int = 50, **config) -> tuple[LocalVectorIndex, np.ndarray]:
+    vectors = _unit_vectors(n)
+    index = LocalVectorIndex(str(tmp_path / "idx"), LocalVectorIndexConfig(**config))
+    index.upsert(
+        [f"page_{i}" for i in range(n)],
+        [f"doc_{i % 5}" for i in range(n)],
+        vectors.tolist(),
+    )
+    return index, vectors
+
+
+# ---------------------------------------------------------------------------
+# Tests: LocalVectorIndex
+# ---------------------------------------------------------------------------
+
+class TestLocalVectorIndex:
+    """Tests for the memory-mapped local vector index."""
+
+    def test_exact_search_returns_nearest_first(self, tmp_path):
+        """The stored vector itself is the top hit with score 1.0."""
+        index, vectors = _make_index(tmp_path)
+
+        hits = index.search(vectors[7].tolist(), top_k=3)
+
+        assert len(hits) == 3
+        assert hits[0][0] == "page_7"
+        assert hits[0][1] == "doc_2"
+        assert hits[0][2] == pytest.approx(1.0, abs=1e-5)
+        assert hits[0][2] >= hits[1][2] >= hits[2][2]
+
+    def test_document_id_filter(self, tmp_path):
+        """Only rows of the allowed documents are returned."""
+        index, vectors = _make_index(tmp_path)
+
+        hits = index.search(vectors[7].tolist(), top_k=50, document_ids=["doc_1"])
+
+        assert len(hits) == 10
+        assert {doc_id for _, doc_id, _ in hits} == {"doc_1"}
+
+    def test_unknown_document_filter_returns_nothing(self, tmp_path):
+        index, vectors = _make_index(tmp_path)
+        assert index.search(vectors[0].tolist(), top_k=5, document_ids=["missing"]) == []
+
+    def test_upsert_overwrites_existing_rows(self, tmp_path):
+        """Re-embedding a page replaces its vector instead of adding a row."""
+        index, vectors = _make_index(tmp_path)
+
+        index.upsert(["page_0"], ["doc_0"], [vectors[1].tolist()])
+
+        assert len(index) == 50
+        hits = index.search(vectors[1].tolist(), top_k=2)
+        assert {hit_id for hit_id, _, _ in hits} == {"page_0", "page_1"}
+
+    def test_persistence_and_refresh(self, tmp_path):
+        """A second instance sees the data, and picks up later writes."""
+        writer, vectors = _make_index(tmp_path)
+        reader = LocalVectorIndex(writer.path)
+        assert len(reader) == 50
+
+        extra = _unit_vectors(1, seed=42)
+        writer.upsert(["page_new"], ["doc_new"], extra.tolist())
+
+        hits = reader.search(extra[0].tolist(), top_k=1)
+        assert hits[0][0] == "page_new"
+
+    def test_writes_do_not_reload(self, tmp_path):
+        """Writes keep the writer's state current instead of reloading from disk."""
+        index, vectors = _make_index(tmp_path)
+
+        with patch.object(index, "_load", wraps=index._load) as load:
+            for i in range(5):
+                index.upsert([f"page_new_{i}"], ["doc_new"], _unit_vectors(1, seed=100 + i).tolist())
+            index.upsert(["page_0"], ["doc_0"], [vectors[1].tolist()])
+            index.delete_documents(["doc_1"])
+
+        load.assert_not_called()
+        assert len(index) == 45
+        assert index.search(vectors[1].tolist(), top_k=1)[0][0] in {"page_0", "page_1"}
+
+    def test_appends_are_logged_not_rewritten(self, tmp_path):
+        """Rows are appended to rows.log; rows.json is only written by compaction."""
+        index, _ = _make_index(tmp_path)
+        index.upsert(["page_new"], ["doc_new"], _unit_vectors(1, seed=42).tolist())
+        index.delete_documents(["doc_1"])
+
+        assert not os.path.exists(os.path.join(index.path, "rows.json"))
+        with open(os.path.join(index.path, "rows.log")) as f:
+            assert len(f.read().splitlines()) == 51 + 10
+
+        reader = LocalVectorIndex(index.path)
+        assert len(reader) == 41
+        assert reader._ids == index._ids
+        assert reader._document_ids == index._document_ids
+
+    def test_interrupted_write_tail_is_ignored(self, tmp_path):
+        """Bytes written past meta.json's counts are not read, and are replaced by the next write."""
+        index, _ = _make_index(tmp_path)
+        with open(os.path.join(index.path, "vectors.f32"), "ab") as f:
+            f.write(_unit_vectors(3, seed=9).tobytes())
+        with open(os.path.join(index.path, "rows.log"), "ab") as f:
+            f.write(b'[50, "page_lost", "doc_lost"]\n')
+
+        reader = LocalVectorIndex(index.path)
+        assert len(reader) == 50
+        assert "page_lost" not in reader._row_by_id
+
+        extra = _unit_vectors(1, seed=42)
+        reader.upsert(["page_new"], ["doc_new"], extra.tolist())
+        again = LocalVectorIndex(index.path)
+        assert again._row_by_id["page_new"] == 50
+        assert again.search(extra[0].tolist(), top_k=1)[0][0] == "page_new"
+
+    def test_delete_documents(self, tmp_path):
+        index, vectors = _make_index(tmp_path)
+
+        removed = index.delete_documents(["doc_2"])
+
+        assert removed == 10
+        assert len(index) == 40
+        hits = index.search(vectors[7].tolist(), top_k=50)
+        assert all(doc_id != "doc_2" for _, doc_id, _ in hits)
+
+    def test_compaction_after_mass_delete(self, tmp_path):
+        """Deleting most rows compacts the matrix while keeping search correct."""
+        index, vectors = _make_index(tmp_path)
+
+        index.delete_documents(["doc_0", "doc_1", "doc_2"])
+
+        assert len(index) == 20
+        assert index._count == 20
+        hits = index.search(vectors[3].tolist(), top_k=1)
+        assert hits[0][0] == "page_3"
+
+    def test_dimension_mismatch_raises(self, tmp_path):
+        index, _ = _make_index(tmp_path)
+        with pytest.raises(ValueError):
+            index.search([0.1, 0.2], top_k=1)
+
+    def test_ivf_search_finds_exact_match(self, tmp_path):
+        """With all lists probed, IVF returns the same top hit as exact search."""
+        index, vectors = _make_index(
+            tmp_path, n=200, index_type="ivf", ivf_nlist=8, ivf_nprobe=8, ivf_min_train_size=100,
+        )
+
+        assert index._centroids is not None
+        assert len(index._assignments) == 200
+        hits = index.search(vectors[123].tolist(), top_k=1)
+        assert hits[0][0] == "page_123"
+
+        extra = _unit_vectors(1, seed=42)
+        index.upsert(["page_new"], ["doc_new"], extra.tolist())
+        reader = LocalVectorIndex(index.path, index.config)
+        assert np.array_equal(reader._assignments, index._assignments)
+        assert len(reader._assignments) == 201
+        assert reader.search(extra[0].tolist(), top_k=1)[0][0] == "page_new"
+
+    @pytest.mark.parametrize("quantization,code_bytes", [("int8", 16), ("binary", 2)])
+    def test_quantized_search_rescores_to_exact_scores(self, tmp_path, quantization, code_bytes):
+        """Quantized codes shortlist rows; the returned scores are full precision."""
+        index, vectors = _make_index(tmp_path, n=200, quantization=quantization, rescore_multiplier=10)
+        exact, _ = _make_index(tmp_path / "exact", n=200)
+
+        assert index._codes.shape == (200, code_bytes)
+        hits = index.search(vectors[42].tolist(), top_k=5)
+        assert hits[0][0] == "page_42"
+        assert hits[0][2] == pytest.approx(1.0, abs=1e-5)
+        expected = {hit_id: score for hit_id, _, score in exact.search(vectors[42].tolist(), top_k=200)}
+        for hit_id, _, score in hits:
+            assert score == pytest.approx(expected[hit_id], abs=1e-6)
+
+    @pytest.mark.parametrize("quantization,rescore_limit,min_recall", [
+        ("int8", 40, 0.95),
+        ("binary", 100, 0.6),
+        ("binary", 500, 1.0),
+    ])
+    def test_quantized_recall_against_exact(self, tmp_path, quantization, rescore_limit, min_recall):
+        """Quantized scan + rescoring recovers the exact top-10 on a fixed corpus."""
+        index, _ = _make_index(tmp_path, n=500, quantization=quantization)
+        queries = _unit_vectors(20, seed=7)
+
+        recalls = []
+        for query in queries:
+            truth = {hit_id for hit_id, _, _ in index.search(query.tolist(), top_k=10, exact=True)}
+            found = {hit_id for hit_id, _, _ in index.search(query.tolist(), top_k=10, rescore_limit=rescore_limit)}
+            recalls.append(len(truth & found) / 10)
+        assert np.mean(recalls) >= min_recall
+
+    def test_exact_search_ignores_codes(self, tmp_path):
+        """exact=True on a quantized index matches a full-precision index."""
+        index, _ = _make_index(tmp_path, n=200, quantization="binary", rescore_multiplier=1)
+        exact, _ = _make_index(tmp_path / "exact", n=200)
+        query = _unit_vectors(1, seed=7)[0].tolist()
+
+        assert index.search(query, top_k=10, exact=True) == exact.search(query, top_k=10)
+
+    def test_quantized_codes_follow_updates_and_compaction(self, tmp_path):
+        index, vectors = _make_index(tmp_path, quantization="int8")
+
+        index.upsert(["page_0"], ["doc_0"], [vectors[1].tolist()])
+        index.delete_documents(["doc_1", "doc_2", "doc_3"])
+
+        assert index._codes.shape[0] == index._count == 20
+        reader = LocalVectorIndex(index.path, LocalVectorIndexConfig(quantization="int8"))
+        assert np.array_equal(reader._codes, index._codes)
+        hits = reader.search(vectors[1].tolist(), top_k=1)
+        assert hits[0][0] in {"page_0", "page_1"}
+
+    def test_codes_encoded_on_load_are_saved_by_next_write(self, tmp_path):
+        """Opening an unquantized index with quantization encodes codes once, then writes them."""
+        index, vectors = _make_index(tmp_path)
+        quantized = LocalVectorIndex(index.path, LocalVectorIndexConfig(quantization="int8"))
+        assert quantized._unsaved == {"codes"}
+
+        quantized.upsert(["page_new"], ["doc_new"], _unit_vectors(1, seed=42).tolist())
+
+        with open(os.path.join(index.path, "meta.json")) as f:
+            assert json.load(f)["quantization"] == "int8"
+        reader = LocalVectorIndex(index.path, LocalVectorIndexConfig(quantization="int8"))
+        assert reader._unsaved == set()
+        assert reader._codes.shape == (51, 16)
+        assert reader.search(vectors[9].tolist(), top_k=1)[0][0] == "page_9"
+
+    def test_score_ids_for_reranking(self, tmp_path):
+        """score_ids returns exact scores for known IDs and skips unknown ones."""
+        index, vectors = _make_index(tmp_path)
+
+        scores = index.score_ids(vectors[5].tolist(), ["page_5", "page_6", "missing"])
+
+        assert set(scores) == {"page_5", "page_6"}
+        assert scores["page_5"] == pytest.approx(1.0, abs=1e-5)
+        assert scores["page_6"] < scores["page_5"]
+
+
+# ---------------------------------------------------------------------------
+# Tests: delete_document_from_local_indexes
+# ---------------------------------------------------------------------------
+
+class TestDeleteDocumentFromLocalIndexes:
+    """Document deletes (API and CLI) drop the document's rows from the local indexes."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        with patch("mydocs.config.DATA_FOLDER", str(tmp_path)), patch.dict(local._vector_indexes, clear=True):
+            index = local.get_vector_index("pages", "content_embedding")
+            index.upsert(["page_1", "page_2"], ["doc_1", "doc_2"], _unit_vectors(2).tolist())
+            yield index
+
+    def test_rows_removed_with_local_backend(self, index):
+        local.delete_document_from_local_indexes("doc_1", RetrievalConfig.model_construct(vector_backend="local"))
+
+        assert set(index._row_by_id) == {"page_2"}
+
+    def test_noop_with_atlas_backends(self, index):
+        local.delete_document_from_local_indexes("doc_1", RetrievalConfig.model_construct())
+
+        assert set(index._row_by_id) == {"page_1", "page_2"}
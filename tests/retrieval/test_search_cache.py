@@ -0,0 +1,192 @@
+"""Tests for mydocs.retrieval.cache — request keys, LRU/TTL and generation invalidation."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mydocs.retrieval import cache as cache_module
+from mydocs.retrieval.cache import (
+    SearchResultCache,
+    bump_corpus_generation,
+    get_corpus_generation,
+    request_cache_key,
+)
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import SearchFilters, SearchRequest, SearchResponse
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _response(total: int = 0) -> SearchResponse:
+    return SearchResponse(results=[], total=total, search_target="pages", search_mode="fulltext")
+
+
+def _ft_result(page_id: str) -> dict:
+    return {
+        "id": page_id, "document_id": "doc_1", "page_number": 1, "score": 2.0,
+        "content": "text", "content_markdown": None, "file_name": "a.pdf", "tags": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests: request_cache_key
+# ---------------------------------------------------------------------------
+
+class TestRequestCacheKey:
+
+    def test_equal_requests_share_key(self):
+        a = SearchRequest(query="invoice", filters=SearchFilters(tags=["x"]))
+        b = SearchRequest(filters={"tags": ["x"]}, query="invoice")
+        assert request_cache_key(a) == request_cache_key(b)
+
+    def test_different_requests_differ(self):
+        a = SearchRequest(query="invoice")
+        assert request_cache_key(a) != request_cache_key(SearchRequest(query="invoice", top_k=20))
+        assert request_cache_key(a) != request_cache_key(SearchRequest(query="receipt"))
+
+    def test_use_cache_flag_is_not_part_of_key(self):
+        a = SearchRequest(query="invoice")
+        assert request_cache_key(a) == request_cache_key(SearchRequest(query="invoice", use_cache=False))
+
+
+# ---------------------------------------------------------------------------
+# Tests: SearchResultCache
+# ---------------------------------------------------------------------------
+
+class TestSearchResultCache:
+
+    def test_hit_returns_copy(self):
+        cache = SearchResultCache()
+        cache.put("k", 1, _response(3))
+
+        hit = cache.get("k", 1)
+        hit.total = 99
+
+        assert cache.get("k", 1).total == 3
+        assert cache.stats()["hits"] == 2
+
+    def test_generation_change_invalidates(self):
+        cache = SearchResultCache()
+        cache.put("k", 1, _response())
+
+        assert cache.get("k", 2) is None
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        cache = SearchResultCache(ttl_seconds=10)
+        with patch.object(cache_module.time, "monotonic", return_value=100.0):
+            cache.put("k", 1, _response())
+        with patch.object(cache_module.time, "monotonic", return_value=109.0):
+            assert cache.get("k", 1) is not None
+        with patch.object(cache_module.time, "monotonic", return_value=110.0):
+            assert cache.get("k", 1) is None
+
+    def test_lru_eviction(self):
+        cache = SearchResultCache(max_entries=2)
+        cache.put("a", 1, _response())
+        cache.put("b", 1, _response())
+        cache.get("a", 1)
+        cache.put("c", 1, _response())
+
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is not None
+        assert cache.get("c", 1) is not None
+
+
+# ---------------------------------------------------------------------------
+# Tests: corpus generation
+# ---------------------------------------------------------------------------
+
+class TestCorpusGeneration:
+
+    @pytest.fixture
+    def collection(self):
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value={"_id": "corpus", "generation": 5})
+        collection.find_one_and_update = AsyncMock(return_value={"_id": "corpus", "generation": 6})
+        db = {cache_module.GENERATION_COLLECTION: collection}
+        with patch.object(cache_module, "get_async_database", MagicMock(return_value=db)), \
+                patch.object(cache_module, "_generation", None):
+            yield collection
+
+    @pytest.mark.asyncio
+    async def test_reused_within_max_age(self, collection):
+        with patch.object(cache_module.time, "monotonic", return_value=100.0):
+            assert await get_corpus_generation(1.0) == 5
+            assert await get_corpus_generation(1.0) == 5
+        assert collection.find_one.await_count == 1
+
+        with patch.object(cache_module.time, "monotonic", return_value=101.0):
+            await get_corpus_generation(1.0)
+        assert collection.find_one.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_max_age_always_reads(self, collection):
+        await get_corpus_generation()
+        await get_corpus_generation()
+
+        assert collection.find_one.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_bump_visible_at_once_in_process(self, collection):
+        with patch.object(cache_module.time, "monotonic", return_value=100.0):
+            await get_corpus_generation(1.0)
+            await bump_corpus_generation()
+            assert await get_corpus_generation(1.0) == 6
+        assert collection.find_one.await_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() caching
+# ---------------------------------------------------------------------------
+
+class TestSearchCaching:
+
+    @pytest.fixture
+    def patched(self):
+        fulltext = AsyncMock(side_effect=lambda **kwargs: [_ft_result("p1")])
+        generation = AsyncMock(return_value=1)
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search.get_search_cache", return_value=SearchResultCache()), \
+                patch("mydocs.retrieval.search.get_corpus_generation", generation), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext):
+            yield fulltext, generation
+
+    @pytest.mark.asyncio
+    async def test_repeated_request_is_served_from_cache(self, patched):
+        fulltext, _ = patched
+        request = SearchRequest(query="invoice", search_mode="fulltext")
+
+        first = await search(request)
+        second = await search(request)
+
+        assert fulltext.await_count == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert second.results[0].id == "p1"
+
+    @pytest.mark.asyncio
+    async def test_generation_bump_forces_new_search(self, patched):
+        fulltext, generation = patched
+        request = SearchRequest(query="invoice", search_mode="fulltext")
+
+        await search(request)
+        generation.return_value = 2
+        response = await search(request)
+
+        assert fulltext.await_count == 2
+        assert response.cached is False
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_bypasses(self, patched):
+        fulltext, generation = patched
+        request = SearchRequest(query="invoice", search_mode="fulltext", use_cache=False)
+
+        await search(request)
+        await search(request)
+
+        assert fulltext.await_count == 2
+        generation.assert_not_awaited()
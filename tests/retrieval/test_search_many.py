@@ -0,0 +1,115 @@
+"""Tests for mydocs.retrieval.search.search_many — batched embeddings, ordering and errors."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.models import SearchRequest, SearchResponse
+from mydocs.retrieval.search import search_many
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _response(request: SearchRequest) -> SearchResponse:
+    return SearchResponse(
+        results=[], total=0, search_target=request.search_target, search_mode=request.query,
+    )
+
+
+def _resolve(request, retrieval_config=None):
+    if request.query == "bad":
+        raise ValueError("No vector index found")
+    return "vec_pages_large_dot", "emb", "text-embedding-3-large", None
+
+
+# ---------------------------------------------------------------------------
+# Tests: search_many
+# ---------------------------------------------------------------------------
+
+class TestSearchMany:
+
+    @pytest.fixture
+    def patched(self):
+        embed = AsyncMock(side_effect=lambda queries, model, batch_size: [[float(len(q))] for q in queries])
+
+        async def fake_search(request, query_embedding=None, retrieval_config=None):
+            if request.query == "boom":
+                raise RuntimeError("aggregation failed")
+            fake_search.embeddings[request.query] = query_embedding
+            return _response(request)
+
+        fake_search.embeddings = {}
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=RetrievalConfig.model_construct()), \
+                patch("mydocs.retrieval.search._resolve_vector_index", side_effect=_resolve), \
+                patch("mydocs.retrieval.search.embeddings.generate_query_embeddings", embed), \
+                patch("mydocs.retrieval.search.search", side_effect=fake_search):
+            yield embed, fake_search
+
+    @pytest.mark.asyncio
+    async def test_embeds_all_queries_in_one_call(self, patched):
+        embed, fake_search = patched
+        requests = [
+            SearchRequest(query="alpha"),
+            SearchRequest(query="beta", search_mode="vector"),
+            SearchRequest(query="alpha"),
+            SearchRequest(query="gamma", search_mode="fulltext"),
+        ]
+
+        response = await search_many(requests)
+
+        embed.assert_awaited_once()
+        assert embed.await_args.args[0] == ["alpha", "beta"]
+        assert fake_search.embeddings == {"alpha": [5.0], "beta": [4.0], "gamma": None}
+        assert [item.index for item in response.results] == [0, 1, 2, 3]
+        assert [item.response.search_mode for item in response.results] == ["alpha", "beta", "alpha", "gamma"]
+        assert response.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_per_query_errors(self, patched):
+        requests = [
+            SearchRequest(query="ok"),
+            SearchRequest(query="bad"),
+            SearchRequest(query="boom", search_mode="fulltext"),
+        ]
+
+        response = await search_many(requests)
+
+        assert response.total == 3
+        assert response.failed == 2
+        assert response.results[0].response is not None
+        assert "No vector index" in response.results[1].error
+        assert response.results[2].error == "aggregation failed"
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_fails_only_vector_queries(self, patched):
+        embed, _ = patched
+        embed.side_effect = RuntimeError("rate limited")
+
+        response = await search_many([SearchRequest(query="a"), SearchRequest(query="b", search_mode="fulltext")])
+
+        assert "rate limited" in response.results[0].error
+        assert response.results[1].response is not None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self, patched):
+        running = 0
+        peak = 0
+
+        async def slow_search(request, query_embedding=None, retrieval_config=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return _response(request)
+
+        with patch("mydocs.retrieval.search.search", side_effect=slow_search):
+            requests = [SearchRequest(query=f"q{i}", search_mode="fulltext") for i in range(10)]
+            response = await search_many(requests, max_concurrency=3)
+
+        assert peak == 3
+        assert response.failed == 0
@@ -0,0 +1,124 @@
+"""Tests for cursor-based search pagination (mydocs.retrieval.cursor and search())."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval import cursor as cursor_module
+from mydocs.retrieval.config import PaginationConfig, RetrievalConfig
+from mydocs.retrieval.cursor import SearchCursor, SearchCursorStore, decode_cursor, encode_cursor
+from mydocs.retrieval.models import SearchRequest
+from mydocs.retrieval.search import search
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _ft_results(n: int) -> list[dict]:
+    return [
+        {"id": f"p{i}", "document_id": "doc_1", "page_number": i, "score": float(n - i),
+         "content": None, "content_markdown": None, "file_name": "a.pdf", "tags": []}
+        for i in range(n)
+    ]
+
+
+async def _hydrate(search_target, hits, content_projection=None):
+    return [
+        {"id": hit_id, "document_id": "doc_1", "page_number": int(hit_id[1:]), "score": score,
+         "content": f"text of {hit_id}", "content_markdown": None, "file_name": "a.pdf", "tags": []}
+        for hit_id, score in hits
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Tests: tokens and store
+# ---------------------------------------------------------------------------
+
+class TestCursorTokens:
+
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor("abc", 20)) == ("abc", 20)
+
+    @pytest.mark.parametrize("token", ["not-a-cursor", encode_cursor("abc", -1), ""])
+    def test_malformed(self, token):
+        with pytest.raises(ValueError, match="Invalid search cursor"):
+            decode_cursor(token)
+
+
+class TestSearchCursorStore:
+
+    def test_ttl_expiry(self):
+        store = SearchCursorStore(ttl_seconds=10)
+        with patch.object(cursor_module.time, "monotonic", return_value=100.0):
+            cursor_id = store.put(SearchCursor(SearchRequest(query="q"), []))
+        with patch.object(cursor_module.time, "monotonic", return_value=110.0):
+            assert store.get(cursor_id) is None
+
+    def test_lru_eviction(self):
+        store = SearchCursorStore(max_cursors=1)
+        first = store.put(SearchCursor(SearchRequest(query="a"), []))
+        second = store.put(SearchCursor(SearchRequest(query="b"), []))
+
+        assert store.get(first) is None
+        assert store.get(second).request.query == "b"
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() pagination
+# ---------------------------------------------------------------------------
+
+class TestSearchPagination:
+
+    @pytest.fixture
+    def patched(self):
+        fulltext = AsyncMock(return_value=_ft_results(25))
+        hydrate = AsyncMock(side_effect=_hydrate)
+        config = RetrievalConfig.model_construct(pagination=PaginationConfig(max_results=100))
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=config), \
+                patch("mydocs.retrieval.search.get_cursor_store", return_value=SearchCursorStore()), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext), \
+                patch("mydocs.retrieval.search.hydrate_results", hydrate):
+            yield fulltext, hydrate
+
+    @pytest.mark.asyncio
+    async def test_pages_are_served_without_searching_again(self, patched):
+        fulltext, hydrate = patched
+        request = SearchRequest(query="q", search_mode="fulltext", top_k=10, paginate=True)
+
+        first = await search(request)
+        second = await search(SearchRequest(query="q", top_k=10, cursor=first.next_cursor))
+        third = await search(SearchRequest(query="q", top_k=10, cursor=second.next_cursor))
+
+        assert fulltext.await_count == 1
+        kwargs = fulltext.await_args.kwargs
+        assert kwargs["top_k"] == 100
+        assert kwargs["content_fields"] == []
+        assert [r.id for r in first.results] == [f"p{i}" for i in range(10)]
+        assert [r.id for r in second.results] == [f"p{i}" for i in range(10, 20)]
+        assert [r.id for r in third.results] == [f"p{i}" for i in range(20, 25)]
+        assert third.next_cursor is None
+        assert second.results[0].content == "text of p10"
+        assert second.results[0].scores == {"fulltext": 15.0, "vector": 0.0}
+        assert second.search_mode == "fulltext"
+
+    @pytest.mark.asyncio
+    async def test_cursor_is_replayable(self, patched):
+        first = await search(SearchRequest(query="q", search_mode="fulltext", top_k=10, paginate=True))
+
+        a = await search(SearchRequest(query="q", top_k=10, cursor=first.next_cursor))
+        b = await search(SearchRequest(query="q", top_k=10, cursor=first.next_cursor))
+
+        assert [r.id for r in a.results] == [r.id for r in b.results]
+
+    @pytest.mark.asyncio
+    async def test_no_cursor_when_everything_fits(self, patched):
+        response = await search(SearchRequest(query="q", search_mode="fulltext", top_k=50, paginate=True))
+
+        assert response.total == 25
+        assert response.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_cursor(self, patched):
+        with pytest.raises(ValueError, match="expired or unknown"):
+            await search(SearchRequest(query="q", cursor=encode_cursor("missing", 10)))
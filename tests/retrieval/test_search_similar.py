@@ -0,0 +1,106 @@
+"""Tests for mydocs.retrieval.search.search_similar — stored-vector similarity search."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mydocs.retrieval.config import RetrievalConfig
+from mydocs.retrieval.embeddings import average_embeddings
+from mydocs.retrieval.models import SimilarSearchRequest
+from mydocs.retrieval.search import search_similar
+
+FIELD = "emb_content_markdown_text_embedding_3_large"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _hit(page_id: str, document_id: str, score: float) -> dict:
+    return {
+        "id": page_id, "document_id": document_id, "page_number": 1, "score": score,
+        "content": "text", "content_markdown": None, "file_name": None, "tags": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests: average_embeddings
+# ---------------------------------------------------------------------------
+
+class TestAverageEmbeddings:
+
+    def test_mean_is_renormalized(self):
+        assert average_embeddings([[1.0, 0.0], [0.0, 1.0]]) == pytest.approx([2 ** -0.5, 2 ** -0.5])
+
+    def test_single_vector_unchanged(self):
+        assert average_embeddings([[0.6, 0.8]]) == pytest.approx([0.6, 0.8])
+
+
+# ---------------------------------------------------------------------------
+# Tests: search_similar
+# ---------------------------------------------------------------------------
+
+class TestSearchSimilar:
+
+    @pytest.fixture
+    def patched(self):
+        sources = [{"_id": "a1", FIELD: [1.0, 0.0]}, {"_id": "a2", FIELD: [0.0, 1.0]}]
+        aggregate = AsyncMock(return_value=sources)
+        vector = AsyncMock(return_value=[
+            _hit("a1", "A", 0.99), _hit("b1", "B", 0.9), _hit("a3", "A", 0.85), _hit("c1", "C", 0.8),
+        ])
+        embed = AsyncMock()
+        with patch("mydocs.retrieval.search._resolve_vector_index",
+                   return_value=("vec_pages_large_dot", FIELD, "text-embedding-3-large", None)), \
+                patch("mydocs.retrieval.search.DocumentPage.aaggregate", aggregate), \
+                patch("mydocs.retrieval.search.vector_retriever.vector_search", vector), \
+                patch("mydocs.retrieval.search.embeddings.generate_query_embedding", embed):
+            yield aggregate, vector, embed
+
+    @pytest.mark.asyncio
+    async def test_page_ids_average_and_exclude_sources(self, patched):
+        aggregate, vector, embed = patched
+
+        response = await search_similar(
+            SimilarSearchRequest(page_ids=["a1", "a2"], top_k=2), RetrievalConfig.model_construct(),
+        )
+
+        embed.assert_not_awaited()
+        kwargs = vector.await_args.kwargs
+        assert kwargs["query_embedding"] == pytest.approx([2 ** -0.5, 2 ** -0.5])
+        assert kwargs["top_k"] == 4
+        assert aggregate.await_args.args[0][0]["$match"]["_id"] == {"$in": ["a1", "a2"]}
+        assert [r.id for r in response.results] == ["b1", "a3"]
+        assert response.search_mode == "similar"
+        assert response.embedding_model_used is None
+
+    @pytest.mark.asyncio
+    async def test_document_source_excludes_all_its_pages(self, patched):
+        aggregate, _, _ = patched
+
+        response = await search_similar(SimilarSearchRequest(document_id="A"), RetrievalConfig.model_construct())
+
+        assert aggregate.await_args.args[0][0]["$match"]["document_id"] == "A"
+        assert [r.id for r in response.results] == ["b1", "c1"]
+
+    @pytest.mark.asyncio
+    async def test_keep_sources(self, patched):
+        response = await search_similar(
+            SimilarSearchRequest(page_ids=["a1"], exclude_source=False), RetrievalConfig.model_construct(),
+        )
+
+        assert response.results[0].id == "a1"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("request_kwargs", [{}, {"document_id": "A", "page_ids": ["a1"]}])
+    async def test_requires_exactly_one_source(self, request_kwargs):
+        with pytest.raises(ValueError, match="exactly one"):
+            await search_similar(SimilarSearchRequest(**request_kwargs))
+
+    @pytest.mark.asyncio
+    async def test_missing_vectors(self, patched):
+        aggregate, _, _ = patched
+        aggregate.return_value = []
+
+        with pytest.raises(ValueError, match="No stored"):
+            await search_similar(SimilarSearchRequest(page_ids=["zz"]), RetrievalConfig.model_construct())
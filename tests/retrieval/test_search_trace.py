@@ -0,0 +1,119 @@
+"""Tests for mydocs.retrieval.trace and the search() debug/explain output."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mydocs.retrieval import trace as trace_module
+from mydocs.retrieval.cache import SearchResultCache
+from mydocs.retrieval.config import RetrievalConfig, SearchDiagnosticsConfig
+from mydocs.retrieval.models import SearchRequest
+from mydocs.retrieval.search import search
+from mydocs.retrieval.trace import count, current_trace, stage, start_trace, traced_aggregate
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _ft_result(page_id: str, score: float) -> dict:
+    return {
+        "id": page_id, "document_id": "doc_1", "page_number": 1, "score": score,
+        "content": "text", "content_markdown": None, "file_name": "a.pdf", "tags": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests: SearchTrace
+# ---------------------------------------------------------------------------
+
+class TestSearchTrace:
+
+    def test_stages_accumulate(self):
+        clock = iter([0.0, 1.0, 1.5, 2.0, 2.25, 3.0])
+        with patch.object(trace_module.time, "monotonic", side_effect=lambda: next(clock)):
+            with start_trace() as trace:
+                with stage("embedding"):
+                    pass
+                with stage("embedding"):
+                    pass
+                count("returned", 3)
+                debug = trace.to_debug()
+
+        assert debug.timings_ms == {"embedding": 750.0}
+        assert debug.counts == {"returned": 3}
+        assert debug.total_ms == 3000.0
+        assert debug.explain is None
+
+    def test_no_trace_is_noop(self):
+        assert current_trace() is None
+        with stage("fusion"):
+            count("fused", 1)
+        assert current_trace() is None
+
+    @pytest.mark.asyncio
+    async def test_traced_aggregate_with_explain(self):
+        collection = MagicMock()
+        collection.name = "pages"
+        collection.database.command = AsyncMock(return_value={"stages": [{"$vectorSearch": {"nReturned": 2}}]})
+        model = MagicMock()
+        model.aaggregate = AsyncMock(return_value=[{"_id": 1}, {"_id": 2}])
+        model.get_async_collection = AsyncMock(return_value=collection)
+
+        with start_trace(explain=True) as trace:
+            raw = await traced_aggregate(model, [{"$match": {}}], "vector.pages")
+
+        assert len(raw) == 2
+        assert trace.counts == {"vector.pages": 2}
+        assert "vector.pages" in trace.timings_ms
+        command = collection.database.command.await_args.args[0]
+        assert command["explain"] == {"aggregate": "pages", "pipeline": [{"$match": {}}], "cursor": {}}
+        assert command["verbosity"] == "executionStats"
+        assert trace.explain["vector.pages"]["stages"][0]["$vectorSearch"]["nReturned"] == 2
+
+
+# ---------------------------------------------------------------------------
+# Tests: search() debug output
+# ---------------------------------------------------------------------------
+
+class TestSearchDebug:
+
+    @pytest.fixture
+    def patched(self):
+        fulltext = AsyncMock(side_effect=lambda **kwargs: [_ft_result("p1", 3.0), _ft_result("p2", 0.5)])
+        config = RetrievalConfig.model_construct(diagnostics=SearchDiagnosticsConfig(slow_query_ms=0))
+        with patch("mydocs.retrieval.search.RetrievalConfig", return_value=config), \
+                patch("mydocs.retrieval.search.get_search_cache", return_value=SearchResultCache()), \
+                patch("mydocs.retrieval.search.get_corpus_generation", AsyncMock(return_value=1)), \
+                patch("mydocs.retrieval.search.fulltext_retriever.fulltext_search", fulltext):
+            yield config
+
+    @pytest.mark.asyncio
+    async def test_debug_breakdown(self, patched):
+        response = await search(SearchRequest(query="q", search_mode="fulltext", min_score=1.0, debug=True))
+
+        assert {"cache", "fulltext", "build_response"} <= set(response.debug.timings_ms)
+        assert response.debug.counts == {"fulltext.results": 2, "after_min_score": 1, "returned": 1}
+
+    @pytest.mark.asyncio
+    async def test_no_debug_by_default(self, patched):
+        response = await search(SearchRequest(query="q", search_mode="fulltext"))
+        assert response.debug is None
+
+    @pytest.mark.asyncio
+    async def test_cached_response_gets_fresh_trace(self, patched):
+        await search(SearchRequest(query="q", search_mode="fulltext"))
+        response = await search(SearchRequest(query="q", search_mode="fulltext", debug=True))
+
+        assert response.cached is True
+        assert set(response.debug.timings_ms) == {"cache"}
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged(self, patched):
+        patched.diagnostics.slow_query_ms = 0.000001
+        with patch("mydocs.retrieval.search.log") as log:
+            await search(SearchRequest(query="q", search_mode="fulltext", use_cache=False))
+
+        message = log.warning.call_args.args[0]
+        assert message.startswith("slow search duration_ms=")
+        assert "timings_ms={'fulltext'" in message
@@ -0,0 +1,97 @@
+"""Tests for short-vector embeddings and vector index routing in mydocs.retrieval.search."""
+
+import math
+from unittest.mock import patch
+
+import pytest
+
+from mydocs.parsing.config import EmbeddingConfig, ParserConfig
+from mydocs.retrieval.config import LocalVectorIndexConfig, RetrievalConfig
+from mydocs.retrieval.embeddings import shorten_embedding
+from mydocs.retrieval.models import SearchRequest, VectorSearchConfig
+from mydocs.retrieval.search import _resolve_vector_index
+
+FULL_FIELD = "emb_content_markdown_text_embedding_3_large"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _parser_config(**embedding) -> ParserConfig:
+    return ParserConfig.model_construct(
+        page_embeddings=[EmbeddingConfig(**embedding)], document_embeddings=None,
+    )
+
+
+def _resolve(vector: VectorSearchConfig, retrieval_config: RetrievalConfig | None = None, **embedding):
+    request = SearchRequest(query="q", vector=vector)
+    with patch("mydocs.retrieval.search.ParserConfig", return_value=_parser_config(**embedding)):
+        return _resolve_vector_index(request, retrieval_config)
+
+
+def _local_config(quantization: str | None) -> RetrievalConfig:
+    return RetrievalConfig.model_construct(
+        vector_backend="local", local_vector=LocalVectorIndexConfig(quantization=quantization),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tests: shorten_embedding
+# ---------------------------------------------------------------------------
+
+class TestShortenEmbedding:
+
+    def test_truncates_and_renormalizes(self):
+        short = shorten_embedding([3.0, 4.0, 12.0], 2)
+        assert short == pytest.approx([0.6, 0.8])
+        assert math.sqrt(sum(v * v for v in short)) == pytest.approx(1.0)
+
+    def test_zero_vector_is_kept(self):
+        assert shorten_embedding([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+    def test_short_field_defaults_from_target_field(self):
+        assert EmbeddingConfig().short_field is None
+        assert EmbeddingConfig(short_dimensions=256).short_field == f"{FULL_FIELD}_256"
+        assert EmbeddingConfig(short_dimensions=256, short_target_field="emb_short").short_field == "emb_short"
+
+
+# ---------------------------------------------------------------------------
+# Tests: _resolve_vector_index
+# ---------------------------------------------------------------------------
+
+class TestResolveVectorIndex:
+
+    def test_full_precision_index(self):
+        index_name, field, _, rerank_field = _resolve(VectorSearchConfig(), short_dimensions=256)
+        assert (index_name, field, rerank_field) == ("vec_pages_large_dot", FULL_FIELD, None)
+
+    def test_quantized_index(self):
+        index_name, field, _, rerank_field = _resolve(VectorSearchConfig(quantization="int8"))
+        assert (index_name, field, rerank_field) == ("vec_pages_large_dot_int8", FULL_FIELD, None)
+
+    def test_short_vector_index_reranks_with_full_field(self):
+        index_name, field, _, rerank_field = _resolve(VectorSearchConfig(dimensions=256), short_dimensions=256)
+        assert index_name == "vec_pages_large_256_dot"
+        assert field == f"{FULL_FIELD}_256"
+        assert rerank_field == FULL_FIELD
+
+    def test_explicit_short_index_name(self):
+        vector = VectorSearchConfig(index_name="vec_pages_large_256_dot")
+        _, field, _, rerank_field = _resolve(vector, short_dimensions=256)
+        assert (field, rerank_field) == (f"{FULL_FIELD}_256", FULL_FIELD)
+
+    def test_unconfigured_dimensions_raise(self):
+        with pytest.raises(ValueError, match="No 512-dimension vectors"):
+            _resolve(VectorSearchConfig(dimensions=512), short_dimensions=256)
+
+    @pytest.mark.parametrize("quantization", [None, "int8"])
+    def test_local_backend_accepts_own_quantization(self, quantization):
+        _, field, _, _ = _resolve(VectorSearchConfig(quantization=quantization), _local_config("int8"))
+        assert field == FULL_FIELD
+
+    def test_local_backend_rejects_other_quantization(self):
+        with pytest.raises(ValueError, match="not available on the local vector backend"):
+            _resolve(VectorSearchConfig(quantization="binary"), _local_config("int8"))
+        with pytest.raises(ValueError, match="not available on the local vector backend"):
+            _resolve(VectorSearchConfig(quantization="int8"), _local_config(None))